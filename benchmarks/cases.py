@@ -0,0 +1,365 @@
+"""Benchmark cases over reproducible synthetic inputs.
+
+Each case has a setup step (not timed) that returns a zero-argument callable;
+the runner times that callable, which returns how many units (bars, rows,
+backtests) it processed. Inputs come from `qryptify.data.synthetic` with a
+fixed seed, so every run sees the same series for a given size.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import random
+from typing import Callable, Dict, List, Optional
+
+from qryptify.data.synthetic import iter_rows
+from qryptify.data.synthetic import synthetic_bars
+from qryptify.data.synthetic import synthetic_columns
+from qryptify.shared.latency import LatencyTracker
+from qryptify_strategy.backtester import backtest
+from qryptify_strategy.batch import batch_backtest
+from qryptify_strategy.candidates import eval_grid
+from qryptify_strategy.indicators import ema
+from qryptify_strategy.indicators import RollingMeanStd
+from qryptify_strategy.indicators import true_range
+from qryptify_strategy.indicators import WilderATR
+from qryptify_strategy.indicators import WilderRSI
+from qryptify_strategy.loader import build_bars
+from qryptify_strategy.models import RiskParams
+from qryptify_strategy.pareto import skyline
+from qryptify_strategy.strategies.bollinger import BollingerBandStrategy
+from qryptify_strategy.strategies.ema_crossover import EMACrossStrategy
+from qryptify_strategy.strategies.rsi_scalp import RSIScalpStrategy
+
+SEED = 20240101
+BENCH_SYMBOL = "BENCHUSDT"
+
+# Same defaults as qryptify-optimize
+DEFAULT_GRID = dict(
+    strategies=["ema", "bollinger", "rsi"],
+    fast_opts=[10, 20, 30, 50],
+    slow_opts=[50, 100, 200],
+    risk_opts=[0.003, 0.005, 0.01],
+    atr_opts=[2.0, 2.5, 3.0],
+    fee_bps_val=4.0,
+)
+
+Runner = Callable[[], int]
+
+
+@dataclass
+class BenchContext:
+    dsn: Optional[str] = None
+    layout: str = "single"  # db.layout for the DB cases
+
+
+@dataclass
+class Case:
+    name: str
+    group: str
+    setup: Callable[[BenchContext, int], Runner]
+    unit: str = "bars"
+    max_size: int = 10_000_000  # skipped above this unless --no-cap
+    needs_db: bool = False
+    warmup: bool = True  # off for cases that are long enough on their own
+
+
+def _risk(trail: float = 0.0) -> RiskParams:
+    return RiskParams(start_equity=10_000.0,
+                      risk_per_trade=0.005,
+                      atr_period=14,
+                      atr_mult_stop=2.5,
+                      fee_bps=4.0,
+                      slippage_bps=1.0,
+                      atr_mult_trail=trail,
+                      atr_trail_trigger_mult=1.0 if trail else 0.0)
+
+
+# --- indicators -----------------------------------------------------------
+
+
+def _ind_ema(ctx: BenchContext, n: int) -> Runner:
+    closes = list(synthetic_columns(n).close)
+
+    def run() -> int:
+        prev = None
+        alpha = 2.0 / 51.0
+        for c in closes:
+            prev = ema(alpha, prev, c)
+        return len(closes)
+
+    return run
+
+
+def _ind_rsi(ctx: BenchContext, n: int) -> Runner:
+    closes = list(synthetic_columns(n).close)
+
+    def run() -> int:
+        calc = WilderRSI(14)
+        for c in closes:
+            calc.update(c)
+        return len(closes)
+
+    return run
+
+
+def _ind_atr(ctx: BenchContext, n: int) -> Runner:
+    cols = synthetic_columns(n)
+    hlc = list(zip(cols.high, cols.low, cols.close))
+
+    def run() -> int:
+        calc = WilderATR(14)
+        prev = None
+        for h, lo, c in hlc:
+            calc.update(true_range(h, lo, prev))
+            prev = c
+        return len(hlc)
+
+    return run
+
+
+def _ind_meanstd(ctx: BenchContext, n: int) -> Runner:
+    closes = list(synthetic_columns(n).close)
+
+    def run() -> int:
+        calc = RollingMeanStd(20)
+        for c in closes:
+            calc.update(c)
+        return len(closes)
+
+    return run
+
+
+# --- strategies -----------------------------------------------------------
+
+
+def _on_bar(factory: Callable[[], object]) -> Callable[[BenchContext, int], Runner]:
+
+    def setup(ctx: BenchContext, n: int) -> Runner:
+        bars = synthetic_bars(n)
+
+        def run() -> int:
+            strat = factory()
+            strat.on_start()  # type: ignore[attr-defined]
+            on_bar = strat.on_bar  # type: ignore[attr-defined]
+            for i, bar in enumerate(bars):
+                on_bar(i, bar)
+            return len(bars)
+
+        return run
+
+    return setup
+
+
+# --- engine ---------------------------------------------------------------
+
+
+def _backtest(factory: Callable[[], object],
+              trail: float = 0.0) -> Callable[[BenchContext, int], Runner]:
+
+    def setup(ctx: BenchContext, n: int) -> Runner:
+        bars = synthetic_bars(n)
+        risk = _risk(trail)
+
+        def run() -> int:
+            backtest(BENCH_SYMBOL, "1m", bars, factory(), risk)  # type: ignore[arg-type]
+            return len(bars)
+
+        return run
+
+    return setup
+
+
+def _batch(factory: Callable[[], object], symbols: int = 4) -> Callable[[BenchContext, int], Runner]:
+    """One config over `symbols` series of n/symbols bars (batch signal kernels)."""
+
+    def setup(ctx: BenchContext, n: int) -> Runner:
+        bars = synthetic_bars(max(1, n // symbols))
+        by_symbol = {f"BENCH{j}USDT": bars for j in range(symbols)}
+        risk = _risk()
+
+        def run() -> int:
+            batch_backtest("1m", by_symbol, factory(), risk)  # type: ignore[arg-type]
+            return len(bars) * symbols
+
+        return run
+
+    return setup
+
+
+def _paper(ctx: BenchContext, n: int, pairs: int = 40) -> Runner:
+    """Live paper step: 3 strategies on each of `pairs` pairs, one batch per closed bar."""
+    from qryptify_strategy.paper import PaperBatch
+    from qryptify_strategy.paper import PaperEngine
+    from qryptify_strategy.paper import PaperInstance
+
+    bars = synthetic_bars(max(1, n // (3 * pairs)))
+    symbols = [f"BENCH{j}USDT" for j in range(pairs)]
+    risk = _risk()
+
+    def run() -> int:
+        ids = iter(range(1, 1 << 62))
+        engine = PaperEngine([
+            PaperInstance(f"{k}:{s}", s, "1m", make(), risk) for s in symbols
+            for k, make in enumerate((lambda: EMACrossStrategy(20, 100),
+                                      lambda: BollingerBandStrategy(20, 2.0),
+                                      lambda: RSIScalpStrategy(14, 30.0, 55.0, 200)))
+        ], ids.__next__)
+        steps = 0
+        for b in bars:
+            for s in symbols:
+                steps += engine.on_bar(s, "1m", b, PaperBatch())
+        return steps
+
+    return run
+
+
+def _latency(ctx: BenchContext, n: int, pairs: int = 40) -> Runner:
+    """Live-path tracing: one five-stamp bar record per closed bar."""
+    rnd = random.Random(5)
+    stamps = []
+    for _ in range(1000):
+        recv = 0.2 + rnd.random()
+        commit = recv + 0.01 + rnd.random() / 50
+        stamps.append((0.0, recv, recv + 0.0002, recv + 0.00021, commit))
+    keys = [(f"BENCH{j}USDT", "1m") for j in range(pairs)]
+
+    def run() -> int:
+        tracker = LatencyTracker()
+        record = tracker.record
+        for i in range(n):
+            sym, itv = keys[i % pairs]
+            record(sym, itv, stamps[i % 1000])
+        tracker.drain()
+        return n
+
+    return run
+
+
+def _eval_grid(ctx: BenchContext, n: int) -> Runner:
+    bars = synthetic_bars(n)
+
+    def run() -> int:
+        res = eval_grid(BENCH_SYMBOL, "1m", bars, **DEFAULT_GRID)  # type: ignore[arg-type]
+        return len(res)
+
+    return run
+
+
+def _pareto_skyline(ctx: BenchContext, n: int) -> Runner:
+    # pnl/cagr and trades/fee drag move together in real grids; dd and win rate less so
+    rng = random.Random(SEED)
+    pnl = [rng.gauss(0, 1) for _ in range(n)]
+    trades = [rng.random() for _ in range(n)]
+    cols = [
+        [-x for x in pnl],
+        [rng.random() for _ in range(n)],
+        [-x - rng.gauss(0, 0.2) for x in pnl],
+        [-rng.random() for _ in range(n)],
+        [t + rng.gauss(0, 0.1) for t in trades],
+    ]
+
+    def run() -> int:
+        skyline(cols)
+        return n
+
+    return run
+
+
+def _build_bars(ctx: BenchContext, n: int) -> Runner:
+    rows = list(iter_rows(synthetic_columns(n), BENCH_SYMBOL, "1m"))
+
+    def run() -> int:
+        return len(build_bars(rows))
+
+    return run
+
+
+# --- repository (needs a TimescaleDB) --------------------------------------
+
+
+def _repo(ctx: BenchContext):
+    from qryptify.data.timescale import TimescaleRepo
+
+    assert ctx.dsn
+    return TimescaleRepo.from_cfg({"db": {"dsn": ctx.dsn, "layout": ctx.layout}})
+
+
+def _purge(ctx: BenchContext) -> None:
+    import psycopg
+
+    from qryptify.data.layout import table_for
+
+    assert ctx.dsn
+    with psycopg.connect(ctx.dsn, autocommit=True) as conn:
+        conn.execute(f"DELETE FROM {table_for('1m', ctx.layout)} WHERE symbol = %s",
+                     (BENCH_SYMBOL, ))
+
+
+def _db_write(method: str) -> Callable[[BenchContext, int], Runner]:
+
+    def setup(ctx: BenchContext, n: int) -> Runner:
+        rows = list(iter_rows(synthetic_columns(n), BENCH_SYMBOL, "1m"))
+
+        def run() -> int:
+            # Each repetition starts from an empty symbol (insert path)
+            _purge(ctx)
+            with _repo(ctx) as repo:
+                getattr(repo, method)(rows)
+            return len(rows)
+
+        return run
+
+    return setup
+
+
+def _db_fetch(ctx: BenchContext, n: int) -> Runner:
+    rows = list(iter_rows(synthetic_columns(n), BENCH_SYMBOL, "1m"))
+    _purge(ctx)
+    with _repo(ctx) as repo:
+        repo.copy_klines(rows)
+
+    def run() -> int:
+        with _repo(ctx) as repo:
+            return len(repo.fetch_ohlcv(BENCH_SYMBOL, "1m", limit=n))
+
+    return run
+
+
+CASES: List[Case] = [
+    Case("indicators.ema", "indicators", _ind_ema),
+    Case("indicators.wilder_rsi", "indicators", _ind_rsi),
+    Case("indicators.wilder_atr", "indicators", _ind_atr),
+    Case("indicators.rolling_mean_std", "indicators", _ind_meanstd),
+    Case("strategy.ema.on_bar", "strategy", _on_bar(lambda: EMACrossStrategy(20, 100))),
+    Case("strategy.bollinger.on_bar", "strategy",
+         _on_bar(lambda: BollingerBandStrategy(20, 2.0))),
+    Case("strategy.rsi.on_bar", "strategy",
+         _on_bar(lambda: RSIScalpStrategy(14, 30.0, 55.0, 200))),
+    Case("backtest.ema", "backtest", _backtest(lambda: EMACrossStrategy(20, 100))),
+    Case("backtest.ema_trailing", "backtest",
+         _backtest(lambda: EMACrossStrategy(20, 100), trail=2.0)),
+    Case("backtest.rsi", "backtest", _backtest(lambda: RSIScalpStrategy(14, 30.0, 55.0,
+                                                                         200))),
+    Case("backtest.batch_ema", "backtest", _batch(lambda: EMACrossStrategy(20, 100))),
+    Case("backtest.batch_rsi", "backtest", _batch(lambda: RSIScalpStrategy(14, 30.0, 55.0,
+                                                                            200))),
+    Case("paper.step", "paper", _paper, unit="steps"),
+    Case("live.latency_record", "live", _latency),
+    Case("optimize.eval_grid",
+         "optimize",
+         _eval_grid,
+         unit="backtests",
+         max_size=10_000,
+         warmup=False),
+    Case("optimize.pareto_skyline", "optimize", _pareto_skyline, unit="results",
+         max_size=1_000_000),
+    Case("loader.build_bars", "loader", _build_bars),
+    Case("db.upsert_klines", "db", _db_write("upsert_klines"), unit="rows",
+         max_size=1_000_000, needs_db=True),
+    Case("db.copy_klines", "db", _db_write("copy_klines"), unit="rows",
+         max_size=1_000_000, needs_db=True),
+    Case("db.fetch_ohlcv", "db", _db_fetch, unit="rows", max_size=1_000_000,
+         needs_db=True),
+]
+
+CASES_BY_NAME: Dict[str, Case] = {c.name: c for c in CASES}
@@ -0,0 +1,199 @@
+"""
+Run the benchmark suite and compare against a stored baseline.
+
+Usage:
+  python -m benchmarks.run                                  # 1e4,1e5; no DB cases
+  python -m benchmarks.run --sizes 1e4,1e5,1e6 --filter backtest,indicators
+  python -m benchmarks.run --dsn postgresql://... --filter db --sizes 1e5
+  python -m benchmarks.run --dsn postgresql://... --filter db --layout per_interval
+  python -m benchmarks.run --out reports/bench.json --baseline benchmarks/baseline.json
+  python -m benchmarks.run --save-baseline benchmarks/baseline.json
+
+Each case is timed `--repeat` times after one untimed warm-up; the median is
+compared with the baseline. A case regresses when it is slower than the
+baseline by more than `--threshold` (fraction); the exit status is 1 if any
+case regressed, so the command can gate CI. Cases over their size cap (e.g.
+eval_grid above 1e4 bars, ~300 backtests per run) are skipped unless `--no-cap` is given.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from qryptify.shared.config_model import STORAGE_LAYOUTS
+
+from .cases import BenchContext
+from .cases import Case
+from .cases import CASES
+
+DEFAULT_SIZES = "1e4,1e5"
+
+
+def _parse_sizes(s: str) -> List[int]:
+    return [int(float(x)) for x in s.split(",") if x.strip()]
+
+
+def select_cases(filters: List[str], with_db: bool) -> List[Case]:
+    out = []
+    for c in CASES:
+        if c.needs_db and not with_db:
+            continue
+        if filters and not any(f in c.name for f in filters):
+            continue
+        out.append(c)
+    return out
+
+
+def run_case(case: Case, size: int, ctx: BenchContext, repeat: int) -> Dict[str, object]:
+    run = case.setup(ctx, size)
+    if case.warmup:
+        run()  # untimed; primes caches and the DB
+    times: List[float] = []
+    units = 0
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        units = run()
+        times.append(time.perf_counter() - t0)
+    med = statistics.median(times)
+    return {
+        "case": case.name,
+        "group": case.group,
+        "size": size,
+        "unit": case.unit,
+        "units": units,
+        "median_s": round(med, 6),
+        "min_s": round(min(times), 6),
+        "units_per_s": round(units / med, 1) if med > 0 else None,
+        "repeat": len(times),
+    }
+
+
+def compare(current: List[Dict[str, object]], baseline: List[Dict[str, object]],
+            threshold: float) -> List[Dict[str, object]]:
+    """Attach baseline ratio and status (ok/regression/faster/new) to each result."""
+    base: Dict[Tuple[str, int], Dict[str, object]] = {
+        (str(b["case"]), int(b["size"])): b  # type: ignore[call-overload]
+        for b in baseline
+    }
+    out = []
+    for r in current:
+        row = dict(r)
+        b = base.get((str(r["case"]), int(r["size"])))  # type: ignore[call-overload]
+        if b is None or not b.get("median_s"):
+            row["baseline_s"] = None
+            row["ratio"] = None
+            row["status"] = "new"
+        else:
+            ratio = float(r["median_s"]) / float(b["median_s"])  # type: ignore[arg-type]
+            row["baseline_s"] = b["median_s"]
+            row["ratio"] = round(ratio, 3)
+            if ratio > 1.0 + threshold:
+                row["status"] = "regression"
+            elif ratio < 1.0 / (1.0 + threshold):
+                row["status"] = "faster"
+            else:
+                row["status"] = "ok"
+        out.append(row)
+    return out
+
+
+def format_report(rows: List[Dict[str, object]]) -> str:
+    head = f"{'case':<30} {'size':>9} {'median_s':>10} {'units/s':>14} {'base_s':>10} " \
+           f"{'ratio':>6}  status"
+    lines = [head, "-" * len(head)]
+    for r in rows:
+        base = r.get("baseline_s")
+        ratio = r.get("ratio")
+        ups = r.get("units_per_s")
+        status = str(r.get("status", ""))
+        lines.append(f"{r['case']:<30} {r['size']:>9} {r['median_s']:>10.4f} "
+                     f"{(f'{ups:,.0f}' if ups else '-'):>14} "
+                     f"{(f'{base:.4f}' if base else '-'):>10} "
+                     f"{(f'{ratio:.2f}' if ratio else '-'):>6}  "
+                     f"{status.upper() if status == 'regression' else status}")
+    regs = [r for r in rows if r.get("status") == "regression"]
+    lines.append("")
+    lines.append(f"{len(rows)} results, {len(regs)} regression(s)")
+    for r in regs:
+        lines.append(f"  REGRESSION {r['case']} @ {r['size']}: "
+                     f"{r['baseline_s']}s -> {r['median_s']}s (x{r['ratio']})")
+    return "\n".join(lines)
+
+
+def _env() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Qryptify benchmark suite")
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated bar counts")
+    ap.add_argument("--filter", default="", help="Comma-separated case name substrings")
+    ap.add_argument("--repeat", type=int, default=3, help="Timed runs per case")
+    ap.add_argument("--dsn", default="", help="Enable DB cases against this TimescaleDB")
+    ap.add_argument("--layout",
+                    choices=STORAGE_LAYOUTS,
+                    default="single",
+                    help="db.layout used by the DB cases")
+    ap.add_argument("--no-cap", action="store_true", help="Ignore per-case size caps")
+    ap.add_argument("--out", default="", help="Write results JSON here")
+    ap.add_argument("--baseline", default="", help="Baseline JSON to compare against")
+    ap.add_argument("--threshold",
+                    type=float,
+                    default=0.15,
+                    help="Allowed slowdown vs baseline (fraction)")
+    ap.add_argument("--save-baseline", default="", help="Write results as a new baseline")
+    ap.add_argument("--list", action="store_true", help="List cases and exit")
+    args = ap.parse_args(argv)
+
+    filters = [f.strip() for f in args.filter.split(",") if f.strip()]
+    cases = select_cases(filters, with_db=bool(args.dsn))
+    if args.list:
+        for c in CASES:
+            print(f"{c.name:<30} {c.group:<11} unit={c.unit} cap={c.max_size:,}"
+                  f"{' (db)' if c.needs_db else ''}")
+        return 0
+
+    ctx = BenchContext(dsn=args.dsn or None, layout=args.layout)
+    results: List[Dict[str, object]] = []
+    for size in _parse_sizes(args.sizes):
+        for case in cases:
+            if size > case.max_size and not args.no_cap:
+                print(f"skip {case.name} @ {size} (cap {case.max_size:,})", file=sys.stderr)
+                continue
+            res = run_case(case, size, ctx, args.repeat)
+            print(f"{res['case']} @ {size}: {res['median_s']:.4f}s "
+                  f"({res['units_per_s']:,} {case.unit}/s)",
+                  file=sys.stderr)
+            results.append(res)
+
+    baseline: List[Dict[str, object]] = []
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f).get("results", [])
+    rows = compare(results, baseline, args.threshold)
+    print(format_report(rows))
+
+    doc = {"env": _env(), "threshold": args.threshold, "results": rows}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(doc, f, indent=2)
+        print(f"Saved results to {args.out}")
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"env": _env(), "results": results}, f, indent=2)
+        print(f"Saved baseline to {args.save_baseline}")
+    return 1 if any(r.get("status") == "regression" for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
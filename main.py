@@ -1,18 +1,27 @@
+import argparse
 import asyncio
 
 from loguru import logger
 
 from qryptify.shared.config import load_cfg_validated
 from qryptify.shared.logging import setup_logging
+from qryptify.shared.profiling import add_profile_args
+from qryptify.shared.profiling import profiled
 from qryptify_ingestor.coordinator import run_all
 
 
 def main() -> None:
+    p = argparse.ArgumentParser(description="Qryptify ingestor (backfill, then live)")
+    add_profile_args(p)
+    args = p.parse_args()
+
     setup_logging("INFO")
     cfg = load_cfg_validated()
     pairs = cfg.get("pairs")
     logger.info(f"Starting Qryptify Ingestor | pairs={pairs}")
-    asyncio.run(run_all(cfg))
+    # The profile report is printed when the ingestor stops (e.g. Ctrl+C)
+    with profiled(args.profile, args.profile_out):
+        asyncio.run(run_all(cfg))
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 """Data access layer for Qryptify."""
 
 __all__ = [
+    "notify",
     "timescale",
 ]
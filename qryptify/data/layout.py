@@ -0,0 +1,173 @@
+"""Storage layouts for candles and the online migration between them.
+
+- single: every interval lives in `candlesticks` (1-day chunks, sql/001_init.sql)
+- per_interval: one hypertable per interval (`candlesticks_<interval>`) with a
+  chunk size picked so each chunk holds a few thousand bars per pair, and a
+  compression policy that never touches the chunk being written.
+
+`TimescaleRepo(layout=...)` hides the difference; readers and writers keep
+the same `(symbol, interval)` API.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+import time
+from typing import Callable, Dict, List, Optional
+
+from qryptify.shared.intervals import SUPPORTED_INTERVALS
+
+LAYOUTS = ("single", "per_interval")
+
+# chunk_time_interval per interval (~4k-10k bars per pair per chunk)
+CHUNK_INTERVALS: Dict[str, str] = {
+    "1m": "7 days",
+    "3m": "14 days",
+    "5m": "28 days",
+    "15m": "60 days",
+    "30m": "90 days",
+    "1h": "180 days",
+    "2h": "180 days",
+    "4h": "365 days",
+}
+
+
+def table_for(interval: str, layout: str = "single") -> str:
+    """Return the hypertable holding `interval` under `layout`."""
+    if layout == "single":
+        return "candlesticks"
+    if layout != "per_interval":
+        raise ValueError(f"Unknown storage layout: {layout}")
+    if interval not in SUPPORTED_INTERVALS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return f"candlesticks_{interval}"
+
+
+def layout_ddl(interval: str) -> List[str]:
+    """DDL creating the per-interval hypertable for `interval` (idempotent)."""
+    table = table_for(interval, "per_interval")
+    chunk = CHUNK_INTERVALS[interval]
+    return [
+        f"CREATE TABLE IF NOT EXISTS {table} (LIKE candlesticks INCLUDING ALL,\n"
+        f"  CHECK (interval = '{interval}'))",
+        f"SELECT create_hypertable('{table}', 'ts', if_not_exists => TRUE,\n"
+        f"  chunk_time_interval => INTERVAL '{chunk}')",
+        ("DO $$ BEGIN\n"
+         "  IF NOT EXISTS (SELECT 1 FROM timescaledb_information.hypertables\n"
+         f"                 WHERE hypertable_name = '{table}' AND compression_enabled) THEN\n"
+         f"    ALTER TABLE {table} SET (timescaledb.compress,\n"
+         "      timescaledb.compress_orderby = 'ts DESC',\n"
+         "      timescaledb.compress_segmentby = 'symbol');\n"
+         "  END IF;\n"
+         "END $$"),
+        # Compress only chunks older than one chunk span: the chunk currently
+        # being written is never compressed under the ingestor.
+        f"SELECT add_compression_policy('{table}', INTERVAL '{chunk}', if_not_exists => TRUE)",
+    ]
+
+
+# Per-interval copy watermark: every source row with ts < copied_until is in
+# the target table. Advanced in the same transaction as each copied batch.
+MIGRATION_DDL = ("CREATE TABLE IF NOT EXISTS layout_migration (\n"
+                 "  interval TEXT PRIMARY KEY,\n"
+                 "  copied_until TIMESTAMPTZ NOT NULL)")
+
+
+@dataclass
+class MigrationStats:
+    interval: str
+    rows: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def migrate_to_per_interval(
+    conn,
+    intervals: Optional[List[str]] = None,
+    *,
+    batch: timedelta = timedelta(days=7),
+    full: bool = False,
+    progress: Optional[Callable[[MigrationStats, datetime], None]] = None,
+) -> List[MigrationStats]:
+    """Copy candles from `candlesticks` into per-interval hypertables online.
+
+    `conn` is a psycopg connection using the dict row factory.
+
+    Each time batch is copied in its own short transaction with
+    ON CONFLICT DO NOTHING, so ingestion can keep writing to the source table
+    and re-running the migration only copies what is missing. Switch
+    `db.layout` to `per_interval`, restart the ingestor, then run the
+    migration once more to pick up rows written in between.
+
+    Re-runs resume from the watermark in `layout_migration`, which each
+    batch advances in its own transaction. The target's newest row is no
+    guide: once the ingestor writes there, it is far ahead of the copy. Pass
+    `full=True` to rescan the whole source (e.g. after backfilling older
+    history into it).
+    """
+    out: List[MigrationStats] = []
+    with conn.cursor() as cur:
+        cur.execute(MIGRATION_DDL)
+    conn.commit()
+    for itv in intervals or list(SUPPORTED_INTERVALS):
+        table = table_for(itv, "per_interval")
+        with conn.cursor() as cur:
+            for stmt in layout_ddl(itv):
+                cur.execute(stmt)
+        conn.commit()
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT copied_until FROM layout_migration WHERE interval=%s", (itv, ))
+            copied_until = (cur.fetchone() or {}).get("copied_until")
+            cur.execute(
+                "SELECT min(ts) AS lo, max(ts) AS hi FROM candlesticks WHERE interval=%s",
+                (itv, ),
+            )
+            row = cur.fetchone() or {}
+        conn.commit()
+        lo, hi = row.get("lo"), row.get("hi")
+        stats = MigrationStats(interval=itv)
+        if lo is None or hi is None:
+            out.append(stats)
+            continue
+        cursor = lo
+        if copied_until is not None and not full:
+            cursor = max(lo, copied_until)
+        t0 = time.perf_counter()
+        while cursor <= hi:
+            upper = cursor + batch
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        (f"INSERT INTO {table}\n"
+                         "SELECT * FROM candlesticks\n"
+                         "WHERE interval=%s AND ts >= %s AND ts < %s\n"
+                         "ON CONFLICT (symbol, interval, ts) DO NOTHING"),
+                        (itv, cursor, upper),
+                    )
+                    stats.rows += max(cur.rowcount, 0)
+                    # Capped at the newest source row seen: later bars may still land below upper
+                    cur.execute(
+                        ("INSERT INTO layout_migration (interval, copied_until)\n"
+                         "VALUES (%s, %s)\n"
+                         "ON CONFLICT (interval) DO UPDATE\n"
+                         "  SET copied_until = EXCLUDED.copied_until"),
+                        (itv, min(upper, hi)),
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            stats.batches += 1
+            stats.seconds = time.perf_counter() - t0
+            if progress is not None:
+                progress(stats, upper)
+            cursor = upper
+        out.append(stats)
+    return out
+
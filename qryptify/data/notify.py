@@ -0,0 +1,177 @@
+"""New-bar fan-out over Postgres LISTEN/NOTIFY.
+
+The live ingestor commits each batch of closed klines together with the
+`sync_state` resume pointers and a `pg_notify(CHANNEL, ...)` (see
+`TimescaleRepo.publish_klines`). Postgres delivers the notification to every
+listening connection when the transaction commits, so consumers learn about
+new bars within milliseconds and no consumer polls the candle tables.
+
+The payload is compact: one `SYMBOL/interval@close_time_ms` token per pair in
+the batch (its latest close), space-separated, split across notifications
+below Postgres's 8000-byte limit.
+
+Notifications are not queued for a listener that is disconnected.
+`BarSubscriber` therefore reads `sync_state` right after LISTEN on every
+(re)connect and every `catch_up_s` seconds, and yields only events that move
+a pair forward, so missed notifications turn into one catch-up event per pair
+and duplicates are dropped.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import (Any, AsyncIterator, Dict, Iterable, List, Mapping, Optional, Sequence,
+                    Tuple, TYPE_CHECKING)
+
+from qryptify.shared.time import to_dt
+from qryptify.shared.time import to_ms
+
+if TYPE_CHECKING:
+    import psycopg
+
+CHANNEL = "qryptify_bars"
+PAYLOAD_MAX = 7900
+
+_CATCH_UP_SQL = ("SELECT symbol, interval, last_closed_ts FROM sync_state\n"
+                 "WHERE last_closed_ts IS NOT NULL")
+
+
+@dataclass(frozen=True)
+class BarEvent:
+    """Bars of `symbol`/`interval` are committed up to `close_time`."""
+
+    symbol: str
+    interval: str
+    close_time: datetime
+
+
+def latest_closes(rows: Iterable[Mapping[str, Any]]) -> Dict[Tuple[str, str], datetime]:
+    """Latest `close_time` per (symbol, interval) among kline rows."""
+    out: Dict[Tuple[str, str], datetime] = {}
+    for r in rows:
+        key = (r["symbol"], r["interval"])
+        prev = out.get(key)
+        if prev is None or r["close_time"] > prev:
+            out[key] = r["close_time"]
+    return out
+
+
+def encode_events(closes: Mapping[Tuple[str, str], datetime]) -> List[str]:
+    """NOTIFY payloads announcing `closes`, each under PAYLOAD_MAX bytes."""
+    payloads: List[str] = []
+    tokens: List[str] = []
+    size = 0
+    for (symbol, interval), close_time in closes.items():
+        token = f"{symbol}/{interval}@{to_ms(close_time)}"
+        if tokens and size + len(token) >= PAYLOAD_MAX:
+            payloads.append(" ".join(tokens))
+            tokens, size = [], 0
+        tokens.append(token)
+        size += len(token) + 1
+    if tokens:
+        payloads.append(" ".join(tokens))
+    return payloads
+
+
+def decode_events(payload: str) -> List[BarEvent]:
+    """Parse a payload built by `encode_events`; raises ValueError if malformed."""
+    out = []
+    for token in payload.split():
+        pair, sep, ms = token.rpartition("@")
+        symbol, slash, interval = pair.partition("/")
+        if not (sep and slash and symbol and interval):
+            raise ValueError(f"Malformed bar notification token: {token!r}")
+        out.append(BarEvent(symbol, interval, to_dt(int(ms))))
+    return out
+
+
+class BarSubscriber:
+    """Async iterator of `BarEvent`s for bars committed by the live ingestor.
+
+    Usage:
+      async for ev in BarSubscriber(dsn, pairs=[("BTCUSDT", "1m")]):
+          rows = repo.fetch_ohlcv(ev.symbol, ev.interval, start=..., end=ev.close_time)
+
+    An event means every bar of the pair up to `close_time` is readable; after
+    missed notifications it covers several bars, so consumers read the range
+    since the last bar they processed. `last` seeds the per-pair marks (e.g.
+    from the consumer's saved state); a pair without a mark gets one event for
+    its current head on connect. `pairs=None` subscribes to every pair.
+    Reconnects on connection errors; `catch_up_s=None` only catches up then.
+    """
+
+    def __init__(self,
+                 dsn: str,
+                 pairs: Optional[Sequence[Tuple[str, str]]] = None,
+                 *,
+                 last: Optional[Mapping[Tuple[str, str], datetime]] = None,
+                 channel: str = CHANNEL,
+                 catch_up_s: Optional[float] = 60.0,
+                 reconnect_s: float = 1.0) -> None:
+        self._dsn = dsn
+        self._pairs = set(pairs) if pairs is not None else None
+        self._channel = channel
+        self._catch_up_s = catch_up_s
+        self._reconnect_s = reconnect_s
+        self.last: Dict[Tuple[str, str], datetime] = dict(last or {})
+        self.notified = 0
+        self.caught_up = 0
+
+    def __aiter__(self) -> AsyncIterator[BarEvent]:
+        return self.events()
+
+    def advance(self, events: Iterable[BarEvent]) -> List[BarEvent]:
+        """Keep the subscribed events that move their pair forward and record them."""
+        out = []
+        for ev in events:
+            key = (ev.symbol, ev.interval)
+            if self._pairs is not None and key not in self._pairs:
+                continue
+            prev = self.last.get(key)
+            if prev is None or ev.close_time > prev:
+                self.last[key] = ev.close_time
+                out.append(ev)
+        return out
+
+    async def _catch_up(self, conn: "psycopg.AsyncConnection") -> List[BarEvent]:
+        cur = await conn.execute(_CATCH_UP_SQL)
+        rows = await cur.fetchall()
+        events = self.advance(BarEvent(s, i, ts) for s, i, ts in rows)
+        self.caught_up += len(events)
+        return events
+
+    def _decode(self, payload: str) -> List[BarEvent]:
+        try:
+            events = self.advance(decode_events(payload))
+        except ValueError as e:
+            from loguru import logger
+            logger.warning(f"Ignoring bar notification: {e}")
+            return []
+        self.notified += len(events)
+        return events
+
+    async def events(self) -> AsyncIterator[BarEvent]:
+        # Local imports: the payload helpers and writers need neither
+        from loguru import logger
+        import psycopg
+        from psycopg import sql
+
+        listen = sql.SQL("LISTEN {}").format(sql.Identifier(self._channel))
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self._dsn,
+                                                                 autocommit=True) as conn:
+                    await conn.execute(listen)
+                    logger.info(f"Listening for new bars on '{self._channel}'")
+                    while True:
+                        # After LISTEN, so a commit racing this read is still notified
+                        for ev in await self._catch_up(conn):
+                            yield ev
+                        async for n in conn.notifies(timeout=self._catch_up_s):
+                            for ev in self._decode(n.payload):
+                                yield ev
+            except psycopg.OperationalError as e:
+                logger.warning(f"Bar subscriber disconnected ({e}); reconnecting in "
+                               f"{self._reconnect_s:g}s")
+                await asyncio.sleep(self._reconnect_s)
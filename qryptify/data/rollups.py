@@ -0,0 +1,112 @@
+"""Continuous-aggregate rollups that derive higher intervals from 1m candles.
+
+In rollup ingest mode only 1m klines are written to `candlesticks`; every other
+supported interval is served from a Timescale continuous aggregate named
+`candlesticks_rollup_<interval>`. Buckets are aligned like Binance klines
+(UTC, epoch-aligned), so rolled-up bars match exchange-native bars in
+open/high/low/close, volumes, trade counts and close_time.
+"""
+from __future__ import annotations
+
+from typing import List
+
+from qryptify.shared.intervals import step_of
+
+BASE_INTERVAL = "1m"
+
+ROLLUP_INTERVALS = (
+    "3m",
+    "5m",
+    "15m",
+    "30m",
+    "1h",
+    "2h",
+    "4h",
+)
+
+# (start_offset, end_offset, schedule_interval) for each refresh policy.
+# The refresh window must span at least two buckets; real-time aggregation
+# covers anything newer than end_offset.
+_POLICIES = {
+    "3m": ("1 day", "3 minutes", "1 minute"),
+    "5m": ("1 day", "5 minutes", "1 minute"),
+    "15m": ("1 day", "15 minutes", "5 minutes"),
+    "30m": ("1 day", "30 minutes", "5 minutes"),
+    "1h": ("1 day", "1 hour", "15 minutes"),
+    "2h": ("2 days", "2 hours", "15 minutes"),
+    "4h": ("2 days", "4 hours", "30 minutes"),
+}
+
+
+def rollup_view(interval: str) -> str:
+    """Return the continuous aggregate name serving `interval`."""
+    if interval not in ROLLUP_INTERVALS:
+        raise ValueError(f"No rollup for interval: {interval}")
+    return f"candlesticks_rollup_{interval}"
+
+
+def _pg_interval(interval: str) -> str:
+    secs = int(step_of(interval).total_seconds())
+    if secs % 3600 == 0:
+        return f"{secs // 3600} hours"
+    return f"{secs // 60} minutes"
+
+
+def rollup_relation(interval: str) -> str:
+    """SQL relation exposing a rollup with the `candlesticks` column layout.
+
+    Only complete buckets are returned: a bucket is closed once its last 1m
+    candle (close_time = bucket end - 1ms) has been ingested and none of its
+    1m candles is missing. A bucket with a gap stays hidden until the gap is
+    backfilled, rather than being served as a final bar.
+    """
+    view = rollup_view(interval)
+    width = _pg_interval(interval)
+    minutes = step_of(interval) // step_of(BASE_INTERVAL)
+    return ("(SELECT ts, symbol, '{itv}'::text AS interval, open, high, low, close, "
+            "volume, close_time,\n"
+            "        quote_asset_volume, number_of_trades, taker_buy_base, "
+            "taker_buy_quote\n"
+            "   FROM {view}\n"
+            "  WHERE close_time = ts + INTERVAL '{width}' - INTERVAL '1 millisecond'\n"
+            "    AND bars = {minutes}"
+            ") AS candlesticks").format(itv=interval, view=view, width=width,
+                                        minutes=minutes)
+
+
+def rollup_ddl(source: str = "candlesticks") -> List[str]:
+    """Return DDL statements creating every rollup and its refresh policy.
+
+    `source` is the hypertable holding 1m candles.
+    """
+    stmts: List[str] = []
+    for itv in ROLLUP_INTERVALS:
+        view = rollup_view(itv)
+        width = _pg_interval(itv)
+        start_off, end_off, schedule = _POLICIES[itv]
+        stmts.append(
+            f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view}\n"
+            "WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS\n"
+            f"SELECT time_bucket(INTERVAL '{width}', ts) AS ts,\n"
+            "       symbol,\n"
+            "       first(open, ts) AS open,\n"
+            "       max(high) AS high,\n"
+            "       min(low) AS low,\n"
+            "       last(close, ts) AS close,\n"
+            "       sum(volume) AS volume,\n"
+            "       max(close_time) AS close_time,\n"
+            "       sum(quote_asset_volume) AS quote_asset_volume,\n"
+            "       sum(number_of_trades) AS number_of_trades,\n"
+            "       sum(taker_buy_base) AS taker_buy_base,\n"
+            "       sum(taker_buy_quote) AS taker_buy_quote,\n"
+            "       count(*) AS bars\n"
+            f"FROM {source}\n"
+            f"WHERE interval = '{BASE_INTERVAL}'\n"
+            f"GROUP BY time_bucket(INTERVAL '{width}', ts), symbol\n"
+            "WITH NO DATA")
+        stmts.append(f"SELECT add_continuous_aggregate_policy('{view}',\n"
+                     f"  start_offset => INTERVAL '{start_off}',\n"
+                     f"  end_offset => INTERVAL '{end_off}',\n"
+                     f"  schedule_interval => INTERVAL '{schedule}',\n"
+                     "  if_not_exists => TRUE)")
+    return stmts
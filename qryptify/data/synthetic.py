@@ -0,0 +1,336 @@
+"""Seeded synthetic OHLCV generator for tests, benchmarks and seeding.
+
+Prices follow a geometric Brownian motion whose drift and volatility switch
+between Markov regimes, with GARCH(1,1)-style volatility clustering and
+random outages (missing bars). Output is columnar (`array` per field), so
+millions of bars stay compact; higher intervals are rolled up from the same
+base series with the continuous-aggregate semantics of sql/003_rollups.sql,
+so all intervals are mutually consistent.
+
+Writers: `iter_rows` feeds `TimescaleRepo.copy_klines` (bulk COPY path) and
+`write_columnar` / `read_columnar` store one binary file per column.
+`synthetic_columns` / `synthetic_bars` give the fixed, cached series shared
+by tests and benchmarks; `synthetic_symbols` cuts it into ragged symbols.
+"""
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from functools import lru_cache
+from itertools import accumulate
+from itertools import compress
+import json
+import math
+from pathlib import Path
+import random
+from typing import Dict, Iterator, List, Tuple, TYPE_CHECKING
+
+from qryptify.ingestor.types import KlineRow
+
+if TYPE_CHECKING:
+    from qryptify_strategy.models import Bar
+
+_FLOAT_FIELDS = (
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "quote_asset_volume",
+    "taker_buy_base",
+    "taker_buy_quote",
+)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Fixed series for tests and benchmarks
+_FIXED_SEED = 20240101
+_FIXED_END = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_TWO_PI = 2.0 * math.pi
+
+
+@dataclass
+class Regime:
+    drift: float  # per-bar log drift
+    vol_mult: float  # multiplier on the GARCH volatility
+
+
+@dataclass
+class SyntheticSpec:
+    bars: int
+    step: timedelta = timedelta(minutes=1)
+    end: datetime | None = None  # open time of the bar after the last one
+    seed: int = 42
+    start_price: float = 100.0
+    base_vol: float = 0.001  # per-bar stdev of log returns (long-run)
+    # GARCH(1,1): var = omega + alpha * innovation^2 + beta * var
+    garch_alpha: float = 0.08
+    garch_beta: float = 0.9
+    regimes: List[Regime] = field(default_factory=lambda: [
+        Regime(drift=0.000002, vol_mult=0.8),
+        Regime(drift=-0.000003, vol_mult=1.6),
+        Regime(drift=0.0, vol_mult=1.0),
+    ])
+    regime_switch_prob: float = 0.0005
+    gap_prob: float = 0.0002  # chance an outage starts at a bar
+    gap_mean_bars: float = 30.0
+    base_volume: float = 10.0
+
+
+@dataclass
+class OHLCVColumns:
+    """Columnar OHLCV series; `ts` holds open times in epoch milliseconds."""
+
+    step_ms: int
+    ts: array = field(default_factory=lambda: array("q"))
+    open: array = field(default_factory=lambda: array("d"))
+    high: array = field(default_factory=lambda: array("d"))
+    low: array = field(default_factory=lambda: array("d"))
+    close: array = field(default_factory=lambda: array("d"))
+    volume: array = field(default_factory=lambda: array("d"))
+    quote_asset_volume: array = field(default_factory=lambda: array("d"))
+    number_of_trades: array = field(default_factory=lambda: array("q"))
+    taker_buy_base: array = field(default_factory=lambda: array("d"))
+    taker_buy_quote: array = field(default_factory=lambda: array("d"))
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+
+def _segments(rng: random.Random, n: int, prob: float) -> List[int]:
+    """Event positions of a Bernoulli(prob) process over n bars (geometric gaps)."""
+    out: List[int] = []
+    if prob <= 0.0:
+        return out
+    i = int(rng.expovariate(prob))
+    while i < n:
+        out.append(i)
+        i += 1 + int(rng.expovariate(prob))
+    return out
+
+
+def _normals(rng: random.Random, n: int) -> List[float]:
+    """n standard normals via batched Box-Muller (two per pair of uniforms)."""
+    m = (n + 1) // 2
+    rand = rng.random
+    r = [math.sqrt(-2.0 * math.log(1.0 - rand())) for _ in range(m)]
+    theta = [_TWO_PI * rand() for _ in range(m)]
+    out = [a * math.cos(t) for a, t in zip(r, theta)]
+    out += [a * math.sin(t) for a, t in zip(r, theta)]
+    return out[:n]
+
+
+def generate_ohlcv(spec: SyntheticSpec) -> OHLCVColumns:
+    """Generate `spec.bars` bars (fewer if outages drop some) deterministically.
+
+    Work is done column by column: random draws are batched, regime switches
+    and outages are sampled as sparse event lists, and the only sequential
+    loop is the GARCH variance recursion.
+    """
+    rng = random.Random(spec.seed)
+    n = spec.bars
+    step_ms = int(spec.step.total_seconds() * 1000)
+    end = spec.end or datetime.now(timezone.utc)
+    end_ms = (int((end - _EPOCH).total_seconds() * 1000) // step_ms) * step_ms
+    t0 = end_ms - n * step_ms
+
+    rand = rng.random
+    z = _normals(rng, n)
+
+    # Regime per bar (piecewise constant between sparse switch events)
+    drift = [0.0] * n
+    vmult = [1.0] * n
+    switches = _segments(rng, n, spec.regime_switch_prob)
+    reg = spec.regimes[0]
+    bounds = [0] + switches + [n]
+    for k in range(len(bounds) - 1):
+        if k:
+            reg = spec.regimes[int(rand() * len(spec.regimes))]
+        a, b = bounds[k], bounds[k + 1]
+        drift[a:b] = [reg.drift] * (b - a)
+        vmult[a:b] = [reg.vol_mult] * (b - a)
+
+    # GARCH(1,1) variance path, run on the unscaled innovation so a
+    # high-volatility regime cannot make the recursion explode.
+    base_var = spec.base_vol**2
+    alpha, beta = spec.garch_alpha, spec.garch_beta
+    omega = base_var * max(1.0 - alpha - beta, 1e-6)
+    sigma = [0.0] * n
+    var = base_var
+    sqrt = math.sqrt
+    for i in range(n):
+        zi = z[i]
+        var = omega + (alpha * zi * zi + beta) * var
+        sigma[i] = sqrt(var) * vmult[i]
+
+    shock = [s * zi for s, zi in zip(sigma, z)]
+    log_ret = [d - 0.5 * s * s + e for d, s, e in zip(drift, sigma, shock)]
+    log0 = math.log(spec.start_price)
+    exp = math.exp
+    close = [exp(v) for v in accumulate(log_ret, initial=log0)]
+    opens = close[:-1]
+    close = close[1:]
+
+    # Intra-bar wicks (exponential in units of sigma), and volume that grows
+    # with the size of the move
+    log = math.log
+    hi = [max(o, c) * (1.0 - 0.5 * s * log(1.0 - rand()))
+          for o, c, s in zip(opens, close, sigma)]
+    lo = [min(o, c) * (1.0 + 0.5 * s * log(1.0 - rand()))
+          for o, c, s in zip(opens, close, sigma)]
+    base_volume = spec.base_volume
+    vol = [base_volume * (0.5 + rand()) * (1.0 + abs(zi)) for zi in z]
+    mid = [0.5 * (o + c) for o, c in zip(opens, close)]
+    buy = [v * (0.4 + 0.2 * rand()) for v in vol]
+
+    # Outages: drop runs of bars; prices keep moving, so the next bar gaps
+    keep = None
+    starts = _segments(rng, n, spec.gap_prob)
+    if starts:
+        keep = [True] * n
+        for s0 in starts:
+            length = 1 + int(rng.expovariate(1.0 / spec.gap_mean_bars))
+            keep[s0:s0 + length] = [False] * len(keep[s0:s0 + length])
+
+    def _col(typecode: str, values) -> array:
+        if keep is None:
+            return array(typecode, values)
+        return array(typecode, compress(values, keep))
+
+    return OHLCVColumns(
+        step_ms=step_ms,
+        ts=_col("q", range(t0, end_ms, step_ms)),
+        open=_col("d", opens),
+        high=_col("d", hi),
+        low=_col("d", lo),
+        close=_col("d", close),
+        volume=_col("d", vol),
+        quote_asset_volume=_col("d", [v * m for v, m in zip(vol, mid)]),
+        number_of_trades=_col("q", [int(v * 7.0) + 1 for v in vol]),
+        taker_buy_base=_col("d", buy),
+        taker_buy_quote=_col("d", [b * m for b, m in zip(buy, mid)]),
+    )
+
+
+def rollup(cols: OHLCVColumns, step: timedelta) -> OHLCVColumns:
+    """Aggregate a base series into `step` buckets (epoch aligned).
+
+    Matches the continuous aggregates: first/max/min/last for prices, sums for
+    volumes and trades; buckets with outages are kept. The trailing bucket is
+    dropped if it is still incomplete.
+    """
+    step_ms = int(step.total_seconds() * 1000)
+    if step_ms % cols.step_ms:
+        raise ValueError("rollup step must be a multiple of the base step")
+    ratio = step_ms // cols.step_ms
+    out = OHLCVColumns(step_ms=step_ms)
+    n = len(cols)
+    if n == 0:
+        return out
+    keys = [t // step_ms for t in cols.ts]
+    starts = [0] + [i for i in range(1, n) if keys[i] != keys[i - 1]]
+    ends = starts[1:] + [n]
+    last_full = (cols.ts[-1] + cols.step_ms) % step_ms == 0
+    for j, (s, e) in enumerate(zip(starts, ends)):
+        if j == len(starts) - 1 and not last_full and e - s < ratio:
+            break
+        out.ts.append(keys[s] * step_ms)
+        out.open.append(cols.open[s])
+        out.high.append(max(cols.high[s:e]))
+        out.low.append(min(cols.low[s:e]))
+        out.close.append(cols.close[e - 1])
+        out.volume.append(sum(cols.volume[s:e]))
+        out.quote_asset_volume.append(sum(cols.quote_asset_volume[s:e]))
+        out.number_of_trades.append(sum(cols.number_of_trades[s:e]))
+        out.taker_buy_base.append(sum(cols.taker_buy_base[s:e]))
+        out.taker_buy_quote.append(sum(cols.taker_buy_quote[s:e]))
+    return out
+
+
+def iter_rows(cols: OHLCVColumns, symbol: str, interval: str) -> Iterator[KlineRow]:
+    """Yield DB rows (close_time = open + step - 1ms, like Binance)."""
+    close_off = timedelta(milliseconds=cols.step_ms - 1)
+    for i in range(len(cols)):
+        ts = _EPOCH + timedelta(milliseconds=cols.ts[i])
+        yield KlineRow(
+            ts=ts,
+            symbol=symbol,
+            interval=interval,
+            open=cols.open[i],
+            high=cols.high[i],
+            low=cols.low[i],
+            close=cols.close[i],
+            volume=cols.volume[i],
+            close_time=ts + close_off,
+            quote_asset_volume=cols.quote_asset_volume[i],
+            number_of_trades=int(cols.number_of_trades[i]),
+            taker_buy_base=cols.taker_buy_base[i],
+            taker_buy_quote=cols.taker_buy_quote[i],
+        )
+
+
+def iter_bar_tuples(
+        cols: OHLCVColumns) -> Iterator[Tuple[datetime, float, float, float, float, float]]:
+    """Yield (ts, open, high, low, close, volume) tuples for building bars."""
+    for i in range(len(cols)):
+        yield (_EPOCH + timedelta(milliseconds=cols.ts[i]), cols.open[i], cols.high[i],
+               cols.low[i], cols.close[i], cols.volume[i])
+
+
+@lru_cache(maxsize=2)
+def synthetic_columns(n: int) -> OHLCVColumns:
+    """`n` gap-free 1m bars ending at 2024-01-01, always the same series (cached)."""
+    return generate_ohlcv(
+        SyntheticSpec(bars=n, end=_FIXED_END, seed=_FIXED_SEED, gap_prob=0.0))
+
+
+@lru_cache(maxsize=2)
+def synthetic_bars(n: int) -> List["Bar"]:
+    """`synthetic_columns(n)` as strategy `Bar`s (cached; do not mutate)."""
+    # Local import: the generator itself does not depend on the strategy package
+    from qryptify_strategy.models import Bar
+
+    return [
+        Bar(ts=ts, open=o, high=h, low=lo, close=c, volume=v)
+        for ts, o, h, lo, c, v in iter_bar_tuples(synthetic_columns(n))
+    ]
+
+
+def synthetic_symbols(n: int, seed: int = 7, late: int = 400) -> Dict[str, List["Bar"]]:
+    """Three symbols cut from `synthetic_bars(n)`: the full series, one
+    starting `late` bars in, and one missing a seeded ~5% of its bars."""
+    base = synthetic_bars(n)
+    rnd = random.Random(seed)
+    return {
+        "AUSDT": base,
+        "BUSDT": base[late:],
+        "CUSDT": [b for b in base if rnd.random() > 0.05],
+    }
+
+
+def write_columnar(cols: OHLCVColumns, path: str | Path, **meta) -> Path:
+    """Write one raw binary file per column plus `meta.json` into `path`."""
+    d = Path(path)
+    d.mkdir(parents=True, exist_ok=True)
+    names = ("ts", "number_of_trades") + _FLOAT_FIELDS
+    for name in names:
+        with (d / f"{name}.bin").open("wb") as f:
+            getattr(cols, name).tofile(f)
+    info = dict(meta, step_ms=cols.step_ms, rows=len(cols), columns=list(names))
+    (d / "meta.json").write_text(json.dumps(info, indent=2, default=str))
+    return d
+
+
+def read_columnar(path: str | Path) -> OHLCVColumns:
+    """Read a directory written by `write_columnar`."""
+    d = Path(path)
+    info = json.loads((d / "meta.json").read_text())
+    cols = OHLCVColumns(step_ms=int(info["step_ms"]))
+    rows = int(info["rows"])
+    for name in info["columns"]:
+        arr = getattr(cols, name)
+        with (d / f"{name}.bin").open("rb") as f:
+            arr.fromfile(f, rows)
+    return cols
@@ -3,21 +3,87 @@ from __future__ import annotations
 import asyncio
 from contextlib import contextmanager
 from datetime import datetime
+from datetime import timedelta
+from operator import itemgetter
 from typing import Iterable, Optional
 
 from loguru import logger
 import psycopg
 from psycopg.rows import dict_row
 
+from qryptify.shared.latency import LatencyRow
+
 from .interfaces import KlineRow
+from .layout import table_for
+from .notify import CHANNEL
+from .notify import encode_events
+from .notify import latest_closes
+from .rollups import ROLLUP_INTERVALS
+from .rollups import rollup_relation
+from .rollups import rollup_view
+
+
+_KLINE_FIELDS = (
+    "ts",
+    "symbol",
+    "interval",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "close_time",
+    "quote_asset_volume",
+    "number_of_trades",
+    "taker_buy_base",
+    "taker_buy_quote",
+)
+_KLINE_COLUMNS = ", ".join(_KLINE_FIELDS)
+_kline_values = itemgetter(*_KLINE_FIELDS)
+
+# Keep in sync with sql/005_ingest_latency.sql
+LATENCY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_latency (
+  ts TIMESTAMPTZ NOT NULL,
+  symbol TEXT NOT NULL,
+  interval TEXT NOT NULL,
+  stage TEXT NOT NULL,
+  n INTEGER NOT NULL,
+  mean_ms DOUBLE PRECISION NOT NULL,
+  p50_ms DOUBLE PRECISION NOT NULL,
+  p99_ms DOUBLE PRECISION NOT NULL,
+  max_ms DOUBLE PRECISION NOT NULL,
+  PRIMARY KEY (symbol, interval, stage, ts)
+);
+SELECT create_hypertable('ingest_latency', 'ts', if_not_exists => TRUE,
+  chunk_time_interval => INTERVAL '7 days');
+SELECT add_retention_policy('ingest_latency', INTERVAL '90 days', if_not_exists => TRUE);
+"""
 
 
 class TimescaleRepo:
-    """Thin TimescaleDB repository focused on clarity and safety."""
+    """Thin TimescaleDB repository focused on clarity and safety.
+
+    With `rollup=True`, reads for intervals above 1m are served from the
+    continuous aggregates in sql/003_rollups.sql. `layout` selects the
+    candle tables (see qryptify/data/layout.py). The API is unchanged.
+    """
 
-    def __init__(self, dsn: str):
+    def __init__(self, dsn: str, *, rollup: bool = False, layout: str = "single"):
         self._dsn = dsn
+        self._rollup = rollup
+        self._layout = layout
         self._conn: Optional[psycopg.Connection] = None
+        self._latency_table = False
+
+    @classmethod
+    def from_cfg(cls, cfg: dict) -> "TimescaleRepo":
+        """Build a repo from the YAML config (`db.dsn`, `db.layout`, `ingest.mode`)."""
+        from qryptify.shared.config_model import ingest_mode
+        from qryptify.shared.config_model import storage_layout
+        return cls(cfg["db"]["dsn"],
+                   rollup=ingest_mode(cfg) == "rollup",
+                   layout=storage_layout(cfg))
 
     def __enter__(self) -> "TimescaleRepo":
         self.connect()
@@ -48,10 +114,73 @@ class TimescaleRepo:
             raise RuntimeError("TimescaleRepo.connect() must be called before use")
         return self._conn
 
+    def _relation(self, interval: str) -> str:
+        """Return the relation holding bars for `interval`."""
+        if self._rollup and interval in ROLLUP_INTERVALS:
+            return rollup_relation(interval)
+        return table_for(interval, self._layout)
+
     def upsert_klines(self, rows: Iterable[KlineRow]) -> int:
         conn = self._require_conn()
-        sql = (
-            "INSERT INTO candlesticks (\n"
+        batch = list(rows)
+        if not batch:
+            return 0
+        try:
+            with conn.cursor() as cur:
+                inserted = self._write_klines(cur, batch)
+            conn.commit()
+            return inserted
+        except Exception:
+            conn.rollback()
+            raise
+
+    def publish_klines(self, rows: Iterable[KlineRow], *, channel: str = CHANNEL) -> int:
+        """Upsert closed klines, advance `sync_state` and notify listeners, atomically.
+
+        Every pair in the batch gets its resume pointer moved to its latest
+        close, and `channel` is notified of those closes on commit (see
+        qryptify/data/notify.py), so listeners never see a bar before it is
+        readable.
+        """
+        conn = self._require_conn()
+        batch = list(rows)
+        if not batch:
+            return 0
+        closes = latest_closes(batch)
+        try:
+            with conn.cursor() as cur:
+                inserted = self._write_klines(cur, batch)
+                cur.executemany(
+                    ("INSERT INTO sync_state(symbol, interval, last_closed_ts)\n"
+                     "VALUES (%s, %s, %s)\n"
+                     "ON CONFLICT (symbol, interval) DO UPDATE\n"
+                     "  SET last_closed_ts = GREATEST(sync_state.last_closed_ts,\n"
+                     "                                EXCLUDED.last_closed_ts)"),
+                    [(s, i, ts) for (s, i), ts in closes.items()],
+                )
+                for payload in encode_events(closes):
+                    cur.execute("SELECT pg_notify(%s, %s)", (channel, payload))
+            conn.commit()
+            return inserted
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _write_klines(self, cur: psycopg.Cursor, batch: list[KlineRow]) -> int:
+        # Group by target table (one group under the single layout)
+        groups: dict[str, list[KlineRow]] = {}
+        for r in batch:
+            groups.setdefault(table_for(r["interval"], self._layout), []).append(r)
+        inserted = 0
+        for table, group in groups.items():
+            cur.executemany(self._upsert_sql(table), group)
+            inserted += cur.rowcount
+        return inserted
+
+    @staticmethod
+    def _upsert_sql(table: str) -> str:
+        return (
+            f"INSERT INTO {table} (\n"
             "  ts, symbol, interval, open, high, low, close, volume, close_time,\n"
             "  quote_asset_volume, number_of_trades, taker_buy_base, taker_buy_quote\n"
             ") VALUES (\n"
@@ -59,19 +188,80 @@ class TimescaleRepo:
             "  %(quote_asset_volume)s, %(number_of_trades)s, %(taker_buy_base)s, %(taker_buy_quote)s\n"
             ")\n"
             "ON CONFLICT (symbol, interval, ts) DO NOTHING")
+
+    def copy_klines(self, rows: Iterable[KlineRow]) -> int:
+        """Bulk-load rows via COPY into a staging table, then merge.
+
+        Much faster than `upsert_klines` for historical loads; the merge keeps
+        ON CONFLICT DO NOTHING semantics so reloads stay idempotent.
+        """
+        conn = self._require_conn()
         batch = list(rows)
         if not batch:
             return 0
+        groups: dict[str, list[KlineRow]] = {}
+        for r in batch:
+            groups.setdefault(table_for(r["interval"], self._layout), []).append(r)
         try:
+            inserted = 0
             with conn.cursor() as cur:
-                cur.executemany(sql, batch)
-                inserted = cur.rowcount
+                cur.execute("CREATE TEMP TABLE IF NOT EXISTS stage_klines\n"
+                            "  (LIKE candlesticks INCLUDING DEFAULTS) ON COMMIT DELETE ROWS")
+                for table, group in groups.items():
+                    with cur.copy(f"COPY stage_klines ({_KLINE_COLUMNS}) FROM STDIN") as cp:
+                        for r in group:
+                            cp.write_row(_kline_values(r))
+                    cur.execute(f"INSERT INTO {table} ({_KLINE_COLUMNS})\n"
+                                f"SELECT {_KLINE_COLUMNS} FROM stage_klines\n"
+                                "ON CONFLICT (symbol, interval, ts) DO NOTHING")
+                    inserted += cur.rowcount
+                    cur.execute("TRUNCATE stage_klines")
             conn.commit()
             return inserted
         except Exception:
             conn.rollback()
             raise
 
+    def compressed_chunks(self, interval: str, start: datetime, end: datetime) -> list[str]:
+        """Return compressed chunks of `interval`'s hypertable overlapping [start, end]."""
+        conn = self._require_conn()
+        with conn.cursor() as cur:
+            cur.execute(
+                ("SELECT format('%%I.%%I', chunk_schema, chunk_name) AS chunk\n"
+                 "FROM timescaledb_information.chunks\n"
+                 "WHERE hypertable_name=%s AND is_compressed\n"
+                 "  AND range_start <= %s AND range_end > %s\n"
+                 "ORDER BY range_start"),
+                (table_for(interval, self._layout), end, start),
+            )
+            rows = cur.fetchall() or []
+        conn.commit()
+        return [r["chunk"] for r in rows]
+
+    def decompress_chunks(self, chunks: Iterable[str]) -> int:
+        """Decompress the given chunks (no-op for already decompressed ones)."""
+        return self._chunk_call("decompress_chunk(%s::regclass, if_compressed => true)",
+                                chunks)
+
+    def compress_chunks(self, chunks: Iterable[str]) -> int:
+        """Compress the given chunks (no-op for already compressed ones)."""
+        return self._chunk_call("compress_chunk(%s::regclass, if_not_compressed => true)",
+                                chunks)
+
+    def _chunk_call(self, call: str, chunks: Iterable[str]) -> int:
+        conn = self._require_conn()
+        n = 0
+        try:
+            with conn.cursor() as cur:
+                for chunk in chunks:
+                    cur.execute(f"SELECT {call}", (chunk, ))
+                    n += 1
+            conn.commit()
+            return n
+        except Exception:
+            conn.rollback()
+            raise
+
     def fetch_ohlcv(
         self,
         symbol: str,
@@ -94,7 +284,7 @@ class TimescaleRepo:
         sql = (
             "SELECT ts, symbol, interval, open, high, low, close, volume, close_time,\n"
             "       quote_asset_volume, number_of_trades, taker_buy_base, taker_buy_quote\n"
-            f"FROM candlesticks WHERE {where} ORDER BY ts ASC")
+            f"FROM {self._relation(interval)} WHERE {where} ORDER BY ts ASC")
         if limit is not None:
             sql += " LIMIT %s"
             params.append(limit)
@@ -110,7 +300,7 @@ class TimescaleRepo:
             cur.execute(
                 ("SELECT ts, symbol, interval, open, high, low, close, volume, close_time,\n"
                  "       quote_asset_volume, number_of_trades, taker_buy_base, taker_buy_quote\n"
-                 "FROM candlesticks\n"
+                 f"FROM {self._relation(interval)}\n"
                  "WHERE symbol=%s AND interval=%s\n"
                  "ORDER BY ts DESC\n"
                  "LIMIT %s"),
@@ -120,6 +310,69 @@ class TimescaleRepo:
         rows.reverse()
         return rows
 
+    def count_chunks(self, interval: str) -> int:
+        """Number of hypertable chunks backing `interval` under this layout."""
+        conn = self._require_conn()
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT count(*) AS n FROM timescaledb_information.chunks WHERE hypertable_name=%s",
+                (table_for(interval, self._layout), ),
+            )
+            row = cur.fetchone()
+        conn.commit()
+        return int(row["n"]) if row else 0
+
+    def refresh_rollups(self, start: datetime, end: datetime) -> None:
+        """Materialize every rollup over [start, end], e.g. after a backfill.
+
+        Refresh policies only cover a recent window, so historical 1m loads
+        must be rolled up explicitly. The window is widened to whole UTC days
+        so partially covered edge buckets are refreshed too. Runs outside a
+        transaction as required by `refresh_continuous_aggregate`.
+        """
+        conn = self._require_conn()
+        start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = end.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        conn.commit()
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                for itv in ROLLUP_INTERVALS:
+                    cur.execute(
+                        "CALL refresh_continuous_aggregate(%s::regclass, %s::timestamptz, %s::timestamptz)",
+                        (rollup_view(itv), start, end),
+                    )
+        finally:
+            conn.autocommit = False
+
+    def record_latency(self, ts: datetime, rows: Iterable[LatencyRow]) -> int:
+        """Store one reporting window of live bar latency (`ingest_latency`).
+
+        The table is created on first use, so existing databases need no migration.
+        """
+        conn = self._require_conn()
+        batch = [(ts, r.symbol, r.interval, r.stage, r.n, r.mean_ms, r.p50_ms, r.p99_ms,
+                  r.max_ms) for r in rows]
+        if not batch:
+            return 0
+        try:
+            with conn.cursor() as cur:
+                if not self._latency_table:
+                    cur.execute(LATENCY_SCHEMA)
+                cur.executemany(
+                    ("INSERT INTO ingest_latency\n"
+                     "  (ts, symbol, interval, stage, n, mean_ms, p50_ms, p99_ms, max_ms)\n"
+                     "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)\n"
+                     "ON CONFLICT DO NOTHING"),
+                    batch,
+                )
+            conn.commit()
+            self._latency_table = True
+            return len(batch)
+        except Exception:
+            conn.rollback()
+            raise
+
     def get_last_closed_ts(self, symbol: str, interval: str) -> Optional[datetime]:
         conn = self._require_conn()
         with conn.cursor() as cur:
@@ -150,8 +403,13 @@ class TimescaleRepo:
 class AsyncTimescaleRepo:
     """Async facade that wraps TimescaleRepo and offloads work to threads."""
 
-    def __init__(self, dsn: str):
-        self._inner = TimescaleRepo(dsn)
+    def __init__(self, dsn: str, *, rollup: bool = False, layout: str = "single"):
+        self._inner = TimescaleRepo(dsn, rollup=rollup, layout=layout)
+
+    @classmethod
+    def from_cfg(cls, cfg: dict) -> "AsyncTimescaleRepo":
+        inner = TimescaleRepo.from_cfg(cfg)
+        return cls(inner._dsn, rollup=inner._rollup, layout=inner._layout)
 
     async def connect(self) -> None:
         await asyncio.to_thread(self._inner.connect)
@@ -162,6 +420,12 @@ class AsyncTimescaleRepo:
     async def upsert_klines_async(self, rows: Iterable[KlineRow]) -> int:
         return await asyncio.to_thread(self._inner.upsert_klines, rows)
 
+    async def publish_klines_async(self, rows: Iterable[KlineRow]) -> int:
+        return await asyncio.to_thread(self._inner.publish_klines, rows)
+
+    async def record_latency_async(self, ts: datetime, rows: Iterable[LatencyRow]) -> int:
+        return await asyncio.to_thread(self._inner.record_latency, ts, rows)
+
     async def set_last_closed_ts_async(self, symbol: str, interval: str,
                                        ts: datetime) -> None:
         await asyncio.to_thread(self._inner.set_last_closed_ts, symbol, interval, ts)
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, List, Optional, Union
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Union
 
 from .intervals import SUPPORTED_INTERVALS
 
+INGEST_MODES = ("native", "rollup")
+STORAGE_LAYOUTS = ("single", "per_interval")
+BACKFILL_MODES = ("rows", "bulk")
+
 
 @dataclass
 class PairSpec:
@@ -26,11 +31,15 @@ class WSConfig:
 @dataclass
 class DBConfig:
     dsn: str
+    layout: str = "single"
 
 
 @dataclass
 class BackfillConfig:
     start_date: str
+    mode: str = "rows"
+    batch_rows: int = 50_000
+    reload: Optional[Tuple[datetime, datetime]] = None
 
 
 @dataclass
@@ -41,6 +50,81 @@ class IngestorConfig:
     db: DBConfig
     backfill: BackfillConfig
     live: Optional[dict] = None
+    ingest_mode: str = "native"
+
+
+def ingest_mode(cfg: dict) -> str:
+    """Return the configured ingest mode (`ingest.mode`, default "native").
+
+    - native: each configured (symbol, interval) is ingested as its own stream
+    - rollup: only 1m is ingested per symbol; higher intervals are served from
+      continuous aggregates (see sql/003_rollups.sql)
+    """
+    ingest = cfg.get("ingest")
+    mode = ingest.get("mode", "native") if isinstance(ingest, dict) else "native"
+    mode = str(mode or "native").strip().lower()
+    if mode not in INGEST_MODES:
+        raise ValueError(f"config.ingest.mode must be one of {INGEST_MODES}")
+    return mode
+
+
+def storage_layout(cfg: dict) -> str:
+    """Return the candle storage layout (`db.layout`, default "single").
+
+    - single: all intervals in the `candlesticks` hypertable
+    - per_interval: one hypertable per interval with tuned chunk sizes
+      (see qryptify/data/layout.py and `qryptify-migrate-layout`)
+    """
+    db = cfg.get("db")
+    layout = db.get("layout", "single") if isinstance(db, dict) else "single"
+    layout = str(layout or "single").strip().lower()
+    if layout not in STORAGE_LAYOUTS:
+        raise ValueError(f"config.db.layout must be one of {STORAGE_LAYOUTS}")
+    return layout
+
+
+def backfill_mode(cfg: dict) -> str:
+    """Return the backfill write mode (`backfill.mode`, default "rows").
+
+    - rows: upsert each REST page as it arrives
+    - bulk: accumulate `backfill.batch_rows` rows, COPY them in, and
+      decompress/recompress any compressed chunks the batch touches
+    """
+    bf = cfg.get("backfill")
+    mode = bf.get("mode", "rows") if isinstance(bf, dict) else "rows"
+    mode = str(mode or "rows").strip().lower()
+    if mode not in BACKFILL_MODES:
+        raise ValueError(f"config.backfill.mode must be one of {BACKFILL_MODES}")
+    return mode
+
+
+def _parse_iso(value: Any, key: str) -> datetime:
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"config.{key} must be set (ISO string)")
+    dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        raise ValueError(f"config.{key} must include a UTC offset")
+    return dt
+
+
+def backfill_reload(cfg: dict) -> Optional[Tuple[datetime, datetime]]:
+    """Return the explicit reload range (`backfill.reload.start/end`), if any.
+
+    A reload re-fetches [start, end) for every pair regardless of
+    `sync_state`, and leaves the resume pointers alone; the usual resume
+    backfill runs after it.
+    """
+    bf = cfg.get("backfill")
+    reload = bf.get("reload") if isinstance(bf, dict) else None
+    if reload is None:
+        return None
+    if not isinstance(reload, dict):
+        raise ValueError("config.backfill.reload must be a mapping with start and end")
+    start = _parse_iso(reload.get("start"), "backfill.reload.start")
+    end = _parse_iso(reload.get("end"), "backfill.reload.end")
+    if end <= start:
+        raise ValueError("config.backfill.reload.end must be after start")
+    return start, end
 
 
 def _parse_pair(item: Union[str, dict[str, Any]]) -> PairSpec:
@@ -80,6 +164,7 @@ def validate_cfg_dict(cfg: dict) -> None:
     dsn = cfg.get("db", {}).get("dsn")
     if not isinstance(dsn, str) or not dsn.strip():
         raise ValueError("config.db.dsn must be a non-empty string")
+    storage_layout(cfg)
     # Endpoints
     rest_ep = cfg.get("rest", {}).get("endpoint")
     ws_ep = cfg.get("ws", {}).get("endpoint")
@@ -91,6 +176,10 @@ def validate_cfg_dict(cfg: dict) -> None:
     start_date = cfg.get("backfill", {}).get("start_date")
     if not isinstance(start_date, str) or not start_date.strip():
         raise ValueError("config.backfill.start_date must be set (ISO string)")
+    backfill_mode(cfg)
+    backfill_reload(cfg)
+    # Ingest mode
+    ingest_mode(cfg)
 
 
 def cfg_model_from_dict(cfg: dict) -> IngestorConfig:
@@ -101,12 +190,18 @@ def cfg_model_from_dict(cfg: dict) -> IngestorConfig:
         klines_limit=int(cfg["rest"].get("klines_limit", 1500)),
     )
     ws = WSConfig(endpoint=str(cfg["ws"]["endpoint"]).strip())
-    db = DBConfig(dsn=str(cfg["db"]["dsn"]).strip())
-    backfill = BackfillConfig(start_date=str(cfg["backfill"]["start_date"]).strip())
+    db = DBConfig(dsn=str(cfg["db"]["dsn"]).strip(), layout=storage_layout(cfg))
+    backfill = BackfillConfig(
+        start_date=str(cfg["backfill"]["start_date"]).strip(),
+        mode=backfill_mode(cfg),
+        batch_rows=int(cfg["backfill"].get("batch_rows", 50_000)),
+        reload=backfill_reload(cfg),
+    )
     live = cfg.get("live") if isinstance(cfg.get("live"), dict) else None
     return IngestorConfig(pairs=pairs,
                           rest=rest,
                           ws=ws,
                           db=db,
                           backfill=backfill,
-                          live=live)
+                          live=live,
+                          ingest_mode=ingest_mode(cfg))
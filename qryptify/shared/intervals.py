@@ -31,6 +31,22 @@ def step_of(interval: str) -> timedelta:
     return table[interval]
 
 
+_UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_interval(interval: str) -> timedelta:
+    """Parse any `<n>m|h|d|w` interval (e.g. 45m, 6h, 1d) into a timedelta.
+
+    Unlike `step_of`, this is not limited to the ingested intervals; it is
+    used for bars derived in memory from a stored base interval.
+    """
+    s = str(interval or "").strip()
+    num, unit = s[:-1], s[-1:]
+    if unit not in _UNIT_SECONDS or not num.isdigit() or int(num) <= 0:
+        raise ValueError(f"Invalid interval: {interval}")
+    return timedelta(seconds=int(num) * _UNIT_SECONDS[unit])
+
+
 def validate_interval(interval: str) -> str:
     if interval not in SUPPORTED_INTERVALS:
         raise ValueError(f"Unsupported interval: {interval}")
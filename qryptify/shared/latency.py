@@ -0,0 +1,166 @@
+"""Per-pair latency histograms for bars on the live path.
+
+Each closed bar carries wall-clock stamps (epoch seconds) as it moves from the
+exchange to the database: the exchange close, WS receipt, parse, enqueue on
+the write buffer and DB commit. `LatencyTracker.record` turns them into one
+sample per stage (time since the previous stamp) plus the close-to-commit
+total, kept in `LatencyHistogram`s per (symbol, interval).
+
+Histograms use fixed logarithmic buckets: recording is a log and an index
+increment, quantiles are read back within one bucket (10%) and memory does
+not grow with the sample count. The exchange stage compares the exchange's
+clock with ours, so it includes any clock offset.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+from typing import Dict, List, Sequence, Tuple
+
+STAGES = ("exchange", "parse", "enqueue", "commit")
+TOTAL = "total"
+
+_MIN_MS = 0.01
+_GROWTH = 1.1
+_INV_LOG_GROWTH = 1.0 / math.log(_GROWTH)
+# Bucket 0 holds samples <= _MIN_MS; the last one everything above ~3h
+_BUCKETS = 2 + int(math.log(1e7 / _MIN_MS) * _INV_LOG_GROWTH)
+
+
+def _upper(i: int) -> float:
+    return _MIN_MS * _GROWTH**i
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of latencies in milliseconds."""
+
+    __slots__ = ("counts", "n", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms: float) -> None:
+        if ms <= _MIN_MS:
+            i = 0
+        else:
+            i = min(int(math.log(ms / _MIN_MS) * _INV_LOG_GROWTH) + 1, _BUCKETS - 1)
+        self.counts[i] += 1
+        self.n += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for i, k in enumerate(other.counts):
+            if k:
+                self.counts[i] += k
+        self.n += other.n
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (capped at the max)."""
+        if self.n == 0:
+            return 0.0
+        rank = max(1, math.ceil(q * self.n))
+        seen = 0
+        for i, k in enumerate(self.counts):
+            seen += k
+            if seen >= rank:
+                return min(_upper(i), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else 0.0
+
+
+@dataclass(frozen=True)
+class LatencyRow:
+    """Latency of one stage of one pair over a reporting window."""
+
+    symbol: str
+    interval: str
+    stage: str
+    n: int
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+def _rows(hists: Dict[Tuple[str, str], List[LatencyHistogram]]) -> List[LatencyRow]:
+    out = []
+    for (symbol, interval), hs in sorted(hists.items()):
+        for stage, h in zip(STAGES + (TOTAL, ), hs):
+            if h.n:
+                out.append(
+                    LatencyRow(symbol, interval, stage, h.n, h.mean, h.quantile(0.5),
+                               h.quantile(0.99), h.max))
+    return out
+
+
+class LatencyTracker:
+    """Per-pair stage histograms for the current window and since start.
+
+    Usage:
+      tracker.record("BTCUSDT", "1m", (close, recv, parsed, enqueued, committed))
+      rows = tracker.drain()  # this window's LatencyRows; starts the next one
+    """
+
+    def __init__(self) -> None:
+        self._window: Dict[Tuple[str, str], List[LatencyHistogram]] = {}
+        self._total: Dict[Tuple[str, str], List[LatencyHistogram]] = {}
+
+    def record(self, symbol: str, interval: str, stamps: Sequence[float]) -> None:
+        """Record one bar from its epoch-second stamps, one per stage after the close."""
+        hs = self._window.get((symbol, interval))
+        if hs is None:
+            hs = self._window[(symbol, interval)] = [
+                LatencyHistogram() for _ in range(len(STAGES) + 1)
+            ]
+        prev = stamps[0]
+        for h, t in zip(hs, stamps[1:]):
+            h.record((t - prev) * 1000.0)
+            prev = t
+        hs[-1].record((prev - stamps[0]) * 1000.0)
+
+    def drain(self) -> List[LatencyRow]:
+        """Rows for the window since the last drain; folds it into the totals."""
+        rows = _rows(self._window)
+        for key, hs in self._window.items():
+            total = self._total.setdefault(key, [LatencyHistogram() for _ in hs])
+            for t, h in zip(total, hs):
+                t.merge(h)
+        self._window = {}
+        return rows
+
+    def summary(self) -> List[LatencyRow]:
+        """Rows since start, including the current window."""
+        merged: Dict[Tuple[str, str], List[LatencyHistogram]] = {}
+        for hists in (self._total, self._window):
+            for key, hs in hists.items():
+                acc = merged.setdefault(key, [LatencyHistogram() for _ in hs])
+                for a, h in zip(acc, hs):
+                    a.merge(h)
+        return _rows(merged)
+
+
+def format_rows(rows: Sequence[LatencyRow]) -> List[str]:
+    """One line per pair: total then per-stage p50/p99 in ms."""
+    by_pair: Dict[Tuple[str, str], Dict[str, LatencyRow]] = {}
+    for r in rows:
+        by_pair.setdefault((r.symbol, r.interval), {})[r.stage] = r
+    lines = []
+    for (symbol, interval), stages in by_pair.items():
+        total = stages.get(TOTAL)
+        head = (f"{symbol}/{interval} n={total.n} total p50={total.p50_ms:.1f} "
+                f"p99={total.p99_ms:.1f} max={total.max_ms:.1f} ms" if total else
+                f"{symbol}/{interval}")
+        parts = [f"{s} {stages[s].p50_ms:.2f}/{stages[s].p99_ms:.2f}" for s in STAGES
+                 if s in stages]
+        lines.append(f"{head} | p50/p99 " + " ".join(parts))
+    return lines
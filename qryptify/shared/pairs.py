@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from typing import List, Tuple
 
+from .config_model import ingest_mode
+
 
 def parse_pair(pair: str) -> tuple[str, str]:
     """Parse a single pair string into (SYMBOL, interval).
@@ -62,3 +64,20 @@ def symbol_interval_pairs_from_cfg(cfg) -> List[Tuple[str, str]]:
             seen.add(p)
             uniq.append(p)
     return uniq
+
+
+def ingest_pairs_from_cfg(cfg) -> List[Tuple[str, str]]:
+    """Return the (symbol, interval) streams the ingestor should fetch.
+
+    In native mode this is `symbol_interval_pairs_from_cfg(cfg)`. In rollup
+    mode every configured symbol is ingested once at 1m and higher intervals
+    are derived in the database.
+    """
+    pairs = symbol_interval_pairs_from_cfg(cfg)
+    if ingest_mode(cfg) != "rollup":
+        return pairs
+    out: list[tuple[str, str]] = []
+    for sym, _ in pairs:
+        if (sym, "1m") not in out:
+            out.append((sym, "1m"))
+    return out
@@ -0,0 +1,292 @@
+"""Lightweight phase profiler for the CLIs (`--profile`).
+
+Code marks coarse phases with `current().phase("db_fetch")` and counters with
+`current().count("bars", n)`. Unless a CLI activates a `Profiler`, `current()`
+returns a no-op profiler whose `phase()` hands back a shared null context, so
+instrumented code costs one function call per phase when profiling is off.
+
+A `Profiler` records per-phase wall time (perf_counter), CPU time
+(process_time, process-wide) and call counts, plus peak RSS, and can
+additionally write a cProfile dump (`.prof`, for snakeviz/pstats),
+collapsed stacks sampled from the main thread (`.folded`, for flamegraph.pl
+or speedscope) or the phase table as JSON (`.json`). Nested phases are named
+with a slash (`backtest/on_bar`). Each thread nests its own phases, so a
+phase opened by a background thread (e.g. a prefetch loader) is reported at
+the top level and its wall time overlaps the main thread's. In async code a
+phase's wall time includes time spent in other tasks.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+from contextlib import nullcontext
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    import cProfile
+
+F = TypeVar("F", bound=Callable)
+
+_NULL_CTX = nullcontext()
+
+
+class NullProfiler:
+    enabled = False
+
+    def phase(self, name: str):
+        return _NULL_CTX
+
+    def count(self, name: str, n: int = 1) -> None:
+        pass
+
+    def wrap(self, fn: F, name: str) -> F:
+        return fn
+
+
+class _PhaseStat:
+    __slots__ = ("wall", "cpu", "calls")
+
+    def __init__(self) -> None:
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.calls = 0
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB (None if unavailable)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+class _StackSampler(threading.Thread):
+    """Samples the target thread's stack into collapsed-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self._tid = thread_id
+        self._interval = interval
+        self._stop_evt = threading.Event()
+        self.stacks: Counter = Counter()
+
+    def run(self) -> None:
+        while not self._stop_evt.wait(self._interval):
+            frame = sys._current_frames().get(self._tid)
+            names: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self) -> None:
+        self._stop_evt.set()
+        self.join()
+
+
+class Profiler:
+    enabled = True
+
+    def __init__(self, dump_path: str = "", sample_interval: float = 0.005) -> None:
+        self.phases: Dict[str, _PhaseStat] = {}
+        self.counters: Counter = Counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._dump_path = dump_path
+        self._sample_interval = sample_interval
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+        self._t0 = 0.0
+        self._c0 = 0.0
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self) -> None:
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+        if self._dump_path.endswith((".folded", ".collapsed")):
+            self._sampler = _StackSampler(threading.get_ident(), self._sample_interval)
+            self._sampler.start()
+        elif self._dump_path and not self._dump_path.endswith(".json"):
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        self.wall = time.perf_counter() - self._t0
+        self.cpu = time.process_time() - self._c0
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self._dump_path)
+        if self._sampler is not None:
+            self._sampler.stop()
+            with open(self._dump_path, "w") as f:
+                for stack, n in self._sampler.stacks.most_common():
+                    f.write(f"{stack} {n}\n")
+        if self._dump_path.endswith(".json"):
+            import json
+            with open(self._dump_path, "w") as f:
+                json.dump(self.to_dict(), f, indent=2)
+
+    # -- instrumentation ---------------------------------------------------
+
+    @property
+    def _stack(self) -> List[str]:
+        """Open phases of the calling thread."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        stack = self._stack
+        full = "/".join(stack + [name])
+        # Registered on entry so the report lists parents before children
+        st = self.phases.setdefault(full, _PhaseStat())
+        stack.append(name)
+        w0 = time.perf_counter()
+        c0 = time.process_time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                st.wall += time.perf_counter() - w0
+                st.cpu += time.process_time() - c0
+                st.calls += 1
+            stack.pop()
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def wrap(self, fn: F, name: str) -> F:
+        """Time every call of `fn` as a sub-phase of the active phase."""
+        prefix = "/".join(self._stack)
+        full = f"{prefix}/{name}" if prefix else name
+        st = self.phases.get(full)
+        if st is None:
+            st = self.phases[full] = _PhaseStat()
+        perf = time.perf_counter
+
+        def timed(*args, **kwargs):
+            t0 = perf()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                st.wall += perf() - t0
+                st.calls += 1
+
+        return timed  # type: ignore[return-value]
+
+    # -- reporting ---------------------------------------------------------
+
+    def rates(self) -> Dict[str, float]:
+        """Throughput counters: <counter>/sec over the phase named like it."""
+        out: Dict[str, float] = {}
+        for name, n in self.counters.items():
+            secs = sum(st.wall for key, st in self.phases.items()
+                       if key.rsplit("/", 1)[-1] == _RATE_PHASES.get(name, ""))
+            secs = secs or self.wall
+            if secs > 0:
+                out[f"{name}/sec"] = n / secs
+        return out
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "wall_s": self.wall,
+            "cpu_s": self.cpu,
+            "peak_rss_mb": peak_rss_mb(),
+            "phases": {
+                k: {
+                    "wall_s": v.wall,
+                    "cpu_s": v.cpu,
+                    "calls": v.calls
+                }
+                for k, v in self.phases.items()
+            },
+            "counters": dict(self.counters),
+            "rates": self.rates(),
+        }
+
+    def report(self) -> str:
+        total = self.wall or sum(st.wall for k, st in self.phases.items() if "/" not in k)
+        lines = [
+            "Profile",
+            f"  {'phase':<28} {'wall_s':>9} {'cpu_s':>9} {'calls':>8} {'%wall':>6}",
+        ]
+        for name, st in self.phases.items():
+            depth = name.count("/")
+            label = "  " * depth + name.rsplit("/", 1)[-1]
+            pct = 100.0 * st.wall / total if total > 0 else 0.0
+            cpu = f"{st.cpu:>9.3f}" if st.cpu else f"{'-':>9}"
+            lines.append(f"  {label:<28} {st.wall:>9.3f} {cpu} {st.calls:>8} {pct:>5.1f}%")
+        lines.append(f"  {'total':<28} {self.wall:>9.3f} {self.cpu:>9.3f}")
+        for name, n in sorted(self.counters.items()):
+            lines.append(f"  {name}: {n:,}")
+        for name, r in sorted(self.rates().items()):
+            lines.append(f"  {name}: {r:,.1f}")
+        rss = peak_rss_mb()
+        if rss is not None:
+            lines.append(f"  peak RSS: {rss:,.1f} MiB")
+        if self._dump_path:
+            lines.append(f"  dump: {self._dump_path}")
+        return "\n".join(lines)
+
+
+# Counter -> phase whose wall time it is measured against
+_RATE_PHASES = {
+    "bars": "backtest",
+    "backtests": "backtest",
+    "rows": "db_write",
+}
+
+_NULL = NullProfiler()
+_current: "NullProfiler | Profiler" = _NULL
+
+
+def current() -> "NullProfiler | Profiler":
+    return _current
+
+
+def add_profile_args(parser) -> None:
+    """Add the shared `--profile` / `--profile-out` CLI options."""
+    parser.add_argument("--profile",
+                        action="store_true",
+                        help="Print per-phase wall/CPU timings, rates and peak memory")
+    parser.add_argument(
+        "--profile-out",
+        default="",
+        help="With --profile: write a cProfile dump (.prof), sampled collapsed "
+        "stacks for flame graphs (.folded) or the phase table (.json)",
+    )
+
+
+@contextmanager
+def profiled(enabled: bool,
+             dump_path: str = "",
+             report: Callable[[str], None] = print) -> Iterator["NullProfiler | Profiler"]:
+    """Activate a Profiler for the block when `enabled`; print its report at exit."""
+    global _current
+    if not enabled:
+        yield _NULL
+        return
+    prof = Profiler(dump_path=dump_path)
+    _current = prof
+    prof.start()
+    try:
+        yield prof
+    finally:
+        prof.stop()
+        _current = _NULL
+        report(prof.report())
@@ -7,16 +7,24 @@ from __future__ import annotations
 
 from datetime import datetime
 from datetime import timezone
+from typing import Optional
 
 from loguru import logger
 
 from qryptify.ingestor.parsers import parse_rest_kline_row
 from qryptify.ingestor.types import KlineRow
+from qryptify.shared.config_model import backfill_mode
+from qryptify.shared.config_model import backfill_reload
+from qryptify.shared.config_model import ingest_mode
 from qryptify.shared.intervals import step_of
-from qryptify.shared.pairs import symbol_interval_pairs_from_cfg
+from qryptify.shared.pairs import ingest_pairs_from_cfg
+from qryptify.shared.profiling import current
 from qryptify.shared.time import to_dt
 from qryptify.shared.time import to_ms
 
+from .bulk_loader import BulkLoadStats
+from .bulk_loader import write_batch
+
 
 def _parse_kline(symbol: str, interval: str, arr: list) -> KlineRow:
     """Wrapper kept for compatibility; delegates to shared parser."""
@@ -29,45 +37,114 @@ async def run_backfill(cfg: dict, repo, client) -> None:
     - Resumes from `sync_state.last_closed_ts` when present, otherwise uses
       `backfill.start_date` from the config.
     - Writes with ON CONFLICT DO NOTHING to remain idempotent.
+    - In rollup mode only 1m is fetched per symbol and the continuous
+      aggregates are refreshed over the backfilled range.
+    - With `backfill.mode: bulk`, pages are accumulated into batches of
+      `backfill.batch_rows` and written via the compression-aware COPY path;
+      the resume pointer advances once per written batch.
+    - With `backfill.reload: {start, end}`, each pair first re-fetches
+      [start, end) ignoring the resume pointer (which it does not move),
+      then resumes as usual.
     """
-    pairs = symbol_interval_pairs_from_cfg(cfg)
-    page_limit = cfg["rest"]["klines_limit"]
+    pairs = ingest_pairs_from_cfg(cfg)
+    reload = backfill_reload(cfg)
     min_start = datetime.fromisoformat(cfg["backfill"]["start_date"].replace(
         "Z", "+00:00"))
 
     for symbol, interval in pairs:
+        if reload is not None:
+            logger.info(f"Reload {symbol}/{interval} {reload[0].isoformat()} -> "
+                        f"{reload[1].isoformat()} (resume pointer untouched)")
+            await _backfill_range(cfg, repo, client, symbol, interval, *reload)
         last = repo.get_last_closed_ts(symbol, interval)
         start_dt = max_dt(min_start, (last + step_of(interval)) if last else min_start)
-        start_ms = to_ms(start_dt)
-        logger.info(
-            f"Backfill {symbol}/{interval} from {start_dt.isoformat()} (limit={page_limit})"
-        )
+        await _backfill_range(cfg, repo, client, symbol, interval, start_dt)
+
 
-        while True:
+async def _backfill_range(cfg: dict,
+                          repo,
+                          client,
+                          symbol: str,
+                          interval: str,
+                          start_dt: datetime,
+                          end_dt: Optional[datetime] = None) -> None:
+    """Fetch and write bars opening in [start_dt, end_dt), or up to near-now.
+
+    The resume pointer advances only for the open-ended (resume) range.
+    """
+    prof = current()
+    rollup = ingest_mode(cfg) == "rollup"
+    bulk = backfill_mode(cfg) == "bulk"
+    batch_rows = max(1, int(cfg["backfill"].get("batch_rows", 50_000)))
+    page_limit = cfg["rest"]["klines_limit"]
+    advance = end_dt is None
+    end_ms = to_ms(end_dt) - 1 if end_dt is not None else None
+    start_ms = to_ms(start_dt)
+    last_close_dt = None
+    pending: list[KlineRow] = []
+    stats = BulkLoadStats()
+    logger.info(
+        f"Backfill {symbol}/{interval} from {start_dt.isoformat()} (limit={page_limit})")
+
+    while True:
+        with prof.phase("rest_fetch"):
             batch = await client.klines(symbol,
                                         interval,
                                         start_ms=start_ms,
+                                        end_ms=end_ms,
                                         limit=page_limit)
-            if not batch:
-                logger.info(f"Backfill {symbol}/{interval} complete (no more data)")
-                break
+        if end_ms is not None:
+            batch = [arr for arr in batch if arr[0] <= end_ms]
+        if not batch:
+            logger.info(f"Backfill {symbol}/{interval} complete (no more data)")
+            break
+        with prof.phase("parse"):
             rows = [_parse_kline(symbol, interval, arr) for arr in batch]
-            inserted = repo.upsert_klines(rows)
-            # advance by last close
-            last_close_ms = batch[-1][6]
-            last_close_dt = to_dt(last_close_ms)
-            repo.set_last_closed_ts(symbol, interval, last_close_dt)
+        # advance by last close
+        last_close_ms = batch[-1][6]
+        last_close_dt = to_dt(last_close_ms)
+        if bulk:
+            pending.extend(rows)
+            if len(pending) >= batch_rows:
+                with prof.phase("db_write"):
+                    write_batch(repo, pending, stats)
+                    if advance:
+                        repo.set_last_closed_ts(symbol, interval, last_close_dt)
+                prof.count("rows", len(pending))
+                pending = []
+        else:
+            with prof.phase("db_write"):
+                inserted = repo.upsert_klines(rows)
+                if advance:
+                    repo.set_last_closed_ts(symbol, interval, last_close_dt)
+            prof.count("rows", len(rows))
             logger.info(
                 f"Backfill {symbol}/{interval}: inserted={inserted} last_close={last_close_dt.isoformat()}"
             )
 
-            # Stop when close to "now" (let live mode take over)
-            if (datetime.now(timezone.utc) - last_close_dt) < step_of(interval):
-                logger.info(
-                    f"Backfill {symbol}/{interval} up-to-date through {last_close_dt.isoformat()}"
-                )
-                break
-            start_ms = last_close_ms + 1
+        if end_ms is not None and last_close_ms >= end_ms:
+            break
+        # Stop when close to "now" (let live mode take over)
+        if (datetime.now(timezone.utc) - last_close_dt) < step_of(interval):
+            logger.info(
+                f"Backfill {symbol}/{interval} up-to-date through {last_close_dt.isoformat()}"
+            )
+            break
+        start_ms = last_close_ms + 1
+
+    if pending:
+        with prof.phase("db_write"):
+            write_batch(repo, pending, stats)
+            if advance:
+                repo.set_last_closed_ts(symbol, interval, pending[-1]["close_time"])
+        prof.count("rows", len(pending))
+    if stats.batches:
+        logger.info(f"Bulk backfill {symbol}/{interval}: {stats.summary()}")
+
+    if rollup and last_close_dt is not None and hasattr(repo, "refresh_rollups"):
+        with prof.phase("refresh_rollups"):
+            repo.refresh_rollups(start_dt, last_close_dt)
+        logger.info(f"Refreshed rollups for {symbol} through {last_close_dt.isoformat()}")
 
 
 def max_dt(a: datetime, b: datetime) -> datetime:
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import json
+import time
 from typing import AsyncGenerator, List, Optional
 
 import httpx
@@ -56,7 +57,8 @@ class BinanceClient:
         Yields closed kline payloads as dicts for mixed (symbol, interval) pairs:
         {
           "symbol": "BTCUSDT",
-          "k": { "t": open_time, "T": close_time, "i": "1m", "x": true, ... }
+          "k": { "t": open_time, "T": close_time, "i": "1m", "x": true, ... },
+          "recv": receipt time (epoch seconds)
         }
         """
         streams = [f"{s.lower()}@kline_{i}" for s, i in pairs]
@@ -71,10 +73,11 @@ class BinanceClient:
             try:
                 logger.info(f"WebSocket connected: {url}")
                 async for msg in ws:
+                    recv = time.time()
                     data = json.loads(msg)
                     k = data.get("data", {}).get("k")
                     if k and k.get("x") is True:
-                        yield {"symbol": data["data"]["s"], "k": k}
+                        yield {"symbol": data["data"]["s"], "k": k, "recv": recv}
             except websockets.ConnectionClosed:
                 logger.warning("WebSocket connection closed; reconnecting…")
                 continue
@@ -17,11 +17,10 @@ from .live_runner import run_live
 async def run_all(cfg: dict) -> None:
     """Orchestrate backfill then live phases with a shared repo and client."""
     client = BinanceClient(cfg["rest"]["endpoint"], cfg["ws"]["endpoint"])
-    dsn = cfg["db"]["dsn"]
 
     _ = await client.server_time_ms()
 
-    repo_sync = TimescaleRepo(dsn)
+    repo_sync = TimescaleRepo.from_cfg(cfg)
     repo_sync.connect()
     try:
         logger.info("Backfill phase starting")
@@ -30,7 +29,7 @@ async def run_all(cfg: dict) -> None:
         repo_sync.close()
 
     logger.info("Live phase starting")
-    repo_async = AsyncTimescaleRepo(dsn)
+    repo_async = AsyncTimescaleRepo.from_cfg(cfg)
     await repo_async.connect()
     try:
         await run_live(cfg, repo_async, client)
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import asyncio
+from datetime import datetime
+from datetime import timezone
+import time
+from typing import Optional
 
 from loguru import logger
 
 from qryptify.ingestor.parsers import parse_ws_kline_row
 from qryptify.ingestor.types import KlineRow
-from qryptify.shared.pairs import symbol_interval_pairs_from_cfg
+from qryptify.shared.latency import format_rows
+from qryptify.shared.latency import LatencyTracker
+from qryptify.shared.pairs import ingest_pairs_from_cfg
+from qryptify.shared.profiling import current
 
 
 def _row_from_k(symbol: str, k: dict, interval: str) -> KlineRow:
@@ -14,8 +21,15 @@ def _row_from_k(symbol: str, k: dict, interval: str) -> KlineRow:
     return parse_ws_kline_row(symbol, interval, k)
 
 
-async def run_live(cfg, repo, client):
-    pairs = symbol_interval_pairs_from_cfg(cfg)
+async def run_live(cfg, repo, client, latency: Optional[LatencyTracker] = None):
+    """Stream closed klines into the DB.
+
+    Every bar is traced from exchange close to commit into `latency` (a fresh
+    tracker by default); per-pair p50/p99 are logged and stored in
+    `ingest_latency` every `live.latency_report_s` seconds (0 disables).
+    """
+    prof = current()
+    pairs = ingest_pairs_from_cfg(cfg)
     pairs_str = ", ".join([f"{s}/{i}" for s, i in pairs])
     logger.info(f"Live streaming started for: {pairs_str}")
     # Optional size-based buffering (default 1 = existing behavior)
@@ -24,22 +38,56 @@ async def run_live(cfg, repo, client):
         buffer_max = int(live_cfg.get("buffer_max", 1))
     except Exception:
         buffer_max = 1
+    # Commit each batch with its sync_state pointers and a NOTIFY for consumers
+    notify = bool(live_cfg.get("notify", True)) and hasattr(repo, "publish_klines_async")
+    try:
+        report_s = float(live_cfg.get("latency_report_s", 60))
+    except Exception:
+        report_s = 60.0
+    tracker = latency if latency is not None else LatencyTracker()
+    reported = time.monotonic()
     buf: list[KlineRow] = []
+    # (close, recv, parsed, enqueued) epoch seconds per buffered row
+    stamps: list[tuple[float, float, float, float]] = []
 
-    async def _flush(rows: list[KlineRow]) -> None:
+    async def _flush(rows: list[KlineRow], traces: list[tuple[float, float, float,
+                                                              float]]) -> None:
         if not rows:
             return
         last = rows[-1]
         sym_last = last["symbol"]
         interval_last = last["interval"]
-        if hasattr(repo, "upsert_klines_async"):
-            await repo.upsert_klines_async(rows)
-            await repo.set_last_closed_ts_async(sym_last, interval_last,
-                                                last["close_time"])
-        else:
-            await asyncio.to_thread(repo.upsert_klines, rows)
-            await asyncio.to_thread(repo.set_last_closed_ts, sym_last, interval_last,
-                                    last["close_time"])
+        with prof.phase("db_write"):
+            if notify:
+                await repo.publish_klines_async(rows)
+            elif hasattr(repo, "upsert_klines_async"):
+                await repo.upsert_klines_async(rows)
+                await repo.set_last_closed_ts_async(sym_last, interval_last,
+                                                    last["close_time"])
+            else:
+                await asyncio.to_thread(repo.upsert_klines, rows)
+                await asyncio.to_thread(repo.set_last_closed_ts, sym_last, interval_last,
+                                        last["close_time"])
+        committed = time.time()
+        for row, st in zip(rows, traces):
+            tracker.record(row["symbol"], row["interval"], (*st, committed))
+        prof.count("rows", len(rows))
+
+    async def _report() -> None:
+        nonlocal reported
+        reported = time.monotonic()
+        rows = tracker.drain()
+        if not rows:
+            return
+        for line in format_rows(rows):
+            logger.info(f"Latency {line}")
+        try:
+            if hasattr(repo, "record_latency_async"):
+                await repo.record_latency_async(datetime.now(timezone.utc), rows)
+            elif hasattr(repo, "record_latency"):
+                await asyncio.to_thread(repo.record_latency, datetime.now(timezone.utc), rows)
+        except Exception as e:
+            logger.warning(f"Could not store latency stats: {e}")
 
     try:
         async for msg in client.ws_kline_stream_pairs(pairs):
@@ -48,15 +96,25 @@ async def run_live(cfg, repo, client):
             if k.get("x") is True:
                 interval = k.get("i")
                 row = _row_from_k(sym, k, interval)
+                parsed = time.time()
                 buf.append(row)
+                # close_time is the bar's last millisecond; "recv" is stamped by the client
+                stamps.append(((k["T"] + 1) / 1000.0, msg.get("recv", parsed), parsed,
+                               time.time()))
                 if len(buf) >= max(1, buffer_max):
-                    rows = buf
-                    buf = []
-                    await _flush(rows)
+                    rows, traces = buf, stamps
+                    buf, stamps = [], []
+                    await _flush(rows, traces)
                     logger.debug(
                         f"Live close {sym}/{interval} at {row['close_time'].isoformat()} close={row['close']} batch={len(rows)}"
                     )
+                    if report_s > 0 and time.monotonic() - reported >= report_s:
+                        await _report()
     finally:
         if buf:
-            await _flush(buf)
+            await _flush(buf, stamps)
             logger.info(f"Flushed {len(buf)} buffered rows before shutdown")
+        if report_s > 0:
+            await _report()
+        for line in format_rows(tracker.summary()):
+            logger.info(f"Latency since start {line}")
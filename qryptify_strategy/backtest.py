@@ -2,53 +2,105 @@ from __future__ import annotations
 
 import argparse
 from datetime import datetime
-from typing import List
+from datetime import timedelta
+import json
+import os
+from typing import Dict, List, Optional, Tuple
 
-from qryptify.shared.config import load_cfg_dsn
 from qryptify.shared.fees import binance_futures_fee_bps
-from qryptify.shared.logging import setup_logging
 from qryptify.shared.pairs import parse_pair
+from qryptify.shared.profiling import add_profile_args
+from qryptify.shared.profiling import current
+from qryptify.shared.profiling import profiled
 
 from .backtester import backtest
+from .backtester import backtest_resumable
+from .backtester import EngineSnapshot
+from .backtester import required_warmup
+from .backtester import snapshot_from_json
+from .backtester import snapshot_to_json
+from .batch import batch_backtest
+from .loader import build_bars  # noqa: F401  (re-exported for callers)
+from .loader import load_window
+from .models import BacktestReport
 from .models import Bar
 from .models import RiskParams
+from .models import Trade
 from .strategies.bollinger import BollingerBandStrategy
 from .strategies.ema_crossover import EMACrossStrategy
 from .strategies.rsi_scalp import RSIScalpStrategy
-
-
-def build_bars(rows: List[dict]) -> List[Bar]:
-    out: List[Bar] = []
-    for r in rows:
-        out.append(
-            Bar(
-                ts=r["ts"],
-                open=float(r["open"]),
-                high=float(r["high"]),
-                low=float(r["low"]),
-                close=float(r["close"]),
-                volume=float(r["volume"]),
-            ))
-    return out
+from .strategy_base import Strategy
 
 
 def main() -> None:
     # Standardize logging format (stdout printing remains unchanged below)
     try:
+        from qryptify.shared.logging import setup_logging
         setup_logging("INFO")
     except Exception:
         pass
     p = argparse.ArgumentParser(description="Backtest strategies on stored OHLCV")
-    p.add_argument("--pair", help="SYMBOL/interval like BTCUSDT/4h", required=True)
+    pairs = p.add_mutually_exclusive_group(required=True)
+    pairs.add_argument("--pair", help="SYMBOL/interval like BTCUSDT/4h")
+    pairs.add_argument(
+        "--pairs",
+        help="Comma list of pairs sharing one interval (e.g. BTCUSDT/1h,ETHUSDT/1h): one "
+        "batch pass computes the signals for all of them, positions are simulated per pair",
+    )
+    add_strategy_args(p)
+    p.add_argument("--lookback",
+                   type=int,
+                   help="report the latest N bars (warm-up bars are fetched on top)",
+                   default=2000)
+    p.add_argument(
+        "--warmup",
+        type=int,
+        default=-1,
+        help="Bars fed to the strategy before the reported window (default: what the "
+        "strategy and ATR declare; 0 to disable)",
+    )
+    p.add_argument("--start", help="ISO start datetime (UTC)")
+    p.add_argument("--end", help="ISO end datetime (UTC)")
+    p.add_argument(
+        "--base-interval",
+        default="",
+        help=
+        "Stored interval to resample from (default: stored pair interval, or the coarsest stored divisor for derived intervals like 45m/6h/1d)",
+    )
+    add_risk_args(p)
+    p.add_argument(
+        "--json-out",
+        default="",
+        help="Optional path to write a JSON summary (report + last trades)",
+    )
+    p.add_argument(
+        "--save-state",
+        default="",
+        help="Write the engine state at the end of the run to this JSON file (--pair only)",
+    )
+    p.add_argument(
+        "--resume-state",
+        default="",
+        help="Continue the run saved with --save-state: only bars after its last bar are "
+        "loaded and the report covers the whole span. Reuses the saved fee unless --fee-bps",
+    )
+    add_profile_args(p)
+    args = p.parse_args()
+    if args.pairs and (args.save_state or args.resume_state):
+        p.error("--save-state/--resume-state need --pair")
+
+    with profiled(args.profile, args.profile_out):
+        _run(args)
+
+
+def add_strategy_args(p: argparse.ArgumentParser) -> None:
+    """--strategy and the per-strategy parameters (see `strategy_from_args`)."""
     p.add_argument(
         "--strategy",
         choices=["ema", "bollinger", "boll", "bb", "rsi", "rsi_mr"],
         default="ema",
         help="Strategy: ema | bollinger | rsi",
     )
-    p.add_argument("--lookback", type=int, help="fetch latest N bars", default=2000)
-    p.add_argument("--start", help="ISO start datetime (UTC)")
-    p.add_argument("--end", help="ISO end datetime (UTC)")
     # EMA params
     p.add_argument("--fast", type=int, default=50, help="EMA fast period (ema)")
     p.add_argument("--slow", type=int, default=200, help="EMA slow period (ema)")
@@ -75,6 +127,10 @@ def main() -> None:
                    type=int,
                    default=200,
                    help="EMA filter period, 0 to disable (rsi)")
+
+
+def add_risk_args(p: argparse.ArgumentParser) -> None:
+    """Sizing, stop, fee and exchange-constraint flags (see `risk_from_args`)."""
     p.add_argument("--equity", type=float, default=10_000.0)
     p.add_argument("--risk", type=float, default=0.01)
     p.add_argument("--atr", type=int, default=14)
@@ -116,144 +172,262 @@ def main() -> None:
                    type=float,
                    default=0.0,
                    help="Price tick size for stop rounding (0 to ignore)")
-    p.add_argument(
-        "--json-out",
-        default="",
-        help="Optional path to write a JSON summary (report + last trades)",
+
+
+def strategy_from_args(args: argparse.Namespace) -> Strategy:
+    strat_key = args.strategy
+    if strat_key in ("boll", "bb"):
+        strat_key = "bollinger"
+    if strat_key == "rsi_mr":
+        strat_key = "rsi"
+
+    if strat_key == "ema":
+        return EMACrossStrategy(fast=args.fast, slow=args.slow)
+    if strat_key == "bollinger":
+        return BollingerBandStrategy(period=args.bb_period, mult=args.bb_mult)
+    if strat_key == "rsi":
+        return RSIScalpStrategy(
+            rsi_period=args.rsi_period,
+            entry=args.rsi_entry,
+            exit=args.rsi_exit,
+            ema_filter=args.rsi_ema,
+        )
+    raise ValueError(f"Unknown strategy: {args.strategy}")
+
+
+def risk_from_args(args: argparse.Namespace, fee_bps_val: float) -> RiskParams:
+    return RiskParams(
+        start_equity=args.equity,
+        risk_per_trade=args.risk,
+        atr_period=args.atr,
+        atr_mult_stop=args.atr_mult,
+        atr_mult_trail=args.atr_trail,
+        atr_trail_trigger_mult=args.atr_trail_trigger,
+        fee_bps=fee_bps_val,
+        fee_lookup=None,
+        slippage_bps=args.slip_bps,
+        qty_step=args.qty_step,
+        min_qty=args.min_qty,
+        min_notional=args.min_notional,
+        price_tick=args.price_tick,
     )
-    args = p.parse_args()
 
-    symbol, interval = parse_pair(args.pair)
+
+def fee_bps_from_args(args: argparse.Namespace, symbol: str) -> float:
+    """--fee-bps, or the symbol's taker fee from the API (fallback 4.0)."""
+    if args.fee_bps is not None and args.fee_bps >= 0:
+        return float(args.fee_bps)
+    with current().phase("fee_api"):
+        try:
+            _, taker_bps = binance_futures_fee_bps(symbol)
+            return float(taker_bps)
+        except Exception:
+            return 4.0
+
+
+def _load(args: argparse.Namespace, repo, symbol: str, interval: str,
+          warmup: int) -> Tuple[List[Bar], int]:
+    """The window's bars with up to `warmup` bars ahead of it; returns (bars, n_warmup)."""
+    start = (datetime.fromisoformat(args.start.replace("Z", "+00:00")) if args.start else None)
+    end = (datetime.fromisoformat(args.end.replace("Z", "+00:00")) if args.end else None)
+    return load_window(repo,
+                       symbol,
+                       interval,
+                       warmup,
+                       lookback=args.lookback,
+                       start=start,
+                       end=end,
+                       base_interval=args.base_interval or None)
+
+
+def _read_state(path: str) -> EngineSnapshot:
+    with open(path) as f:
+        return snapshot_from_json(json.load(f))
+
+
+def _write_state(path: str, snap: EngineSnapshot) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot_to_json(snap), f)
+    os.replace(tmp, path)
+    print(f"Saved engine state to {path} (last bar {snap.last_ts.isoformat()})")
+
+
+def _print_summary(report: BacktestReport, trades: List[Trade]) -> None:
+    print("Summary")
+    print(f"  Pair:       {report.symbol}/{report.interval}")
+    print(f"  Bars:       {report.bars}")
+    print(f"  Trades:     {report.trades}")
+    print(f"  Win rate:   {report.win_rate:.1%}")
+    print(f"  Avg win:    {report.avg_win:.2f}")
+    print(f"  Avg loss:   {report.avg_loss:.2f}")
+    print(f"  Fees:       {report.total_fees:.2f}")
+    print(f"  Avg fee:    {report.avg_fee_bps:.2f} bps ({report.fee_model})")
+    print(f"  PnL:        {report.total_pnl:.2f}")
+    print(f"  Equity end: {report.equity_end:.2f}")
+    if report.cagr is not None:
+        print(f"  CAGR:       {report.cagr:.2%}")
+    print(f"  Max DD:     {report.max_drawdown:.2f}")
+
+    # Show last few trades
+    last = trades[-5:]
+    if last:
+        print("\nLast trades")
+        for t in last:
+            print(
+                f"  {t.entry_ts.isoformat()} -> {t.exit_ts.isoformat()} | qty={t.qty:.6f} entry={t.entry_price:.2f} exit={t.exit_price:.2f} pnl={t.pnl:.2f} reason={t.reason}"
+            )
+
+
+def _summary_json(report: BacktestReport, trades: List[Trade]) -> dict:
+    return {
+        "report": {
+            "symbol": report.symbol,
+            "interval": report.interval,
+            "bars": report.bars,
+            "trades": report.trades,
+            "total_pnl": report.total_pnl,
+            "total_fees": report.total_fees,
+            "equity_end": report.equity_end,
+            "max_drawdown": report.max_drawdown,
+            "win_rate": report.win_rate,
+            "avg_win": report.avg_win,
+            "avg_loss": report.avg_loss,
+            "cagr": report.cagr,
+            "avg_fee_bps": report.avg_fee_bps,
+            "fee_model": report.fee_model,
+        },
+        "last_trades": [{
+            "entry_ts": t.entry_ts.isoformat(),
+            "exit_ts": t.exit_ts.isoformat(),
+            "entry_price": t.entry_price,
+            "exit_price": t.exit_price,
+            "qty": t.qty,
+            "pnl": t.pnl,
+            "fees": t.fees,
+            "reason": t.reason,
+        } for t in trades[-5:]],
+    }
+
+
+def _write_json(path: str, out: dict) -> None:
+    try:
+        import json
+        with open(path, "w") as f:
+            json.dump(out, f, indent=2)
+        print(f"Saved JSON summary to {path}")
+    except Exception:
+        # Do not fail the run due to JSON write issues
+        pass
+
+
+def _run(args: argparse.Namespace) -> None:
+    prof = current()
+    if args.pairs:
+        specs = [parse_pair(x.strip()) for x in args.pairs.split(",") if x.strip()]
+        if len({interval for _, interval in specs}) != 1:
+            raise SystemExit("--pairs must share one interval")
+    else:
+        specs = [parse_pair(args.pair)]
+    interval = specs[0][1]
+
+    resume: Optional[EngineSnapshot] = None
+    if args.resume_state:
+        resume = _read_state(args.resume_state)
+        if (resume.symbol, resume.interval) != specs[0]:
+            raise SystemExit(f"{args.resume_state} is for {resume.symbol}/{resume.interval}")
+        # Only the bars after the saved state
+        args.start = (resume.last_ts + timedelta(microseconds=1)).isoformat()
+
+    strategy = strategy_from_args(args)
+    if resume is not None:
+        warmup = 0  # the saved state is already warm
+    else:
+        warmup = args.warmup if args.warmup >= 0 else required_warmup(strategy, args.atr)
 
     # Local import so --help works without loguru/psycopg until run
     from qryptify.data.timescale import TimescaleRepo  # type: ignore
-    dsn = load_cfg_dsn()
-    repo = TimescaleRepo(dsn)
-    repo.connect()
+    from qryptify.shared.config import load_cfg
+    repo = TimescaleRepo.from_cfg(load_cfg())
+    with prof.phase("db_connect"):
+        repo.connect()
     try:
-        if args.start or args.end:
-            start = (datetime.fromisoformat(args.start.replace("Z", "+00:00"))
-                     if args.start else None)
-            end = (datetime.fromisoformat(args.end.replace("Z", "+00:00"))
-                   if args.end else None)
-            rows = repo.fetch_ohlcv(symbol, interval, start=start, end=end)
-        else:
-            rows = repo.fetch_latest_n(symbol, interval, args.lookback)
+        bars_by_symbol: Dict[str, List[Bar]] = {}
+        warm: Dict[str, int] = {}
+        for symbol, _ in specs:
+            bars_by_symbol[symbol], warm[symbol] = _load(args, repo, symbol, interval, warmup)
+            print(f"Fetched {len(bars_by_symbol[symbol])} bars for {symbol}/{interval} "
+                  f"({warm[symbol]} warm-up)")
+    finally:
+        repo.close()
 
-        print(f"Fetched {len(rows)} bars for {symbol}/{interval}")
-        bars = build_bars(rows)
-        # Determine a fixed taker fee bps for this symbol from API (fallback 4.0).
-        if args.fee_bps is None or args.fee_bps < 0:
+    # Fixed taker fee bps per symbol from the API (fallback 4.0) unless --fee-bps;
+    # a resumed run keeps the fee it was started with
+    risks = {
+        symbol: risk_from_args(
+            args, resume.config["risk"]["fee_bps"] if resume is not None and args.fee_bps < 0
+            else fee_bps_from_args(args, symbol))
+        for symbol in bars_by_symbol
+    }
+
+    if args.pairs:
+        with prof.phase("backtest"):
+            results = batch_backtest(interval, bars_by_symbol, strategy, risks, warmup=warm)
+        prof.count("bars", sum(len(b) for b in bars_by_symbol.values()))
+        prof.count("backtests", len(results))
+        with prof.phase("output"):
+            for symbol, (report, trades) in results.items():
+                print()
+                _print_summary(report, trades)
+            for symbol in bars_by_symbol:
+                if symbol not in results:
+                    print(f"\nNo bars for {symbol}/{interval}")
+            if args.json_out:
+                _write_json(args.json_out,
+                            {"pairs": [_summary_json(r, t) for r, t in results.values()]})
+        return
+
+    symbol = specs[0][0]
+    bars = bars_by_symbol[symbol]
+    if resume is not None and not bars:
+        print(f"No new bars since {resume.last_ts.isoformat()}")
+        return
+    snap: Optional[EngineSnapshot] = None
+    with prof.phase("backtest"):
+        if prof.enabled:
+            # Time strategy.on_bar separately from the engine loop
+            strategy.on_bar = prof.wrap(  # type: ignore[method-assign]
+                strategy.on_bar, "on_bar")
+        if resume is not None or args.save_state:
             try:
-                _, taker_bps = binance_futures_fee_bps(symbol)
-                fee_bps_val = float(taker_bps)
-            except Exception:
-                fee_bps_val = 4.0
+                report, trades, snap = backtest_resumable(symbol,
+                                                          interval,
+                                                          bars,
+                                                          strategy,
+                                                          risks[symbol],
+                                                          warmup=warm[symbol],
+                                                          resume=resume)
+            except ValueError as e:
+                if resume is None:
+                    raise
+                raise SystemExit(f"Cannot resume from {args.resume_state}: {e}")
         else:
-            fee_bps_val = float(args.fee_bps)
-        # Select strategy
-        strat_key = args.strategy
-        if strat_key in ("boll", "bb"):
-            strat_key = "bollinger"
-        if strat_key == "rsi_mr":
-            strat_key = "rsi"
-
-        if strat_key == "ema":
-            strategy = EMACrossStrategy(fast=args.fast, slow=args.slow)
-        elif strat_key == "bollinger":
-            strategy = BollingerBandStrategy(period=args.bb_period, mult=args.bb_mult)
-        elif strat_key == "rsi":
-            strategy = RSIScalpStrategy(
-                rsi_period=args.rsi_period,
-                entry=args.rsi_entry,
-                exit=args.rsi_exit,
-                ema_filter=args.rsi_ema,
-            )
-        else:
-            raise ValueError(f"Unknown strategy: {args.strategy}")
-        risk = RiskParams(
-            start_equity=args.equity,
-            risk_per_trade=args.risk,
-            atr_period=args.atr,
-            atr_mult_stop=args.atr_mult,
-            atr_mult_trail=args.atr_trail,
-            atr_trail_trigger_mult=args.atr_trail_trigger,
-            fee_bps=fee_bps_val,
-            fee_lookup=None,
-            slippage_bps=args.slip_bps,
-            qty_step=args.qty_step,
-            min_qty=args.min_qty,
-            min_notional=args.min_notional,
-            price_tick=args.price_tick,
-        )
-
-        report, trades = backtest(symbol, interval, bars, strategy, risk)
-
-        # Print summary
-        print("Summary")
-        print(f"  Pair:       {report.symbol}/{report.interval}")
-        print(f"  Bars:       {report.bars}")
-        print(f"  Trades:     {report.trades}")
-        print(f"  Win rate:   {report.win_rate:.1%}")
-        print(f"  Avg win:    {report.avg_win:.2f}")
-        print(f"  Avg loss:   {report.avg_loss:.2f}")
-        print(f"  Fees:       {report.total_fees:.2f}")
-        print(f"  Avg fee:    {report.avg_fee_bps:.2f} bps ({report.fee_model})")
-        print(f"  PnL:        {report.total_pnl:.2f}")
-        print(f"  Equity end: {report.equity_end:.2f}")
-        if report.cagr is not None:
-            print(f"  CAGR:       {report.cagr:.2%}")
-        print(f"  Max DD:     {report.max_drawdown:.2f}")
-
-        # Show last few trades
-        last = trades[-5:]
-        if last:
-            print("\nLast trades")
-            for t in last:
-                print(
-                    f"  {t.entry_ts.isoformat()} -> {t.exit_ts.isoformat()} | qty={t.qty:.6f} entry={t.entry_price:.2f} exit={t.exit_price:.2f} pnl={t.pnl:.2f} reason={t.reason}"
-                )
+            report, trades = backtest(symbol,
+                                      interval,
+                                      bars,
+                                      strategy,
+                                      risks[symbol],
+                                      warmup=warm[symbol])
+    prof.count("bars", len(bars))
+    prof.count("backtests")
 
+    with prof.phase("output"):
+        _print_summary(report, trades)
         # Optional JSON output for machine consumption
         if args.json_out:
-            try:
-                import json
-                out = {
-                    "report": {
-                        "symbol": report.symbol,
-                        "interval": report.interval,
-                        "bars": report.bars,
-                        "trades": report.trades,
-                        "total_pnl": report.total_pnl,
-                        "total_fees": report.total_fees,
-                        "equity_end": report.equity_end,
-                        "max_drawdown": report.max_drawdown,
-                        "win_rate": report.win_rate,
-                        "avg_win": report.avg_win,
-                        "avg_loss": report.avg_loss,
-                        "cagr": report.cagr,
-                        "avg_fee_bps": report.avg_fee_bps,
-                        "fee_model": report.fee_model,
-                    },
-                    "last_trades": [{
-                        "entry_ts": t.entry_ts.isoformat(),
-                        "exit_ts": t.exit_ts.isoformat(),
-                        "entry_price": t.entry_price,
-                        "exit_price": t.exit_price,
-                        "qty": t.qty,
-                        "pnl": t.pnl,
-                        "fees": t.fees,
-                        "reason": t.reason,
-                    } for t in last],
-                }
-                with open(args.json_out, "w") as f:
-                    json.dump(out, f, indent=2)
-                print(f"Saved JSON summary to {args.json_out}")
-            except Exception:
-                # Do not fail the run due to JSON write issues
-                pass
-    finally:
-        repo.close()
+            _write_json(args.json_out, _summary_json(report, trades))
+        if args.save_state and snap is not None:
+            _write_state(args.save_state, snap)
 
 
 if __name__ == "__main__":
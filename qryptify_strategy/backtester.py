@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+from dataclasses import asdict
 from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import fields
+from dataclasses import is_dataclass
+from dataclasses import replace
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from .indicators import true_range
 from .indicators import WilderATR
+from .models import AbortRules
 from .models import BacktestReport
 from .models import Bar
 from .models import RiskParams
@@ -13,6 +19,9 @@ from .models import Signal
 from .models import Trade
 from .strategy_base import Strategy
 
+# Bump when fills, fees or metrics change meaning (invalidates cached results)
+ENGINE_VERSION = 1
+
 
 @dataclass
 class BacktestState:
@@ -27,6 +36,134 @@ class BacktestState:
     trough_price: Optional[float] = None  # lowest low since entry (short)
 
 
+@dataclass
+class TradeTotals:
+    """Running trade aggregates behind the report metrics (summed in trade order)."""
+    trades: int = 0
+    wins: int = 0
+    win_pnl: float = 0.0
+    losses: int = 0
+    loss_pnl: float = 0.0
+    pnl: float = 0.0
+    fees: float = 0.0
+    fee_notional: float = 0.0  # entry + exit notional, for the effective fee bps
+
+    def add(self, t: Trade) -> None:
+        self.trades += 1
+        if t.pnl > 0:
+            self.wins += 1
+            self.win_pnl += t.pnl
+        else:
+            self.losses += 1
+            self.loss_pnl += t.pnl
+        self.pnl += t.pnl
+        self.fees += t.fees
+        self.fee_notional += abs(t.qty) * (t.entry_price + t.exit_price)
+
+
+@dataclass
+class EngineSnapshot:
+    """Engine state at the end of a run, to extend it later with new bars only.
+
+    Taken after the last bar's stop checks but before its signal is acted on
+    and before the end-of-data close, i.e. exactly where a longer run would
+    continue. `backtest_resumable(..., resume=snap)` over the bars after
+    `last_ts` reports what a full rerun over all bars would.
+    """
+    symbol: str
+    interval: str
+    engine: int  # ENGINE_VERSION
+    config: Dict[str, Any]  # strategy and risk parameters the state belongs to
+    first_ts: datetime  # first reported bar (after warm-up)
+    last_ts: datetime
+    next_i: int  # bar index the next bar gets in on_bar
+    bars: int  # bars reported so far
+    last_close: float
+    state: BacktestState
+    atr: Dict[str, Any]
+    strategy: Dict[str, Any]
+    pending: Optional[Signal]  # the last bar's signal, to fill at the next open
+    pending_atr: Optional[float]
+    dd_peak: Optional[float]
+    max_dd: float
+    totals: TradeTotals = field(default_factory=TradeTotals)
+
+
+def required_warmup(strategy: Strategy, atr_period: int) -> int:
+    """Bars to run before the reported window: the strategy's and the ATR stop's warm-up."""
+    return max(strategy.warmup, WilderATR(atr_period).warmup)
+
+
+def strategy_params(strategy: Strategy) -> Dict[str, Any]:
+    """A dataclass strategy's constructor parameters ({} for other strategies)."""
+    if not is_dataclass(strategy):
+        return {}
+    return {f.name: getattr(strategy, f.name) for f in fields(strategy)}
+
+
+def run_config(strategy: Strategy, risk: RiskParams) -> Dict[str, Any]:
+    """Strategy and risk parameters a snapshot is tied to (fee_lookup excluded)."""
+    r = asdict(risk)
+    r.pop("fee_lookup", None)
+    return {"strategy": type(strategy).__name__, "params": strategy_params(strategy), "risk": r}
+
+
+def _ts_json(ts: Optional[datetime]) -> Optional[str]:
+    return ts.isoformat() if ts is not None else None
+
+
+def _ts_parse(s: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(s) if s is not None else None
+
+
+def snapshot_to_json(snap: EngineSnapshot) -> Dict[str, Any]:
+    st = asdict(snap.state)
+    st["entry_ts"] = _ts_json(snap.state.entry_ts)
+    return {
+        "symbol": snap.symbol,
+        "interval": snap.interval,
+        "engine": snap.engine,
+        "config": snap.config,
+        "first_ts": snap.first_ts.isoformat(),
+        "last_ts": snap.last_ts.isoformat(),
+        "next_i": snap.next_i,
+        "bars": snap.bars,
+        "last_close": snap.last_close,
+        "state": st,
+        "atr": snap.atr,
+        "strategy": snap.strategy,
+        "pending": asdict(snap.pending) if snap.pending is not None else None,
+        "pending_atr": snap.pending_atr,
+        "dd_peak": snap.dd_peak,
+        "max_dd": snap.max_dd,
+        "totals": asdict(snap.totals),
+    }
+
+
+def snapshot_from_json(d: Dict[str, Any]) -> EngineSnapshot:
+    st = dict(d["state"])
+    st["entry_ts"] = _ts_parse(st["entry_ts"])
+    return EngineSnapshot(
+        symbol=d["symbol"],
+        interval=d["interval"],
+        engine=d["engine"],
+        config=d["config"],
+        first_ts=datetime.fromisoformat(d["first_ts"]),
+        last_ts=datetime.fromisoformat(d["last_ts"]),
+        next_i=d["next_i"],
+        bars=d["bars"],
+        last_close=d["last_close"],
+        state=BacktestState(**st),
+        atr=d["atr"],
+        strategy=d["strategy"],
+        pending=Signal(**d["pending"]) if d["pending"] is not None else None,
+        pending_atr=d["pending_atr"],
+        dd_peak=d["dd_peak"],
+        max_dd=d["max_dd"],
+        totals=TradeTotals(**d["totals"]),
+    )
+
+
 def _apply_fees(notional: float, fee_bps: float) -> float:
     return notional * (fee_bps / 10_000.0)
 
@@ -109,15 +246,181 @@ def _close_position(
     return trade
 
 
+def _abort_reason(abort: AbortRules, i: int, mtm: float, max_dd: float,
+                  n_trades: int) -> str:
+    if abort.max_drawdown > 0 and max_dd > abort.max_drawdown:
+        return "max_drawdown"
+    if abort.equity_floor > 0 and mtm <= abort.equity_floor:
+        return "equity_floor"
+    if (abort.min_trades > 0 and i >= abort.min_trades_by_bar and
+            n_trades < abort.min_trades):
+        return "min_trades"
+    return ""
+
+
+def _trail_and_stop(state: BacktestState, bar: Bar, atr: Optional[float],
+                    risk: RiskParams) -> Tuple[str, float]:
+    """Trail the open position's stop over `bar`, then check it.
+
+    Returns (exit reason, exit price) when the stop is hit, else ("", 0.0).
+    """
+    # Track extremes since entry
+    if state.position_qty > 0:
+        state.peak_price = max(state.peak_price or bar.high, bar.high)
+    else:
+        state.trough_price = min(state.trough_price or bar.low, bar.low)
+
+    # Tighten stop with ATR trailing if configured
+    if atr is not None and getattr(risk, "atr_mult_trail", 0.0) > 0:
+        trail_dist = atr * getattr(risk, "atr_mult_trail", 0.0)
+        trigger = atr * getattr(risk, "atr_trail_trigger_mult", 0.0)
+        if state.position_qty > 0 and state.peak_price is not None and state.entry_price is not None:
+            if (state.peak_price - state.entry_price) >= trigger:
+                trail_px = max(state.peak_price - trail_dist, 0.0)
+                trail_px = _floor_price_tick(trail_px, getattr(risk, "price_tick", 0.0))
+                state.stop_price = max(state.stop_price or 0.0, trail_px)
+        elif state.position_qty < 0 and state.trough_price is not None and state.entry_price is not None:
+            if (state.entry_price - state.trough_price) >= trigger:
+                trail_px = state.trough_price + trail_dist
+                trail_px = _floor_price_tick(trail_px, getattr(risk, "price_tick", 0.0))
+                state.stop_price = (trail_px if state.stop_price is None else
+                                    min(state.stop_price, trail_px))
+
+    stop_px = state.stop_price
+    if stop_px is None:
+        return "", 0.0
+    if state.position_qty > 0:
+        # Long stop
+        if bar.open <= stop_px:
+            return "stop_gap", _price_with_slippage(bar.open, risk.slippage_bps, SIDE_SELL)
+        if bar.low <= stop_px:
+            return "stop", _price_with_slippage(stop_px, risk.slippage_bps, SIDE_SELL)
+    else:
+        # Short stop
+        if bar.open >= stop_px:
+            return "stop_gap", _price_with_slippage(bar.open, risk.slippage_bps, SIDE_BUY)
+        if bar.high >= stop_px:
+            return "stop", _price_with_slippage(stop_px, risk.slippage_bps, SIDE_BUY)
+    return "", 0.0
+
+
+def _act_on_signal(state: BacktestState, sig: Signal, atr: Optional[float], bars: List[Bar],
+                   i: int, next_bar: Bar, risk: RiskParams, trades: List[Trade]) -> bool:
+    """Fill bar i's signal at `next_bar`'s open; False when an entry was skipped for size."""
+    desired = max(min(int(sig.target), 1), -1)
+    cur_sign = _sign(state.position_qty)
+
+    # First, flatten if target is different sign or zero while in a position
+    if desired != cur_sign and state.position_qty != 0:
+        px_exit = _price_with_slippage(next_bar.open, risk.slippage_bps,
+                                       SIDE_SELL if state.position_qty > 0 else SIDE_BUY)
+        trades.append(
+            _close_position(state, bars, i, next_bar.ts, px_exit, risk, sig.reason or
+                            "signal_exit"))
+
+    # Then, enter if desired is non-flat and we are currently flat
+    if desired != 0 and state.position_qty == 0 and atr is not None:
+        px_entry = _price_with_slippage(next_bar.open, risk.slippage_bps,
+                                        SIDE_BUY if desired > 0 else SIDE_SELL)
+        risk_cash = state.equity * risk.risk_per_trade
+        stop_dist = atr * risk.atr_mult_stop
+        if stop_dist <= 0:
+            return False
+        qty = max(risk_cash / stop_dist, 0.0)
+        qty = _floor_to_step(qty, getattr(risk, "qty_step", 0.0))
+        min_qty = getattr(risk, "min_qty", 0.0) or 0.0
+        min_notional = getattr(risk, "min_notional", 0.0) or 0.0
+        if qty <= 0 or qty < min_qty or (qty * px_entry) < min_notional:
+            return False
+        fee_bps_entry = _fee_bps_at(risk, next_bar.ts)
+        open_fees = _apply_fees(qty * px_entry, fee_bps_entry)
+        state.position_qty = qty if desired > 0 else -qty
+        state.entry_price = px_entry
+        state.entry_ts = next_bar.ts
+        state.open_fees = open_fees
+        if desired > 0:
+            stop_px = max(px_entry - stop_dist, 0.0)
+        else:
+            stop_px = px_entry + stop_dist
+        stop_px = _floor_price_tick(stop_px, getattr(risk, "price_tick", 0.0))
+        state.stop_price = stop_px
+        # Initialize extremes for trailing
+        state.peak_price = px_entry if desired > 0 else None
+        state.trough_price = px_entry if desired < 0 else None
+    return True
+
+
 def backtest(
     symbol: str,
     interval: str,
     bars: List[Bar],
     strategy: Strategy,
     risk: RiskParams,
+    abort: Optional[AbortRules] = None,
+    warmup: int = 0,
+    *,
+    signals: Optional[Sequence[Optional[Signal]]] = None,
+    atr_series: Optional[Sequence[Optional[float]]] = None,
 ) -> Tuple[BacktestReport, List[Trade]]:
+    """Run `strategy` over `bars`.
+
+    The first `warmup` bars only feed the strategy and ATR (no orders, no
+    drawdown); a signal on the last warm-up bar fills at the next open. The
+    report covers the bars from `warmup` on.
+
+    `signals` and `atr_series` are optional precomputed per-bar inputs (see
+    batch.py); they replace `strategy.on_bar` and the Wilder ATR and must
+    match what those would produce.
+    """
+    rpt, trades, _ = _run(symbol, interval, bars, strategy, risk, abort, warmup, signals,
+                          atr_series, None, False)
+    return rpt, trades
+
+
+def backtest_resumable(
+    symbol: str,
+    interval: str,
+    bars: List[Bar],
+    strategy: Strategy,
+    risk: RiskParams,
+    abort: Optional[AbortRules] = None,
+    warmup: int = 0,
+    *,
+    resume: Optional[EngineSnapshot] = None,
+) -> Tuple[BacktestReport, List[Trade], Optional[EngineSnapshot]]:
+    """`backtest` that can continue from, and hands back, an `EngineSnapshot`.
+
+    With `resume`, `bars` are the bars after the snapshot's last bar; the
+    report covers the whole span since the original first bar, while the
+    returned trades are only those closed in this call. The snapshot is None
+    for pruned runs. The strategy must implement `snapshot`/`restore`. A
+    resumed run is already warm, so `warmup` only applies to fresh runs.
+    """
+    if resume is not None and warmup:
+        raise ValueError("a resumed run takes no warmup")
+    return _run(symbol, interval, bars, strategy, risk, abort, warmup, None, None, resume, True)
+
+
+def _run(
+    symbol: str,
+    interval: str,
+    bars: List[Bar],
+    strategy: Strategy,
+    risk: RiskParams,
+    abort: Optional[AbortRules],
+    warmup: int,
+    signals: Optional[Sequence[Optional[Signal]]],
+    atr_series: Optional[Sequence[Optional[float]]],
+    resume: Optional[EngineSnapshot],
+    want_snapshot: bool,
+) -> Tuple[BacktestReport, List[Trade], Optional[EngineSnapshot]]:
     if not bars:
         raise ValueError("No bars provided")
+    if not 0 <= warmup < len(bars):
+        raise ValueError(f"warmup must be in [0, {len(bars)}), got {warmup}")
+    for name, seq in (("signals", signals), ("atr_series", atr_series)):
+        if seq is not None and len(seq) != len(bars):
+            raise ValueError(f"{name} has {len(seq)} entries for {len(bars)} bars")
 
     state = BacktestState(equity=risk.start_equity, max_equity=risk.start_equity)
     atr_calc = WilderATR(risk.atr_period)
@@ -125,117 +428,102 @@ def backtest(
     prev_close: Optional[float] = None
 
     strategy.on_start()
-    equity_series: List[float] = []
-
-    for i in range(len(bars)):
+    # Drawdown is tracked while running so abort rules can act on it
+    dd_peak: Optional[float] = None
+    max_dd = 0.0
+    pruned_reason = ""
+    last_i = len(bars) - 1
+    # Index of bars[0] in on_bar and the abort rules; trades and bars before this call
+    offset = 0
+    prior = TradeTotals()
+    config = run_config(strategy, risk) if want_snapshot else {}
+    snap: Optional[EngineSnapshot] = None
+    snap_trades = 0
+
+    if resume is not None:
+        if (resume.symbol, resume.interval) != (symbol, interval):
+            raise ValueError(f"snapshot is for {resume.symbol}/{resume.interval}, "
+                             f"not {symbol}/{interval}")
+        if resume.engine != ENGINE_VERSION:
+            raise ValueError(f"snapshot is from engine version {resume.engine}, "
+                             f"this is {ENGINE_VERSION}")
+        if resume.config != config:
+            raise ValueError("snapshot was taken with different strategy/risk parameters")
+        if bars[0].ts <= resume.last_ts:
+            raise ValueError(f"bars must start after the snapshot's last bar {resume.last_ts}")
+        state = replace(resume.state)
+        atr_calc.restore(resume.atr)
+        strategy.restore(resume.strategy)
+        prev_close = resume.last_close
+        dd_peak, max_dd = resume.dd_peak, resume.max_dd
+        offset = resume.next_i
+        prior = replace(resume.totals)
+
+        # Finish the snapshot's last bar: its signal fills at our first open
+        marked = True
+        if resume.pending is not None:
+            marked = _act_on_signal(state, resume.pending, resume.pending_atr, bars, 0, bars[0],
+                                    risk, trades)
+        if marked:
+            mtm = state.equity
+            if state.position_qty != 0 and state.entry_price is not None:
+                mtm += (resume.last_close - state.entry_price) * state.position_qty
+                mtm -= state.open_fees
+            if mtm > state.max_equity:
+                state.max_equity = mtm
+            if dd_peak is None or mtm > dd_peak:
+                dd_peak = mtm
+            if dd_peak - mtm > max_dd:
+                max_dd = dd_peak - mtm
+            if abort is not None:
+                pruned_reason = _abort_reason(abort, offset - 1, mtm, max_dd,
+                                              prior.trades + len(trades))
+                if pruned_reason:
+                    last_i = -1
+
+    for i in range(len(bars) if not pruned_reason else 0):
         bar = bars[i]
-        tr = true_range(bar.high, bar.low, prev_close)
-        atr = atr_calc.update(tr)
+        if atr_series is None:
+            atr = atr_calc.update(true_range(bar.high, bar.low, prev_close))
+        else:
+            atr = atr_series[i]
+
+        sig: Optional[Signal] = (strategy.on_bar(offset + i, bar)
+                                 if signals is None else signals[i])
+        if i < warmup:
+            prev_close = bar.close
+            if i < warmup - 1 or sig is None:
+                continue
 
-        sig: Optional[Signal] = strategy.on_bar(i, bar)
-
-        # Update trailing stop state (peak/trough) and tighten if enabled
         if state.position_qty != 0:
-            # Track extremes since entry
-            if state.position_qty > 0:
-                state.peak_price = max(state.peak_price or bar.high, bar.high)
-            else:
-                state.trough_price = min(state.trough_price or bar.low, bar.low)
-
-            # Tighten stop with ATR trailing if configured
-            if atr is not None and getattr(risk, "atr_mult_trail", 0.0) > 0:
-                trail_dist = atr * getattr(risk, "atr_mult_trail", 0.0)
-                trigger = atr * getattr(risk, "atr_trail_trigger_mult", 0.0)
-                if state.position_qty > 0 and state.peak_price is not None and state.entry_price is not None:
-                    if (state.peak_price - state.entry_price) >= trigger:
-                        trail_px = max(state.peak_price - trail_dist, 0.0)
-                        trail_px = _floor_price_tick(trail_px,
-                                                     getattr(risk, "price_tick", 0.0))
-                        state.stop_price = max(state.stop_price or 0.0, trail_px)
-                elif state.position_qty < 0 and state.trough_price is not None and state.entry_price is not None:
-                    if (state.entry_price - state.trough_price) >= trigger:
-                        trail_px = state.trough_price + trail_dist
-                        trail_px = _floor_price_tick(trail_px,
-                                                     getattr(risk, "price_tick", 0.0))
-                        state.stop_price = (trail_px if state.stop_price is None else
-                                            min(state.stop_price, trail_px))
-
-        exit_reason: Optional[str] = None
-        exit_price: Optional[float] = None
-        if state.stop_price is not None and state.position_qty != 0:
-            stop_px = state.stop_price
-            if state.position_qty > 0:
-                # Long stop
-                if bar.open <= stop_px:
-                    exit_reason = "stop_gap"
-                    exit_price = _price_with_slippage(bar.open, risk.slippage_bps,
-                                                      SIDE_SELL)
-                elif bar.low <= stop_px:
-                    exit_reason = "stop"
-                    exit_price = _price_with_slippage(stop_px, risk.slippage_bps,
-                                                      SIDE_SELL)
-            else:
-                # Short stop
-                if bar.open >= stop_px:
-                    exit_reason = "stop_gap"
-                    exit_price = _price_with_slippage(bar.open, risk.slippage_bps,
-                                                      SIDE_BUY)
-                elif bar.high >= stop_px:
-                    exit_reason = "stop"
-                    exit_price = _price_with_slippage(stop_px, risk.slippage_bps,
-                                                      SIDE_BUY)
-
-        next_open_price = bars[i + 1].open if (i + 1) < len(bars) else None
-
-        if exit_reason and state.position_qty != 0:
-            trades.append(
-                _close_position(state, bars, i, bar.ts, (exit_price or bar.close), risk,
-                                exit_reason))
-
-        if next_open_price is not None and sig is not None:
-            desired = max(min(int(sig.target), 1), -1)
-            cur_sign = _sign(state.position_qty)
-
-            # First, flatten if target is different sign or zero while in a position
-            if desired != cur_sign and state.position_qty != 0:
-                px_exit = _price_with_slippage(
-                    next_open_price, risk.slippage_bps,
-                    SIDE_SELL if state.position_qty > 0 else SIDE_BUY)
-                trades.append(
-                    _close_position(state, bars, i, bars[i + 1].ts, px_exit, risk,
-                                    sig.reason or "signal_exit"))
-
-            # Then, enter if desired is non-flat and we are currently flat
-            if desired != 0 and state.position_qty == 0 and atr is not None:
-                px_entry = _price_with_slippage(next_open_price, risk.slippage_bps,
-                                                SIDE_BUY if desired > 0 else SIDE_SELL)
-                risk_cash = state.equity * risk.risk_per_trade
-                stop_dist = atr * risk.atr_mult_stop
-                if stop_dist <= 0:
-                    prev_close = bar.close
-                    continue
-                qty = max(risk_cash / stop_dist, 0.0)
-                qty = _floor_to_step(qty, getattr(risk, "qty_step", 0.0))
-                min_qty = getattr(risk, "min_qty", 0.0) or 0.0
-                min_notional = getattr(risk, "min_notional", 0.0) or 0.0
-                if qty <= 0 or qty < min_qty or (qty * px_entry) < min_notional:
-                    prev_close = bar.close
-                    continue
-                fee_bps_entry = _fee_bps_at(risk, bars[i + 1].ts)
-                open_fees = _apply_fees(qty * px_entry, fee_bps_entry)
-                state.position_qty = qty if desired > 0 else -qty
-                state.entry_price = px_entry
-                state.entry_ts = bars[i + 1].ts
-                state.open_fees = open_fees
-                if desired > 0:
-                    stop_px = max(px_entry - stop_dist, 0.0)
-                else:
-                    stop_px = px_entry + stop_dist
-                stop_px = _floor_price_tick(stop_px, getattr(risk, "price_tick", 0.0))
-                state.stop_price = stop_px
-                # Initialize extremes for trailing
-                state.peak_price = px_entry if desired > 0 else None
-                state.trough_price = px_entry if desired < 0 else None
+            exit_reason, exit_price = _trail_and_stop(state, bar, atr, risk)
+            if exit_reason:
+                trades.append(_close_position(state, bars, i, bar.ts, exit_price, risk,
+                                              exit_reason))
+
+        if want_snapshot and i == last_i:
+            snap_trades = len(trades)
+            snap = EngineSnapshot(symbol=symbol,
+                                  interval=interval,
+                                  engine=ENGINE_VERSION,
+                                  config=config,
+                                  first_ts=resume.first_ts if resume else bars[warmup].ts,
+                                  last_ts=bar.ts,
+                                  next_i=offset + i + 1,
+                                  bars=(resume.bars if resume else 0) + len(bars) - warmup,
+                                  last_close=bar.close,
+                                  state=replace(state),
+                                  atr=atr_calc.snapshot(),
+                                  strategy=strategy.snapshot(),
+                                  pending=sig,
+                                  pending_atr=atr,
+                                  dd_peak=dd_peak,
+                                  max_dd=max_dd)
+
+        if sig is not None and i + 1 < len(bars):
+            if not _act_on_signal(state, sig, atr, bars, i, bars[i + 1], risk, trades):
+                prev_close = bar.close
+                continue
 
         mtm = state.equity
         # Mark-to-market includes unrealized PnL minus accrued open fees
@@ -244,11 +532,31 @@ def backtest(
             mtm -= state.open_fees
         if mtm > state.max_equity:
             state.max_equity = mtm
-        equity_series.append(mtm)
+        if dd_peak is None or mtm > dd_peak:
+            dd_peak = mtm
+        if dd_peak - mtm > max_dd:
+            max_dd = dd_peak - mtm
 
         prev_close = bar.close
 
-    if state.position_qty != 0 and bars:
+        if abort is not None:
+            pruned_reason = _abort_reason(abort, offset + i - warmup, mtm, max_dd,
+                                          prior.trades + len(trades))
+            if pruned_reason:
+                last_i = i
+                break
+
+    if pruned_reason and state.position_qty != 0:
+        # Flatten like a signal exit: next open if there is one, else this close
+        if last_i + 1 < len(bars):
+            exit_bar, exit_px = bars[last_i + 1], bars[last_i + 1].open
+        else:
+            exit_bar, exit_px = bars[last_i], bars[last_i].close
+        side = SIDE_SELL if state.position_qty > 0 else SIDE_BUY
+        px = _price_with_slippage(exit_px, risk.slippage_bps, side)
+        trades.append(
+            _close_position(state, bars, last_i, exit_bar.ts, px, risk, "pruned"))
+    elif state.position_qty != 0 and bars:
         last_bar = bars[-1]
         side = SIDE_SELL if state.position_qty > 0 else SIDE_BUY
         px = _price_with_slippage(last_bar.close, risk.slippage_bps, side)
@@ -256,20 +564,23 @@ def backtest(
             _close_position(state, bars,
                             len(bars) - 1, last_bar.ts, px, risk, "final_close"))
 
-    wins = [t for t in trades if t.pnl > 0]
-    losses = [t for t in trades if t.pnl <= 0]
-    win_rate = len(wins) / len(trades) if trades else 0.0
-    avg_win = sum(t.pnl for t in wins) / len(wins) if wins else 0.0
-    avg_loss = sum(t.pnl for t in losses) / len(losses) if losses else 0.0
-    total_pnl = sum(t.pnl for t in trades)
-    total_fees = sum(t.fees for t in trades)
+    totals = replace(prior)
+    for k, t in enumerate(trades):
+        if snap is not None and k == snap_trades:
+            snap.totals = replace(totals)
+        totals.add(t)
+    if snap is not None and snap_trades == len(trades):
+        snap.totals = replace(totals)
+    win_rate = totals.wins / totals.trades if totals.trades else 0.0
+    avg_win = totals.win_pnl / totals.wins if totals.wins else 0.0
+    avg_loss = totals.loss_pnl / totals.losses if totals.losses else 0.0
     # Effective average fee (bps) across both entry and exit notionals
-    denom = 0.0
-    for t in trades:
-        denom += abs(t.qty) * (t.entry_price + t.exit_price)
-    avg_fee_bps = (total_fees / denom * 10_000.0) if denom > 0 else 0.0
+    denom = totals.fee_notional
+    avg_fee_bps = (totals.fees / denom * 10_000.0) if denom > 0 else 0.0
 
-    span_sec = max((bars[-1].ts - bars[0].ts).total_seconds(), 1.0)
+    first_ts = resume.first_ts if resume is not None else bars[warmup].ts
+    end_ts = bars[last_i].ts if last_i >= 0 else resume.last_ts  # type: ignore[union-attr]
+    span_sec = max((end_ts - first_ts).total_seconds(), 1.0)
     years = span_sec / (365.25 * 24 * 3600)
     # Avoid numerically unstable/meaningless annualization for very short windows (< 1 day)
     if years >= (1.0 / 365.25):
@@ -280,22 +591,13 @@ def backtest(
     else:
         cagr = None
 
-    peak = equity_series[0] if equity_series else risk.start_equity
-    max_dd = 0.0
-    for eq in equity_series:
-        if eq > peak:
-            peak = eq
-        dd = peak - eq
-        if dd > max_dd:
-            max_dd = dd
-
     rpt = BacktestReport(
         symbol=symbol,
         interval=interval,
-        bars=len(bars),
-        trades=len(trades),
-        total_pnl=total_pnl,
-        total_fees=total_fees,
+        bars=(resume.bars if resume is not None else 0) + last_i + 1 - warmup,
+        trades=totals.trades,
+        total_pnl=totals.pnl,
+        total_fees=totals.fees,
         equity_end=state.equity,
         max_drawdown=max_dd,
         win_rate=win_rate,
@@ -304,9 +606,11 @@ def backtest(
         cagr=cagr,
         avg_fee_bps=avg_fee_bps,
         fee_model=("dynamic_db" if getattr(risk, "fee_lookup", None) else "fixed_bps"),
+        pruned=bool(pruned_reason),
+        pruned_reason=pruned_reason,
     )
     strategy.on_finish()
-    return rpt, trades
+    return rpt, trades, (None if pruned_reason else snap)
 
 
 SIDE_BUY = "BUY"
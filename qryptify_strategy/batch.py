@@ -0,0 +1,306 @@
+"""Cross-sectional batch backtests: one strategy config over many symbols.
+
+`align_bars` puts every symbol's bars on one union timeline as a time x
+symbol panel (one `array('d')` column per symbol, NaN where a symbol has no
+bar). A signal kernel then computes the strategy's indicators and entry/exit
+signals for all columns in one pass, with the indicator math inlined instead
+of one `on_bar` call (and its core/indicator method calls) per symbol and
+bar. The kernels repeat the strategy cores' float operations in the same
+order, so the signals are bit-identical.
+
+Each symbol's position, stops and equity are then simulated independently
+by `backtest`, fed its precomputed signals and ATR (`atr_series`), so
+`batch_backtest` returns exactly the `BacktestReport`/trades of an
+individual run per symbol.
+Strategies without a kernel fall back to a fresh copy of the strategy per
+symbol.
+"""
+from __future__ import annotations
+
+from array import array
+import copy
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Type, Union
+
+from .backtester import backtest
+from .models import AbortRules
+from .models import BacktestReport
+from .models import Bar
+from .models import RiskParams
+from .models import Signal
+from .models import Trade
+from .strategies.bollinger import BollingerBandStrategy
+from .strategies.ema_crossover import EMACrossStrategy
+from .strategies.rsi_scalp import RSIScalpStrategy
+from .strategy_base import Strategy
+
+_NAN = float("nan")
+
+# Signals per symbol, indexed by the symbol's own bar index
+Tape = List[Optional[Signal]]
+
+
+@dataclass
+class Panel:
+    """Bars of several symbols aligned on the union of their timestamps."""
+    symbols: List[str]
+    ts: List[datetime]
+    bars: List[List[Bar]]  # per symbol, as given
+    close: List[array]  # per symbol, len(ts) closes, NaN where the symbol has no bar
+
+    def column(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+
+def align_bars(bars_by_symbol: Mapping[str, Sequence[Bar]]) -> Panel:
+    """Align symbols on one timeline; each symbol's bars must have increasing timestamps."""
+    symbols = list(bars_by_symbol)
+    series = [list(bars_by_symbol[s]) for s in symbols]
+    stamps = [[b.ts for b in bars] for bars in series]
+    for sym, ts in zip(symbols, stamps):
+        if any(a >= b for a, b in zip(ts, ts[1:])):
+            raise ValueError(f"{sym}: bar timestamps must be strictly increasing")
+    if all(ts == stamps[0] for ts in stamps):
+        # Common case: one shared timeline, no gaps to fill
+        timeline = stamps[0] if stamps else []
+        close = [array("d", [b.close for b in bars]) for bars in series]
+        return Panel(symbols, timeline, series, close)
+    timeline = sorted({t for ts in stamps for t in ts})
+    row = {t: i for i, t in enumerate(timeline)}
+    close = []
+    for bars in series:
+        col = array("d", [_NAN]) * len(timeline)
+        for b in bars:
+            col[row[b.ts]] = b.close
+        close.append(col)
+    return Panel(symbols, timeline, series, close)
+
+
+def atr_series(bars: Sequence[Bar], period: int) -> List[Optional[float]]:
+    """Per-bar Wilder ATR of `true_range`, as `backtest` computes it (None while warming up)."""
+    if period <= 0:
+        raise ValueError("period must be > 0")
+    out: List[Optional[float]] = [None] * len(bars)
+    atr = 0.0
+    total = 0.0
+    prev_close: Optional[float] = None
+    for i, b in enumerate(bars):
+        h, lo = b.high, b.low
+        if prev_close is None:
+            tr = h - lo
+        else:
+            tr = max(h - lo, abs(h - prev_close), abs(lo - prev_close))
+        prev_close = b.close
+        if i < period:
+            total += tr
+            if i == period - 1:
+                atr = total / period
+                out[i] = atr
+            continue
+        atr = ((atr or tr) * (period - 1) + tr) / period
+        out[i] = atr
+    return out
+
+
+# -- signal kernels ----------------------------------------------------------
+
+_EMA_UP = Signal(target=+1, reason="fast_cross_above_slow")
+_EMA_DN = Signal(target=-1, reason="fast_cross_below_slow")
+
+
+def _ema_tapes(s: EMACrossStrategy, panel: Panel) -> List[Tape]:
+    """EMACrossCore.update_and_cross over every column."""
+    af = 2.0 / (s.fast + 1.0)
+    aslow = 2.0 / (s.slow + 1.0)
+    out: List[Tape] = []
+    for bars, col in zip(panel.bars, panel.close):
+        tape: Tape = [None] * len(bars)
+        fast = slow = 0.0
+        k = -1
+        for c in col:
+            if c != c:
+                continue
+            k += 1
+            if k == 0:
+                fast = slow = c
+                continue
+            pf, ps = fast, slow
+            fast = af * c + (1.0 - af) * pf
+            slow = aslow * c + (1.0 - aslow) * ps
+            if pf <= ps and fast > slow:
+                tape[k] = _EMA_UP
+            elif pf >= ps and fast < slow:
+                tape[k] = _EMA_DN
+        out.append(tape)
+    return out
+
+
+_BB_LONG_EXIT = Signal(target=0, reason="bb_long_exit")
+_BB_SHORT_EXIT = Signal(target=0, reason="bb_short_exit")
+_BB_UP = Signal(target=+1, reason="bb_breakout_up")
+_BB_DN = Signal(target=-1, reason="bb_breakout_down")
+
+
+def _bollinger_tapes(s: BollingerBandStrategy, panel: Panel) -> List[Tape]:
+    """BollingerCore.update_and_events (RollingMeanStd bands) over every column."""
+    n, mult = s.period, s.mult
+    out: List[Tape] = []
+    for bars, col in zip(panel.bars, panel.close):
+        tape: Tape = [None] * len(bars)
+        closes = [c for c in col if c == c]
+        tot = sumsq = 0.0
+        prev_close = 0.0
+        have_bands = False
+        lower = mid = upper = 0.0
+        for k, c in enumerate(closes):
+            if have_bands:
+                # Events against the previous bar's bands, in the strategy's priority order
+                if prev_close >= mid and c < mid:
+                    tape[k] = _BB_LONG_EXIT
+                elif prev_close <= mid and c > mid:
+                    tape[k] = _BB_SHORT_EXIT
+                elif prev_close <= upper and c > upper:
+                    tape[k] = _BB_UP
+                elif prev_close >= lower and c < lower:
+                    tape[k] = _BB_DN
+            tot += c
+            sumsq += c * c
+            if k >= n:
+                old = closes[k - n]
+                tot -= old
+                sumsq -= old * old
+            have_bands = k >= n - 1
+            if have_bands:
+                mid = tot / n
+                std = max(sumsq / n - mid * mid, 0.0)**0.5
+                upper = mid + mult * std
+                lower = mid - mult * std
+            prev_close = c
+        out.append(tape)
+    return out
+
+
+_RSI_LONG_EXIT = Signal(target=0, reason="rsi_long_exit")
+_RSI_SHORT_EXIT = Signal(target=0, reason="rsi_short_exit")
+_RSI_LONG = Signal(target=+1, reason="rsi_long_entry")
+_RSI_SHORT = Signal(target=-1, reason="rsi_short_entry")
+
+
+def _rsi_tapes(s: RSIScalpStrategy, panel: Panel) -> List[Tape]:
+    """RSICore.update (WilderRSI + EMA filter) and RSIScalpStrategy rules over every column."""
+    period, ema_n = s.rsi_period, s.ema_filter
+    entry_low, exit_low = s.entry, s.exit
+    entry_high = max(70.0, 100.0 - s.entry)
+    exit_high = min(55.0, 100.0 - s.exit)
+    alpha = 2.0 / (ema_n + 1.0) if ema_n > 0 else 0.0
+    out: List[Tape] = []
+    for bars, col in zip(panel.bars, panel.close):
+        tape: Tape = [None] * len(bars)
+        prev = ema = 0.0
+        sum_gain = sum_loss = avg_gain = avg_loss = 0.0
+        rsi: Optional[float] = None
+        k = -1
+        for c in col:
+            if c != c:
+                continue
+            k += 1
+            prev_rsi = rsi
+            prev_ema = ema
+            if k == 0:
+                rsi = None
+                ema = c
+                prev = c
+                continue
+            change = c - prev
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            if k <= period:
+                # Warm-up: the first `period` changes seed the averages
+                sum_gain += gain
+                sum_loss += loss
+                if k < period:
+                    rsi = None
+                else:
+                    avg_gain = sum_gain / float(period)
+                    avg_loss = sum_loss / float(period)
+            else:
+                avg_gain = (avg_gain * (period - 1) + gain) / period
+                avg_loss = (avg_loss * (period - 1) + loss) / period
+            if k >= period:
+                if avg_loss == 0.0 and avg_gain == 0.0:
+                    rsi = 50.0
+                elif avg_loss == 0.0:
+                    rsi = 100.0
+                else:
+                    rsi = 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+            if ema_n > 0:
+                ema = alpha * c + (1.0 - alpha) * prev_ema
+                ok_long, ok_short = c > ema, c < ema
+                cross_down = prev >= prev_ema and c < ema
+                cross_up = prev <= prev_ema and c > ema
+            else:
+                ok_long = ok_short = True
+                cross_down = cross_up = False
+            prev = c
+            if rsi is None or prev_rsi is None:
+                continue
+            if (prev_rsi <= exit_low and rsi > exit_low) or cross_down:
+                tape[k] = _RSI_LONG_EXIT
+            elif (prev_rsi >= exit_high and rsi < exit_high) or cross_up:
+                tape[k] = _RSI_SHORT_EXIT
+            elif prev_rsi <= entry_low and rsi > entry_low and ok_long:
+                tape[k] = _RSI_LONG
+            elif prev_rsi >= entry_high and rsi < entry_high and ok_short:
+                tape[k] = _RSI_SHORT
+        out.append(tape)
+    return out
+
+
+KERNELS: Dict[Type[Strategy], Callable[..., List[Tape]]] = {
+    EMACrossStrategy: _ema_tapes,
+    BollingerBandStrategy: _bollinger_tapes,
+    RSIScalpStrategy: _rsi_tapes,
+}
+
+
+def signal_tapes(strategy: Strategy, panel: Panel) -> Optional[List[Tape]]:
+    """Per-symbol signal tapes from the strategy's kernel (None without a kernel)."""
+    kernel = KERNELS.get(type(strategy))
+    return kernel(strategy, panel) if kernel is not None else None
+
+
+def batch_backtest(
+    interval: str,
+    bars_by_symbol: Mapping[str, Sequence[Bar]],
+    strategy: Strategy,
+    risk: Union[RiskParams, Mapping[str, RiskParams]],
+    abort: Optional[AbortRules] = None,
+    warmup: Union[int, Mapping[str, int]] = 0,
+) -> Dict[str, Tuple[BacktestReport, List[Trade]]]:
+    """Backtest one strategy config on every symbol; results keyed like `bars_by_symbol`.
+
+    `risk` and `warmup` (leading bars excluded from the report, see
+    `backtest`) are shared or per symbol. Symbols without bars are skipped,
+    matching `backtest`, which rejects empty input.
+    """
+    panel = align_bars({s: b for s, b in bars_by_symbol.items() if b})
+    tapes = signal_tapes(strategy, panel)
+    out: Dict[str, Tuple[BacktestReport, List[Trade]]] = {}
+    for j, symbol in enumerate(panel.symbols):
+        bars = panel.bars[j]
+        r = risk if isinstance(risk, RiskParams) else risk[symbol]
+        w = warmup if isinstance(warmup, int) else warmup.get(symbol, 0)
+        if tapes is None:
+            out[symbol] = backtest(symbol, interval, bars, copy.deepcopy(strategy), r, abort, w)
+        else:
+            out[symbol] = backtest(symbol,
+                                   interval,
+                                   bars,
+                                   strategy,
+                                   r,
+                                   abort,
+                                   w,
+                                   signals=tapes[j],
+                                   atr_series=atr_series(bars, r.atr_period))
+    return out
@@ -0,0 +1,306 @@
+"""Content-addressed cache of optimizer results (local SQLite).
+
+A cell is keyed by a SHA-256 over the bar data fingerprint, strategy name
+and constructor params, the full RiskParams (fee bps included), the abort
+rules and the engine version, so a rerun over unchanged data and grids
+skips every backtest it has already done. The engine version combines
+`backtester.ENGINE_VERSION` with a hash of the engine and strategy sources,
+so editing either invalidates old entries without a manual bump.
+`RESULT_VERSION` is part of the key too and is bumped when `Result` gains
+metrics, so older rows (which lack them) miss instead of loading as None.
+
+Symbol/interval are stored alongside each row for `invalidate --pair` but
+are not part of the key (the backtest only depends on the bars).
+
+    qryptify-cache --path reports/optimizer_cache.sqlite stats
+    qryptify-cache --path ... invalidate --pair BTCUSDT/1h --older-than-days 30
+    qryptify-cache --path ... clear
+"""
+from __future__ import annotations
+
+import argparse
+from array import array
+from dataclasses import asdict
+from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+from . import backtester
+from .candidates import Candidate
+from .candidates import Result
+from .candidates import STRATEGIES
+from .models import AbortRules
+from .models import Bar
+from .models import RiskParams
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    engine TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+RESULT_VERSION = 2  # 2: win_rate, fees
+
+
+def bars_fingerprint(bars: Sequence[Bar]) -> str:
+    """SHA-256 over (ts, o, h, l, c, v) of every bar."""
+    buf = array("d")
+    for b in bars:
+        buf.extend((b.ts.timestamp(), b.open, b.high, b.low, b.close, b.volume))
+    return hashlib.sha256(buf.tobytes()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def engine_version(strategy: str) -> str:
+    """ENGINE_VERSION plus a hash of the engine and the strategy's sources."""
+    h = hashlib.sha256(str(backtester.ENGINE_VERSION).encode())
+    mods = [backtester, sys.modules[RiskParams.__module__]]
+    cls = STRATEGIES.get(strategy)
+    if cls is not None:
+        mods.append(sys.modules[cls.__module__])
+        # Cores/indicators the strategies delegate to
+        mods.extend(sys.modules[m] for m in ("qryptify_strategy.strategy_utils",
+                                             "qryptify_strategy.indicators")
+                    if m in sys.modules)
+    for mod in mods:
+        try:
+            h.update(inspect.getsource(mod).encode())
+        except (OSError, TypeError):
+            h.update(mod.__name__.encode())
+    return f"{backtester.ENGINE_VERSION}-{h.hexdigest()[:12]}"
+
+
+def cell_key(bars_fp: str, cand: Candidate, risk: RiskParams,
+             abort: Optional[AbortRules]) -> str:
+    risk_d = {k: v for k, v in asdict(risk).items() if k != "fee_lookup"}
+    if risk.fee_lookup is not None:
+        # Time-varying fees are opaque; never share cells across lookups
+        risk_d["fee_lookup"] = repr(risk.fee_lookup)
+    payload = {
+        "bars": bars_fp,
+        "strategy": cand.strategy,
+        "params": [list(p) for p in cand.params],
+        "risk": risk_d,
+        "abort": asdict(abort) if abort is not None else None,
+        "engine": engine_version(cand.strategy),
+        "result": RESULT_VERSION,
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evicted: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        n = self.hits + self.misses
+        return self.hits / n if n else 0.0
+
+    def __str__(self) -> str:
+        return (f"hits={self.hits:,} misses={self.misses:,} ({self.hit_rate:.1%} hit) "
+                f"writes={self.writes:,} evicted={self.evicted:,}")
+
+
+class ResultCache:
+    """SQLite result store with LRU eviction past `max_entries`.
+
+    Writes and last-used touches are buffered and flushed every
+    `flush_every` operations and on `close()`.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1_000_000,
+                 flush_every: int = 500) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.stats = CacheStats()
+        self._pending: List[tuple] = []
+        self._touched: List[tuple] = []
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def key(self, bars_fp: str, cand: Candidate, risk: RiskParams,
+            abort: Optional[AbortRules]) -> str:
+        return cell_key(bars_fp, cand, risk, abort)
+
+    def fingerprint(self, bars: Sequence[Bar]) -> str:
+        return bars_fingerprint(bars)
+
+    def get(self, key: str) -> Optional[Result]:
+        row = self._conn.execute("SELECT result FROM results WHERE key = ?",
+                                 (key, )).fetchone()
+        if row is None:
+            # A cell written earlier in this run may still be buffered
+            for pending in self._pending:
+                if pending[0] == key:
+                    self.stats.hits += 1
+                    return Result(**json.loads(pending[5]))
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        self._touched.append((time.time(), key))
+        self._maybe_flush()
+        return Result(**json.loads(row[0]))
+
+    def put(self, key: str, result: Result, strategy: str, symbol: str = "",
+            interval: str = "") -> None:
+        now = time.time()
+        self._pending.append((key, engine_version(strategy), strategy, symbol, interval,
+                              json.dumps(asdict(result)), now, now))
+        self.stats.writes += 1
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if len(self._pending) + len(self._touched) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._conn:
+            if self._pending:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._pending)
+            if self._touched:
+                self._conn.executemany("UPDATE results SET last_used = ? WHERE key = ?",
+                                       self._touched)
+        self._pending.clear()
+        self._touched.clear()
+
+    def evict(self) -> int:
+        """Drop least-recently-used rows beyond max_entries."""
+        self.flush()
+        (count, ) = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        excess = count - self.max_entries
+        if self.max_entries <= 0 or excess <= 0:
+            return 0
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY last_used LIMIT ?)", (excess, ))
+        self.stats.evicted += excess
+        return excess
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        self.evict()
+        self._conn.close()
+        self._conn = None  # type: ignore[assignment]
+
+    # -- maintenance -------------------------------------------------------
+
+    def summary(self) -> Dict[str, object]:
+        self.flush()
+        (n, size) = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(result)), 0) FROM results").fetchone()
+        by_strategy = dict(
+            self._conn.execute("SELECT strategy, COUNT(*) FROM results GROUP BY strategy"))
+        engines = self._conn.execute("SELECT COUNT(DISTINCT engine) FROM results").fetchone()
+        return {
+            "entries": n,
+            "result_bytes": size,
+            "file_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            "engines": engines[0],
+            "by_strategy": by_strategy,
+        }
+
+    def invalidate(self,
+                   strategy: str = "",
+                   symbol: str = "",
+                   interval: str = "",
+                   older_than_days: float = 0.0,
+                   stale_engine: bool = False) -> int:
+        """Delete matching rows (all rows when no filter is given)."""
+        self.flush()
+        where: List[str] = []
+        params: List[object] = []
+        if strategy:
+            where.append("strategy = ?")
+            params.append(strategy)
+        if symbol:
+            where.append("symbol = ?")
+            params.append(symbol)
+        if interval:
+            where.append("interval = ?")
+            params.append(interval)
+        if older_than_days > 0:
+            where.append("created < ?")
+            params.append(time.time() - older_than_days * 86400.0)
+        if stale_engine:
+            current = sorted({engine_version(s) for s in STRATEGIES})
+            where.append(f"engine NOT IN ({', '.join('?' * len(current))})")
+            params.extend(current)
+        sql = "DELETE FROM results" + (" WHERE " + " AND ".join(where) if where else "")
+        with self._conn:
+            cur = self._conn.execute(sql, params)
+        return cur.rowcount
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Inspect or invalidate the optimizer result cache")
+    ap.add_argument("--path", default="reports/optimizer_cache.sqlite", help="Cache file")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="Entry counts and size")
+    sub.add_parser("clear", help="Delete every entry")
+    inv = sub.add_parser("invalidate", help="Delete entries matching all given filters")
+    inv.add_argument("--strategy", default="")
+    inv.add_argument("--pair", default="", help="SYMBOL/interval or SYMBOL")
+    inv.add_argument("--older-than-days", type=float, default=0.0)
+    inv.add_argument("--stale-engine",
+                     action="store_true",
+                     help="Entries written by another engine/strategy version")
+    sub.add_parser("vacuum", help="Reclaim file space")
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        raise SystemExit(f"No cache at {args.path}")
+    with ResultCache(args.path, max_entries=0) as cache:
+        if args.cmd == "stats":
+            for k, v in cache.summary().items():
+                print(f"{k}: {v}")
+        elif args.cmd == "clear":
+            print(f"Deleted {cache.invalidate():,} entries")
+        elif args.cmd == "invalidate":
+            symbol, _, interval = args.pair.partition("/")
+            if not (args.strategy or symbol or args.older_than_days or args.stale_engine):
+                raise SystemExit("Give at least one filter (or use `clear`)")
+            n = cache.invalidate(args.strategy, symbol.upper(), interval,
+                                 args.older_than_days, args.stale_engine)
+            print(f"Deleted {n:,} entries")
+        elif args.cmd == "vacuum":
+            cache.flush()
+            cache._conn.execute("VACUUM")
+            print("Vacuumed")
+
+
+if __name__ == "__main__":
+    main()
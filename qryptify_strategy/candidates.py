@@ -0,0 +1,298 @@
+"""Optimizer candidates: one (strategy, params, risk, atr_mult) cell each.
+
+`iter_candidates` enumerates the optimizer grid lazily and `run_candidate`
+backtests a single cell into a `Result`, so search modes (exhaustive grid,
+successive halving, ...) share the same evaluation path.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import (Any, Dict, Iterable, Iterator, List, Mapping, Optional, Protocol, Tuple, Type,
+                    TYPE_CHECKING)
+
+from .backtester import backtest
+from .models import AbortRules
+from .models import Bar
+from .models import RiskParams
+from .strategies.bollinger import BollingerBandStrategy
+from .strategies.ema_crossover import EMACrossStrategy
+from .strategies.rsi_scalp import RSIScalpStrategy
+from .strategy_base import Strategy
+
+if TYPE_CHECKING:
+    from .cache import ResultCache
+
+STRATEGIES: Dict[str, Type[Strategy]] = {
+    "ema": EMACrossStrategy,
+    "bollinger": BollingerBandStrategy,
+    "rsi": RSIScalpStrategy,
+}
+
+# Built-in Bollinger/RSI grids used when no search space is configured
+BB_PERIODS = [20, 50]
+BB_MULTS = [2.0, 2.5, 3.0]
+RSI_PERIODS = [8, 14]
+RSI_ENTRIES = [25.0, 30.0]
+RSI_EXITS = [50.0, 55.0]
+RSI_EMA_FILTERS = [0, 200]
+
+
+@dataclass(slots=True)
+class Result:
+    strategy: str
+    params: str
+    risk: float
+    atr_mult: float
+    pnl: float
+    dd: float
+    trades: int
+    cagr: Optional[float]
+    equity_end: float
+    avg_fee_bps: Optional[float] = None
+    win_rate: Optional[float] = None
+    fees: Optional[float] = None  # total fees paid (quote currency)
+    pruned: bool = False  # stopped early by AbortRules; metrics cover a prefix
+    bars: Optional[int] = None  # bars processed (fewer than loaded when pruned)
+    # optional per-strategy fields for debugging
+    fast: Optional[int] = None
+    slow: Optional[int] = None
+    bb_period: Optional[int] = None
+    bb_mult: Optional[float] = None
+    rsi_period: Optional[int] = None
+    entry_low: Optional[float] = None
+    exit_low: Optional[float] = None
+    entry_high: Optional[float] = None
+    exit_high: Optional[float] = None
+    atr_trail: float = 0.0
+    atr_trail_trigger: float = 0.0
+
+
+@dataclass(frozen=True)
+class Candidate:
+    strategy: str  # ema | bollinger | rsi
+    params: Tuple[Tuple[str, object], ...]  # strategy constructor kwargs, in order
+    risk: float
+    atr_mult: float
+    trail: float = 0.0  # ATR trailing stop multiple, 0 disables
+    trail_trigger: float = 0.0  # MFE in ATRs before trailing activates
+
+    def kwargs(self) -> dict:
+        return dict(self.params)
+
+
+def candidate_to_json(c: Candidate) -> Dict[str, object]:
+    return {
+        "strategy": c.strategy,
+        "params": [list(p) for p in c.params],
+        "risk": c.risk,
+        "atr_mult": c.atr_mult,
+        "trail": c.trail,
+        "trail_trigger": c.trail_trigger,
+    }
+
+
+def candidate_from_json(d: Mapping[str, Any]) -> Candidate:
+    return Candidate(d["strategy"], tuple((k, v) for k, v in d["params"]), d["risk"],
+                     d["atr_mult"], d.get("trail", 0.0), d.get("trail_trigger", 0.0))
+
+
+class CellLog(Protocol):
+    """Record of finished cells (e.g. a run journal) consulted by eval_candidates."""
+
+    def completed(self, window: int) -> Mapping[Candidate, Result]:
+        ...
+
+    def record(self, window: int, cand: Candidate, result: Result) -> None:
+        ...
+
+
+def iter_candidates(
+    strategies: List[str],
+    fast_opts: Iterable[int],
+    slow_opts: Iterable[int],
+    risk_opts: Iterable[float],
+    atr_opts: Iterable[float],
+) -> Iterator[Candidate]:
+    """Yield the optimizer grid in the historical eval_grid order."""
+    fast_l, slow_l = list(fast_opts), list(slow_opts)
+    atr_l = list(atr_opts)
+    for risk in risk_opts:
+        for atr_mult in atr_l:
+            # EMA long/short
+            if "ema" in strategies:
+                for fast in fast_l:
+                    for slow in slow_l:
+                        if fast >= slow:
+                            continue
+                        yield Candidate("ema", (("fast", fast), ("slow", slow)), risk,
+                                        atr_mult)
+            # Bollinger long/short
+            if "bollinger" in strategies:
+                for bb_period in BB_PERIODS:
+                    for bb_mult in BB_MULTS:
+                        yield Candidate("bollinger", (("period", bb_period),
+                                                      ("mult", bb_mult)), risk, atr_mult)
+            # RSI two-sided
+            if "rsi" in strategies:
+                for rsi_period in RSI_PERIODS:
+                    for entry_low in RSI_ENTRIES:
+                        for exit_low in RSI_EXITS:
+                            for ema_filter in RSI_EMA_FILTERS:
+                                yield Candidate(
+                                    "rsi",
+                                    (("rsi_period", rsi_period), ("entry", entry_low),
+                                     ("exit", exit_low), ("ema_filter", ema_filter)),
+                                    risk,
+                                    atr_mult,
+                                )
+
+
+def make_strategy(cand: Candidate) -> Strategy:
+    cls = STRATEGIES.get(cand.strategy)
+    if cls is None:
+        raise ValueError(f"Unknown strategy: {cand.strategy}")
+    return cls(**cand.kwargs())
+
+
+def _result_fields(cand: Candidate) -> dict:
+    """Params label and per-strategy Result fields for a candidate."""
+    out = _strategy_fields(cand)
+    if cand.trail > 0:
+        # Trailing settings ride in the label so CSVs/reproduce commands carry them
+        out["params"] += f",trail={cand.trail},trig={cand.trail_trigger}"
+    return out
+
+
+def _strategy_fields(cand: Candidate) -> dict:
+    kw = cand.kwargs()
+    if cand.strategy == "ema":
+        return dict(params=f"fast={kw['fast']},slow={kw['slow']}",
+                    fast=kw["fast"],
+                    slow=kw["slow"])
+    if cand.strategy == "bollinger":
+        return dict(params=f"period={kw['period']},mult={kw['mult']}",
+                    bb_period=kw["period"],
+                    bb_mult=kw["mult"])
+    if cand.strategy == "rsi":
+        return dict(
+            params=(f"period={kw['rsi_period']},eL={kw['entry']},xL={kw['exit']},"
+                    f"ema={kw['ema_filter']}"),
+            rsi_period=kw["rsi_period"],
+            entry_low=kw["entry"],
+            exit_low=kw["exit"],
+        )
+    return dict(params=",".join(f"{k}={v}" for k, v in cand.params))
+
+
+def candidate_risk(cand: Candidate, fee_bps_val: float) -> RiskParams:
+    return RiskParams(
+        start_equity=10_000.0,
+        risk_per_trade=cand.risk,
+        atr_period=14,
+        atr_mult_stop=cand.atr_mult,
+        atr_mult_trail=cand.trail,
+        atr_trail_trigger_mult=cand.trail_trigger,
+        fee_bps=fee_bps_val,
+        fee_lookup=None,
+        slippage_bps=1.0,
+    )
+
+
+def run_candidate(
+    symbol: str,
+    interval: str,
+    bars: List[Bar],
+    cand: Candidate,
+    fee_bps_val: float,
+    abort: Optional[AbortRules] = None,
+    cache: Optional["ResultCache"] = None,
+    bars_fp: str = "",
+) -> Result:
+    risk = candidate_risk(cand, fee_bps_val)
+    key = ""
+    if cache is not None:
+        key = cache.key(bars_fp or cache.fingerprint(bars), cand, risk, abort)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    rpt, _ = backtest(symbol, interval, bars, make_strategy(cand), risk, abort)
+    res = Result(
+        strategy=cand.strategy,
+        risk=cand.risk,
+        atr_mult=cand.atr_mult,
+        pnl=rpt.total_pnl,
+        dd=rpt.max_drawdown,
+        trades=rpt.trades,
+        cagr=rpt.cagr,
+        equity_end=rpt.equity_end,
+        avg_fee_bps=rpt.avg_fee_bps,
+        win_rate=rpt.win_rate,
+        fees=rpt.total_fees,
+        pruned=rpt.pruned,
+        bars=rpt.bars,
+        atr_trail=cand.trail,
+        atr_trail_trigger=cand.trail_trigger,
+        **_result_fields(cand),
+    )
+    if cache is not None:
+        cache.put(key, res, cand.strategy, symbol, interval)
+    return res
+
+
+def eval_grid(
+    symbol: str,
+    interval: str,
+    bars,
+    strategies: List[str],
+    fast_opts: Iterable[int],
+    slow_opts: Iterable[int],
+    risk_opts: Iterable[float],
+    atr_opts: Iterable[float],
+    fee_bps_val: float,
+    abort: Optional[AbortRules] = None,
+    cache: Optional["ResultCache"] = None,
+) -> List[Result]:
+    return eval_candidates(symbol, interval, bars,
+                           iter_candidates(strategies, fast_opts, slow_opts, risk_opts,
+                                           atr_opts), fee_bps_val, abort, cache)
+
+
+def eval_candidates(
+    symbol: str,
+    interval: str,
+    bars: List[Bar],
+    candidates: Iterable[Candidate],
+    fee_bps_val: float,
+    abort: Optional[AbortRules] = None,
+    cache: Optional["ResultCache"] = None,
+    log: Optional[CellLog] = None,
+) -> List[Result]:
+    return list(
+        iter_results(symbol, interval, bars, candidates, fee_bps_val, abort, cache, log))
+
+
+def iter_results(
+    symbol: str,
+    interval: str,
+    bars: List[Bar],
+    candidates: Iterable[Candidate],
+    fee_bps_val: float,
+    abort: Optional[AbortRules] = None,
+    cache: Optional["ResultCache"] = None,
+    log: Optional[CellLog] = None,
+) -> Iterator[Result]:
+    """Backtest candidates lazily, consulting `log` and `cache` first when given.
+
+    Cells already in `log` for this window (`len(bars)`) are reused as is,
+    except pruned ones when running without `abort`; newly computed ones are
+    recorded to it.
+    """
+    fp = cache.fingerprint(bars) if cache is not None else ""
+    done: Mapping[Candidate, Result] = log.completed(len(bars)) if log is not None else {}
+    for c in candidates:
+        res = done.get(c)
+        if res is None or (res.pruned and abort is None):
+            res = run_candidate(symbol, interval, bars, c, fee_bps_val, abort, cache, fp)
+            if log is not None:
+                log.record(len(bars), c, res)
+        yield res
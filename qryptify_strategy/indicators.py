@@ -1,7 +1,18 @@
 from __future__ import annotations
 
 from collections import deque
-from typing import Deque, Optional
+import math
+from typing import Any, Deque, Dict, Optional
+
+
+# An EMA seeded with its first value keeps (1 - 2/(N+1))**(k*N) ~ exp(-2k) of the
+# seed's weight after k*N updates; 3 periods leave ~0.25%
+EMA_CONVERGENCE = 3.0
+
+
+def ema_warmup(period: int) -> int:
+    """Updates before an EMA of `period` has (practically) forgotten its seed."""
+    return math.ceil(EMA_CONVERGENCE * period)
 
 
 def ema(alpha: float, prev: Optional[float], value: float) -> float:
@@ -11,6 +22,12 @@ def ema(alpha: float, prev: Optional[float], value: float) -> float:
     return alpha * value + (1.0 - alpha) * prev
 
 
+def _check_period(ind: Any, state: Dict[str, Any]) -> None:
+    if state["period"] != ind.period:
+        raise ValueError(f"{type(ind).__name__} snapshot has period {state['period']}, "
+                         f"expected {ind.period}")
+
+
 class WilderRSI:
     """Wilder's RSI with warm-up; update(close)->RSI or None."""
 
@@ -33,6 +50,31 @@ class WilderRSI:
         self._avg_loss = None
         self._count = 0
 
+    @property
+    def warmup(self) -> int:
+        """Closes before the first RSI value."""
+        return self.period + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "period": self.period,
+            "prev_close": self._prev_close,
+            "sum_gain": self._sum_gain,
+            "sum_loss": self._sum_loss,
+            "avg_gain": self._avg_gain,
+            "avg_loss": self._avg_loss,
+            "count": self._count,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        _check_period(self, state)
+        self._prev_close = state["prev_close"]
+        self._sum_gain = state["sum_gain"]
+        self._sum_loss = state["sum_loss"]
+        self._avg_gain = state["avg_gain"]
+        self._avg_loss = state["avg_loss"]
+        self._count = state["count"]
+
     def update(self, close: float) -> Optional[float]:
         prev = self._prev_close
         if prev is None:
@@ -95,6 +137,21 @@ class WilderATR:
         self._atr = None
         self._sum_tr = 0.0
 
+    @property
+    def warmup(self) -> int:
+        """Updates before the first ATR value."""
+        return self.period
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"period": self.period, "count": self._count, "atr": self._atr,
+                "sum_tr": self._sum_tr}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        _check_period(self, state)
+        self._count = state["count"]
+        self._atr = state["atr"]
+        self._sum_tr = state["sum_tr"]
+
     def update(self, tr: float) -> Optional[float]:
         self._count += 1
         if self._count <= self.period:
@@ -122,6 +179,23 @@ class RollingMeanStd:
         self._sum = 0.0
         self._sumsq = 0.0
 
+    @property
+    def warmup(self) -> int:
+        """Values before the first full window."""
+        return self.period
+
+    def snapshot(self) -> Dict[str, Any]:
+        # The running sums are kept as they are (not recomputed from the window),
+        # so a restored instance continues bit-identically
+        return {"period": self.period, "win": list(self._win), "sum": self._sum,
+                "sumsq": self._sumsq}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        _check_period(self, state)
+        self._win = deque(state["win"])
+        self._sum = state["sum"]
+        self._sumsq = state["sumsq"]
+
     def update(self, value: float) -> Optional[tuple[float, float]]:
         self._win.append(value)
         self._sum += value
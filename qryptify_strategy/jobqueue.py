@@ -0,0 +1,479 @@
+"""Postgres job queue for distributed optimizer sweeps.
+
+A coordinator (`qryptify-optimize --coordinator`) registers each pair's bar
+span, fingerprint and fee in `optimizer_pairs` and COPYs one row per grid
+cell into `optimizer_jobs`. Workers on any host (`qryptify-optimize --worker`)
+claim batches with `FOR UPDATE SKIP LOCKED`, run them against a local copy of
+the pair's bars (fetched once per pair and checked against the fingerprint)
+and write the results back in one statement per batch. The coordinator polls
+progress and, once the queue has drained, ranks the stored results exactly
+like a local sweep.
+
+A claim is a lease: `lease_until` is extended while a worker is busy, and
+cells whose lease expired (dead or stuck worker) are claimed again by other
+workers, up to `max_attempts` claims, after which they are marked failed.
+Timestamps come from the database, so worker clocks do not matter.
+
+    qryptify-queue runs
+    qryptify-queue progress RUN_ID
+    qryptify-queue retry RUN_ID     # failed cells back to pending
+    qryptify-queue drop RUN_ID
+"""
+from __future__ import annotations
+
+import argparse
+from collections import OrderedDict
+from dataclasses import asdict
+from dataclasses import dataclass
+from datetime import datetime
+import itertools
+import json
+import os
+import socket
+import time
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple,
+                    TYPE_CHECKING)
+
+from .cache import bars_fingerprint
+from .candidates import Candidate
+from .candidates import candidate_from_json
+from .candidates import candidate_to_json
+from .candidates import Result
+from .candidates import run_candidate
+from .models import AbortRules
+from .models import Bar
+
+if TYPE_CHECKING:
+    import psycopg
+
+    from .cache import ResultCache
+
+# Keep in sync with sql/004_optimizer_jobs.sql
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS optimizer_runs (
+  run_id TEXT PRIMARY KEY,
+  created TIMESTAMPTZ NOT NULL DEFAULT now(),
+  meta JSONB NOT NULL DEFAULT '{}'
+);
+
+CREATE TABLE IF NOT EXISTS optimizer_pairs (
+  run_id TEXT NOT NULL REFERENCES optimizer_runs(run_id) ON DELETE CASCADE,
+  pair TEXT NOT NULL,
+  symbol TEXT NOT NULL,
+  interval TEXT NOT NULL,
+  first_ts TIMESTAMPTZ NOT NULL,
+  last_ts TIMESTAMPTZ NOT NULL,
+  n_bars INTEGER NOT NULL,
+  bars_fp TEXT NOT NULL,
+  fee_bps DOUBLE PRECISION NOT NULL,
+  PRIMARY KEY (run_id, pair)
+);
+
+CREATE TABLE IF NOT EXISTS optimizer_jobs (
+  id BIGSERIAL PRIMARY KEY,
+  run_id TEXT NOT NULL,
+  pair TEXT NOT NULL,
+  cand JSONB NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending'
+    CHECK (status IN ('pending','running','done','failed')),
+  worker TEXT,
+  lease_until TIMESTAMPTZ,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  result JSONB,
+  error TEXT,
+  updated TIMESTAMPTZ NOT NULL DEFAULT now(),
+  FOREIGN KEY (run_id, pair) REFERENCES optimizer_pairs(run_id, pair) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_optimizer_jobs_status ON optimizer_jobs(status, id);
+CREATE INDEX IF NOT EXISTS idx_optimizer_jobs_run_pair ON optimizer_jobs(run_id, pair, id);
+"""
+
+_REAP_SQL = """
+UPDATE optimizer_jobs
+SET status = 'failed', lease_until = NULL, updated = now(),
+    error = 'lease expired after ' || attempts || ' attempts'
+WHERE status = 'running' AND lease_until < now() AND attempts >= %s
+"""
+
+_CLAIM_SQL = """
+WITH picked AS (
+  SELECT id FROM optimizer_jobs
+  WHERE (status = 'pending' OR (status = 'running' AND lease_until < now()))
+    AND attempts < %(max_attempts)s
+    AND (%(run_id)s::text IS NULL OR run_id = %(run_id)s::text)
+  ORDER BY id
+  LIMIT %(batch)s
+  FOR UPDATE SKIP LOCKED
+)
+UPDATE optimizer_jobs j
+SET status = 'running', worker = %(worker)s, attempts = j.attempts + 1,
+    lease_until = now() + %(lease)s::double precision * interval '1 second',
+    updated = now()
+FROM picked
+WHERE j.id = picked.id
+RETURNING j.id, j.run_id, j.pair, j.cand
+"""
+
+_COMPLETE_SQL = """
+UPDATE optimizer_jobs j
+SET status = 'done', result = v.result::jsonb, worker = %s, lease_until = NULL,
+    error = NULL, updated = now()
+FROM unnest(%s::bigint[], %s::text[]) AS v(id, result)
+WHERE j.id = v.id AND j.status <> 'done'
+"""
+
+_PROGRESS_SQL = """
+SELECT pair,
+       count(*) FILTER (WHERE status = 'pending'),
+       count(*) FILTER (WHERE status = 'running'),
+       count(*) FILTER (WHERE status = 'done'),
+       count(*) FILTER (WHERE status = 'failed'),
+       count(DISTINCT worker) FILTER (WHERE status = 'running')
+FROM optimizer_jobs
+WHERE run_id = %s
+GROUP BY pair
+ORDER BY pair
+"""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass(frozen=True)
+class Job:
+    id: int
+    run_id: str
+    pair: str
+    cand: Candidate
+
+
+@dataclass(frozen=True)
+class PairInfo:
+    """What a worker needs to rebuild a pair's bars and cells exactly."""
+    run_id: str
+    pair: str
+    symbol: str
+    interval: str
+    first_ts: datetime
+    last_ts: datetime
+    n_bars: int
+    bars_fp: str
+    fee_bps: float
+    abort: Optional[AbortRules] = None
+
+
+@dataclass
+class Progress:
+    pair: str
+    pending: int = 0
+    running: int = 0
+    done: int = 0
+    failed: int = 0
+    workers: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.pending + self.running + self.done + self.failed
+
+    @property
+    def open(self) -> int:
+        return self.pending + self.running
+
+
+def total_progress(rows: Sequence[Progress]) -> Progress:
+    out = Progress("*")
+    for p in rows:
+        out.pending += p.pending
+        out.running += p.running
+        out.done += p.done
+        out.failed += p.failed
+        out.workers = max(out.workers, p.workers)
+    return out
+
+
+class JobQueue:
+    """Queue operations over one autocommit connection (statements are atomic)."""
+
+    def __init__(self, conn: "psycopg.Connection") -> None:
+        self._conn = conn
+
+    @classmethod
+    def connect(cls, dsn: str) -> "JobQueue":
+        # Local import so the queue helpers and --help work without psycopg
+        import psycopg
+
+        conn = psycopg.connect(dsn, autocommit=True)
+        q = cls(conn)
+        q.ensure_schema()
+        return q
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def ensure_schema(self) -> None:
+        # Serialized so workers starting together do not race on CREATE TABLE
+        with self._conn.transaction():
+            self._conn.execute("SELECT pg_advisory_xact_lock(hashtext('optimizer_jobs'))")
+            self._conn.execute(SCHEMA)
+
+    # -- coordinator -------------------------------------------------------
+
+    def create_run(self, run_id: str, meta: Dict[str, Any]) -> bool:
+        """Register a run; False when it already exists (re-attaching)."""
+        cur = self._conn.execute(
+            "INSERT INTO optimizer_runs (run_id, meta) VALUES (%s, %s::jsonb) "
+            "ON CONFLICT (run_id) DO NOTHING", (run_id, json.dumps(meta, default=str)))
+        return cur.rowcount == 1
+
+    def run_meta(self, run_id: str) -> Dict[str, Any]:
+        row = self._conn.execute("SELECT meta FROM optimizer_runs WHERE run_id = %s",
+                                 (run_id, )).fetchone()
+        if row is None:
+            raise KeyError(f"No optimizer run {run_id!r} in the queue")
+        return row[0]
+
+    def has_pair(self, run_id: str, pair: str) -> bool:
+        row = self._conn.execute("SELECT 1 FROM optimizer_pairs WHERE run_id = %s AND pair = %s",
+                                 (run_id, pair)).fetchone()
+        return row is not None
+
+    def enqueue(self, info: PairInfo, candidates: Iterable[Candidate]) -> int:
+        """Register a pair and COPY its cells, in one transaction."""
+        n = 0
+        with self._conn.transaction():
+            self._conn.execute(
+                "INSERT INTO optimizer_pairs (run_id, pair, symbol, interval, first_ts, "
+                "last_ts, n_bars, bars_fp, fee_bps) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                (info.run_id, info.pair, info.symbol, info.interval, info.first_ts,
+                 info.last_ts, info.n_bars, info.bars_fp, info.fee_bps))
+            with self._conn.cursor() as cur:
+                with cur.copy("COPY optimizer_jobs (run_id, pair, cand) FROM STDIN") as cp:
+                    for c in candidates:
+                        cp.write_row((info.run_id, info.pair, json.dumps(candidate_to_json(c))))
+                        n += 1
+        return n
+
+    def progress(self, run_id: str) -> List[Progress]:
+        rows = self._conn.execute(_PROGRESS_SQL, (run_id, )).fetchall()
+        return [Progress(*r) for r in rows]
+
+    def wait(self, run_id: str, poll_s: float = 5.0,
+             on_progress: Optional[Callable[[Progress], None]] = None) -> Progress:
+        """Poll until no cell of the run is pending or running."""
+        while True:
+            total = total_progress(self.progress(run_id))
+            if on_progress is not None:
+                on_progress(total)
+            if not total.open:
+                return total
+            time.sleep(poll_s)
+
+    def results(self, run_id: str, pair: str) -> Iterator[Result]:
+        """Finished cells of a pair in enqueue order, streamed from a server-side cursor."""
+        with self._conn.transaction():
+            with self._conn.cursor(name="optimizer_results") as cur:
+                cur.execute(
+                    "SELECT result FROM optimizer_jobs WHERE run_id = %s AND pair = %s "
+                    "AND status = 'done' ORDER BY id", (run_id, pair))
+                for (res, ) in cur:
+                    yield Result(**res)
+
+    def runs(self) -> List[Tuple[str, datetime, Progress]]:
+        out = []
+        for run_id, created in self._conn.execute(
+                "SELECT run_id, created FROM optimizer_runs ORDER BY created").fetchall():
+            out.append((run_id, created, total_progress(self.progress(run_id))))
+        return out
+
+    def retry_failed(self, run_id: str) -> int:
+        cur = self._conn.execute(
+            "UPDATE optimizer_jobs SET status = 'pending', attempts = 0, error = NULL, "
+            "worker = NULL, updated = now() WHERE run_id = %s AND status = 'failed'",
+            (run_id, ))
+        return cur.rowcount
+
+    def drop_run(self, run_id: str) -> int:
+        with self._conn.transaction():
+            cur = self._conn.execute("DELETE FROM optimizer_jobs WHERE run_id = %s", (run_id, ))
+            self._conn.execute("DELETE FROM optimizer_runs WHERE run_id = %s", (run_id, ))
+        return cur.rowcount
+
+    # -- worker ------------------------------------------------------------
+
+    def pair_info(self, run_id: str, pair: str) -> PairInfo:
+        row = self._conn.execute(
+            "SELECT p.symbol, p.interval, p.first_ts, p.last_ts, p.n_bars, p.bars_fp, "
+            "p.fee_bps, r.meta FROM optimizer_pairs p JOIN optimizer_runs r USING (run_id) "
+            "WHERE p.run_id = %s AND p.pair = %s", (run_id, pair)).fetchone()
+        if row is None:
+            raise KeyError(f"No pair {pair!r} in optimizer run {run_id!r}")
+        symbol, interval, first_ts, last_ts, n_bars, bars_fp, fee_bps, meta = row
+        abort = meta.get("abort")
+        return PairInfo(run_id, pair, symbol, interval, first_ts, last_ts, n_bars, bars_fp,
+                        fee_bps, AbortRules(**abort) if abort else None)
+
+    def claim(self, worker: str, batch: int, lease_s: float, max_attempts: int = 3,
+              run_id: Optional[str] = None) -> List[Job]:
+        self._conn.execute(_REAP_SQL, (max_attempts, ))
+        rows = self._conn.execute(
+            _CLAIM_SQL, {
+                "worker": worker,
+                "batch": batch,
+                "lease": lease_s,
+                "max_attempts": max_attempts,
+                "run_id": run_id,
+            }).fetchall()
+        jobs = [Job(i, r, p, candidate_from_json(c)) for i, r, p, c in rows]
+        jobs.sort(key=lambda j: j.id)
+        return jobs
+
+    def renew(self, worker: str, ids: Sequence[int], lease_s: float) -> int:
+        cur = self._conn.execute(
+            "UPDATE optimizer_jobs SET lease_until = now() + %s::double precision * "
+            "interval '1 second' WHERE id = ANY(%s::bigint[]) AND worker = %s "
+            "AND status = 'running'", (lease_s, list(ids), worker))
+        return cur.rowcount
+
+    def complete(self, worker: str, done: Sequence[Tuple[int, Result]]) -> int:
+        """Store a batch of results in one statement (results are deterministic,
+        so a cell finished twice after a lost lease is harmless)."""
+        if not done:
+            return 0
+        cur = self._conn.execute(_COMPLETE_SQL, (worker, [i for i, _ in done],
+                                                 [json.dumps(asdict(r)) for _, r in done]))
+        return cur.rowcount
+
+    def fail(self, ids: Sequence[int], error: str) -> int:
+        cur = self._conn.execute(
+            "UPDATE optimizer_jobs SET status = 'failed', error = %s, lease_until = NULL, "
+            "updated = now() WHERE id = ANY(%s::bigint[])", (error, list(ids)))
+        return cur.rowcount
+
+
+class BarStore:
+    """Per-worker LRU of pair bars, verified against the enqueued fingerprint."""
+
+    def __init__(self, load: Callable[[PairInfo], List[Bar]], max_pairs: int = 4) -> None:
+        self._load = load
+        self.max_pairs = max(1, max_pairs)
+        self._bars: "OrderedDict[Tuple[str, str], List[Bar]]" = OrderedDict()
+
+    def get(self, info: PairInfo) -> List[Bar]:
+        key = (info.run_id, info.pair)
+        bars = self._bars.get(key)
+        if bars is not None:
+            self._bars.move_to_end(key)
+            return bars
+        bars = self._load(info)
+        if len(bars) != info.n_bars or bars_fingerprint(bars) != info.bars_fp:
+            raise ValueError(f"{info.pair}: stored bars changed since the run was enqueued")
+        self._bars[key] = bars
+        while len(self._bars) > self.max_pairs:
+            self._bars.popitem(last=False)
+        return bars
+
+
+def run_worker(
+    queue: JobQueue,
+    store: BarStore,
+    *,
+    worker_id: str,
+    batch: int = 50,
+    lease_s: float = 300.0,
+    max_attempts: int = 3,
+    run_id: Optional[str] = None,
+    idle_exit: float = 0.0,
+    poll_s: float = 2.0,
+    cache: Optional["ResultCache"] = None,
+    on_batch: Optional[Callable[[str, int], None]] = None,
+) -> int:
+    """Claim and run cells until idle for `idle_exit` seconds (0: forever).
+
+    Returns the number of cells completed.
+    """
+    infos: Dict[Tuple[str, str], PairInfo] = {}
+    completed = 0
+    idle_since = time.monotonic()
+    while True:
+        jobs = queue.claim(worker_id, batch, lease_s, max_attempts, run_id)
+        if not jobs:
+            if idle_exit and time.monotonic() - idle_since >= idle_exit:
+                return completed
+            time.sleep(poll_s)
+            continue
+        left = {j.id for j in jobs}  # claimed but not finished: leases to keep alive
+        renewed = time.monotonic()
+        for (run, pair), grp in itertools.groupby(jobs, key=lambda j: (j.run_id, j.pair)):
+            group = list(grp)
+            left.difference_update(j.id for j in group)
+            try:
+                info = infos.get((run, pair)) or queue.pair_info(run, pair)
+                infos[(run, pair)] = info
+                bars = store.get(info)
+            except Exception as e:
+                queue.fail([j.id for j in group], str(e))
+                continue
+            done: List[Tuple[int, Result]] = []
+            for k, job in enumerate(group):
+                try:
+                    done.append((job.id,
+                                 run_candidate(info.symbol, info.interval, bars, job.cand,
+                                               info.fee_bps, info.abort, cache, info.bars_fp)))
+                except Exception as e:
+                    queue.fail([job.id], repr(e))
+                if time.monotonic() - renewed > lease_s / 3:
+                    queue.renew(worker_id, [j.id for j in group[k + 1:]] + sorted(left),
+                                lease_s)
+                    renewed = time.monotonic()
+            completed += queue.complete(worker_id, done)
+            if cache is not None:
+                cache.flush()
+            if on_batch is not None:
+                on_batch(pair, len(done))
+        idle_since = time.monotonic()
+
+
+def format_progress(p: Progress) -> str:
+    pct = p.done / p.total if p.total else 0.0
+    return (f"{p.done:,}/{p.total:,} done ({pct:.1%}), {p.running:,} running on "
+            f"{p.workers} worker(s), {p.pending:,} pending, {p.failed:,} failed")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from qryptify.shared.config import load_cfg_dsn
+
+    ap = argparse.ArgumentParser(description="Inspect the distributed optimizer job queue")
+    ap.add_argument("--dsn", default="", help="Postgres DSN (default: db.dsn from config)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("runs", help="Runs with overall progress")
+    for name, desc in (("progress", "Per-pair progress of a run"),
+                       ("retry", "Move failed cells back to pending"),
+                       ("drop", "Delete a run and its cells")):
+        sub.add_parser(name, help=desc).add_argument("run_id")
+    args = ap.parse_args(argv)
+
+    with JobQueue.connect(args.dsn or load_cfg_dsn()) as q:
+        if args.cmd == "runs":
+            for run_id, created, total in q.runs():
+                print(f"{run_id}  {created:%Y-%m-%d %H:%M}  {format_progress(total)}")
+        elif args.cmd == "progress":
+            rows = q.progress(args.run_id)
+            for p in rows:
+                print(f"{p.pair:<20} {format_progress(p)}")
+            print(f"{'total':<20} {format_progress(total_progress(rows))}")
+        elif args.cmd == "retry":
+            print(f"Requeued {q.retry_failed(args.run_id):,} failed cells")
+        elif args.cmd == "drop":
+            print(f"Deleted {q.drop_run(args.run_id):,} cells")
+
+
+if __name__ == "__main__":
+    main()
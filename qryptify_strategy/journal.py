@@ -0,0 +1,185 @@
+"""Append-only run journal for resumable optimizer runs.
+
+Each run gets `<runs_dir>/<run_id>/` with `meta.json` (the resolved CLI
+arguments and YAML config) and `cells.jsonl`, one JSON record per line:
+
+    {"t": "pair", "pair": "BTCUSDT/1h", "fee_bps": 4.0, "n_bars": ..., ...}
+    {"t": "cell", "pair": "BTCUSDT/1h", "window": 20000, "cand": {...}, "res": {...}}
+    {"t": "done", "pair": "BTCUSDT/1h", "window": 20000}
+
+Records are flushed on every write and fsync'd every `sync_every` cells and
+at pair boundaries, so a crash loses at most a few cells. Replaying the
+journal yields the completed cells per (pair, window) — the window is the
+number of bars a cell was run on, so successive-halving rungs resume too —
+and which pairs finished. A torn trailing line from a crash is dropped.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Mapping, Optional, TextIO
+
+from .candidates import Candidate
+from .candidates import candidate_from_json
+from .candidates import candidate_to_json
+from .candidates import Result
+
+
+def new_run_id() -> str:
+    return time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+
+
+@dataclass
+class PairState:
+    info: Dict[str, Any] = field(default_factory=dict)  # from the "pair" record
+    cells: Dict[int, Dict[Candidate, Result]] = field(default_factory=dict)
+    done_window: Optional[int] = None  # set once the pair finished
+
+    @property
+    def done(self) -> bool:
+        return self.done_window is not None
+
+    def final_results(self) -> List[Result]:
+        return list(self.cells.get(self.done_window or -1, {}).values())
+
+
+class PairLog:
+    """CellLog bound to one pair of a RunJournal."""
+
+    def __init__(self, journal: "RunJournal", pair: str) -> None:
+        self._journal = journal
+        self.pair = pair
+
+    def completed(self, window: int) -> Mapping[Candidate, Result]:
+        return self._journal.state(self.pair).cells.get(window, {})
+
+    def record(self, window: int, cand: Candidate, result: Result) -> None:
+        self._journal.record(self.pair, window, cand, result)
+
+
+class RunJournal:
+
+    def __init__(self, run_dir: Path, meta: Dict[str, Any], sync_every: int = 200) -> None:
+        self.run_dir = run_dir
+        self.run_id = run_dir.name
+        self.meta = meta
+        self.sync_every = sync_every
+        self.pairs: Dict[str, PairState] = {}
+        self._unsynced = 0
+        self._f: Optional[TextIO] = None
+
+    # -- lifecycle ---------------------------------------------------------
+
+    @classmethod
+    def create(cls, runs_dir: str, run_id: str, meta: Dict[str, Any]) -> "RunJournal":
+        run_dir = Path(runs_dir) / run_id
+        run_dir.mkdir(parents=True, exist_ok=False)
+        (run_dir / "meta.json").write_text(json.dumps(meta, indent=2, default=str))
+        j = cls(run_dir, meta)
+        j._open_for_append()
+        return j
+
+    @classmethod
+    def open(cls, runs_dir: str, run_id: str) -> "RunJournal":
+        run_dir = Path(runs_dir) / run_id
+        meta_path = run_dir / "meta.json"
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No run journal at {run_dir}")
+        j = cls(run_dir, json.loads(meta_path.read_text()))
+        j._replay()
+        j._open_for_append()
+        return j
+
+    def _open_for_append(self) -> None:
+        self._f = open(self.run_dir / "cells.jsonl", "a", encoding="utf-8")
+
+    def _replay(self) -> None:
+        path = self.run_dir / "cells.jsonl"
+        if not path.exists():
+            return
+        with open(path, "rb+") as f:
+            data = f.read()
+            keep = data.rfind(b"\n") + 1
+            if keep < len(data):
+                # Torn write from a crash: drop the partial line
+                f.truncate(keep)
+        for line in data[:keep].splitlines():
+            rec = json.loads(line)
+            kind = rec["t"]
+            if kind == "pair":
+                # A later pair record means the pair restarted on new inputs
+                self.pairs[rec["pair"]] = PairState(
+                    info={k: v for k, v in rec.items() if k not in ("t", "pair")})
+                continue
+            st = self.state(rec["pair"])
+            if kind == "cell":
+                cand = candidate_from_json(rec["cand"])
+                st.cells.setdefault(rec["window"], {})[cand] = Result(**rec["res"])
+            elif kind == "done":
+                st.done_window = rec["window"]
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._sync()
+            self._f.close()
+            self._f = None
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- state -------------------------------------------------------------
+
+    def state(self, pair: str) -> PairState:
+        st = self.pairs.get(pair)
+        if st is None:
+            st = self.pairs[pair] = PairState()
+        return st
+
+    def log(self, pair: str) -> PairLog:
+        return PairLog(self, pair)
+
+    # -- writes ------------------------------------------------------------
+
+    def _write(self, rec: Dict[str, Any], sync: bool = False) -> None:
+        assert self._f is not None, "journal is closed"
+        self._f.write(json.dumps(rec, default=str) + "\n")
+        self._f.flush()
+        self._unsynced += 1
+        if sync or self._unsynced >= self.sync_every:
+            self._sync()
+
+    def _sync(self) -> None:
+        if self._f is not None and self._unsynced:
+            os.fsync(self._f.fileno())
+            self._unsynced = 0
+
+    def start_pair(self, pair: str, info: Dict[str, Any]) -> None:
+        """Record the inputs a pair's cells depend on (fee, bar span/fingerprint).
+
+        Starting a pair again discards its earlier cells, on replay too.
+        """
+        self.pairs[pair] = PairState(info=dict(info))
+        self._write({"t": "pair", "pair": pair, **info}, sync=True)
+
+    def record(self, pair: str, window: int, cand: Candidate, result: Result) -> None:
+        # Written through only: in-memory cells come from replay, so a long
+        # run does not accumulate every result
+        self._write({
+            "t": "cell",
+            "pair": pair,
+            "window": window,
+            "cand": candidate_to_json(cand),
+            "res": asdict(result),
+        })
+
+    def finish_pair(self, pair: str, window: int) -> None:
+        self.state(pair).done_window = window
+        self._write({"t": "done", "pair": pair, "window": window}, sync=True)
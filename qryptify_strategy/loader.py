@@ -0,0 +1,154 @@
+"""Bar loading for the strategy CLIs.
+
+Stored intervals are read directly; any other interval (45m, 6h, 1d, ...) is
+derived in memory from a stored base interval via `resample_bars`, so new
+timeframes need no ingestion or schema changes.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timedelta
+from typing import Any, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from qryptify.shared.intervals import parse_interval
+from qryptify.shared.intervals import step_of
+from qryptify.shared.intervals import SUPPORTED_INTERVALS
+from qryptify.shared.profiling import current
+
+from .models import Bar
+from .resample import base_interval_for
+from .resample import resample_bars
+
+
+def build_bars(rows: Iterable[Mapping[str, Any]]) -> List[Bar]:
+    out: List[Bar] = []
+    for r in rows:
+        out.append(
+            Bar(
+                ts=r["ts"],
+                open=float(r["open"]),
+                high=float(r["high"]),
+                low=float(r["low"]),
+                close=float(r["close"]),
+                volume=float(r["volume"]),
+            ))
+    return out
+
+
+def load_bars(
+    repo,
+    symbol: str,
+    interval: str,
+    *,
+    lookback: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    base_interval: Optional[str] = None,
+) -> List[Bar]:
+    """Load bars for (symbol, interval) from a Timescale reader.
+
+    Uses `fetch_ohlcv` when `start`/`end` are given, otherwise the latest
+    `lookback` bars. If `interval` is not stored (or `base_interval` is set),
+    the base series is fetched and resampled; the latest-N path fetches one
+    extra bucket of base bars so an edge bucket dropped as partial does not
+    shorten the result.
+    """
+    prof = current()
+    if base_interval is None and interval in SUPPORTED_INTERVALS:
+        with prof.phase("db_fetch"):
+            if start is not None or end is not None:
+                rows = repo.fetch_ohlcv(symbol, interval, start=start, end=end)
+            else:
+                rows = repo.fetch_latest_n(symbol, interval, int(lookback or 0))
+        with prof.phase("build_bars"):
+            return build_bars(rows)
+
+    target = parse_interval(interval)
+    base = base_interval or base_interval_for(interval)
+    base_step = step_of(base)
+    if target % base_step:
+        raise ValueError(f"{interval} is not a multiple of base interval {base}")
+    ratio = target // base_step
+    n = int(lookback or 0)
+    with prof.phase("db_fetch"):
+        if start is not None or end is not None:
+            rows = repo.fetch_ohlcv(symbol, base, start=start, end=end)
+        else:
+            rows = repo.fetch_latest_n(symbol, base, (n + 1) * ratio)
+    with prof.phase("build_bars"):
+        base_bars = build_bars(rows)
+    with prof.phase("resample"):
+        bars = resample_bars(base_bars, target, base_step=base_step)
+    if start is not None or end is not None:
+        return bars
+    return bars[-n:] if n > 0 else []
+
+
+def load_window(
+    repo,
+    symbol: str,
+    interval: str,
+    warmup: int,
+    *,
+    lookback: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    base_interval: Optional[str] = None,
+) -> Tuple[List[Bar], int]:
+    """`load_bars` plus up to `warmup` bars ahead of the window; returns (bars, n_warmup).
+
+    The window is the latest `lookback` bars, or `start`..`end`; the warm-up
+    bars come right before it (by time for `start`, so gaps in the data
+    shorten it; with only `end`, the first bars of history warm up). Pass n_warmup to `backtest(..., warmup=...)` so the warm-up
+    bars only feed the indicators. The window is kept whole when history is
+    short; the warm-up is what shrinks.
+    """
+    if start is not None:
+        step = parse_interval(interval)
+        bars = load_bars(repo,
+                         symbol,
+                         interval,
+                         start=start - warmup * step,
+                         end=end,
+                         base_interval=base_interval)
+        n_warm = sum(1 for b in bars if b.ts < start)
+    elif end is not None:
+        # No start: all history up to `end`, the first bars warming up
+        bars = load_bars(repo, symbol, interval, end=end, base_interval=base_interval)
+        n_warm = warmup
+    else:
+        n = int(lookback or 0)
+        bars = load_bars(repo, symbol, interval, lookback=n + warmup,
+                         base_interval=base_interval)
+        n_warm = max(len(bars) - n, 0)
+    # backtest() needs at least one bar in the window
+    return bars, min(n_warm, max(len(bars) - 1, 0))
+
+
+def iter_bars(
+    repo,
+    symbol: str,
+    interval: str,
+    *,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    page: int = 10_000,
+) -> Iterator[Bar]:
+    """Stream a stored interval's bars in [start, end], `page` rows per query.
+
+    Keyset-paginated on `ts`, so memory stays at one page however long the
+    span is. Derived intervals are not supported (use `load_bars`).
+    """
+    if interval not in SUPPORTED_INTERVALS:
+        raise ValueError(f"{interval} is not stored; iter_bars streams stored intervals only")
+    prof = current()
+    cursor = start
+    while True:
+        with prof.phase("db_fetch"):
+            rows = repo.fetch_ohlcv(symbol, interval, start=cursor, end=end, limit=page)
+        with prof.phase("build_bars"):
+            bars = build_bars(rows)
+        yield from bars
+        if len(rows) < page:
+            return
+        cursor = bars[-1].ts + timedelta(microseconds=1)
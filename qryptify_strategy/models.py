@@ -43,6 +43,20 @@ class RiskParams:
     fee_lookup: Optional[Callable[[datetime], float]] = None
 
 
+@dataclass
+class AbortRules:
+    """Early-abort conditions for a backtest; 0 disables a rule.
+
+    Used by sweeps to stop hopeless configurations early. A pruned run is
+    flattened and reported with `pruned=True` and the rule that fired.
+    """
+
+    max_drawdown: float = 0.0  # abort once mark-to-market DD exceeds this (quote)
+    equity_floor: float = 0.0  # abort once mark-to-market equity falls to this
+    min_trades: int = 0  # abort if fewer trades than this ...
+    min_trades_by_bar: int = 0  # ... have closed by this bar index
+
+
 @dataclass
 class Trade:
     entry_ts: datetime
@@ -71,3 +85,6 @@ class BacktestReport:
     cagr: Optional[float]
     avg_fee_bps: float = 0.0
     fee_model: str = "fixed_bps"
+    # Set when AbortRules stopped the run early; `bars` then counts bars seen
+    pruned: bool = False
+    pruned_reason: str = ""
@@ -1,212 +1,60 @@
 from __future__ import annotations
 
 import argparse
+from dataclasses import asdict
 from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
 from pathlib import Path
-from typing import Iterable, List, Optional, Tuple
+from typing import List, Optional, Tuple
 
 import yaml
 
-from qryptify.shared.config import load_cfg_dsn
+from qryptify.shared.config import load_cfg
 from qryptify.shared.fees import binance_futures_fee_bps
+from qryptify.shared.intervals import parse_interval
 from qryptify.shared.logging import setup_logging
 from qryptify.shared.pairs import parse_pair
-
-from .backtest import build_bars
-from .backtester import backtest
-from .models import RiskParams
-from .strategies.bollinger import BollingerBandStrategy
-from .strategies.ema_crossover import EMACrossStrategy
-from .strategies.rsi_scalp import RSIScalpStrategy
-
-
-@dataclass
-class Result:
-    strategy: str
-    params: str
-    risk: float
-    atr_mult: float
-    pnl: float
-    dd: float
-    trades: int
-    cagr: Optional[float]
-    equity_end: float
-    avg_fee_bps: Optional[float] = None
-    # optional per-strategy fields for debugging
-    fast: Optional[int] = None
-    slow: Optional[int] = None
-    bb_period: Optional[int] = None
-    bb_mult: Optional[float] = None
-    rsi_period: Optional[int] = None
-    entry_low: Optional[float] = None
-    exit_low: Optional[float] = None
-    entry_high: Optional[float] = None
-    exit_high: Optional[float] = None
-
-
-def eval_grid(
-    symbol: str,
-    interval: str,
-    bars,
-    strategies: List[str],
-    fast_opts: Iterable[int],
-    slow_opts: Iterable[int],
-    risk_opts: Iterable[float],
-    atr_opts: Iterable[float],
-    fee_bps_val: float,
-) -> List[Result]:
-    out: List[Result] = []
-    for risk in risk_opts:
-        for atr_mult in atr_opts:
-            # EMA long/short
-            if "ema" in strategies:
-                for fast in fast_opts:
-                    for slow in slow_opts:
-                        if fast >= slow:
-                            continue
-                        strat = EMACrossStrategy(fast=fast, slow=slow)
-                        rpt, _ = backtest(
-                            symbol,
-                            interval,
-                            bars,
-                            strat,
-                            RiskParams(
-                                start_equity=10_000.0,
-                                risk_per_trade=risk,
-                                atr_period=14,
-                                atr_mult_stop=atr_mult,
-                                fee_bps=fee_bps_val,
-                                fee_lookup=None,
-                                slippage_bps=1.0,
-                            ),
-                        )
-                        out.append(
-                            Result(
-                                strategy="ema",
-                                params=f"fast={fast},slow={slow}",
-                                risk=risk,
-                                atr_mult=atr_mult,
-                                pnl=rpt.total_pnl,
-                                dd=rpt.max_drawdown,
-                                trades=rpt.trades,
-                                cagr=rpt.cagr,
-                                equity_end=rpt.equity_end,
-                                avg_fee_bps=rpt.avg_fee_bps,
-                                fast=fast,
-                                slow=slow,
-                            ))
-            # Bollinger long/short
-            if "bollinger" in strategies:
-                for bb_period in [20, 50]:
-                    for bb_mult in [2.0, 2.5, 3.0]:
-                        strat = BollingerBandStrategy(period=bb_period, mult=bb_mult)
-                        rpt, _ = backtest(
-                            symbol,
-                            interval,
-                            bars,
-                            strat,
-                            RiskParams(
-                                start_equity=10_000.0,
-                                risk_per_trade=risk,
-                                atr_period=14,
-                                atr_mult_stop=atr_mult,
-                                fee_bps=fee_bps_val,
-                                fee_lookup=None,
-                                slippage_bps=1.0,
-                            ),
-                        )
-                        out.append(
-                            Result(
-                                strategy="bollinger",
-                                params=f"period={bb_period},mult={bb_mult}",
-                                risk=risk,
-                                atr_mult=atr_mult,
-                                pnl=rpt.total_pnl,
-                                dd=rpt.max_drawdown,
-                                trades=rpt.trades,
-                                cagr=rpt.cagr,
-                                equity_end=rpt.equity_end,
-                                avg_fee_bps=rpt.avg_fee_bps,
-                                bb_period=bb_period,
-                                bb_mult=bb_mult,
-                            ))
-            # RSI two-sided
-            if "rsi" in strategies:
-                for rsi_period in [8, 14]:
-                    for entry_low in [25.0, 30.0]:
-                        for exit_low in [50.0, 55.0]:
-                            for ema_filter in [0, 200]:
-                                strat = RSIScalpStrategy(
-                                    rsi_period=rsi_period,
-                                    entry=entry_low,
-                                    exit=exit_low,
-                                    ema_filter=ema_filter,
-                                )
-                                rpt, _ = backtest(
-                                    symbol,
-                                    interval,
-                                    bars,
-                                    strat,
-                                    RiskParams(
-                                        start_equity=10_000.0,
-                                        risk_per_trade=risk,
-                                        atr_period=14,
-                                        atr_mult_stop=atr_mult,
-                                        fee_bps=fee_bps_val,
-                                        fee_lookup=None,
-                                        slippage_bps=1.0,
-                                    ),
-                                )
-                                out.append(
-                                    Result(
-                                        strategy="rsi",
-                                        params=
-                                        (f"period={rsi_period},eL={entry_low},xL={exit_low},ema={ema_filter}"
-                                        ),
-                                        risk=risk,
-                                        atr_mult=atr_mult,
-                                        pnl=rpt.total_pnl,
-                                        dd=rpt.max_drawdown,
-                                        trades=rpt.trades,
-                                        cagr=rpt.cagr,
-                                        equity_end=rpt.equity_end,
-                                        avg_fee_bps=rpt.avg_fee_bps,
-                                        rsi_period=rsi_period,
-                                        entry_low=entry_low,
-                                        exit_low=exit_low,
-                                    ))
-    return out
-
-
-def choose_best(results: List[Result], dd_cap: float | None,
-                lam: float) -> Tuple[Result, List[Result]]:
-    # Filter by drawdown cap if provided
-    filt = [r for r in results if dd_cap is None or r.dd <= dd_cap]
-    if not filt:
-        # If nothing passes, pick best score without cap
-        filt = results
-    # Score: pnl - lam * dd
-    scored = sorted(filt, key=lambda r: (r.pnl - lam * r.dd, r.pnl), reverse=True)
-    top = scored[0]
-    # Return also full ranked list for inspection/export
-    return top, scored
-
-
-def pareto_frontier(results: List[Result]) -> List[Result]:
-    """Compute Pareto frontier maximizing pnl and minimizing dd.
-
-    Returns results sorted by dd ascending, keeping only non-dominated points.
-    """
-    if not results:
-        return []
-    arr = sorted(results, key=lambda r: (r.dd, -r.pnl))
-    frontier: List[Result] = []
-    best_pnl = float("-inf")
-    for r in arr:
-        if r.pnl > best_pnl:
-            frontier.append(r)
-            best_pnl = r.pnl
-    return frontier
+from qryptify.shared.profiling import add_profile_args
+from qryptify.shared.profiling import current
+from qryptify.shared.profiling import profiled
+
+from .cache import bars_fingerprint
+from .cache import ResultCache
+from .candidates import eval_grid  # noqa: F401  (re-exported for callers)
+from .candidates import iter_candidates
+from .candidates import iter_results
+from .candidates import Result
+from .journal import new_run_id
+from .journal import PairState
+from .journal import RunJournal
+from .loader import load_bars
+from .models import AbortRules
+from .models import Bar
+from .pareto import DEFAULT_OBJECTIVES
+from .pareto import OBJECTIVES
+from .pareto import parse_objectives
+from .prefetch import prefetch
+from .prefetch import RepoPool
+from .search import Rung
+from .search import successive_halving
+from .sink import choose_best  # noqa: F401  (re-exported for callers)
+from .sink import frontier_fields
+from .sink import frontier_row
+from .sink import FullGridWriter
+from .sink import PairSink
+from .sink import sweep_unpruned
+from .sink import pareto_frontier  # noqa: F401
+from .space import legacy_space
+from .space import parse_space
+from .space import sample
+from .space import SAMPLERS
+from .space import SearchSpace
+from .walkforward import markdown as wf_markdown
+from .walkforward import walk_forward
+from .walkforward import WalkForwardReport
+from .walkforward import WFSettings
+from .walkforward import write_report as write_wf_report
 
 
 def _build_backtest_cmd(symbol: str, interval: str, best: Result, lookback: int) -> str:
@@ -252,11 +100,188 @@ def _build_backtest_cmd(symbol: str, interval: str, best: Result, lookback: int)
                 base.append(f"--rsi-exit {kv['xL']}")
             if "ema" in kv:
                 base.append(f"--rsi-ema {kv['ema']}")
+        if "trail" in kv:
+            base.append(f"--atr-trail {kv['trail']}")
+        if "trig" in kv:
+            base.append(f"--atr-trail-trigger {kv['trig']}")
     except Exception:
         pass
     return " ".join(base)
 
 
+# Options that belong to the invocation, not to the journaled run
+_RUN_LOCAL_ARGS = {"resume", "runs_dir", "profile", "profile_out", "prefetch"}
+
+
+def _print_rung(rung: Rung) -> None:
+    print(f"  rung {rung.index}: {rung.evaluated} candidates x {rung.window} bars "
+          f"-> keep {rung.kept}")
+
+
+def _taker_fee_bps(symbol: str) -> float:
+    """Fixed taker fee bps for the symbol via the API (fallback 4.0 bps)."""
+    try:
+        _, taker_bps = binance_futures_fee_bps(symbol)
+        return float(taker_bps)
+    except Exception:
+        return 4.0
+
+
+def _load_span(repo, symbol: str, interval: str, first: datetime, last: datetime) -> List[Bar]:
+    """Reload exactly the bars whose open times span [first, last]."""
+    return load_bars(repo,
+                     symbol,
+                     interval,
+                     start=first,
+                     end=last + parse_interval(interval) - timedelta(microseconds=1))
+
+
+@dataclass
+class _PairInputs:
+    bars: List[Bar]
+    fee_bps: float
+    resumed: bool = False  # bars and fee are the journaled ones
+    changed: bool = False  # journaled bars no longer match the store
+
+
+def _load_pair(pool: RepoPool, symbol: str, interval: str, lookback: int,
+               state: Optional[PairState]) -> _PairInputs:
+    """Bars and taker fee for one pair (a prefetch task; runs off the main thread)."""
+    prof = current()
+    resumed = bool(state and state.info)
+    changed = False
+    with pool.acquire() as repo:
+        if state is not None and resumed:
+            # Reload exactly the bars the journaled cells were run on
+            bars = _load_span(repo, symbol, interval,
+                              datetime.fromisoformat(state.info["first_ts"]),
+                              datetime.fromisoformat(state.info["last_ts"]))
+            if bars_fingerprint(bars) != state.info["bars_fp"]:
+                resumed, changed = False, True
+                bars = load_bars(repo, symbol, interval, lookback=lookback)
+        else:
+            bars = load_bars(repo, symbol, interval, lookback=lookback)
+    if state is not None and resumed:
+        return _PairInputs(bars, float(state.info["fee_bps"]), resumed=True)
+    with prof.phase("fee_api"):
+        fee_bps_val = _taker_fee_bps(symbol)
+    return _PairInputs(bars, fee_bps_val, changed=changed)
+
+
+def _enqueue_pairs(repo_cfg: dict, run_id: str, pair_specs: List[Tuple[str, str]],
+                   lookback: int, make_candidates, meta: dict, poll_s: float,
+                   depth: int):
+    """Coordinator: queue each pair's cells (once per run id), then wait for workers."""
+    from qryptify.data.timescale import TimescaleRepo
+
+    from .jobqueue import format_progress
+    from .jobqueue import JobQueue
+    from .jobqueue import PairInfo
+
+    queue = JobQueue.connect(repo_cfg["db"]["dsn"])
+    if not queue.create_run(run_id, meta):
+        print(f"Run {run_id} already queued: re-attaching (cells keep their original "
+              "arguments)")
+    todo = [(s, i) for s, i in pair_specs if not queue.has_pair(run_id, f"{s}/{i}")]
+    with RepoPool(lambda: TimescaleRepo.from_cfg(repo_cfg), max(1, depth)) as pool:
+        for (symbol, interval), fut in prefetch(
+                todo, lambda spec: _load_pair(pool, spec[0], spec[1], lookback, None), depth):
+            pair_key = f"{symbol}/{interval}"
+            inputs = fut.result()
+            bars = inputs.bars
+            if not bars:
+                print(f"No bars for {pair_key}, skipping")
+                continue
+            n = queue.enqueue(
+                PairInfo(run_id, pair_key, symbol, interval, bars[0].ts, bars[-1].ts,
+                         len(bars), bars_fingerprint(bars), inputs.fee_bps),
+                make_candidates())
+            print(f"Queued {n:,} cells for {pair_key} ({len(bars):,} bars)")
+    print(f"Run {run_id}: waiting for workers "
+          f"(qryptify-optimize --worker --run-id {run_id}; qryptify-queue progress {run_id})")
+    total = queue.wait(run_id, poll_s, lambda p: print(f"  {format_progress(p)}"))
+    if total.failed:
+        print(f"{total.failed:,} cells failed (qryptify-queue retry {run_id} to requeue)")
+    return queue
+
+
+def _run_worker(args: argparse.Namespace) -> None:
+    from qryptify.data.timescale import TimescaleRepo
+
+    from .jobqueue import BarStore
+    from .jobqueue import default_worker_id
+    from .jobqueue import JobQueue
+    from .jobqueue import PairInfo
+    from .jobqueue import run_worker
+
+    repo_cfg = load_cfg()
+    repo = TimescaleRepo.from_cfg(repo_cfg)
+    repo.connect()
+
+    def load(info: PairInfo) -> List[Bar]:
+        print(f"  loading {info.n_bars:,} bars for {info.pair}")
+        return _load_span(repo, info.symbol, info.interval, info.first_ts, info.last_ts)
+
+    cache = ResultCache(args.cache, args.cache_max_entries) if args.cache else None
+    worker_id = default_worker_id()
+    print(f"Worker {worker_id}: claiming batches of {args.batch_size} "
+          f"(lease {args.lease_seconds:.0f}s)")
+    try:
+        with JobQueue.connect(repo_cfg["db"]["dsn"]) as queue:
+            n = run_worker(queue,
+                           BarStore(load),
+                           worker_id=worker_id,
+                           batch=args.batch_size,
+                           lease_s=args.lease_seconds,
+                           max_attempts=args.max_attempts,
+                           run_id=args.run_id or None,
+                           idle_exit=args.idle_exit,
+                           cache=cache,
+                           on_batch=lambda pair, k: print(f"  {pair}: {k} cells"))
+    finally:
+        repo.close()
+        if cache is not None:
+            cache.close()
+    print(f"Worker {worker_id}: {n:,} cells done")
+
+
+def _walk_forward_outputs(wf: WalkForwardReport, wf_dir: str, md_lines: List[str],
+                          rows_out: List[dict]) -> None:
+    picks = [w for w in wf.windows if w.is_result is not None]
+    print(f"\nWalk-forward done for {wf.symbol} {wf.interval} ({len(wf.windows)} windows)")
+    for w in wf.windows:
+        r, o = w.is_result, w.oos
+        print(f"  window {w.window.index} OOS {w.oos_from:%Y-%m-%d %H:%M} -> "
+              f"{w.oos_to:%Y-%m-%d %H:%M}: " +
+              (f"strat={r.strategy} params={r.params} risk={r.risk} atr={r.atr_mult} "
+               f"is_pnl={r.pnl:.2f} oos_pnl={o.total_pnl:.2f} eq={w.equity_end:.2f}"
+               if r is not None and o is not None else "no pick"))
+    print(f"Stitched OOS: pnl={wf.end_equity - wf.start_equity:.2f} "
+          f"dd={wf.max_drawdown:.0f} trades={wf.trades} eq={wf.end_equity:.2f}")
+    wpath, epath = write_wf_report(wf, wf_dir)
+    print(f"Saved walk-forward windows to {wpath} and stitched equity to {epath}")
+    md_lines.extend(wf_markdown(wf))
+    if not picks:
+        return
+    # The latest window's pick is the config to run going forward
+    last = picks[-1].is_result
+    assert last is not None
+    rows_out.append({
+        "symbol": wf.symbol,
+        "interval": wf.interval,
+        "strategy": last.strategy,
+        "params": last.params,
+        "risk": last.risk,
+        "atr_mult": last.atr_mult,
+        "pnl": round(last.pnl, 2),
+        "max_dd": round(last.dd, 2),
+        "trades": last.trades,
+        "equity_end": round(last.equity_end, 2),
+        "cagr": round((last.cagr or 0.0) * 100, 2),
+        "avg_fee_bps": round((last.avg_fee_bps or 0.0), 4),
+    })
+
+
 def main() -> None:
     try:
         setup_logging("INFO")
@@ -295,6 +320,131 @@ def main() -> None:
                    default=3000.0,
                    help="Max drawdown cap (quote currency), 0 to disable")
     p.add_argument("--lam", type=float, default=0.5, help="Score lambda: pnl - lam*dd")
+    p.add_argument(
+        "--search",
+        choices=["grid", "halving"],
+        default="grid",
+        help="grid: backtest every candidate on all bars; halving: successive halving "
+        "on growing recent windows, only survivors see the full window",
+    )
+    p.add_argument("--eta",
+                   type=int,
+                   default=3,
+                   help="Halving: keep 1/eta of candidates per rung, windows grow by eta")
+    p.add_argument("--min-window",
+                   type=int,
+                   default=1000,
+                   help="Halving: bars in the shortest (first) rung window, at least")
+    p.add_argument(
+        "--wf-window",
+        type=int,
+        default=0,
+        help="Walk-forward: in-sample bars per window (0 disables); each window's pick "
+        "trades the next --wf-step bars out of sample",
+    )
+    p.add_argument("--wf-step",
+                   type=int,
+                   default=0,
+                   help="Walk-forward: out-of-sample bars per window and the window "
+                   "advance (default: wf-window/4)")
+    p.add_argument("--wf-anchored",
+                   action="store_true",
+                   help="Walk-forward: keep every in-sample window starting at the first bar")
+    p.add_argument("--wf-dir",
+                   default="reports/walkforward",
+                   help="Walk-forward: directory for per-window and stitched equity CSVs")
+    p.add_argument("--workers",
+                   type=int,
+                   default=0,
+                   help="Walk-forward: processes evaluating windows (0: one per CPU)")
+    p.add_argument(
+        "--sampler",
+        choices=list(SAMPLERS),
+        default=None,
+        help="Candidate sampler: grid (exhaustive), random or lhs (Latin hypercube); "
+        "defaults to search_space.sampler or grid",
+    )
+    p.add_argument("--budget",
+                   type=int,
+                   default=None,
+                   help="Candidates to draw for random/lhs (caps grid when > 0)")
+    p.add_argument("--seed", type=int, default=None, help="Sampler seed (random/lhs)")
+    p.add_argument(
+        "--cache",
+        default="",
+        help="SQLite result cache path; reruns skip cells already evaluated on the same "
+        "bars/params/risk/engine (see qryptify-cache)",
+    )
+    p.add_argument("--cache-max-entries",
+                   type=int,
+                   default=1_000_000,
+                   help="Evict least-recently-used cache entries beyond this count")
+    p.add_argument("--runs-dir",
+                   default="reports/runs",
+                   help="Directory holding per-run journals (<runs-dir>/<run-id>/)")
+    p.add_argument("--run-id", default="", help="Name for this run (default: UTC timestamp)")
+    p.add_argument(
+        "--resume",
+        default="",
+        metavar="RUN_ID",
+        help="Resume a journaled run with its original arguments/config: finished pairs "
+        "and cells are reused, outputs are rebuilt",
+    )
+    p.add_argument("--no-journal", action="store_true", help="Do not write a run journal")
+    p.add_argument(
+        "--coordinator",
+        action="store_true",
+        help="Queue every cell in the Postgres job queue (optimizer_jobs), wait for "
+        "--worker processes to drain it, then rank and write outputs as usual",
+    )
+    p.add_argument(
+        "--worker",
+        action="store_true",
+        help="Claim and run queued cells from any host with DB access (all runs, or "
+        "only --run-id)",
+    )
+    p.add_argument("--batch-size", type=int, default=50, help="Queue: cells per claim")
+    p.add_argument("--lease-seconds",
+                   type=float,
+                   default=300.0,
+                   help="Queue: claimed cells go back to other workers when the lease "
+                   "expires (renewed while the worker is busy)")
+    p.add_argument("--max-attempts",
+                   type=int,
+                   default=3,
+                   help="Queue: claims per cell before it is marked failed")
+    p.add_argument("--idle-exit",
+                   type=float,
+                   default=0.0,
+                   help="Worker: exit after this many seconds without work (0: never)")
+    p.add_argument("--poll-seconds",
+                   type=float,
+                   default=5.0,
+                   help="Coordinator: progress polling interval")
+    p.add_argument(
+        "--prefetch",
+        type=int,
+        default=2,
+        help="Load bars and fees for up to N upcoming pairs in background threads while "
+        "the current pair is evaluated, over a pool of N DB connections (0: load inline)",
+    )
+    p.add_argument(
+        "--no-prune",
+        action="store_true",
+        help="Run every backtest to the last bar instead of aborting at --dd-cap",
+    )
+    p.add_argument("--prune-equity-floor",
+                   type=float,
+                   default=0.0,
+                   help="Abort a backtest once equity falls to this level (0 disables)")
+    p.add_argument("--prune-min-trades",
+                   type=int,
+                   default=0,
+                   help="Abort a backtest with fewer trades than this by --prune-by-bar")
+    p.add_argument("--prune-by-bar",
+                   type=int,
+                   default=0,
+                   help="Bar index at which --prune-min-trades is checked")
     p.add_argument(
         "--out",
         default="reports/optimizer_results.csv",
@@ -316,19 +466,44 @@ def main() -> None:
         default="",
         help="If set, writes Pareto frontier CSV per pair into this directory",
     )
+    p.add_argument(
+        "--pareto-objectives",
+        default=DEFAULT_OBJECTIVES,
+        help=("Comma list of frontier objectives from "
+              f"{','.join(OBJECTIVES)}; prefix +/- to force maximize/minimize"),
+    )
     p.add_argument(
         "--md-out",
         default="reports/optimizer_summary.md",
         help="Markdown summary path with per-pair bests and top-K tables",
     )
+    add_profile_args(p)
     args = p.parse_args()
 
-    # Load optional YAML config
+    with profiled(args.profile, args.profile_out):
+        _run(args)
+
+
+def _run(args: argparse.Namespace) -> None:
+    prof = current()
+
+    # Load optional YAML config; a resumed run replays its recorded args/config
     cfg: dict = {}
-    if args.config:
+    journal: Optional[RunJournal] = None
+    if args.resume:
+        journal = RunJournal.open(args.runs_dir, args.resume)
+        for k, v in journal.meta["args"].items():
+            if k not in _RUN_LOCAL_ARGS:
+                setattr(args, k, v)
+        cfg = journal.meta.get("cfg") or {}
+    elif args.config:
         with open(args.config, "r") as f:
             cfg = yaml.safe_load(f) or {}
 
+    if args.worker:
+        _run_worker(args)
+        return
+
     # Resolve pairs: CLI > config.pairs
     pair_specs: List[Tuple[str, str]] = []
     if args.pairs:
@@ -391,54 +566,224 @@ def main() -> None:
     dd_cap = None if dd_cap and float(dd_cap) <= 0 else float(dd_cap)
     lam = float(cfg.get("lam", args.lam))
     top_k = int(cfg.get("top_k", args.top_k))
+    search = str(cfg.get("search", args.search))
+    if search not in ("grid", "halving"):
+        raise SystemExit(f"Unknown search mode: {search}")
+    eta = int(cfg.get("eta", args.eta))
+    min_window = int(cfg.get("min_window", args.min_window))
+    wf_window = int(cfg.get("wf_window", args.wf_window))
+    wf_step = int(cfg.get("wf_step", args.wf_step)) or max(1, wf_window // 4)
+    wf_anchored = bool(cfg.get("wf_anchored", args.wf_anchored))
+    wf_dir = str(cfg.get("wf_dir", args.wf_dir))
+    workers = int(cfg.get("workers", args.workers))
+    depth = max(0, int(cfg.get("prefetch", args.prefetch)))
+    # Candidates: YAML search_space, else the CLI grid; the exhaustive CLI grid
+    # keeps its historical order
+    space: Optional[SearchSpace] = None
+    if cfg.get("search_space"):
+        space = parse_space(cfg["search_space"])
+    elif args.sampler not in (None, "grid"):
+        space = legacy_space(strategy_list, fast_opts, slow_opts, risk_opts, atr_opts)
+    sampler = args.sampler or (space.sampler if space else "grid")
+    budget = args.budget if args.budget is not None else (space.budget if space else 0)
+    seed = args.seed if args.seed is not None else (space.seed if space else 0)
+    if space is not None:
+        size = space.size
+        print(f"Search space: {'continuous' if size is None else f'{size:,} points'} "
+              f"(before constraints), sampler={sampler}, budget={budget or 'all'}")
+
+    def make_candidates():
+        if space is None:
+            return iter_candidates(strategy_list, fast_opts, slow_opts, risk_opts, atr_opts)
+        return sample(space, sampler, budget, seed)
+
+    # Early abort: configs past the DD cap can never be chosen, stop them early
+    abort: Optional[AbortRules] = None
+    if not (args.no_prune or cfg.get("prune") is False):
+        abort = AbortRules(
+            max_drawdown=dd_cap or 0.0,
+            equity_floor=float(cfg.get("prune_equity_floor", args.prune_equity_floor)),
+            min_trades=int(cfg.get("prune_min_trades", args.prune_min_trades)),
+            min_trades_by_bar=int(cfg.get("prune_by_bar", args.prune_by_bar)),
+        )
 
     # Outputs
     out_path = cfg.get("out", args.out)
     full_out = cfg.get("full_out", args.full_out)
     pareto_dir = cfg.get("pareto_dir", args.pareto_dir)
+    try:
+        objectives = parse_objectives(cfg.get("pareto_objectives", args.pareto_objectives))
+    except ValueError as e:
+        raise SystemExit(str(e))
     # Normalize md_out from config/CLI for downstream write below
     args.md_out = cfg.get("md_out", args.md_out)
 
     from qryptify.data.timescale import TimescaleRepo
-    dsn = load_cfg_dsn()
+    repo_cfg = load_cfg()
 
     import csv
     import os
     rows_out: List[dict] = []
     md_lines: List[str] = ["# Optimizer Summary\n"]
-    # Keep all results per pair to avoid recomputing for --full-out later
-    all_results: List[Tuple[str, str, List[Result]]] = []
-
-    for symbol, interval in pair_specs:
-        repo = TimescaleRepo(dsn)
-        repo.connect()
-        try:
-            rows = repo.fetch_latest_n(symbol, interval, lookback)
-        finally:
-            repo.close()
-        bars = build_bars(rows)
-
-        # Resolve fixed taker fee bps for this symbol via API (fallback 4.0 bps)
-        try:
-            _, taker_bps = binance_futures_fee_bps(symbol)
-            fee_bps_val = float(taker_bps)
-        except Exception:
-            fee_bps_val = 4.0
-
-        try:
-            results = eval_grid(symbol, interval, bars, strategy_list, fast_opts,
-                                slow_opts, risk_opts, atr_opts, fee_bps_val)
-        except Exception as e:
-            print(f"\nSkipping {symbol} {interval}: {e}")
-            continue
-        if not results:
+    # Every result streams to the full-grid CSV; per pair only top-K and the
+    # Pareto frontier are kept
+    grid_writer = FullGridWriter(full_out) if full_out else None
+    cache_path = cfg.get("cache", args.cache)
+    cache = (ResultCache(cache_path, int(cfg.get("cache_max_entries",
+                                                 args.cache_max_entries)))
+             if cache_path else None)
+
+    if wf_window and journal is not None:
+        raise SystemExit("Walk-forward runs are not journaled and cannot be resumed")
+    if args.coordinator and (journal is not None or wf_window or search != "grid"):
+        raise SystemExit("--coordinator runs the grid search only, without journal/resume "
+                         "or walk-forward")
+    queue = None
+    queue_run = args.run_id or new_run_id()
+    if args.coordinator:
+        queue = _enqueue_pairs(repo_cfg, queue_run, pair_specs, lookback, make_candidates, {
+            "args": vars(args),
+            "cfg": cfg,
+            "abort": asdict(abort) if abort is not None else None,
+        }, args.poll_seconds, depth)
+    elif journal is None and not args.no_journal and not wf_window:
+        journal = RunJournal.create(args.runs_dir, args.run_id or new_run_id(), {
+            "args": vars(args),
+            "cfg": cfg,
+        })
+    if journal is not None:
+        print(f"Run {journal.run_id}: journal in {journal.run_dir} "
+              f"(resume with --resume {journal.run_id})")
+
+    # Pairs that still need bars load ahead of the loop on a shared connection pool
+    states = {
+        f"{s}/{i}": journal.state(f"{s}/{i}") if journal is not None else None
+        for s, i in pair_specs
+    }
+
+    def load(spec: Tuple[str, str]) -> Optional[_PairInputs]:
+        state = states[f"{spec[0]}/{spec[1]}"]
+        if queue is not None or (state is not None and state.done):
+            return None
+        return _load_pair(pool, spec[0], spec[1], lookback, state)
+
+    pool = RepoPool(lambda: TimescaleRepo.from_cfg(repo_cfg), max(1, depth))
+    pairs = prefetch(pair_specs, load, depth)
+    for (symbol, interval), fut in pairs:
+        pair_key = f"{symbol}/{interval}"
+        state = states[pair_key]
+        sink = PairSink(lam, dd_cap, top_k,
+                        grid_writer.writer_for(symbol, interval) if grid_writer else None,
+                        objectives)
+        if queue is not None:
+            for r in queue.results(queue_run, pair_key):
+                sink.add(r)
+            print(f"\nCollected {pair_key}: {sink.count} results from queue run {queue_run}")
+        elif state is not None and state.done:
+            for r in state.final_results():
+                sink.add(r)
+            print(f"\nResumed {pair_key}: {sink.count} results from the journal")
+        else:
+            with prof.phase("prefetch_wait"):
+                inputs = fut.result()
+            assert inputs is not None
+            bars, fee_bps_val = inputs.bars, inputs.fee_bps
+            if inputs.changed:
+                print(f"\n{pair_key}: stored bars changed since the journaled run, "
+                      "re-running the pair")
+            if inputs.resumed:
+                assert state is not None
+                n_done = sum(len(c) for c in state.cells.values())
+                print(f"\nResuming {pair_key}: {n_done} cells from the journal")
+            elif journal is not None and bars:
+                journal.start_pair(
+                    pair_key, {
+                        "fee_bps": fee_bps_val,
+                        "n_bars": len(bars),
+                        "first_ts": bars[0].ts.isoformat(),
+                        "last_ts": bars[-1].ts.isoformat(),
+                        "bars_fp": bars_fingerprint(bars),
+                    })
+            if wf_window:
+                try:
+                    with prof.phase("backtest"):
+                        wf = walk_forward(symbol,
+                                          interval,
+                                          bars,
+                                          list(make_candidates()),
+                                          fee_bps_val,
+                                          WFSettings(lam, dd_cap, search, eta, min_window,
+                                                     abort, cache_path or None),
+                                          window=wf_window,
+                                          step=wf_step,
+                                          anchored=wf_anchored,
+                                          workers=workers or os.cpu_count() or 1)
+                except Exception as e:
+                    print(f"\nSkipping {symbol} {interval}: {e}")
+                    continue
+                with prof.phase("output"):
+                    _walk_forward_outputs(wf, wf_dir, md_lines, rows_out)
+                continue
+            log = journal.log(pair_key) if journal is not None else None
+
+            def sweep(sink: PairSink, abort: Optional[AbortRules]) -> Tuple[int, int]:
+                """Run the search into `sink`; returns (backtests, bars) it ran."""
+                if search == "halving":
+                    results, rungs = successive_halving(
+                        symbol,
+                        interval,
+                        bars,
+                        make_candidates(),
+                        fee_bps_val,
+                        lam=lam,
+                        eta=eta,
+                        min_window=min_window,
+                        abort=abort,
+                        on_rung=_print_rung,
+                        cache=cache,
+                        log=log,
+                    )
+                    for r in results:
+                        sink.add(r)
+                    return sum(r.evaluated for r in rungs), sum(r.bars for r in rungs)
+                for r in iter_results(symbol, interval, bars, make_candidates(), fee_bps_val,
+                                      abort, cache, log):
+                    sink.add(r)
+                return sink.count, sink.bars
+
+            on_result = sink.on_result
+            try:
+                with prof.phase("backtest"):
+                    # An all-pruned pass is re-run as with --no-prune; only the kept
+                    # pass reaches --full-out and the counts
+                    sink, work, fell_back = sweep_unpruned(
+                        lambda hold: PairSink(lam, dd_cap, top_k, on_result, objectives,
+                                              hold_pruned=hold), sweep, abort)
+                if fell_back:
+                    print(f"\n{pair_key}: every result was pruned, re-ran without early abort")
+                prof.count("backtests", work[0])
+                prof.count("bars", work[1])
+                prof.count("pruned", sink.pruned)
+                if cache is not None:
+                    cache.flush()
+                if journal is not None and sink.count:
+                    journal.finish_pair(pair_key, len(bars))
+            except Exception as e:
+                print(f"\nSkipping {symbol} {interval}: {e}")
+                continue
+        if not sink.count:
             print(f"\nNo results for {symbol} {interval} (check data or grids)")
             continue
-        # Save for potential full-grid export without recomputation
-        all_results.append((symbol, interval, results))
-        best, ranked = choose_best(results, dd_cap, lam)
-
-        print(f"\nSweep done for {symbol} {interval}")
+        if sink.all_pruned:
+            print(f"\n{pair_key}: every result was pruned; ranking by metrics over the "
+                  "bars each run covered (re-run with --no-prune to rank full runs)")
+        with prof.phase("rank"):
+            ranked = sink.ranked()
+            best = ranked[0]
+
+        print(f"\nSweep done for {symbol} {interval} "
+              f"({sink.count} {'finalists' if search == 'halving' else 'backtests'}, "
+              f"{sink.pruned} pruned early)")
         print("Top by score (pnl - lam*dd):")
         for r in ranked[:max(1, top_k)]:
             print(
@@ -486,112 +831,67 @@ def main() -> None:
             "avg_fee_bps": round((best.avg_fee_bps or 0.0), 4),
         })
 
-        # Pareto frontier per pair
-        if pareto_dir:
-            outdir = Path(pareto_dir)
-            outdir.mkdir(parents=True, exist_ok=True)
-            fname = f"pareto_{symbol}_{interval.replace('/', '_')}.csv"
-            ppath = outdir / fname
-            frontier = pareto_frontier(results)
-            with ppath.open("w", newline="") as f:
-                writer = csv.DictWriter(
-                    f,
-                    fieldnames=[
-                        "strategy",
-                        "params",
-                        "risk",
-                        "atr_mult",
-                        "pnl",
-                        "dd",
-                        "trades",
-                        "equity_end",
-                        "cagr",
-                        "avg_fee_bps",
-                    ],
-                )
-                writer.writeheader()
-                for r in frontier:
-                    writer.writerow({
-                        "strategy": r.strategy,
-                        "params": r.params,
-                        "risk": r.risk,
-                        "atr_mult": r.atr_mult,
-                        "pnl": round(r.pnl, 2),
-                        "dd": round(r.dd, 2),
-                        "trades": r.trades,
-                        "equity_end": round(r.equity_end, 2),
-                        "cagr": round((r.cagr or 0.0) * 100, 2),
-                        "avg_fee_bps": round((r.avg_fee_bps or 0.0), 4),
-                    })
-            print(f"Saved Pareto frontier to {ppath}")
-
-    # Write CSV
-    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
-    with open(out_path, "w", newline="") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=[
-                "symbol",
-                "interval",
-                "strategy",
-                "params",
-                "risk",
-                "atr_mult",
-                "pnl",
-                "max_dd",
-                "trades",
-                "equity_end",
-                "cagr",
-                "avg_fee_bps",
-            ],
-        )
-        writer.writeheader()
-        writer.writerows(rows_out)
-    print(f"\nSaved results to {out_path}")
-
-    # Optional full grid CSV
-    if full_out:
-        os.makedirs(os.path.dirname(full_out) or ".", exist_ok=True)
-        with open(full_out, "w", newline="") as f:
-            fieldnames = [
-                "symbol",
-                "interval",
-                "strategy",
-                "params",
-                "risk",
-                "atr_mult",
-                "pnl",
-                "dd",
-                "trades",
-                "equity_end",
-                "cagr",
-                "avg_fee_bps",
-            ]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+        with prof.phase("output"):
+            # Pareto frontier per pair
+            if pareto_dir:
+                outdir = Path(pareto_dir)
+                outdir.mkdir(parents=True, exist_ok=True)
+                fname = f"pareto_{symbol}_{interval.replace('/', '_')}.csv"
+                ppath = outdir / fname
+                frontier = sink.frontier.points()
+                with ppath.open("w", newline="") as f:
+                    writer = csv.DictWriter(f, fieldnames=frontier_fields(objectives))
+                    writer.writeheader()
+                    for r in frontier:
+                        writer.writerow(frontier_row(r))
+                print(f"Saved Pareto frontier to {ppath}")
+
+    pairs.close()
+    pool.close()
+    if journal is not None:
+        journal.close()
+    if queue is not None:
+        queue.close()
+    if cache is not None:
+        cache.close()
+        prof.count("cache_hits", cache.stats.hits)
+        print(f"\nResult cache {cache_path}: {cache.stats}")
+
+    with prof.phase("output"):
+        # Write CSV
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        with open(out_path, "w", newline="") as f:
+            writer = csv.DictWriter(
+                f,
+                fieldnames=[
+                    "symbol",
+                    "interval",
+                    "strategy",
+                    "params",
+                    "risk",
+                    "atr_mult",
+                    "pnl",
+                    "max_dd",
+                    "trades",
+                    "equity_end",
+                    "cagr",
+                    "avg_fee_bps",
+                ],
+            )
             writer.writeheader()
-            for symbol, interval, res in all_results:
-                for r in res:
-                    writer.writerow({
-                        "symbol": symbol,
-                        "interval": interval,
-                        "strategy": r.strategy,
-                        "params": r.params,
-                        "risk": r.risk,
-                        "atr_mult": r.atr_mult,
-                        "pnl": round(r.pnl, 2),
-                        "dd": round(r.dd, 2),
-                        "trades": r.trades,
-                        "equity_end": round(r.equity_end, 2),
-                        "cagr": round((r.cagr or 0.0) * 100, 2),
-                        "avg_fee_bps": round((r.avg_fee_bps or 0.0), 4),
-                    })
-        print(f"Saved full grid to {full_out}")
-
-    # Write Markdown summary
-    md_path = Path(args.md_out)
-    md_path.parent.mkdir(parents=True, exist_ok=True)
-    md_path.write_text("\n".join(md_lines) + "\n")
-    print(f"Saved summary to {md_path}")
+            writer.writerows(rows_out)
+        print(f"\nSaved results to {out_path}")
+
+        # Full grid CSV was streamed while sweeping
+        if grid_writer is not None:
+            grid_writer.close()
+            print(f"Saved full grid ({grid_writer.rows:,} rows) to {full_out}")
+
+        # Write Markdown summary
+        md_path = Path(args.md_out)
+        md_path.parent.mkdir(parents=True, exist_ok=True)
+        md_path.write_text("\n".join(md_lines) + "\n")
+        print(f"Saved summary to {md_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,857 @@
+"""Paper trading on the live closed-kline stream.
+
+A `PaperInstance` runs one strategy on one pair bar by bar with the fills,
+sizing and stops of `backtest`: a signal on a bar fills at the next bar's
+open, stops are trailed and checked against every bar and may gap. Over the
+same bars an instance makes exactly the backtester's trades (without the
+end-of-data close).
+
+What the backtester keeps in memory goes to the `orders` and `trades` tables
+of sql/002_strategy.sql. A signal is recorded as soon as its bar closes, as
+NEW orders priced at the close (an entry is sized off mark-to-market equity
+at that point); the next bar fills them at its open (PAPER_FILLED, with the
+actual qty and price, plus a `trades` row) or rejects an entry that no longer
+sizes. Stop exits are recorded already filled. Order ids are reserved from
+the `orders` sequence in blocks, so rows are built without a round trip.
+
+`PaperEngine` routes each closed bar to the instances on its pair and
+collects their rows into a `PaperBatch`. `run_paper` consumes a stream of
+closed bars and hands batches to one writer task, which merges whatever has
+queued up while the previous write was in flight and commits it in one
+pipelined transaction. With 100+ instances the strategy step takes well
+under a millisecond; the rest of the bar-to-commit latency is the write.
+Bars come from the exchange stream, or with `--source db` from the DB as
+the live ingestor announces them (qryptify/data/notify.py).
+
+    qryptify-paper --pairs BTCUSDT/1m,ETHUSDT/1m --strategies ema,bollinger,rsi \\
+      --state reports/paper_state.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import replace
+from datetime import datetime
+import itertools
+import json
+import os
+import threading
+import time
+from typing import (AsyncIterable, AsyncIterator, Callable, Deque, Dict, Iterable, List,
+                    Optional, Protocol, Sequence, Tuple, TYPE_CHECKING)
+
+from qryptify.data.rollups import BASE_INTERVAL
+from qryptify.data.rollups import ROLLUP_INTERVALS
+from qryptify.shared.config_model import ingest_mode
+from qryptify.shared.intervals import parse_interval
+from qryptify.shared.pairs import parse_pair
+from qryptify.shared.pairs import symbol_interval_pairs_from_cfg
+from qryptify.shared.profiling import add_profile_args
+from qryptify.shared.profiling import current
+from qryptify.shared.profiling import profiled
+
+from .backtest import add_risk_args
+from .backtest import add_strategy_args
+from .backtest import fee_bps_from_args
+from .backtest import risk_from_args
+from .backtest import strategy_from_args
+from .backtester import _act_on_signal
+from .backtester import _close_position
+from .backtester import _floor_to_step
+from .backtester import _sign
+from .backtester import _trail_and_stop
+from .backtester import BacktestState
+from .backtester import ENGINE_VERSION
+from .backtester import EngineSnapshot
+from .backtester import required_warmup
+from .backtester import run_config
+from .backtester import SIDE_BUY
+from .backtester import SIDE_SELL
+from .backtester import snapshot_from_json
+from .backtester import snapshot_to_json
+from .backtester import TradeTotals
+from .indicators import true_range
+from .indicators import WilderATR
+from .loader import build_bars
+from .loader import load_bars
+from .models import Bar
+from .models import RiskParams
+from .models import Signal
+from .models import Trade
+from .snapshots import config_key
+from .strategy_base import Strategy
+
+if TYPE_CHECKING:
+    import psycopg
+
+    from qryptify.data.notify import BarEvent
+
+NEW = "NEW"
+PAPER_FILLED = "PAPER_FILLED"
+REJECTED = "REJECTED"
+CANCELLED = "CANCELLED"
+SOURCE = "paper"
+
+# Keep in sync with sql/002_strategy.sql
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+  id BIGSERIAL PRIMARY KEY,
+  ts TIMESTAMPTZ NOT NULL DEFAULT now(),
+  strategy_id TEXT NOT NULL,
+  symbol TEXT NOT NULL CHECK (symbol = upper(symbol)),
+  side TEXT NOT NULL CHECK (side IN ('BUY','SELL')),
+  qty DOUBLE PRECISION NOT NULL CHECK (qty > 0),
+  price DOUBLE PRECISION NOT NULL CHECK (price > 0),
+  status TEXT NOT NULL CHECK (status IN ('NEW','FILLED','CANCELLED','REJECTED','PAPER_FILLED')) DEFAULT 'NEW',
+  source TEXT NOT NULL DEFAULT 'paper',
+  note TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_orders_strategy_ts ON orders(strategy_id, ts);
+CREATE INDEX IF NOT EXISTS idx_orders_symbol_ts ON orders(symbol, ts);
+
+CREATE TABLE IF NOT EXISTS trades (
+  id BIGSERIAL PRIMARY KEY,
+  order_id BIGINT NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+  ts TIMESTAMPTZ NOT NULL DEFAULT now(),
+  symbol TEXT NOT NULL CHECK (symbol = upper(symbol)),
+  side TEXT NOT NULL CHECK (side IN ('BUY','SELL')),
+  qty DOUBLE PRECISION NOT NULL CHECK (qty > 0),
+  price DOUBLE PRECISION NOT NULL CHECK (price > 0),
+  fee DOUBLE PRECISION NOT NULL DEFAULT 0,
+  pnl DOUBLE PRECISION NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_trades_order ON trades(order_id);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol_ts ON trades(symbol, ts);
+"""
+
+_RESERVE_SQL = ("SELECT nextval(pg_get_serial_sequence('orders', 'id')) "
+                "FROM generate_series(1, %s)")
+
+_INSERT_ORDERS_SQL = """
+INSERT INTO orders (id, ts, strategy_id, symbol, side, qty, price, status, source, note)
+SELECT v.id, v.ts, v.strategy_id, v.symbol, v.side, v.qty, v.price, v.status, %s, v.note
+FROM unnest(%s::bigint[], %s::timestamptz[], %s::text[], %s::text[], %s::text[],
+            %s::float8[], %s::float8[], %s::text[], %s::text[])
+  AS v(id, ts, strategy_id, symbol, side, qty, price, status, note)
+"""
+
+_UPDATE_ORDERS_SQL = """
+UPDATE orders o SET status = v.status, qty = v.qty, price = v.price
+FROM unnest(%s::bigint[], %s::text[], %s::float8[], %s::float8[]) AS v(id, status, qty, price)
+WHERE o.id = v.id
+"""
+
+_INSERT_TRADES_SQL = """
+INSERT INTO trades (order_id, ts, symbol, side, qty, price, fee, pnl)
+SELECT * FROM unnest(%s::bigint[], %s::timestamptz[], %s::text[], %s::text[], %s::float8[],
+                     %s::float8[], %s::float8[], %s::float8[])
+"""
+
+
+@dataclass(frozen=True)
+class OrderRow:
+    id: int
+    ts: datetime
+    strategy_id: str
+    symbol: str
+    side: str
+    qty: float
+    price: float
+    status: str
+    note: str = ""
+
+
+@dataclass(frozen=True)
+class OrderUpdate:
+    """The outcome of an order recorded NEW in an earlier batch."""
+    id: int
+    status: str
+    qty: float
+    price: float
+
+
+@dataclass(frozen=True)
+class FillRow:
+    order_id: int
+    ts: datetime
+    symbol: str
+    side: str
+    qty: float
+    price: float
+    fee: float
+    pnl: float  # net of both legs' fees on exits, 0 on entries
+
+
+@dataclass
+class PaperBatch:
+    """Rows produced by one or more closed bars, written in one transaction."""
+    received: float = 0.0  # perf_counter() when the earliest bar in the batch arrived
+    bars: int = 0
+    orders: List[OrderRow] = field(default_factory=list)
+    updates: List[OrderUpdate] = field(default_factory=list)
+    fills: List[FillRow] = field(default_factory=list)
+
+    def empty(self) -> bool:
+        return not (self.orders or self.updates or self.fills)
+
+    def merge(self, other: "PaperBatch") -> None:
+        self.received = min(self.received, other.received)
+        self.bars += other.bars
+        self.orders.extend(other.orders)
+        self.updates.extend(other.updates)
+        self.fills.extend(other.fills)
+
+
+class OrderWriter(Protocol):
+
+    def next_id(self) -> int:
+        ...
+
+    def write(self, batch: PaperBatch) -> None:
+        ...
+
+
+class PaperInstance:
+    """One strategy on one pair, trading closed bars like `backtest` does."""
+
+    __slots__ = ("strategy_id", "symbol", "interval", "strategy", "risk", "step_td", "state",
+                 "atr_calc", "i", "prev_close", "last_ts", "first_ts", "bars", "pending",
+                 "pending_atr", "pending_orders", "totals")
+
+    def __init__(self, strategy_id: str, symbol: str, interval: str, strategy: Strategy,
+                 risk: RiskParams) -> None:
+        self.strategy_id = strategy_id
+        self.symbol = symbol
+        self.interval = interval
+        self.strategy = strategy
+        self.risk = risk
+        self.step_td = parse_interval(interval)
+        self.state = BacktestState(equity=risk.start_equity, max_equity=risk.start_equity)
+        self.atr_calc = WilderATR(risk.atr_period)
+        self.i = 0
+        self.prev_close: Optional[float] = None
+        self.last_ts: Optional[datetime] = None
+        self.first_ts: Optional[datetime] = None  # first traded bar
+        self.bars = 0  # traded bars
+        self.pending: Optional[Signal] = None  # fills at the next bar's open
+        self.pending_atr: Optional[float] = None
+        self.pending_orders: Dict[str, OrderRow] = {}  # "exit"/"entry" rows recorded NEW
+        self.totals = TradeTotals()
+        strategy.on_start()
+
+    @property
+    def warmup(self) -> int:
+        return required_warmup(self.strategy, self.risk.atr_period)
+
+    def warm(self, bar: Bar) -> None:
+        """Feed a historical bar to the ATR and strategy only (no orders)."""
+        if self.last_ts is not None and bar.ts <= self.last_ts:
+            return
+        atr = self.atr_calc.update(true_range(bar.high, bar.low, self.prev_close))
+        # As in backtest(), only the last warm-up bar's signal is acted on
+        self.pending, self.pending_atr = self.strategy.on_bar(self.i, bar), atr
+        self.i += 1
+        self.prev_close = bar.close
+        self.last_ts = bar.ts
+
+    def step(self, bar: Bar, out: PaperBatch, next_id: Callable[[], int]) -> bool:
+        """Trade a closed bar, appending its rows to `out`; False for an already seen bar."""
+        if self.last_ts is not None and bar.ts <= self.last_ts:
+            return False
+        if self.first_ts is None:
+            self.first_ts = bar.ts
+        self.bars += 1
+        if self.pending is not None:
+            self._fill(bar, out, next_id)
+        atr = self.atr_calc.update(true_range(bar.high, bar.low, self.prev_close))
+        sig = self.strategy.on_bar(self.i, bar)
+        self.i += 1
+
+        st = self.state
+        if st.position_qty != 0:
+            reason, px = _trail_and_stop(st, bar, atr, self.risk)
+            if reason:
+                open_fees = st.open_fees
+                t = _close_position(st, [bar], 0, bar.ts, px, self.risk, reason)
+                self.totals.add(t)
+                self._filled(out, None, bar.ts, SIDE_SELL if t.qty > 0 else SIDE_BUY,
+                             abs(t.qty), px, t.fees - open_fees, t.pnl, reason, next_id)
+
+        if sig is not None:
+            self.pending, self.pending_atr = sig, atr
+            self._record(sig, atr, bar, out, next_id)
+        self.prev_close = bar.close
+        self.last_ts = bar.ts
+        return True
+
+    def _record(self, sig: Signal, atr: Optional[float], bar: Bar, out: PaperBatch,
+                next_id: Callable[[], int]) -> None:
+        """Record the orders `sig` will need at the next open, priced at this close."""
+        st, r = self.state, self.risk
+        desired = max(min(int(sig.target), 1), -1)
+        ts = bar.ts + self.step_td
+        note = sig.reason or "signal_exit"
+        mtm = st.equity
+        if desired != _sign(st.position_qty) and st.position_qty != 0:
+            row = OrderRow(next_id(), ts, self.strategy_id, self.symbol,
+                           SIDE_SELL if st.position_qty > 0 else SIDE_BUY,
+                           abs(st.position_qty), bar.close, NEW, note)
+            self.pending_orders["exit"] = row
+            out.orders.append(row)
+            mtm += (bar.close - (st.entry_price or bar.close)) * st.position_qty - st.open_fees
+        elif st.position_qty != 0:
+            return
+        if desired == 0 or atr is None or atr * r.atr_mult_stop <= 0:
+            return
+        qty = _floor_to_step(max(mtm * r.risk_per_trade / (atr * r.atr_mult_stop), 0.0),
+                             r.qty_step)
+        if qty <= 0 or qty < r.min_qty or qty * bar.close < r.min_notional:
+            return
+        row = OrderRow(next_id(), ts, self.strategy_id, self.symbol,
+                       SIDE_BUY if desired > 0 else SIDE_SELL, qty, bar.close, NEW,
+                       sig.reason)
+        self.pending_orders["entry"] = row
+        out.orders.append(row)
+
+    def _fill(self, bar: Bar, out: PaperBatch, next_id: Callable[[], int]) -> None:
+        """Execute the previous bar's signal at this bar's open."""
+        sig, legs = self.pending, self.pending_orders
+        assert sig is not None
+        self.pending = None
+        self.pending_orders = {}
+        st = self.state
+        open_fees = st.open_fees
+        closed: List[Trade] = []
+        _act_on_signal(st, sig, self.pending_atr, [bar], 0, bar, self.risk, closed)
+        self.pending_atr = None
+        for t in closed:
+            self.totals.add(t)
+            self._filled(out, legs.pop("exit", None), bar.ts,
+                         SIDE_SELL if t.qty > 0 else SIDE_BUY, abs(t.qty), t.exit_price,
+                         t.fees - open_fees, t.pnl, t.reason, next_id)
+        if st.position_qty != 0 and st.entry_ts == bar.ts:
+            self._filled(out, legs.pop("entry", None), bar.ts,
+                         SIDE_BUY if st.position_qty > 0 else SIDE_SELL, abs(st.position_qty),
+                         st.entry_price or bar.open, st.open_fees, 0.0, sig.reason, next_id)
+        for row in legs.values():
+            out.updates.append(OrderUpdate(row.id, REJECTED, row.qty, row.price))
+
+    def _filled(self, out: PaperBatch, row: Optional[OrderRow], ts: datetime, side: str,
+                qty: float, price: float, fee: float, pnl: float, note: str,
+                next_id: Callable[[], int]) -> None:
+        if row is None:
+            oid = next_id()
+            out.orders.append(
+                OrderRow(oid, ts, self.strategy_id, self.symbol, side, qty, price, PAPER_FILLED,
+                         note))
+        else:
+            oid = row.id
+            out.updates.append(OrderUpdate(oid, PAPER_FILLED, qty, price))
+        out.fills.append(FillRow(oid, ts, self.symbol, side, qty, price, fee, pnl))
+
+    def cancel_pending(self, out: PaperBatch) -> None:
+        """Cancel the NEW orders of the pending signal (the signal itself is kept)."""
+        for row in self.pending_orders.values():
+            out.updates.append(OrderUpdate(row.id, CANCELLED, row.qty, row.price))
+        self.pending_orders = {}
+
+    def snapshot(self) -> EngineSnapshot:
+        """The instance's state in the backtester's resumable format."""
+        if self.last_ts is None or self.prev_close is None:
+            raise ValueError(f"{self.strategy_id} has not seen a bar yet")
+        return EngineSnapshot(symbol=self.symbol,
+                              interval=self.interval,
+                              engine=ENGINE_VERSION,
+                              config=run_config(self.strategy, self.risk),
+                              first_ts=self.first_ts or self.last_ts,
+                              last_ts=self.last_ts,
+                              next_i=self.i,
+                              bars=self.bars,
+                              last_close=self.prev_close,
+                              state=replace(self.state),
+                              atr=self.atr_calc.snapshot(),
+                              strategy=self.strategy.snapshot(),
+                              pending=self.pending,
+                              pending_atr=self.pending_atr,
+                              dd_peak=None,
+                              max_dd=0.0,
+                              totals=replace(self.totals))
+
+    def restore(self, snap: EngineSnapshot) -> None:
+        """Continue from `snapshot()`; pending NEW orders are not carried over."""
+        if (snap.symbol, snap.interval) != (self.symbol, self.interval):
+            raise ValueError(f"snapshot is for {snap.symbol}/{snap.interval}, "
+                             f"not {self.symbol}/{self.interval}")
+        if snap.engine != ENGINE_VERSION:
+            raise ValueError(f"snapshot is from engine version {snap.engine}")
+        if snap.config != run_config(self.strategy, self.risk):
+            raise ValueError("snapshot was taken with different strategy/risk parameters")
+        self.strategy.restore(snap.strategy)
+        self.atr_calc.restore(snap.atr)
+        self.state = replace(snap.state)
+        self.i = snap.next_i
+        self.prev_close = snap.last_close
+        self.last_ts = snap.last_ts
+        self.first_ts = snap.first_ts
+        self.bars = snap.bars
+        self.pending, self.pending_atr = snap.pending, snap.pending_atr
+        self.pending_orders = {}
+        self.totals = replace(snap.totals)
+
+
+class PaperEngine:
+    """Routes closed bars to the instances trading their pair."""
+
+    def __init__(self, instances: Sequence[PaperInstance], next_id: Callable[[], int]) -> None:
+        self.instances = list(instances)
+        self.next_id = next_id
+        self._routes: Dict[Tuple[str, str], List[PaperInstance]] = {}
+        seen = set()
+        for inst in self.instances:
+            if inst.strategy_id in seen:
+                raise ValueError(f"duplicate strategy_id {inst.strategy_id!r}")
+            seen.add(inst.strategy_id)
+            self._routes.setdefault((inst.symbol, inst.interval), []).append(inst)
+
+    def pairs(self) -> List[Tuple[str, str]]:
+        return list(self._routes)
+
+    def on_bar(self, symbol: str, interval: str, bar: Bar, out: PaperBatch) -> int:
+        """Step every instance on (symbol, interval); returns how many traded the bar."""
+        n = 0
+        for inst in self._routes.get((symbol, interval), ()):
+            n += inst.step(bar, out, self.next_id)
+        return n
+
+    def cancel_pending(self, out: PaperBatch) -> None:
+        for inst in self.instances:
+            inst.cancel_pending(out)
+
+
+class PaperOrderWriter:
+    """Writes paper batches to `orders`/`trades`, one pipelined transaction per batch."""
+
+    def __init__(self, conn: "psycopg.Connection", id_block: int = 1024) -> None:
+        self._conn = conn
+        self.id_block = id_block
+        self._ids: Deque[int] = deque()
+        # write() runs in a worker thread; keep a refill off its open transaction
+        self._lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, dsn: str, id_block: int = 1024) -> "PaperOrderWriter":
+        import psycopg
+
+        conn = psycopg.connect(dsn, autocommit=True)
+        w = cls(conn, id_block)
+        w.ensure_schema()
+        w._reserve()
+        return w
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "PaperOrderWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def ensure_schema(self) -> None:
+        with self._conn.transaction():
+            self._conn.execute("SELECT pg_advisory_xact_lock(hashtext('paper_orders'))")
+            self._conn.execute(SCHEMA)
+
+    def _reserve(self) -> None:
+        with self._lock:
+            rows = self._conn.execute(_RESERVE_SQL, (self.id_block, )).fetchall()
+        self._ids.extend(r[0] for r in rows)
+
+    def next_id(self) -> int:
+        """An unused order id; a round trip only when the reserved block runs out."""
+        try:
+            return self._ids.popleft()
+        except IndexError:
+            self._reserve()
+            return self._ids.popleft()
+
+    def write(self, batch: PaperBatch) -> None:
+        if not batch.empty():
+            o, u, f = batch.orders, batch.updates, batch.fills
+            with self._lock, self._conn.pipeline(), self._conn.transaction():
+                if o:
+                    self._conn.execute(
+                        _INSERT_ORDERS_SQL,
+                        (SOURCE, [r.id for r in o], [r.ts for r in o],
+                         [r.strategy_id for r in o], [r.symbol for r in o], [r.side for r in o],
+                         [r.qty for r in o], [r.price for r in o], [r.status for r in o],
+                         [r.note for r in o]))
+                if u:
+                    self._conn.execute(_UPDATE_ORDERS_SQL,
+                                       ([r.id for r in u], [r.status for r in u],
+                                        [r.qty for r in u], [r.price for r in u]))
+                if f:
+                    self._conn.execute(
+                        _INSERT_TRADES_SQL,
+                        ([r.order_id for r in f], [r.ts for r in f], [r.symbol for r in f],
+                         [r.side for r in f], [r.qty for r in f], [r.price for r in f],
+                         [r.fee for r in f], [r.pnl for r in f]))
+        # Top up ids here, off the bar path
+        if len(self._ids) < self.id_block // 2:
+            self._reserve()
+
+
+class LogOrderWriter:
+    """Dry-run writer: logs the rows, numbering orders locally."""
+
+    def __init__(self) -> None:
+        self._ids = itertools.count(1)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def write(self, batch: PaperBatch) -> None:
+        from loguru import logger
+
+        for o in batch.orders:
+            logger.info(f"order {o.id} {o.strategy_id} {o.side} {o.qty:.6f} @ {o.price} "
+                        f"{o.status} {o.note}")
+        for u in batch.updates:
+            logger.info(f"order {u.id} -> {u.status} {u.qty:.6f} @ {u.price}")
+        for f in batch.fills:
+            logger.info(f"fill order={f.order_id} {f.symbol} {f.side} {f.qty:.6f} @ {f.price} "
+                        f"fee={f.fee:.4f} pnl={f.pnl:.2f}")
+
+
+@dataclass
+class PaperStats:
+    bars: int = 0  # (pair, bar) events received
+    steps: int = 0  # instance steps
+    writes: int = 0  # transactions
+    orders: int = 0
+    fills: int = 0
+    latency_sum: float = 0.0  # bar receipt -> commit, seconds, over writes
+    latency_max: float = 0.0
+    unwritten: int = 0  # non-empty batches built but not committed yet
+
+    @property
+    def latency_mean(self) -> float:
+        return self.latency_sum / self.writes if self.writes else 0.0
+
+
+async def run_paper(engine: PaperEngine,
+                    bars: AsyncIterator[Tuple[str, str, Bar, float]],
+                    writer: OrderWriter,
+                    *,
+                    stats: Optional[PaperStats] = None,
+                    stats_every: float = 60.0,
+                    on_written: Optional[Callable[[PaperBatch], None]] = None) -> PaperStats:
+    """Trade (symbol, interval, bar, perf_counter at receipt) events until the stream ends.
+
+    Writes run in a worker thread, one at a time; batches arriving meanwhile
+    are merged into the next write. On exit, the NEW orders of pending signals
+    are cancelled and everything is flushed. `stats.unwritten == 0` means the
+    engine's state matches what is committed (e.g. for `on_written`).
+    """
+    prof = current()
+    stats = stats if stats is not None else PaperStats()
+    queued: List[PaperBatch] = []
+    wake = asyncio.Event()
+    done = False
+
+    async def _writer() -> None:
+        while True:
+            await wake.wait()
+            wake.clear()
+            if not queued:
+                if done:
+                    return
+                continue
+            batch = queued.pop(0)
+            n = 1
+            while queued:
+                batch.merge(queued.pop(0))
+                n += 1
+            with prof.phase("paper_write"):
+                await asyncio.to_thread(writer.write, batch)
+            stats.unwritten -= n
+            lat = time.perf_counter() - batch.received
+            stats.writes += 1
+            stats.orders += len(batch.orders)
+            stats.fills += len(batch.fills)
+            stats.latency_sum += lat
+            stats.latency_max = max(stats.latency_max, lat)
+            if on_written is not None:
+                on_written(batch)
+            if queued or done:
+                wake.set()
+
+    task = asyncio.create_task(_writer())
+    last_log = time.monotonic()
+    try:
+        async for symbol, interval, bar, received in bars:
+            if task.done():
+                task.result()  # the writer failed: raise its error
+            out = PaperBatch(received=received, bars=1)
+            with prof.phase("paper_step"):
+                stats.steps += engine.on_bar(symbol, interval, bar, out)
+            stats.bars += 1
+            if not out.empty():
+                queued.append(out)
+                stats.unwritten += 1
+                wake.set()
+            if stats_every > 0 and time.monotonic() - last_log >= stats_every:
+                last_log = time.monotonic()
+                from loguru import logger
+                logger.info(f"Paper: {stats.bars} bars, {stats.steps} steps, "
+                            f"{stats.orders} orders, {stats.fills} fills in {stats.writes} "
+                            f"writes; bar->commit mean {stats.latency_mean * 1e3:.1f} ms, "
+                            f"max {stats.latency_max * 1e3:.1f} ms")
+    finally:
+        out = PaperBatch(received=time.perf_counter())
+        engine.cancel_pending(out)
+        if not out.empty():
+            queued.append(out)
+            stats.unwritten += 1
+        done = True
+        wake.set()
+        await task
+    return stats
+
+
+# -- service ---------------------------------------------------------------
+
+
+def instance_id(name: str, strategy: Strategy, symbol: str, interval: str) -> str:
+    """Stable `strategy_id` for the order rows: strategy, config hash and pair."""
+    return f"{name}-{config_key(strategy)[:8]}:{symbol}/{interval}"
+
+
+def warm_up(instances: Iterable[PaperInstance], repo) -> int:
+    """Feed each instance its declared warm-up from the latest stored bars.
+
+    One fetch per pair, sized for the pair's longest warm-up; returns the
+    number of bars fetched.
+    """
+    by_pair: Dict[Tuple[str, str], List[PaperInstance]] = {}
+    for inst in instances:
+        by_pair.setdefault((inst.symbol, inst.interval), []).append(inst)
+    fetched = 0
+    for (symbol, interval), group in by_pair.items():
+        bars = load_bars(repo, symbol, interval, lookback=max(i.warmup for i in group))
+        fetched += len(bars)
+        for inst in group:
+            for b in bars[-inst.warmup:] if inst.warmup else ():
+                inst.warm(b)
+    return fetched
+
+
+def _read_states(path: str) -> Dict[str, EngineSnapshot]:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {sid: snapshot_from_json(d) for sid, d in json.load(f).items()}
+
+
+def _write_states(path: str, instances: Iterable[PaperInstance]) -> None:
+    doc = {i.strategy_id: snapshot_to_json(i.snapshot()) for i in instances if i.last_ts}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(doc, f)
+    os.replace(tmp, path)
+
+
+async def _closed_bars(client, repo, pairs: List[Tuple[str, str]],
+                       last: Dict[Tuple[str, str], datetime]
+                       ) -> AsyncIterator[Tuple[str, str, Bar, float]]:
+    """Closed klines from the exchange stream, gaps (e.g. reconnects) filled from the DB."""
+    from qryptify.ingestor.parsers import parse_ws_kline_row
+
+    steps = {p: parse_interval(p[1]) for p in pairs}
+    async for msg in client.ws_kline_stream_pairs(pairs):
+        received = time.perf_counter()
+        k = msg["k"]
+        key = (msg["symbol"], k["i"])
+        bar = build_bars([parse_ws_kline_row(key[0], key[1], k)])[0]
+        prev = last.get(key)
+        if prev is not None and bar.ts - prev > steps[key]:
+            rows = await asyncio.to_thread(repo.fetch_ohlcv, key[0], key[1],
+                                           prev + steps[key], bar.ts - steps[key])
+            if len(rows) < (bar.ts - prev) // steps[key] - 1:
+                from loguru import logger
+                logger.warning(f"Paper: {key[0]}/{key[1]} is missing bars before {bar.ts}")
+            for b in build_bars(rows):
+                yield key[0], key[1], b, received
+        if prev is None or bar.ts > prev:
+            last[key] = bar.ts
+        yield key[0], key[1], bar, received
+
+
+async def _db_bars(events: AsyncIterable[BarEvent], repo, pairs: List[Tuple[str, str]],
+                   last: Dict[Tuple[str, str], datetime],
+                   rollup: bool = False) -> AsyncIterator[Tuple[str, str, Bar, float]]:
+    """Bars committed by the ingestor, read from the DB as its notifications arrive.
+
+    An event covers every bar since the pair's last one, so missed
+    notifications only delay bars. Under rollup ingestion only 1m is
+    notified; higher intervals are re-read on their symbol's 1m events and
+    come through once their bucket is complete.
+    """
+    wake: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+    for symbol, interval in pairs:
+        key = (symbol, BASE_INTERVAL) if rollup and interval in ROLLUP_INTERVALS else (
+            symbol, interval)
+        wake.setdefault(key, []).append((symbol, interval))
+    steps = {p: parse_interval(p[1]) for p in pairs}
+    async for ev in events:
+        received = time.perf_counter()
+        for key in wake.get((ev.symbol, ev.interval), ()):
+            prev = last.get(key)
+            if prev is None:
+                rows = await asyncio.to_thread(repo.fetch_latest_n, key[0], key[1], 1)
+            else:
+                rows = await asyncio.to_thread(repo.fetch_ohlcv, key[0], key[1],
+                                               prev + steps[key], ev.close_time)
+            for b in build_bars(rows):
+                last[key] = b.ts
+                yield key[0], key[1], b, received
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(
+        description="Paper-trade strategies on the live closed-kline stream")
+    p.add_argument("--pairs", default="",
+                   help="Comma list of SYMBOL/interval (default: the config's pairs)")
+    p.add_argument("--strategies", default="",
+                   help="Comma list of strategies run on every pair (default: --strategy)")
+    add_strategy_args(p)
+    add_risk_args(p)
+    p.add_argument("--state", default="",
+                   help="JSON file of instance states, restored at start and saved on exit "
+                   "and every --state-every seconds")
+    p.add_argument("--state-every", type=float, default=300.0)
+    p.add_argument("--stats-every", type=float, default=60.0,
+                   help="Seconds between throughput/latency log lines")
+    p.add_argument("--source", choices=["ws", "db"], default="ws",
+                   help="ws: the exchange stream; db: bars committed by the live ingestor, "
+                   "woken by its notifications")
+    p.add_argument("--dry-run", action="store_true",
+                   help="Log orders and fills instead of writing them")
+    p.add_argument("--config", default="", help="Config YAML (default: ingestor config)")
+    add_profile_args(p)
+    args = p.parse_args(argv)
+
+    # Local imports so --help works without yaml/loguru/psycopg until run
+    from qryptify.data.notify import BarSubscriber
+    from qryptify.data.timescale import TimescaleRepo
+    from qryptify.shared.config import load_cfg
+
+    cfg = load_cfg(args.config) if args.config else load_cfg()
+    pairs = ([parse_pair(x.strip()) for x in args.pairs.split(",") if x.strip()]
+             if args.pairs else symbol_interval_pairs_from_cfg(cfg))
+    names = [x.strip() for x in args.strategies.split(",") if x.strip()] or [args.strategy]
+
+    instances = []
+    for symbol, interval in pairs:
+        risk = risk_from_args(args, fee_bps_from_args(args, symbol))
+        for name in names:
+            strat = strategy_from_args(argparse.Namespace(**{**vars(args), "strategy": name}))
+            instances.append(
+                PaperInstance(instance_id(name, strat, symbol, interval), symbol, interval,
+                              strat, risk))
+
+    with profiled(args.profile, args.profile_out):
+        repo = TimescaleRepo.from_cfg(cfg)
+        repo.connect()
+        writer: OrderWriter = (LogOrderWriter() if args.dry_run else
+                               PaperOrderWriter.connect(cfg["db"]["dsn"]))
+        if args.source == "db":
+            subscriber = BarSubscriber(cfg["db"]["dsn"])
+            rollup = ingest_mode(cfg) == "rollup"
+
+            def source(pairs, last):
+                return _db_bars(subscriber, repo, pairs, last, rollup)
+        else:
+            from qryptify_ingestor.binance_client import BinanceClient
+            client = BinanceClient(cfg["rest"]["endpoint"], cfg["ws"]["endpoint"])
+
+            def source(pairs, last):
+                return _closed_bars(client, repo, pairs, last)
+
+        try:
+            asyncio.run(_serve(args, instances, repo, writer, source))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if isinstance(writer, PaperOrderWriter):
+                writer.close()
+            repo.close()
+
+
+async def _serve(args: argparse.Namespace, instances: List[PaperInstance], repo,
+                 writer: OrderWriter, source: Callable[..., AsyncIterator]) -> None:
+    from loguru import logger
+
+    saved = _read_states(args.state)
+    cold = []
+    catch_up = PaperBatch(received=time.perf_counter())
+    for inst in instances:
+        snap = saved.get(inst.strategy_id)
+        try:
+            if snap is None:
+                raise ValueError("no saved state")
+            inst.restore(snap)
+        except ValueError as e:
+            if snap is not None:
+                logger.warning(f"Paper: {inst.strategy_id} starts fresh: {e}")
+            cold.append(inst)
+            continue
+        # Trade the bars stored since the saved state
+        rows = repo.fetch_ohlcv(inst.symbol, inst.interval, start=snap.last_ts + inst.step_td)
+        for b in build_bars(rows):
+            inst.step(b, catch_up, writer.next_id)
+    fetched = warm_up(cold, repo)
+    logger.info(f"Paper: {len(instances)} instances, {len(instances) - len(cold)} restored, "
+                f"{len(cold)} warmed up on {fetched} bars")
+    writer.write(catch_up)
+
+    engine = PaperEngine(instances, writer.next_id)
+    last: Dict[Tuple[str, str], datetime] = {}
+    for inst in instances:
+        if inst.last_ts is not None:
+            key = (inst.symbol, inst.interval)
+            last[key] = max(last.get(key, inst.last_ts), inst.last_ts)
+    saved_at = time.monotonic()
+    stats = PaperStats()
+
+    def _on_written(batch: PaperBatch) -> None:
+        nonlocal saved_at
+        # Instances may have stepped bars whose orders are still queued; a state
+        # ahead of the DB would skip those bars on restart, so wait until none are
+        if (args.state and not stats.unwritten
+                and time.monotonic() - saved_at >= args.state_every):
+            _write_states(args.state, instances)
+            saved_at = time.monotonic()
+
+    try:
+        await run_paper(engine,
+                        source(engine.pairs(), last),
+                        writer,
+                        stats=stats,
+                        stats_every=args.stats_every,
+                        on_written=_on_written)
+    finally:
+        if args.state and not stats.unwritten:
+            _write_states(args.state, instances)
+            logger.info(f"Paper: saved {len(instances)} instance states to {args.state}")
+        elif args.state:
+            logger.warning(f"Paper: {stats.unwritten} batches were not written; keeping "
+                           f"the last saved states in {args.state}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""k-objective Pareto skylines over optimizer results.
+
+Objectives are named metrics with a default direction; `parse_objectives`
+reads a spec such as ``"pnl,dd,win_rate,fee_drag"`` (a leading ``+`` or ``-``
+forces maximize/minimize). `skyline` works on columnar metric arrays with
+every column minimized: two objectives use a sort-and-scan, more use
+sort-filter-skyline (SFS), which presorts by a monotone score so a point can
+only be dominated by points already in the skyline window.
+
+`SkylineFrontier` maintains the frontier of a result stream in bounded memory:
+results are buffered as columns and merged with the current frontier every
+`chunk` results, since skyline(A + B) == skyline(skyline(A) + B).
+"""
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+import math
+from operator import le
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .candidates import Result
+
+MAXIMIZE = 1
+MINIMIZE = -1
+
+
+@dataclass(frozen=True)
+class Objective:
+    name: str
+    sense: int  # MAXIMIZE or MINIMIZE
+    metric: Callable[[Result], Optional[float]]
+
+    def cost(self, r: Result) -> float:
+        """Value to minimize; missing metrics rank worst."""
+        v = self.metric(r)
+        if v is None or math.isnan(v):
+            return math.inf
+        return -v if self.sense == MAXIMIZE else float(v)
+
+
+OBJECTIVES: Dict[str, Tuple[int, Callable[[Result], Optional[float]]]] = {
+    "pnl": (MAXIMIZE, lambda r: r.pnl),
+    "dd": (MINIMIZE, lambda r: r.dd),
+    "trades": (MAXIMIZE, lambda r: r.trades),
+    "cagr": (MAXIMIZE, lambda r: r.cagr),
+    "win_rate": (MAXIMIZE, lambda r: r.win_rate),
+    "fee_drag": (MINIMIZE, lambda r: r.fees),
+}
+DEFAULT_OBJECTIVES = "pnl,dd"
+
+
+def parse_objectives(spec: str | Sequence[str]) -> List[Objective]:
+    names = spec.split(",") if isinstance(spec, str) else list(spec)
+    out: List[Objective] = []
+    for raw in names:
+        name = str(raw).strip()
+        if not name:
+            continue
+        forced = {"+": MAXIMIZE, "-": MINIMIZE}.get(name[0])
+        if forced is not None:
+            name = name[1:]
+        if name not in OBJECTIVES:
+            raise ValueError(f"Unknown Pareto objective {name!r} "
+                             f"(known: {', '.join(OBJECTIVES)})")
+        if any(o.name == name for o in out):
+            raise ValueError(f"Duplicate Pareto objective {name!r}")
+        sense, metric = OBJECTIVES[name]
+        out.append(Objective(name, forced or sense, metric))
+    if not out:
+        raise ValueError("No Pareto objectives given")
+    return out
+
+
+def skyline(cols: Sequence[Sequence[float]]) -> List[int]:
+    """Indices (ascending) of the rows no other row dominates, minimizing every column.
+
+    A row equal to an earlier row counts as dominated, so duplicates keep
+    their first occurrence.
+    """
+    n = len(cols[0]) if cols else 0
+    if n == 0:
+        return []
+    if len(cols) == 1:
+        c = cols[0]
+        return [min(range(n), key=c.__getitem__)]
+    if len(cols) == 2:
+        return _skyline_2d(cols[0], cols[1])
+    return _skyline_sfs(cols)
+
+
+def _skyline_2d(xs: Sequence[float], ys: Sequence[float]) -> List[int]:
+    keep: List[int] = []
+    best = math.inf
+    for i in sorted(range(len(xs)), key=lambda i: (xs[i], ys[i], i)):
+        if ys[i] < best:
+            keep.append(i)
+            best = ys[i]
+    keep.sort()
+    return keep
+
+
+def _skyline_sfs(cols: Sequence[Sequence[float]]) -> List[int]:
+    n = len(cols[0])
+    # Per-column min-max scaling keeps one wide column (pnl) from dominating
+    # the presort; any monotone score is correct, a balanced one filters faster
+    score = [0.0] * n
+    for c in cols:
+        finite = [v for v in c if v != math.inf]
+        lo = min(finite, default=0.0)
+        span = (max(finite, default=0.0) - lo) or 1.0
+        for i, v in enumerate(c):
+            score[i] += (v - lo) / span
+    rows = list(zip(*cols))
+    # A dominating row scores <= and sorts lexicographically <=, so it comes first
+    order = sorted(range(n), key=lambda i: (score[i], rows[i], i))
+    window: List[Tuple[float, ...]] = []
+    keep: List[int] = []
+    for i in order:
+        p = rows[i]
+        for j, s in enumerate(window):
+            if all(map(le, s, p)):
+                if j:
+                    # Move-to-front: a good dominator tends to dominate the next rows too
+                    window.insert(0, window.pop(j))
+                break
+        else:
+            window.append(p)
+            keep.append(i)
+    keep.sort()
+    return keep
+
+
+class SkylineFrontier:
+    """Streaming k-objective frontier (see module docstring).
+
+    `points()` is sorted best-first by the objectives in order.
+    """
+
+    def __init__(self, objectives: Sequence[Objective], chunk: int = 65536) -> None:
+        self.objectives = list(objectives)
+        self.chunk = max(1, chunk)
+        self._pts: List[Result] = []
+        self._cols: List[array] = [array("d") for _ in self.objectives]
+        self._merged = 0  # leading points already known to be non-dominated
+
+    def add(self, r: Result) -> None:
+        self._pts.append(r)
+        for col, o in zip(self._cols, self.objectives):
+            col.append(o.cost(r))
+        if len(self._pts) - self._merged >= self.chunk:
+            self._merge()
+
+    def _merge(self) -> None:
+        keep = skyline(self._cols)
+        self._pts = [self._pts[i] for i in keep]
+        self._cols = [array("d", (c[i] for i in keep)) for c in self._cols]
+        self._merged = len(self._pts)
+
+    def __len__(self) -> int:
+        self._merge()
+        return len(self._pts)
+
+    def points(self) -> List[Result]:
+        self._merge()
+        order = sorted(range(len(self._pts)), key=lambda i: tuple(c[i] for c in self._cols))
+        return [self._pts[i] for i in order]
@@ -0,0 +1,448 @@
+"""Multi-symbol portfolio backtests with shared equity.
+
+`run_portfolio` k-way merges per-symbol bar streams by timestamp
+(`heapq.merge`), so only one pending bar per symbol is held and streams can
+be lazy (`loader.iter_bars` pages them from the database). Each symbol keeps
+its own strategy, ATR, stop and trailing state, with the fill rules of
+`backtest`: a signal on a bar fills at that symbol's next open, stops are
+checked against each bar and may gap.
+
+What is shared is the capital. Entries are sized off the portfolio's
+realized equity (`risk_per_trade` of it per `atr_mult_stop` ATRs), and two
+limits apply at entry time: `max_positions` concurrent positions and
+`max_gross_exposure`, the gross open notional as a multiple of
+mark-to-market equity (entries are shrunk to fit, or skipped when no room
+is left). Portfolio equity and drawdown are marked once per timestamp, after
+every symbol's bar at that time has been processed.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import timedelta
+import heapq
+import json
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from qryptify.shared.intervals import parse_interval
+from qryptify.shared.pairs import parse_pair
+from qryptify.shared.profiling import add_profile_args
+from qryptify.shared.profiling import profiled
+
+from .backtest import add_risk_args
+from .backtest import add_strategy_args
+from .backtest import fee_bps_from_args
+from .backtest import risk_from_args
+from .backtest import strategy_from_args
+from .backtester import _apply_fees
+from .backtester import _fee_bps_at
+from .backtester import _floor_price_tick
+from .backtester import _floor_to_step
+from .backtester import _price_with_slippage
+from .backtester import _reset_position
+from .backtester import _sign
+from .backtester import _trail_and_stop
+from .backtester import BacktestState
+from .backtester import required_warmup
+from .backtester import SIDE_BUY
+from .backtester import SIDE_SELL
+from .indicators import true_range
+from .indicators import WilderATR
+from .loader import iter_bars
+from .models import Bar
+from .models import RiskParams
+from .models import Signal
+from .models import Trade
+from .strategy_base import Strategy
+
+
+@dataclass
+class PortfolioLimits:
+    """Shared-capital limits checked at entry; 0 disables a limit."""
+    max_positions: int = 0  # concurrent open positions
+    max_gross_exposure: float = 0.0  # gross open notional / mark-to-market equity
+
+
+@dataclass
+class SymbolStats:
+    symbol: str
+    bars: int = 0
+    trades: int = 0
+    wins: int = 0
+    pnl: float = 0.0
+    fees: float = 0.0
+    rejected: int = 0  # entries skipped by a portfolio limit
+    capped: int = 0  # entries shrunk to fit max_gross_exposure
+
+
+@dataclass
+class PortfolioReport:
+    start_equity: float
+    equity_end: float
+    total_pnl: float
+    total_fees: float
+    max_drawdown: float  # on mark-to-market equity, per timestamp
+    trades: int
+    win_rate: float
+    cagr: Optional[float]
+    timestamps: int
+    bars: int
+    max_open: int  # most positions open at once
+    symbols: Dict[str, SymbolStats] = field(default_factory=dict)
+    # Mark-to-market equity sampled every `curve_every`, plus the final equity
+    equity_curve: List[Tuple[datetime, float]] = field(default_factory=list)
+
+
+class _Book:
+    """One symbol's strategy and position state."""
+
+    __slots__ = ("symbol", "strategy", "risk", "atr_calc", "i", "prev_close", "state", "mark",
+                 "pending", "pending_atr", "last_bar", "stats")
+
+    def __init__(self, symbol: str, strategy: Strategy, risk: RiskParams) -> None:
+        self.symbol = symbol
+        self.strategy = strategy
+        self.risk = risk
+        self.atr_calc = WilderATR(risk.atr_period)
+        self.i = 0
+        self.prev_close: Optional[float] = None
+        # Position only: cash is shared, so `state.equity` stays unused
+        self.state = BacktestState(equity=0.0)
+        self.mark = 0.0  # last close (entry price right after a fill)
+        self.pending: Optional[Signal] = None  # fills at the next bar's open
+        self.pending_atr: Optional[float] = None
+        self.last_bar: Optional[Bar] = None
+        self.stats = SymbolStats(symbol)
+
+
+def _keyed(j: int, symbol: str, bars: Iterable[Bar]) -> Iterator[Tuple[datetime, int, Bar]]:
+    prev: Optional[datetime] = None
+    for b in bars:
+        if prev is not None and b.ts <= prev:
+            raise ValueError(f"{symbol}: bar timestamps must be strictly increasing")
+        prev = b.ts
+        yield b.ts, j, b
+
+
+class _Portfolio:
+
+    def __init__(self, books: List[_Book], limits: PortfolioLimits, start_equity: float,
+                 keep_trades: bool) -> None:
+        self.books = books
+        self.limits = limits
+        self.start_equity = start_equity
+        self.cash = start_equity
+        self.open: Dict[str, _Book] = {}
+        self.open_pnl = 0.0  # sum of (mark - entry) * qty over open positions
+        self.open_fees = 0.0  # entry fees of open positions
+        self.trades: List[Tuple[str, Trade]] = []
+        self.keep_trades = keep_trades
+        self.dd_peak = start_equity
+        self.max_dd = 0.0
+        self.max_open = 0
+
+    def equity(self) -> float:
+        return self.cash + self.open_pnl - self.open_fees
+
+    def mark(self) -> float:
+        mtm = self.equity()
+        if mtm > self.dd_peak:
+            self.dd_peak = mtm
+        elif self.dd_peak - mtm > self.max_dd:
+            self.max_dd = self.dd_peak - mtm
+        return mtm
+
+    def close(self, b: _Book, ts: datetime, price: float, reason: str) -> None:
+        pos, r = b.state, b.risk
+        qty, entry = pos.position_qty, pos.entry_price or 0.0
+        fees = _apply_fees(abs(qty) * price, _fee_bps_at(r, ts))
+        pnl = (price - entry) * qty - fees - pos.open_fees
+        self.cash += pnl
+        self.open_pnl -= (b.mark - entry) * qty
+        self.open_fees -= pos.open_fees
+        st = b.stats
+        st.trades += 1
+        st.wins += pnl > 0
+        st.pnl += pnl
+        st.fees += fees + pos.open_fees
+        if self.keep_trades:
+            self.trades.append((b.symbol,
+                                Trade(entry_ts=pos.entry_ts or ts,
+                                      exit_ts=ts,
+                                      entry_price=entry,
+                                      exit_price=price,
+                                      qty=qty,
+                                      pnl=pnl,
+                                      fees=fees + pos.open_fees,
+                                      reason=reason)))
+        _reset_position(pos)
+        del self.open[b.symbol]
+        if not self.open:
+            # Drop float residue of the running sums
+            self.open_pnl = self.open_fees = 0.0
+
+    def fill(self, b: _Book, bar: Bar) -> None:
+        """Execute the signal from the previous bar at this bar's open."""
+        sig, atr, r, pos = b.pending, b.pending_atr, b.risk, b.state
+        assert sig is not None
+        b.pending = b.pending_atr = None
+        desired = max(min(int(sig.target), 1), -1)
+        if desired != _sign(pos.position_qty) and pos.position_qty != 0:
+            px = _price_with_slippage(bar.open, r.slippage_bps,
+                                      SIDE_SELL if pos.position_qty > 0 else SIDE_BUY)
+            self.close(b, bar.ts, px, sig.reason or "signal_exit")
+        if desired == 0 or pos.position_qty != 0 or atr is None:
+            return
+        px = _price_with_slippage(bar.open, r.slippage_bps,
+                                  SIDE_BUY if desired > 0 else SIDE_SELL)
+        stop_dist = atr * r.atr_mult_stop
+        if stop_dist <= 0:
+            return
+        lim = self.limits
+        if lim.max_positions and len(self.open) >= lim.max_positions:
+            b.stats.rejected += 1
+            return
+        qty = max(self.cash * r.risk_per_trade / stop_dist, 0.0)
+        if lim.max_gross_exposure > 0:
+            gross = sum(abs(o.state.position_qty) * o.mark for o in self.open.values())
+            room = lim.max_gross_exposure * self.equity() - gross
+            if qty * px > room:
+                if room <= 0:
+                    b.stats.rejected += 1
+                    return
+                qty = room / px
+                b.stats.capped += 1
+        qty = _floor_to_step(qty, r.qty_step)
+        if qty <= 0 or qty < r.min_qty or qty * px < r.min_notional:
+            return
+        fees = _apply_fees(qty * px, _fee_bps_at(r, bar.ts))
+        pos.position_qty = qty if desired > 0 else -qty
+        pos.entry_price = b.mark = px
+        pos.entry_ts = bar.ts
+        pos.open_fees = fees
+        stop = max(px - stop_dist, 0.0) if desired > 0 else px + stop_dist
+        pos.stop_price = _floor_price_tick(stop, r.price_tick)
+        pos.peak_price = px if desired > 0 else None
+        pos.trough_price = px if desired < 0 else None
+        self.open[b.symbol] = b
+        self.open_fees += fees
+        self.max_open = max(self.max_open, len(self.open))
+
+    def warm(self, b: _Book, bar: Bar) -> None:
+        """A bar before the trading start: feeds the ATR and strategy only."""
+        atr = b.atr_calc.update(true_range(bar.high, bar.low, b.prev_close))
+        # As in backtest(), only the last warm-up bar's signal is acted on
+        b.pending, b.pending_atr = b.strategy.on_bar(b.i, bar), atr
+        b.i += 1
+        b.prev_close = bar.close
+
+    def step(self, b: _Book, bar: Bar) -> None:
+        b.stats.bars += 1
+        if b.pending is not None:
+            self.fill(b, bar)
+        atr = b.atr_calc.update(true_range(bar.high, bar.low, b.prev_close))
+        sig = b.strategy.on_bar(b.i, bar)
+        b.i += 1
+
+        pos = b.state
+        if pos.position_qty != 0:
+            # Same trailing stop and stop checks as backtest()
+            reason, px = _trail_and_stop(pos, bar, atr, b.risk)
+            if reason:
+                self.close(b, bar.ts, px, reason)
+            if pos.position_qty != 0:
+                self.open_pnl += (bar.close - b.mark) * pos.position_qty
+                b.mark = bar.close
+
+        if sig is not None:
+            b.pending, b.pending_atr = sig, atr
+        b.prev_close = bar.close
+        b.last_bar = bar
+
+
+def run_portfolio(
+    streams: Mapping[str, Iterable[Bar]],
+    strategy_for: Callable[[str], Strategy],
+    risk: Union[RiskParams, Mapping[str, RiskParams]],
+    limits: Optional[PortfolioLimits] = None,
+    *,
+    start_equity: float = 10_000.0,
+    curve_every: timedelta = timedelta(days=1),
+    keep_trades: bool = True,
+    start: Optional[datetime] = None,
+) -> Tuple[PortfolioReport, List[Tuple[str, Trade]]]:
+    """Backtest every symbol's stream against one shared equity.
+
+    `strategy_for(symbol)` returns a fresh strategy per symbol; `risk` is
+    shared or per symbol (its `start_equity` is ignored in favour of
+    `start_equity`). Bars before `start` only warm up the strategies and
+    ATRs. Trades come back as (symbol, trade) in exit order;
+    `keep_trades=False` keeps only the per-symbol stats.
+    """
+    symbols = list(streams)
+    books = [
+        _Book(s, strategy_for(s), risk if isinstance(risk, RiskParams) else risk[s])
+        for s in symbols
+    ]
+    pf = _Portfolio(books, limits or PortfolioLimits(), start_equity, keep_trades)
+    for b in books:
+        b.strategy.on_start()
+    merged = heapq.merge(*(_keyed(j, s, streams[s]) for j, s in enumerate(symbols)))
+
+    first_ts: Optional[datetime] = None
+    cur_ts: Optional[datetime] = None
+    next_sample: Optional[datetime] = None
+    curve: List[Tuple[datetime, float]] = []
+    timestamps = bars = 0
+    step = pf.step
+    for ts, j, bar in merged:
+        if start is not None and ts < start:
+            pf.warm(books[j], bar)
+            continue
+        if ts != cur_ts:
+            if cur_ts is not None:
+                mtm = pf.mark()
+                if next_sample is None or cur_ts >= next_sample:
+                    curve.append((cur_ts, mtm))
+                    next_sample = cur_ts + curve_every
+            else:
+                first_ts = ts
+            cur_ts = ts
+            timestamps += 1
+        bars += 1
+        step(books[j], bar)
+    if cur_ts is not None:
+        curve.append((cur_ts, pf.mark()))
+
+    # Flatten what is still open at each symbol's last close
+    for b in books:
+        if b.state.position_qty != 0 and b.last_bar is not None:
+            px = _price_with_slippage(b.last_bar.close, b.risk.slippage_bps,
+                                      SIDE_SELL if b.state.position_qty > 0 else SIDE_BUY)
+            pf.close(b, b.last_bar.ts, px, "final_close")
+        b.strategy.on_finish()
+    if cur_ts is not None:
+        curve[-1] = (cur_ts, pf.cash)
+
+    stats = {b.symbol: b.stats for b in books}
+    n_trades = sum(st.trades for st in stats.values())
+    cagr: Optional[float] = None
+    if first_ts is not None and cur_ts is not None:
+        years = max((cur_ts - first_ts).total_seconds(), 1.0) / (365.25 * 24 * 3600)
+        if years >= 1.0 / 365.25 and pf.cash > 0:
+            try:
+                cagr = (pf.cash / start_equity)**(1 / years) - 1
+            except OverflowError:
+                cagr = None
+    report = PortfolioReport(
+        start_equity=start_equity,
+        equity_end=pf.cash,
+        total_pnl=pf.cash - start_equity,
+        total_fees=sum(st.fees for st in stats.values()),
+        max_drawdown=pf.max_dd,
+        trades=n_trades,
+        win_rate=sum(st.wins for st in stats.values()) / n_trades if n_trades else 0.0,
+        cagr=cagr,
+        timestamps=timestamps,
+        bars=bars,
+        max_open=pf.max_open,
+        symbols=stats,
+        equity_curve=curve,
+    )
+    return report, pf.trades
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(
+        description="Backtest one strategy across many symbols sharing one equity")
+    p.add_argument("--pairs", required=True, help="Comma list of pairs on one interval")
+    p.add_argument("--start", required=True, help="ISO start datetime (UTC)")
+    p.add_argument("--end", help="ISO end datetime (UTC)")
+    add_strategy_args(p)
+    add_risk_args(p)
+    p.add_argument("--max-positions", type=int, default=0,
+                   help="Concurrent open positions across symbols (0: unlimited)")
+    p.add_argument("--max-gross", type=float, default=0.0,
+                   help="Gross open notional as a multiple of equity (0: unlimited)")
+    p.add_argument("--warmup", type=int, default=-1,
+                   help="Bars per symbol fed before --start (default: what the strategy "
+                   "and ATR declare; 0 to disable)")
+    p.add_argument("--buffer-bars", type=int, default=500_000,
+                   help="Bars held in memory across all symbols' DB pages")
+    p.add_argument("--equity-out", default="", help="CSV path for the daily equity curve")
+    p.add_argument("--json-out", default="", help="JSON path for the report")
+    add_profile_args(p)
+    args = p.parse_args(argv)
+
+    specs = [parse_pair(x.strip()) for x in args.pairs.split(",") if x.strip()]
+    if len({interval for _, interval in specs}) != 1:
+        raise SystemExit("--pairs must share one interval")
+    interval = specs[0][1]
+    start = datetime.fromisoformat(args.start.replace("Z", "+00:00"))
+    end = datetime.fromisoformat(args.end.replace("Z", "+00:00")) if args.end else None
+    page = max(1_000, args.buffer_bars // len(specs))
+    warmup = args.warmup
+    if warmup < 0:
+        warmup = required_warmup(strategy_from_args(args), args.atr)
+    # Warm-up bars are fetched by time ahead of --start
+    fetch_from = start - warmup * parse_interval(interval)
+
+    # Local import so --help works without loguru/psycopg until run
+    from qryptify.data.timescale import TimescaleRepo
+    from qryptify.shared.config import load_cfg
+
+    with profiled(args.profile, args.profile_out) as prof:
+        repo = TimescaleRepo.from_cfg(load_cfg())
+        repo.connect()
+        try:
+            risks = {s: risk_from_args(args, fee_bps_from_args(args, s)) for s, _ in specs}
+            # The streams take turns on one connection; each page is fetched in full
+            streams = {
+                s: iter_bars(repo, s, interval, start=fetch_from, end=end, page=page)
+                for s, _ in specs
+            }
+            with prof.phase("backtest"):
+                report, trades = run_portfolio(streams,
+                                               lambda s: strategy_from_args(args),
+                                               risks,
+                                               PortfolioLimits(args.max_positions,
+                                                               args.max_gross),
+                                               start_equity=args.equity,
+                                               keep_trades=False,
+                                               start=start)
+            prof.count("bars", report.bars)
+        finally:
+            repo.close()
+
+        print(f"Portfolio {len(specs)} symbols {interval}: {report.timestamps:,} timestamps, "
+              f"{report.bars:,} bars")
+        print(f"  PnL:        {report.total_pnl:.2f}")
+        print(f"  Equity end: {report.equity_end:.2f}")
+        print(f"  Max DD:     {report.max_drawdown:.2f}")
+        if report.cagr is not None:
+            print(f"  CAGR:       {report.cagr:.2%}")
+        print(f"  Trades:     {report.trades} (win rate {report.win_rate:.1%}), "
+              f"fees {report.total_fees:.2f}, max open {report.max_open}")
+        print(f"  {'symbol':<14} {'trades':>7} {'pnl':>12} {'fees':>10} {'rejected':>9}")
+        for st in report.symbols.values():
+            print(f"  {st.symbol:<14} {st.trades:>7} {st.pnl:>12.2f} {st.fees:>10.2f} "
+                  f"{st.rejected:>9}")
+        if args.equity_out:
+            with open(args.equity_out, "w", newline="") as f:
+                w = csv.writer(f)
+                w.writerow(["ts", "equity"])
+                w.writerows((ts.isoformat(), round(eq, 2)) for ts, eq in report.equity_curve)
+            print(f"Saved equity curve to {args.equity_out}")
+        if args.json_out:
+            doc = {k: v for k, v in vars(report).items() if k not in ("symbols", "equity_curve")}
+            doc["symbols"] = {s: vars(st) for s, st in report.symbols.items()}
+            with open(args.json_out, "w") as f:
+                json.dump(doc, f, indent=2)
+            print(f"Saved JSON report to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Background prefetch of per-pair inputs for the optimizer.
+
+The optimizer is CPU-bound while it sweeps a pair and idle while it waits for
+the next pair's bars (DB round trips) and fee (HTTP). `prefetch` overlaps the
+two: while the caller works on pair i, pairs i+1..i+depth load in background
+threads, so at most `depth + 1` pairs' bars are held at once. Items come back
+in input order; a failed load re-raises when its future's result is taken.
+
+The loader threads share one `RepoPool`, which connects lazily and never
+opens more than `size` connections.
+"""
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import queue
+import threading
+from typing import Any, Callable, Deque, Generator, Iterable, Iterator, List, Tuple, TypeVar
+
+from qryptify.shared.profiling import current
+
+K = TypeVar("K")
+T = TypeVar("T")
+
+
+class RepoPool:
+    """Bounded pool of connected repos (e.g. TimescaleRepo), one per borrower."""
+
+    def __init__(self, factory: Callable[[], Any], size: int) -> None:
+        self._factory = factory
+        self._slots = threading.BoundedSemaphore(max(1, size))
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open: List[Any] = []
+
+    @property
+    def connections(self) -> int:
+        return len(self._open)
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        with self._slots:
+            repo = self._take()
+            try:
+                yield repo
+            except BaseException:
+                # The connection may be mid-transaction or broken; do not hand it on
+                self._discard(repo)
+                raise
+            self._idle.put(repo)
+
+    def _take(self) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        repo = self._factory()
+        try:
+            with current().phase("db_connect"):
+                repo.connect()
+        except BaseException:
+            repo.close()
+            raise
+        with self._lock:
+            self._open.append(repo)
+        return repo
+
+    def _discard(self, repo: Any) -> None:
+        with self._lock:
+            if repo in self._open:
+                self._open.remove(repo)
+        repo.close()
+
+    def close(self) -> None:
+        with self._lock:
+            repos, self._open = self._open, []
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for repo in repos:
+            repo.close()
+
+    def __enter__(self) -> "RepoPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_END: Any = object()
+
+
+def _run_now(load: Callable[[K], T], item: K) -> "Future[T]":
+    fut: "Future[T]" = Future()
+    try:
+        fut.set_result(load(item))
+    except Exception as e:
+        fut.set_exception(e)
+    return fut
+
+
+def prefetch(items: Iterable[K], load: Callable[[K], T],
+             depth: int = 2) -> Generator[Tuple[K, "Future[T]"], None, None]:
+    """Yield `(item, future of load(item))` in order, loading up to `depth` items ahead.
+
+    `depth=0` loads each item inline when it is reached. Closing the
+    generator early cancels the loads that have not started.
+    """
+    if depth <= 0:
+        for item in items:
+            yield item, _run_now(load, item)
+        return
+    it = iter(items)
+    pending: Deque[Tuple[K, "Future[T]"]] = deque()
+    with ThreadPoolExecutor(max_workers=depth, thread_name_prefix="prefetch") as pool:
+        try:
+            while True:
+                # The item handed out plus `depth` more in flight
+                while len(pending) <= depth:
+                    item = next(it, _END)
+                    if item is _END:
+                        break
+                    pending.append((item, pool.submit(load, item)))
+                if not pending:
+                    return
+                yield pending.popleft()
+        finally:
+            for _, fut in pending:
+                fut.cancel()
+
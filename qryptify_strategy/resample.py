@@ -0,0 +1,104 @@
+"""In-memory OHLCV resampling for intervals that are not stored in the DB.
+
+Turns a base bar series (e.g. 1m or 5m) into any whole multiple of its step.
+Buckets are aligned to the UTC epoch like Binance klines (weeks start on
+Monday), and aggregation runs column-wise over bucket slices rather than bar
+by bar.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import List, Optional
+
+from qryptify.shared.intervals import parse_interval
+from qryptify.shared.intervals import step_of
+from qryptify.shared.intervals import SUPPORTED_INTERVALS
+
+from .models import Bar
+
+PARTIAL_POLICIES = ("drop", "keep", "strict")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Binance weekly klines open on Monday; 1970-01-05 is the first Monday.
+_WEEK_ORIGIN_S = 4 * 86400
+
+
+def base_interval_for(interval: str) -> str:
+    """Return the coarsest stored interval whose step divides `interval`."""
+    target_s = int(parse_interval(interval).total_seconds())
+    for itv in reversed(SUPPORTED_INTERVALS):
+        if target_s % int(step_of(itv).total_seconds()) == 0:
+            return itv
+    raise ValueError(f"No stored base interval divides {interval}")
+
+
+def _infer_step_s(bars: List[Bar]) -> int:
+    best = 0
+    for a, b in zip(bars, bars[1:]):
+        d = int((b.ts - a.ts).total_seconds())
+        if d > 0 and (best == 0 or d < best):
+            best = d
+    if best == 0:
+        raise ValueError("Cannot infer base step; pass base_step explicitly")
+    return best
+
+
+def resample_bars(
+    bars: List[Bar],
+    target_step: timedelta,
+    *,
+    base_step: Optional[timedelta] = None,
+    partial: str = "drop",
+) -> List[Bar]:
+    """Aggregate `bars` into buckets of `target_step`.
+
+    open=first, high=max, low=min, close=last, volume=sum. `target_step` must
+    be a whole multiple of the base step (inferred from the smallest gap when
+    `base_step` is None).
+
+    Partial buckets (fewer than target/base bars):
+      - drop: drop incomplete buckets at either edge (series starting or
+        ending mid-bucket); interior gaps are kept, like exchange bars
+      - keep: keep every bucket
+      - strict: drop every incomplete bucket
+    """
+    if partial not in PARTIAL_POLICIES:
+        raise ValueError(f"partial must be one of {PARTIAL_POLICIES}")
+    if not bars:
+        return []
+    tgt_s = int(target_step.total_seconds())
+    base_s = int(base_step.total_seconds()) if base_step else _infer_step_s(bars)
+    if tgt_s <= 0 or base_s <= 0 or tgt_s % base_s != 0:
+        raise ValueError(f"target step {target_step} is not a multiple of base {base_s}s")
+    ratio = tgt_s // base_s
+    origin_s = _WEEK_ORIGIN_S if tgt_s % 604800 == 0 else 0
+
+    keys = [(int((b.ts - _EPOCH).total_seconds()) - origin_s) // tgt_s for b in bars]
+    opens = [b.open for b in bars]
+    highs = [b.high for b in bars]
+    lows = [b.low for b in bars]
+    closes = [b.close for b in bars]
+    vols = [b.volume for b in bars]
+
+    # Bucket boundaries: indices where the key changes
+    starts = [0] + [i for i in range(1, len(keys)) if keys[i] != keys[i - 1]]
+    ends = starts[1:] + [len(keys)]
+    last = len(starts) - 1
+
+    out: List[Bar] = []
+    for j, (s, e) in enumerate(zip(starts, ends)):
+        if e - s < ratio:
+            if partial == "strict" or (partial == "drop" and j in (0, last)):
+                continue
+        out.append(
+            Bar(
+                ts=_EPOCH + timedelta(seconds=keys[s] * tgt_s + origin_s),
+                open=opens[s],
+                high=max(highs[s:e]),
+                low=min(lows[s:e]),
+                close=closes[e - 1],
+                volume=sum(vols[s:e]),
+            ))
+    return out
@@ -0,0 +1,320 @@
+"""Bounded-memory consumers for streams of optimizer results.
+
+`PairSink` takes a pair's results one at a time and keeps only what the
+reports need: top-K heaps for the `choose_best` tiers, the Pareto frontier
+of unpruned results maintained incrementally ((pnl, dd) by default, any
+objectives from `pareto.py` otherwise), and counters. Every result can also be
+forwarded to a `FullGridWriter`, which appends it to the full-grid CSV as it
+arrives, so optimizer memory no longer grows with the grid size.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from bisect import bisect_right
+import csv
+import gzip
+import heapq
+import os
+from typing import Callable, Dict, IO, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from .candidates import Result
+from .models import AbortRules
+from .pareto import MAXIMIZE
+from .pareto import MINIMIZE
+from .pareto import Objective
+from .pareto import SkylineFrontier
+
+T = TypeVar("T")
+
+FULL_GRID_FIELDS = [
+    "symbol",
+    "interval",
+    "strategy",
+    "params",
+    "risk",
+    "atr_mult",
+    "pnl",
+    "dd",
+    "trades",
+    "equity_end",
+    "cagr",
+    "avg_fee_bps",
+    "pruned",
+    "win_rate",
+    "fees",
+]
+# Pareto CSV metrics; the chosen objectives are moved to the front
+FRONTIER_METRICS = [
+    "pnl",
+    "dd",
+    "trades",
+    "equity_end",
+    "cagr",
+    "avg_fee_bps",
+    "win_rate",
+    "fee_drag",
+]
+
+
+def choose_best(results: List[Result], dd_cap: float | None,
+                lam: float) -> Tuple[Result, List[Result]]:
+    # Filter by drawdown cap if provided; pruned runs only cover a prefix
+    filt = [r for r in results if not r.pruned and (dd_cap is None or r.dd <= dd_cap)]
+    if not filt:
+        # If nothing passes, pick best score without cap. Prefix metrics of
+        # pruned runs are a last resort: callers re-run unpruned first
+        filt = [r for r in results if not r.pruned] or results
+    # Score: pnl - lam * dd
+    scored = sorted(filt, key=lambda r: (r.pnl - lam * r.dd, r.pnl), reverse=True)
+    top = scored[0]
+    # Return also full ranked list for inspection/export
+    return top, scored
+
+
+def pareto_frontier(results: List[Result]) -> List[Result]:
+    """Compute Pareto frontier maximizing pnl and minimizing dd.
+
+    Returns results sorted by dd ascending, keeping only non-dominated points.
+    """
+    if not results:
+        return []
+    arr = sorted(results, key=lambda r: (r.dd, -r.pnl))
+    frontier: List[Result] = []
+    best_pnl = float("-inf")
+    for r in arr:
+        if r.pnl > best_pnl:
+            frontier.append(r)
+            best_pnl = r.pnl
+    return frontier
+
+
+class TopK:
+    """The k largest items by key; ties keep arrival order, like a stable sort."""
+
+    def __init__(self, k: int, key: Callable[[Result], Tuple[float, float]]) -> None:
+        self.k = max(1, k)
+        self.key = key
+        self._heap: List[Tuple[Tuple[float, float], int, Result]] = []
+        self._seq = 0
+
+    def add(self, r: Result) -> None:
+        item = (self.key(r), -self._seq, r)
+        self._seq += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def sorted(self) -> List[Result]:
+        return [r for _, _, r in sorted(self._heap, key=lambda t: t[:2], reverse=True)]
+
+
+class ParetoFrontier:
+    """Incremental (max pnl, min dd) frontier, kept sorted by dd ascending.
+
+    Matches `pareto_frontier` on the same input: among equal
+    points the first one seen stays.
+    """
+
+    def __init__(self) -> None:
+        self._dd: List[float] = []
+        self._pts: List[Result] = []
+
+    def add(self, r: Result) -> bool:
+        i = bisect_right(self._dd, r.dd)
+        # Best pnl at dd <= r.dd is the last point before the insertion slot
+        if i and self._pts[i - 1].pnl >= r.pnl:
+            return False
+        # Drop points at dd >= r.dd that r now dominates (a contiguous run)
+        lo = j = bisect_left(self._dd, r.dd)
+        while j < len(self._pts) and self._pts[j].pnl <= r.pnl:
+            j += 1
+        self._dd[lo:j] = [r.dd]
+        self._pts[lo:j] = [r]
+        return True
+
+    def __len__(self) -> int:
+        return len(self._pts)
+
+    def points(self) -> List[Result]:
+        return list(self._pts)
+
+
+def make_frontier(
+    objectives: Optional[Sequence[Objective]] = None
+) -> Union[ParetoFrontier, SkylineFrontier]:
+    """ParetoFrontier for the default (pnl max, dd min), else a SkylineFrontier."""
+    if objectives is None or [(o.name, o.sense) for o in objectives] == [("pnl", MAXIMIZE),
+                                                                        ("dd", MINIMIZE)]:
+        return ParetoFrontier()
+    return SkylineFrontier(objectives)
+
+
+class PairSink:
+    """Per-pair ranking state for a stream of results (see choose_best)."""
+
+    def __init__(self, lam: float, dd_cap: Optional[float], top_k: int,
+                 on_result: Optional[Callable[[Result], None]] = None,
+                 objectives: Optional[Sequence[Objective]] = None,
+                 hold_pruned: bool = False) -> None:
+        self.lam = lam
+        self.dd_cap = dd_cap
+        self.on_result = on_result
+        # With hold_pruned, on_result only sees pruned results once an unpruned
+        # one arrives (or on flush()), so an all-pruned pass can be discarded
+        self._held: Optional[List[Result]] = [] if hold_pruned else None
+
+        def key(r: Result) -> Tuple[float, float]:
+            return (r.pnl - lam * r.dd, r.pnl)
+
+        # choose_best tiers: within the DD cap, any unpruned, anything at all
+        self._capped = TopK(top_k, key)
+        self._unpruned = TopK(top_k, key)
+        self._any = TopK(top_k, key)
+        self.frontier = make_frontier(objectives)
+        self.count = 0
+        self.pruned = 0
+        self.bars = 0
+
+    def add(self, r: Result) -> None:
+        self.count += 1
+        self.bars += r.bars or 0
+        self._any.add(r)
+        if r.pruned:
+            self.pruned += 1
+        else:
+            self._unpruned.add(r)
+            if self.dd_cap is None or r.dd <= self.dd_cap:
+                self._capped.add(r)
+            self.frontier.add(r)
+        if self._held is not None:
+            if r.pruned:
+                self._held.append(r)
+                return
+            self.flush()
+        if self.on_result is not None:
+            self.on_result(r)
+
+    def flush(self) -> None:
+        """Pass held pruned results to on_result and stop holding."""
+        held, self._held = self._held or [], None
+        if self.on_result is not None:
+            for r in held:
+                self.on_result(r)
+
+    @property
+    def all_pruned(self) -> bool:
+        """Every result so far was pruned: rankings would rest on prefix metrics.
+
+        Callers re-run the pair without AbortRules before ranking.
+        """
+        return self.count > 0 and not len(self._unpruned)
+
+    def ranked(self) -> List[Result]:
+        """Top-K in choose_best order (best first)."""
+        for tier in (self._capped, self._unpruned, self._any):
+            if len(tier):
+                return tier.sorted()
+        return []
+
+    def best(self) -> Optional[Result]:
+        ranked = self.ranked()
+        return ranked[0] if ranked else None
+
+
+def sweep_unpruned(
+    new_sink: Callable[[bool], PairSink],
+    sweep: Callable[[PairSink, Optional[AbortRules]], T],
+    abort: Optional[AbortRules],
+) -> Tuple[PairSink, T, bool]:
+    """Run `sweep` under `abort`; if every result is pruned, re-run it without.
+
+    Prefix metrics cannot pick a config, so the all-pruned pass is discarded:
+    the re-run goes into a fresh sink (`new_sink(hold_pruned)`) and the first
+    pass's rows never reach `on_result`. Returns the kept sink, what its
+    sweep returned and whether the fallback ran.
+    """
+    sink = new_sink(abort is not None)
+    out = sweep(sink, abort)
+    fell_back = abort is not None and sink.all_pruned
+    if fell_back:
+        sink = new_sink(False)
+        out = sweep(sink, None)
+    sink.flush()
+    return sink, out, fell_back
+
+
+class FullGridWriter:
+    """Streams every result to a CSV (gzip when the path ends in .gz)."""
+
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._f: IO[str] = (gzip.open(path, "wt", newline="")
+                            if path.endswith(".gz") else open(path, "w", newline=""))
+        self._w = csv.DictWriter(self._f, fieldnames=FULL_GRID_FIELDS)
+        self._w.writeheader()
+        self.rows = 0
+
+    def writer_for(self, symbol: str, interval: str) -> Callable[[Result], None]:
+
+        def write(r: Result) -> None:
+            self._w.writerow(_full_row(symbol, interval, r))
+            self.rows += 1
+
+        return write
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> "FullGridWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _full_row(symbol: str, interval: str, r: Result) -> Dict[str, object]:
+    return {
+        "symbol": symbol,
+        "interval": interval,
+        "strategy": r.strategy,
+        "params": r.params,
+        "risk": r.risk,
+        "atr_mult": r.atr_mult,
+        "pnl": round(r.pnl, 2),
+        "dd": round(r.dd, 2),
+        "trades": r.trades,
+        "equity_end": round(r.equity_end, 2),
+        "cagr": round((r.cagr or 0.0) * 100, 2),
+        "avg_fee_bps": round((r.avg_fee_bps or 0.0), 4),
+        "pruned": int(r.pruned),
+        "win_rate": round((r.win_rate or 0.0) * 100, 2),
+        "fees": round((r.fees or 0.0), 2),
+    }
+
+
+def frontier_fields(objectives: Sequence[Objective]) -> List[str]:
+    names = [o.name for o in objectives]
+    return (["strategy", "params", "risk", "atr_mult"] + names +
+            [m for m in FRONTIER_METRICS if m not in names])
+
+
+def frontier_row(r: Result) -> Dict[str, object]:
+    return {
+        "strategy": r.strategy,
+        "params": r.params,
+        "risk": r.risk,
+        "atr_mult": r.atr_mult,
+        "pnl": round(r.pnl, 2),
+        "dd": round(r.dd, 2),
+        "trades": r.trades,
+        "equity_end": round(r.equity_end, 2),
+        "cagr": round((r.cagr or 0.0) * 100, 2),
+        "avg_fee_bps": round((r.avg_fee_bps or 0.0), 4),
+        "win_rate": round((r.win_rate or 0.0) * 100, 2),
+        "fee_drag": round((r.fees or 0.0), 2),
+    }
@@ -0,0 +1,290 @@
+"""Binary snapshots of indicator and strategy state, for warm starts.
+
+Indicators and strategy cores start cold, and a long EMA needs weeks of
+history replayed before its signals can be trusted. `dumps` packs the state of
+an indicator (`WilderRSI`, `WilderATR`, `RollingMeanStd`), a core
+(`EMACrossCore`, `BollingerCore`, `RSICore`) or a shipped strategy into a
+compact struct-packed blob, and `loads` restores it in place. Restored
+objects continue bit-identically.
+
+Layout: magic `QSNP`, format version (u8), kind name (u8 length + ASCII),
+then the kind's fields little-endian. Optional floats are stored as NaN when
+unset. Bump `FORMAT_VERSION` when any layout changes; older blobs then fail
+to load with `SnapshotError` and the caller starts cold.
+
+`SnapshotStore` keeps blobs in SQLite keyed by (pair, strategy config, last
+bar ts). A live process calls `restore_latest` at startup, then replays only
+the bars after the returned timestamp.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timezone
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import struct
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .backtester import strategy_params
+from .indicators import RollingMeanStd
+from .indicators import WilderATR
+from .indicators import WilderRSI
+from .strategy_base import Strategy
+from .strategy_utils import BollingerCore
+from .strategy_utils import EMACrossCore
+from .strategy_utils import RSICore
+
+FORMAT_VERSION = 1
+_MAGIC = b"QSNP"
+_NAN = float("nan")
+
+
+class SnapshotError(ValueError):
+    """A blob that is corrupt, from another format version or of another kind."""
+
+
+def _f(x: Optional[float]) -> float:
+    return _NAN if x is None else x
+
+
+def _opt(x: float) -> Optional[float]:
+    return None if math.isnan(x) else x
+
+
+# -- per-kind layouts: pack(state dict) -> bytes, unpack(buf, offset) -> (state, offset) --
+
+_RSI = struct.Struct("<IQddddd")
+
+
+def _pack_rsi(s: Dict[str, Any]) -> bytes:
+    return _RSI.pack(s["period"], s["count"], _f(s["prev_close"]), s["sum_gain"], s["sum_loss"],
+                     _f(s["avg_gain"]), _f(s["avg_loss"]))
+
+
+def _unpack_rsi(buf: bytes, off: int) -> Tuple[Dict[str, Any], int]:
+    period, count, prev, sg, sl, ag, al = _RSI.unpack_from(buf, off)
+    return {
+        "period": period,
+        "count": count,
+        "prev_close": _opt(prev),
+        "sum_gain": sg,
+        "sum_loss": sl,
+        "avg_gain": _opt(ag),
+        "avg_loss": _opt(al),
+    }, off + _RSI.size
+
+
+_ATR = struct.Struct("<IQdd")
+
+
+def _pack_atr(s: Dict[str, Any]) -> bytes:
+    return _ATR.pack(s["period"], s["count"], _f(s["atr"]), s["sum_tr"])
+
+
+def _unpack_atr(buf: bytes, off: int) -> Tuple[Dict[str, Any], int]:
+    period, count, atr, sum_tr = _ATR.unpack_from(buf, off)
+    return {"period": period, "count": count, "atr": _opt(atr), "sum_tr": sum_tr}, off + _ATR.size
+
+
+_ROLL = struct.Struct("<IddI")
+
+
+def _pack_roll(s: Dict[str, Any]) -> bytes:
+    win = s["win"]
+    return _ROLL.pack(s["period"], s["sum"], s["sumsq"], len(win)) + struct.pack(
+        f"<{len(win)}d", *win)
+
+
+def _unpack_roll(buf: bytes, off: int) -> Tuple[Dict[str, Any], int]:
+    period, tot, sumsq, n = _ROLL.unpack_from(buf, off)
+    off += _ROLL.size
+    win = list(struct.unpack_from(f"<{n}d", buf, off))
+    return {"period": period, "win": win, "sum": tot, "sumsq": sumsq}, off + 8 * n
+
+
+_EMA = struct.Struct("<IIdd")
+
+
+def _pack_ema(s: Dict[str, Any]) -> bytes:
+    return _EMA.pack(s["fast"], s["slow"], _f(s["fast_ema"]), _f(s["slow_ema"]))
+
+
+def _unpack_ema(buf: bytes, off: int) -> Tuple[Dict[str, Any], int]:
+    fast, slow, fe, se = _EMA.unpack_from(buf, off)
+    return {"fast": fast, "slow": slow, "fast_ema": _opt(fe), "slow_ema": _opt(se)}, off + _EMA.size
+
+
+_BB = struct.Struct("<ddddd")
+
+
+def _pack_bb(s: Dict[str, Any]) -> bytes:
+    return _BB.pack(s["mult"], _f(s["prev_close"]), _f(s["prev_lower"]), _f(s["prev_mid"]),
+                    _f(s["prev_upper"])) + _pack_roll(s["roll"])
+
+
+def _unpack_bb(buf: bytes, off: int) -> Tuple[Dict[str, Any], int]:
+    mult, pc, lo, mid, up = _BB.unpack_from(buf, off)
+    roll, off = _unpack_roll(buf, off + _BB.size)
+    return {
+        "mult": mult,
+        "roll": roll,
+        "prev_close": _opt(pc),
+        "prev_lower": _opt(lo),
+        "prev_mid": _opt(mid),
+        "prev_upper": _opt(up),
+    }, off
+
+
+_RSI_CORE = struct.Struct("<iddd")
+
+
+def _pack_rsi_core(s: Dict[str, Any]) -> bytes:
+    return _RSI_CORE.pack(s["ema_filter"], _f(s["rsi"]), _f(s["ema"]),
+                          _f(s["last_close"])) + _pack_rsi(s["rsi_calc"])
+
+
+def _unpack_rsi_core(buf: bytes, off: int) -> Tuple[Dict[str, Any], int]:
+    ema_filter, rsi, ema, last = _RSI_CORE.unpack_from(buf, off)
+    calc, off = _unpack_rsi(buf, off + _RSI_CORE.size)
+    return {
+        "ema_filter": ema_filter,
+        "rsi_calc": calc,
+        "rsi": _opt(rsi),
+        "ema": _opt(ema),
+        "last_close": _opt(last),
+    }, off
+
+
+_Codec = Tuple[Callable[[Dict[str, Any]], bytes], Callable[[bytes, int], Tuple[Dict[str, Any],
+                                                                                int]]]
+CODECS: Dict[str, _Codec] = {
+    WilderRSI.__name__: (_pack_rsi, _unpack_rsi),
+    WilderATR.__name__: (_pack_atr, _unpack_atr),
+    RollingMeanStd.__name__: (_pack_roll, _unpack_roll),
+    EMACrossCore.__name__: (_pack_ema, _unpack_ema),
+    BollingerCore.__name__: (_pack_bb, _unpack_bb),
+    RSICore.__name__: (_pack_rsi_core, _unpack_rsi_core),
+    # The shipped strategies' state is their core's
+    "EMACrossStrategy": (_pack_ema, _unpack_ema),
+    "BollingerBandStrategy": (_pack_bb, _unpack_bb),
+    "RSIScalpStrategy": (_pack_rsi_core, _unpack_rsi_core),
+}
+
+
+def dumps(obj: Any) -> bytes:
+    """Pack `obj.snapshot()` for any kind in `CODECS`."""
+    kind = type(obj).__name__
+    codec = CODECS.get(kind)
+    if codec is None:
+        raise SnapshotError(f"no binary snapshot layout for {kind}")
+    name = kind.encode("ascii")
+    return _MAGIC + bytes((FORMAT_VERSION, len(name))) + name + codec[0](obj.snapshot())
+
+
+def loads(data: bytes, into: Any) -> None:
+    """Restore a `dumps` blob into `into`, which must be of the same kind and parameters."""
+    if data[:4] != _MAGIC or len(data) < 6:
+        raise SnapshotError("not a snapshot")
+    if data[4] != FORMAT_VERSION:
+        raise SnapshotError(f"snapshot format {data[4]}, expected {FORMAT_VERSION}")
+    end = 6 + data[5]
+    kind = data[6:end].decode("ascii")
+    if kind != type(into).__name__:
+        raise SnapshotError(f"snapshot of {kind} cannot restore a {type(into).__name__}")
+    try:
+        state, off = CODECS[kind][1](data, end)
+    except (KeyError, struct.error) as e:
+        raise SnapshotError(f"corrupt {kind} snapshot: {e}") from e
+    if off != len(data):
+        raise SnapshotError(f"corrupt {kind} snapshot: {len(data) - off} trailing bytes")
+    try:
+        into.restore(state)
+    except ValueError as e:  # other parameters than the snapshot's
+        raise SnapshotError(str(e)) from e
+
+
+def config_key(strategy: Strategy) -> str:
+    """Strategy class and parameters, hashed (the store's config column)."""
+    blob = json.dumps({"strategy": type(strategy).__name__, "params": strategy_params(strategy)},
+                      sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()[:32]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    pair TEXT NOT NULL,
+    config TEXT NOT NULL,
+    last_ts TEXT NOT NULL,
+    data BLOB NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (pair, config, last_ts)
+);
+"""
+
+
+class SnapshotStore:
+    """SQLite store of strategy snapshots keyed by (pair, config, last bar ts).
+
+    Timestamps are stored as UTC ISO strings, so they sort chronologically.
+    """
+
+    def __init__(self, path: str, keep: int = 3) -> None:
+        self.path = path
+        self.keep = keep  # snapshots kept per (pair, config)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "SnapshotStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def save(self, pair: str, strategy: Strategy, last_ts: datetime) -> None:
+        """Store the strategy's state after the bar at `last_ts`, keeping the newest `keep`."""
+        cfg = config_key(strategy)
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)",
+                               (pair, cfg, _ts_key(last_ts), dumps(strategy), time.time()))
+            self._conn.execute(
+                "DELETE FROM snapshots WHERE pair = ? AND config = ? AND last_ts NOT IN "
+                "(SELECT last_ts FROM snapshots WHERE pair = ? AND config = ? "
+                "ORDER BY last_ts DESC LIMIT ?)", (pair, cfg, pair, cfg, self.keep))
+
+    def restore_latest(self,
+                       pair: str,
+                       strategy: Strategy,
+                       before: Optional[datetime] = None) -> Optional[datetime]:
+        """Restore the newest usable snapshot (at or before `before`) into `strategy`.
+
+        Returns its last bar ts, or None (strategy untouched) when there is
+        none; unreadable snapshots, e.g. of an older format, are skipped.
+        """
+        sql = "SELECT last_ts, data FROM snapshots WHERE pair = ? AND config = ?"
+        params: list = [pair, config_key(strategy)]
+        if before is not None:
+            sql += " AND last_ts <= ?"
+            params.append(_ts_key(before))
+        for ts, data in self._conn.execute(sql + " ORDER BY last_ts DESC", params):
+            try:
+                loads(data, strategy)
+            except SnapshotError:
+                continue
+            return datetime.fromisoformat(ts)
+        return None
+
+
+def _ts_key(ts: datetime) -> str:
+    if ts.tzinfo is None:
+        raise ValueError("snapshot timestamps must be timezone-aware")
+    return ts.astimezone(timezone.utc).isoformat()
@@ -0,0 +1,357 @@
+"""Declarative optimizer search spaces and samplers.
+
+A space is read from the optimizer YAML (`search_space:`), one entry per
+strategy plus a `common` block for the risk settings shared by all of them::
+
+    search_space:
+      sampler: lhs          # grid | random | lhs
+      budget: 2000          # candidates to evaluate (random/lhs; caps grid)
+      seed: 7
+      common:
+        risk: [0.003, 0.005, 0.01]
+        atr_mult: {min: 1.5, max: 4.0, step: 0.5}
+        atr_trail: [0.0, 2.0, 3.0]
+        atr_trail_trigger: {min: 0.0, max: 2.0, step: 0.5}
+      strategies:
+        ema:
+          fast: {min: 5, max: 60, step: 5}
+          slow: {min: 50, max: 300, step: 25}
+          constraints: ["fast < slow"]
+        rsi:
+          entry: {min: 20, max: 35, step: 5}
+          exit: {min: 45, max: 65, step: 5}
+          constraints: ["exit > entry + 10"]
+
+A parameter is a list of values, a `{min, max, step}` range (integer when
+all bounds are integers; without `step` it is continuous and can only be
+sampled), or a single fixed value. Unlisted strategy parameters keep their
+constructor defaults. Constraints are comparisons (optionally chained) over
+parameter names, numbers and `+ - *`.
+
+All samplers are generators: the exhaustive grid walks the Cartesian product
+lazily and random/LHS draw until the budget is met, so huge spaces are never
+materialized.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import fields as dc_fields
+import itertools
+import math
+import operator
+import random
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .candidates import BB_MULTS
+from .candidates import BB_PERIODS
+from .candidates import Candidate
+from .candidates import RSI_EMA_FILTERS
+from .candidates import RSI_ENTRIES
+from .candidates import RSI_EXITS
+from .candidates import RSI_PERIODS
+from .candidates import STRATEGIES
+
+SAMPLERS = ("grid", "random", "lhs")
+# common block key -> Candidate field
+COMMON_PARAMS = {
+    "risk": "risk",
+    "atr_mult": "atr_mult",
+    "atr_trail": "trail",
+    "atr_trail_trigger": "trail_trigger",
+}
+_COMMON_DEFAULTS = {"risk": [0.005], "atr_mult": [2.5], "atr_trail": [0.0],
+                    "atr_trail_trigger": [0.0]}
+
+
+@dataclass
+class Dim:
+    name: str
+    values: Optional[List[Any]] = None  # discrete choices
+    low: float = 0.0  # continuous range when values is None
+    high: float = 0.0
+    integer: bool = False
+
+    @classmethod
+    def parse(cls, name: str, spec: Any) -> "Dim":
+        if isinstance(spec, (list, tuple)):
+            if not spec:
+                raise ValueError(f"{name}: empty value list")
+            return cls(name, values=list(spec))
+        if isinstance(spec, dict):
+            try:
+                lo, hi = spec["min"], spec["max"]
+            except KeyError:
+                raise ValueError(f"{name}: range needs min and max") from None
+            step = spec.get("step")
+            if hi < lo:
+                raise ValueError(f"{name}: max < min")
+            integer = all(isinstance(x, int) for x in (lo, hi, step) if x is not None)
+            if step is None:
+                if integer:
+                    step = 1
+                else:
+                    return cls(name, low=float(lo), high=float(hi))
+            if step <= 0:
+                raise ValueError(f"{name}: step must be > 0")
+            n = int(math.floor((hi - lo) / step + 1e-9)) + 1
+            vals = [lo + k * step if integer else round(lo + k * step, 10) for k in range(n)]
+            return cls(name, values=vals, integer=integer)
+        return cls(name, values=[spec])
+
+    @property
+    def size(self) -> Optional[int]:
+        return len(self.values) if self.values is not None else None
+
+    def at(self, u: float) -> Any:
+        """Map u in [0, 1) to a value (stratum index for discrete dims)."""
+        if self.values is not None:
+            return self.values[min(int(u * len(self.values)), len(self.values) - 1)]
+        return self.low + u * (self.high - self.low)
+
+
+_CMP = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+        "==": operator.eq, "!=": operator.ne}
+_CMP_RE = re.compile(r"(<=|>=|==|!=|<|>)")
+_TERM_RE = re.compile(r"\s*([+\-*])?\s*([A-Za-z_]\w*|\d+(?:\.\d*)?|\.\d+)\s*")
+
+
+def _compile_expr(text: str, names: Sequence[str]) -> Callable[[Dict[str, Any]], float]:
+    """Compile `a + 2 * b`-style arithmetic (left to right, * binds tighter)."""
+    pos = 0
+    terms: List[Tuple[str, str]] = []
+    while pos < len(text):
+        m = _TERM_RE.match(text, pos)
+        if m is None or (terms and m.group(1) is None) or (not terms and m.group(1)):
+            raise ValueError(f"Bad constraint term: {text!r}")
+        op, tok = m.group(1) or "+", m.group(2)
+        if tok[0].isalpha() or tok[0] == "_":
+            if tok not in names:
+                raise ValueError(f"Unknown parameter in constraint: {tok}")
+        terms.append((op, tok))
+        pos = m.end()
+    if not terms:
+        raise ValueError(f"Empty constraint side: {text!r}")
+
+    def value(tok: str, p: Dict[str, Any]) -> float:
+        return p[tok] if tok in p else float(tok)
+
+    def ev(p: Dict[str, Any]) -> float:
+        total, prod = 0.0, 0.0
+        sign = 1.0
+        for i, (op, tok) in enumerate(terms):
+            v = value(tok, p)
+            if op == "*":
+                prod *= v
+                continue
+            if i:
+                total += sign * prod
+            sign = -1.0 if op == "-" else 1.0
+            prod = v
+        return total + sign * prod
+
+    return ev
+
+
+def compile_constraint(expr: str, names: Sequence[str]) -> Callable[[Dict[str, Any]], bool]:
+    parts = _CMP_RE.split(expr)
+    if len(parts) < 3:
+        raise ValueError(f"Constraint needs a comparison: {expr!r}")
+    sides = [_compile_expr(parts[i], names) for i in range(0, len(parts), 2)]
+    ops = [_CMP[parts[i]] for i in range(1, len(parts), 2)]
+
+    def check(p: Dict[str, Any]) -> bool:
+        vals = [s(p) for s in sides]
+        return all(op(vals[i], vals[i + 1]) for i, op in enumerate(ops))
+
+    return check
+
+
+@dataclass
+class StrategySpace:
+    strategy: str
+    dims: List[Dim]  # strategy parameters, then the common risk dims
+    defaults: Dict[str, Any] = field(default_factory=dict)  # unlisted strategy params
+    constraints: List[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        names = [d.name for d in self.dims]
+        self._checks = [compile_constraint(c, names) for c in self.constraints]
+
+    @property
+    def size(self) -> Optional[int]:
+        """Cartesian size before constraints (None when any dim is continuous)."""
+        n = 1
+        for d in self.dims:
+            if d.size is None:
+                return None
+            n *= d.size
+        return n
+
+    def accepts(self, point: Dict[str, Any]) -> bool:
+        return all(check(point) for check in self._checks)
+
+    def candidate(self, point: Dict[str, Any]) -> Candidate:
+        kw = dict(self.defaults)
+        extra = {}
+        for name, v in point.items():
+            if name in COMMON_PARAMS:
+                extra[COMMON_PARAMS[name]] = float(v)
+            else:
+                kw[name] = v
+        order = [f.name for f in dc_fields(STRATEGIES[self.strategy])]  # type: ignore[arg-type]
+        params = tuple((k, kw[k]) for k in order if k in kw)
+        return Candidate(self.strategy, params, **extra)
+
+
+@dataclass
+class SearchSpace:
+    strategies: List[StrategySpace]
+    sampler: str = "grid"
+    budget: int = 0
+    seed: int = 0
+
+    @property
+    def size(self) -> Optional[int]:
+        total = 0
+        for s in self.strategies:
+            if s.size is None:
+                return None
+            total += s.size
+        return total
+
+
+def _strategy_space(name: str, spec: Dict[str, Any], common: Dict[str, Any]) -> StrategySpace:
+    cls = STRATEGIES.get(name)
+    if cls is None:
+        raise ValueError(f"Unknown strategy in search_space: {name}")
+    spec = dict(spec or {})
+    constraints = [str(c) for c in spec.pop("constraints", []) or []]
+    # Strategy-level overrides of the common risk dims are allowed
+    merged_common = {**common, **{k: spec.pop(k) for k in list(spec) if k in COMMON_PARAMS}}
+    own = {f.name: f.default for f in dc_fields(cls)}  # type: ignore[arg-type]
+    dims: List[Dim] = []
+    for pname, pspec in spec.items():
+        if pname not in own:
+            raise ValueError(f"{name}: unknown parameter {pname!r} "
+                             f"(expected one of {', '.join(own)})")
+        dims.append(Dim.parse(pname, pspec))
+    for cname in COMMON_PARAMS:
+        dims.append(Dim.parse(cname, merged_common.get(cname, _COMMON_DEFAULTS[cname])))
+    defaults = {k: v for k, v in own.items() if k not in spec}
+    return StrategySpace(name, dims, defaults, constraints)
+
+
+def parse_space(cfg: Dict[str, Any]) -> SearchSpace:
+    """Build a SearchSpace from the `search_space:` YAML mapping."""
+    common = dict(cfg.get("common") or {})
+    unknown = set(common) - set(COMMON_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown common parameters: {', '.join(sorted(unknown))}")
+    strategies = cfg.get("strategies") or {}
+    if isinstance(strategies, list):
+        strategies = {str(s): {} for s in strategies}
+    spaces = [_strategy_space(str(k), v, common) for k, v in strategies.items()]
+    if not spaces:
+        raise ValueError("search_space.strategies is empty")
+    sampler = str(cfg.get("sampler", "grid"))
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown sampler: {sampler}")
+    return SearchSpace(spaces, sampler, int(cfg.get("budget", 0) or 0), int(cfg.get("seed", 0)))
+
+
+def legacy_space(strategies: List[str], fast_opts: List[int], slow_opts: List[int],
+                 risk_opts: List[float], atr_opts: List[float]) -> SearchSpace:
+    """The CLI grid (--fast/--slow/--risk/--atr-mult + built-in BB/RSI lists)."""
+    common = {"risk": list(risk_opts), "atr_mult": list(atr_opts)}
+    specs: Dict[str, Dict[str, Any]] = {
+        "ema": {"fast": list(fast_opts), "slow": list(slow_opts),
+                "constraints": ["fast < slow"]},
+        "bollinger": {"period": BB_PERIODS, "mult": BB_MULTS},
+        "rsi": {"rsi_period": RSI_PERIODS, "entry": RSI_ENTRIES, "exit": RSI_EXITS,
+                "ema_filter": RSI_EMA_FILTERS},
+    }
+    spaces = [_strategy_space(s, specs[s], common) for s in specs if s in strategies]
+    return SearchSpace(spaces)
+
+
+# --- samplers ---------------------------------------------------------------
+
+
+def _grid(space: StrategySpace) -> Iterator[Dict[str, Any]]:
+    if space.size is None:
+        raise ValueError(f"{space.strategy}: grid sampling needs a step for every range")
+    names = [d.name for d in space.dims]
+    for combo in itertools.product(*(d.values or () for d in space.dims)):
+        point = dict(zip(names, combo))
+        if space.accepts(point):
+            yield point
+
+
+def _random(space: StrategySpace, n: int, rng: random.Random,
+            lhs: bool) -> Iterator[Dict[str, Any]]:
+    """Draw up to n distinct feasible points, uniform or Latin-hypercube."""
+    seen: set = set()
+    names = [d.name for d in space.dims]
+    attempts = 0
+    max_attempts = 50 * n + 1000  # tight constraints/small spaces end early
+    while len(seen) < n and attempts < max_attempts:
+        batch = n - len(seen)
+        if lhs:
+            # One stratum per draw in every dimension, strata paired at random
+            cols = []
+            for _ in space.dims:
+                perm = list(range(batch))
+                rng.shuffle(perm)
+                cols.append([(k + rng.random()) / batch for k in perm])
+            draws = list(zip(*cols))
+        else:
+            draws = [tuple(rng.random() for _ in space.dims) for _ in range(batch)]
+        for us in draws:
+            attempts += 1
+            point = {nm: d.at(u) for nm, d, u in zip(names, space.dims, us)}
+            key = tuple(point.values())
+            if key in seen or not space.accepts(point):
+                continue
+            seen.add(key)
+            yield point
+
+
+def sample(space: SearchSpace,
+           sampler: Optional[str] = None,
+           budget: Optional[int] = None,
+           seed: Optional[int] = None) -> Iterator[Candidate]:
+    """Lazily yield candidates; arguments override the space's own settings.
+
+    grid enumerates every feasible point (stopping at `budget` when > 0).
+    random/lhs split `budget` evenly across strategies; a strategy whose
+    discrete space is no larger than its share is enumerated instead.
+    """
+    sampler = sampler or space.sampler
+    budget = space.budget if budget is None else budget
+    seed = space.seed if seed is None else seed
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown sampler: {sampler}")
+    if sampler == "grid":
+        points: Iterator[Tuple[StrategySpace, Dict[str, Any]]] = itertools.chain.from_iterable(
+            ((s, p) for p in _grid(s)) for s in space.strategies)
+        if budget > 0:
+            points = itertools.islice(points, budget)
+        for s, p in points:
+            yield s.candidate(p)
+        return
+    if budget <= 0:
+        raise ValueError(f"{sampler} sampling needs a budget > 0")
+    rng = random.Random(seed)
+    k = len(space.strategies)
+    for i, s in enumerate(space.strategies):
+        share = budget // k + (1 if i < budget % k else 0)
+        size = s.size
+        if size is not None and size <= share:
+            gen = _grid(s)
+        else:
+            gen = _random(s, share, rng, lhs=sampler == "lhs")
+        for p in gen:
+            yield s.candidate(p)
+
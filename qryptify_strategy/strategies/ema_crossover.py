@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from ..models import Bar
 from ..models import Signal
@@ -21,6 +21,16 @@ class EMACrossStrategy(Strategy):
     def on_start(self) -> None:
         self._core.reset()
 
+    @property
+    def warmup(self) -> int:
+        return self._core.warmup
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self._core.snapshot()
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self._core.restore(state)
+
     def on_bar(self, i: int, bar: Bar) -> Optional[Signal]:
         res = self._core.update_and_cross(bar.close)
         if res is None:
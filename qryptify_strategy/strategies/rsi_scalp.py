@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from ..models import Bar
 from ..models import Signal
@@ -27,6 +27,16 @@ class RSIScalpStrategy(Strategy):
     def on_start(self) -> None:
         self._core.reset()
 
+    @property
+    def warmup(self) -> int:
+        return self._core.warmup
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self._core.snapshot()
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self._core.restore(state)
+
     def on_bar(self, i: int, bar: Bar) -> Optional[Signal]:
         prev_rsi, rsi, ema_ok_long, ema_ok_short, ema_cross_down, ema_cross_up = self._core.update(
             bar.close)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from .models import Bar
 from .models import Signal
@@ -23,3 +23,23 @@ class Strategy:
 
     def on_finish(self) -> None:
         pass
+
+    @property
+    def warmup(self) -> int:
+        """Bars to feed before the strategy's signals are trustworthy.
+
+        Loaders fetch this many bars ahead of the reported window, and the
+        engine excludes them from the metrics (`backtest(..., warmup=...)`).
+        """
+        return 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Indicator state after the last bar, as plain JSON-able values.
+
+        `restore` (after `on_start`) continues exactly where the snapshot was
+        taken; the engine uses the pair to resume backtests.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support snapshots")
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        raise NotImplementedError(f"{type(self).__name__} does not support snapshots")
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from .indicators import ema
+from .indicators import ema_warmup
 from .indicators import RollingMeanStd
 from .indicators import WilderRSI
 
@@ -32,6 +33,22 @@ class EMACrossCore:
         self._fast_ema = None
         self._slow_ema = None
 
+    @property
+    def warmup(self) -> int:
+        """Bars until the slow EMA has converged."""
+        return ema_warmup(self.slow)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"fast": self.fast, "slow": self.slow, "fast_ema": self._fast_ema,
+                "slow_ema": self._slow_ema}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        if (state["fast"], state["slow"]) != (self.fast, self.slow):
+            raise ValueError(f"EMACrossCore snapshot is {state['fast']}/{state['slow']}, "
+                             f"expected {self.fast}/{self.slow}")
+        self._fast_ema = state["fast_ema"]
+        self._slow_ema = state["slow_ema"]
+
     def update_and_cross(self, price: float) -> Optional[Tuple[bool, bool]]:
         prev_fast = self._fast_ema
         prev_slow = self._slow_ema
@@ -71,6 +88,31 @@ class BollingerCore:
         self._prev_mid = None
         self._prev_upper = None
 
+    @property
+    def warmup(self) -> int:
+        """Bars until events can fire: one full window, then the next close."""
+        return self._roll.warmup + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "mult": self.mult,
+            "roll": self._roll.snapshot(),
+            "prev_close": self._prev_close,
+            "prev_lower": self._prev_lower,
+            "prev_mid": self._prev_mid,
+            "prev_upper": self._prev_upper,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        if state["mult"] != self.mult:
+            raise ValueError(f"BollingerCore snapshot has mult {state['mult']}, "
+                             f"expected {self.mult}")
+        self._roll.restore(state["roll"])
+        self._prev_close = state["prev_close"]
+        self._prev_lower = state["prev_lower"]
+        self._prev_mid = state["prev_mid"]
+        self._prev_upper = state["prev_upper"]
+
     def update_and_events(
             self, close: float) -> Tuple[dict, Optional[Tuple[float, float, float]]]:
         events = {
@@ -132,6 +174,30 @@ class RSICore:
         self._ema = None
         self._last_close = None
 
+    @property
+    def warmup(self) -> int:
+        """Bars until two RSI values exist and the EMA filter has converged."""
+        rsi = self._rsi_calc.warmup + 1
+        return max(rsi, ema_warmup(self.ema_filter)) if self.ema_filter > 0 else rsi
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ema_filter": self.ema_filter,
+            "rsi_calc": self._rsi_calc.snapshot(),
+            "rsi": self._rsi,
+            "ema": self._ema,
+            "last_close": self._last_close,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        if state["ema_filter"] != self.ema_filter:
+            raise ValueError(f"RSICore snapshot has ema_filter {state['ema_filter']}, "
+                             f"expected {self.ema_filter}")
+        self._rsi_calc.restore(state["rsi_calc"])
+        self._rsi = state["rsi"]
+        self._ema = state["ema"]
+        self._last_close = state["last_close"]
+
     def update(self, close: float):
         prev_rsi = self._rsi
         prev_ema = self._ema
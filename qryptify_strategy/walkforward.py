@@ -0,0 +1,333 @@
+"""Walk-forward optimization over rolling or anchored windows.
+
+One bar load per pair is cut into windows of `window` in-sample (IS) bars
+followed by `step` out-of-sample (OOS) bars, advancing by `step`; anchored
+windows keep the IS start at the first bar. Each window ranks the candidates
+on its IS bars exactly like a regular sweep (grid or successive halving,
+`choose_best` tiers with the DD cap). Windows are independent, so they are
+evaluated in parallel worker processes, each of which receives the bars
+once.
+
+The chosen config then trades the window's OOS bars with its indicators
+warmed up on the IS bars right before them (`required_warmup` bars, via
+`backtest(..., warmup=...)`), so no strategy restarts cold at a boundary. OOS runs are chained in window order, each
+starting from the equity the previous one ended with, which yields one
+stitched OOS equity curve.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .backtester import backtest
+from .backtester import required_warmup
+from .cache import ResultCache
+from .candidates import Candidate
+from .candidates import candidate_risk
+from .candidates import iter_results
+from .candidates import make_strategy
+from .candidates import Result
+from .models import AbortRules
+from .models import BacktestReport
+from .models import Bar
+from .search import successive_halving
+from .sink import PairSink
+from .sink import sweep_unpruned
+
+
+@dataclass(frozen=True)
+class WFWindow:
+    index: int
+    is_start: int
+    is_end: int  # exclusive; also the first OOS bar
+    oos_end: int  # exclusive
+
+    @property
+    def oos_start(self) -> int:
+        return self.is_end
+
+
+def wf_windows(n_bars: int, window: int, step: int, anchored: bool = False) -> List[WFWindow]:
+    """Windows over `n_bars`; the last OOS slice may be shorter than `step`."""
+    if window < 1 or step < 1:
+        raise ValueError("walk-forward window and step must be >= 1")
+    out: List[WFWindow] = []
+    is_end = window
+    while is_end < n_bars:
+        out.append(
+            WFWindow(len(out), 0 if anchored else is_end - window, is_end,
+                     min(is_end + step, n_bars)))
+        is_end += step
+    return out
+
+
+@dataclass
+class WFSettings:
+    """How each window's IS sweep ranks candidates (mirrors the optimizer flags)."""
+    lam: float
+    dd_cap: Optional[float] = None
+    search: str = "grid"  # grid | halving
+    eta: int = 3
+    min_window: int = 1000
+    abort: Optional[AbortRules] = None
+    cache_path: Optional[str] = None
+
+
+@dataclass
+class WFWindowResult:
+    window: WFWindow
+    is_from: datetime
+    oos_from: datetime
+    oos_to: datetime
+    evaluated: int = 0
+    pick: Optional[Candidate] = None
+    is_result: Optional[Result] = None  # the pick's IS metrics
+    oos: Optional[BacktestReport] = None
+    equity_start: float = 0.0
+    equity_end: float = 0.0
+
+
+@dataclass
+class WalkForwardReport:
+    symbol: str
+    interval: str
+    windows: List[WFWindowResult]
+    # Stitched OOS equity after every closed trade, starting at the first OOS bar
+    equity: List[Tuple[datetime, float]] = field(default_factory=list)
+
+    @property
+    def start_equity(self) -> float:
+        return self.equity[0][1] if self.equity else 0.0
+
+    @property
+    def end_equity(self) -> float:
+        return self.equity[-1][1] if self.equity else 0.0
+
+    @property
+    def max_drawdown(self) -> float:
+        """Peak-to-trough of the stitched curve (closed trades only)."""
+        peak, dd = float("-inf"), 0.0
+        for _, eq in self.equity:
+            peak = max(peak, eq)
+            dd = max(dd, peak - eq)
+        return dd
+
+    @property
+    def trades(self) -> int:
+        return sum(w.oos.trades for w in self.windows if w.oos is not None)
+
+
+class _PickLog:
+    """CellLog that remembers which candidate produced each full-window result.
+
+    Keyed by id(): the pick is still alive in the sink when it is looked up.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.cands: Dict[int, Candidate] = {}
+
+    def completed(self, window: int) -> Mapping[Candidate, Result]:
+        return {}
+
+    def record(self, window: int, cand: Candidate, result: Result) -> None:
+        if window == self.window:
+            self.cands[id(result)] = cand
+
+
+@dataclass
+class _Inputs:
+    symbol: str
+    interval: str
+    bars: List[Bar]
+    candidates: List[Candidate]
+    fee_bps_val: float
+    settings: WFSettings
+
+
+# Per-process inputs, set once by _init_worker (directly when running serially)
+_INPUTS: Optional[_Inputs] = None
+
+
+def _init_worker(inputs: Optional[_Inputs]) -> None:
+    global _INPUTS
+    _INPUTS = inputs
+
+
+def _select(w: WFWindow) -> Tuple[int, Optional[Candidate], Optional[Result]]:
+    """Rank all candidates on the window's IS bars; returns (evaluated, pick, IS result)."""
+    assert _INPUTS is not None
+    inp, st = _INPUTS, _INPUTS.settings
+    bars = inp.bars[w.is_start:w.is_end]
+    log = _PickLog(len(bars))
+    cache = ResultCache(st.cache_path) if st.cache_path else None
+
+    def sweep(sink: PairSink, abort: Optional[AbortRules]) -> None:
+        if st.search == "halving":
+            results, _ = successive_halving(inp.symbol, inp.interval, bars, inp.candidates,
+                                            inp.fee_bps_val, lam=st.lam, eta=st.eta,
+                                            min_window=st.min_window, abort=abort,
+                                            cache=cache, log=log)
+            for r in results:
+                sink.add(r)
+        else:
+            for r in iter_results(inp.symbol, inp.interval, bars, inp.candidates,
+                                  inp.fee_bps_val, abort, cache, log):
+                sink.add(r)
+
+    try:
+        sink, _, _ = sweep_unpruned(lambda hold: PairSink(st.lam, st.dd_cap, top_k=1), sweep,
+                                    st.abort)
+    finally:
+        if cache is not None:
+            cache.close()
+    best = sink.best()
+    if best is None:
+        return sink.count, None, None
+    return sink.count, log.cands[id(best)], best
+
+
+def walk_forward(
+    symbol: str,
+    interval: str,
+    bars: List[Bar],
+    candidates: Sequence[Candidate],
+    fee_bps_val: float,
+    settings: WFSettings,
+    *,
+    window: int,
+    step: int,
+    anchored: bool = False,
+    workers: int = 1,
+) -> WalkForwardReport:
+    wins = wf_windows(len(bars), window, step, anchored)
+    cands = list(candidates)
+    inputs = _Inputs(symbol, interval, bars, cands, fee_bps_val, settings)
+    if workers > 1 and len(wins) > 1:
+        # Bars and candidates are shipped once per worker, not per window
+        with ProcessPoolExecutor(max_workers=min(workers, len(wins)),
+                                 initializer=_init_worker,
+                                 initargs=(inputs, )) as pool:
+            picks = list(pool.map(_select, wins))
+    else:
+        _init_worker(inputs)
+        try:
+            picks = [_select(w) for w in wins]
+        finally:
+            _init_worker(None)
+
+    report = WalkForwardReport(symbol, interval, [])
+    equity: Optional[float] = None
+    for w, (evaluated, cand, is_res) in zip(wins, picks):
+        wr = WFWindowResult(w, bars[w.is_start].ts, bars[w.oos_start].ts,
+                            bars[w.oos_end - 1].ts, evaluated, cand, is_res)
+        report.windows.append(wr)
+        if cand is None:
+            wr.equity_start = wr.equity_end = equity or 0.0
+            continue
+        risk = candidate_risk(cand, fee_bps_val)
+        if equity is None:
+            equity = risk.start_equity
+            report.equity.append((wr.oos_from, equity))
+        risk = replace(risk, start_equity=equity)
+        # Warm up on the last IS bars the strategy and ATR need, not the whole
+        # IS slice (which grows with every anchored window)
+        strategy = make_strategy(cand)
+        start = max(w.is_start, w.oos_start - required_warmup(strategy, risk.atr_period))
+        rpt, trades = backtest(symbol, interval, bars[start:w.oos_end], strategy, risk,
+                               warmup=w.oos_start - start)
+        wr.oos, wr.equity_start, wr.equity_end = rpt, equity, rpt.equity_end
+        for t in trades:
+            equity += t.pnl
+            report.equity.append((t.exit_ts, equity))
+        equity = rpt.equity_end
+    return report
+
+
+WINDOW_FIELDS = [
+    "window",
+    "is_from",
+    "oos_from",
+    "oos_to",
+    "is_bars",
+    "oos_bars",
+    "evaluated",
+    "strategy",
+    "params",
+    "risk",
+    "atr_mult",
+    "is_pnl",
+    "is_dd",
+    "oos_pnl",
+    "oos_dd",
+    "oos_trades",
+    "equity_start",
+    "equity_end",
+]
+
+
+def _window_row(wr: WFWindowResult) -> Dict[str, object]:
+    w, r, o = wr.window, wr.is_result, wr.oos
+    return {
+        "window": w.index,
+        "is_from": wr.is_from.isoformat(),
+        "oos_from": wr.oos_from.isoformat(),
+        "oos_to": wr.oos_to.isoformat(),
+        "is_bars": w.is_end - w.is_start,
+        "oos_bars": w.oos_end - w.oos_start,
+        "evaluated": wr.evaluated,
+        "strategy": r.strategy if r else "",
+        "params": r.params if r else "",
+        "risk": r.risk if r else "",
+        "atr_mult": r.atr_mult if r else "",
+        "is_pnl": round(r.pnl, 2) if r else "",
+        "is_dd": round(r.dd, 2) if r else "",
+        "oos_pnl": round(o.total_pnl, 2) if o else "",
+        "oos_dd": round(o.max_drawdown, 2) if o else "",
+        "oos_trades": o.trades if o else "",
+        "equity_start": round(wr.equity_start, 2),
+        "equity_end": round(wr.equity_end, 2),
+    }
+
+
+def write_report(report: WalkForwardReport, outdir: str) -> Tuple[Path, Path]:
+    """Per-window picks and the stitched OOS equity as two CSVs in `outdir`."""
+    out = Path(outdir)
+    out.mkdir(parents=True, exist_ok=True)
+    stem = f"{report.symbol}_{report.interval.replace('/', '_')}"
+    wpath = out / f"walkforward_{stem}.csv"
+    with wpath.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=WINDOW_FIELDS)
+        writer.writeheader()
+        writer.writerows(_window_row(wr) for wr in report.windows)
+    epath = out / f"walkforward_equity_{stem}.csv"
+    with epath.open("w", newline="") as f:
+        ew = csv.writer(f)
+        ew.writerow(["ts", "equity"])
+        ew.writerows((ts.isoformat(), round(eq, 2)) for ts, eq in report.equity)
+    return wpath, epath
+
+
+def markdown(report: WalkForwardReport) -> List[str]:
+    lines = [f"\n## {report.symbol} {report.interval} (walk-forward)\n"]
+    pnl = report.end_equity - report.start_equity
+    lines.append(f"Stitched OOS: {len(report.windows)} windows | pnl={pnl:.2f} | "
+                 f"dd={report.max_drawdown:.0f} | trades={report.trades} | "
+                 f"eq={report.end_equity:.2f}\n")
+    lines.append("| # | OOS from | OOS to | Strategy | Params | Risk | ATR | IS PnL | IS DD "
+                 "| OOS PnL | OOS DD | Trades | Equity |\n"
+                 "|---:|---|---|---|---|---:|---:|---:|---:|---:|---:|---:|---:|")
+    for wr in report.windows:
+        row = _window_row(wr)
+        lines.append("| " + " | ".join(
+            str(row[k])
+            for k in ("window", "oos_from", "oos_to", "strategy", "params", "risk",
+                      "atr_mult", "is_pnl", "is_dd", "oos_pnl", "oos_dd", "oos_trades",
+                      "equity_end")) + " |")
+    return lines
@@ -0,0 +1,102 @@
+"""
+Benchmark backtest-style reads on the single vs per-interval storage layouts.
+
+Usage:
+  python scripts/bench_layout.py --pairs BTCUSDT/1m,BTCUSDT/1h,BTCUSDT/4h
+  python scripts/bench_layout.py --pairs BTCUSDT/4h --window 5000 --reps 20 \
+    --json-out reports/bench_layout.json
+
+For each pair and layout it times:
+  - range reads: fetch_ohlcv over `--window` consecutive bars at random offsets
+  - latest reads: fetch_latest_n(window)
+and reports chunk counts, median/p90 latency and bars/sec. Run it after
+`scripts/migrate_layout.py` so both layouts hold the same data.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Dict, List
+
+from qryptify.shared.config import load_cfg_dsn
+from qryptify.shared.intervals import step_of
+from qryptify.shared.pairs import parse_pair
+
+
+def _pct(vals: List[float], q: float) -> float:
+    s = sorted(vals)
+    return s[min(len(s) - 1, int(q * (len(s) - 1) + 0.5))]
+
+
+def bench_pair(repo, layout: str, symbol: str, interval: str, window: int, reps: int,
+               seed: int) -> Dict[str, object]:
+    rng = random.Random(seed)
+    first = repo.fetch_ohlcv(symbol, interval, limit=1)
+    last = repo.fetch_latest_n(symbol, interval, 1)
+    if not first or not last:
+        return {"layout": layout, "pair": f"{symbol}/{interval}", "error": "no data"}
+    lo, hi = first[0]["ts"], last[0]["ts"]
+    step = step_of(interval)
+    span = max(int((hi - lo) / step) - window, 0)
+
+    range_ms: List[float] = []
+    bars = 0
+    for _ in range(reps):
+        start = lo + step * rng.randint(0, span)
+        t0 = time.perf_counter()
+        rows = repo.fetch_ohlcv(symbol, interval, start=start, end=start + step * window)
+        range_ms.append((time.perf_counter() - t0) * 1000.0)
+        bars += len(rows)
+    latest_ms: List[float] = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        repo.fetch_latest_n(symbol, interval, window)
+        latest_ms.append((time.perf_counter() - t0) * 1000.0)
+
+    return {
+        "layout": layout,
+        "pair": f"{symbol}/{interval}",
+        "chunks": repo.count_chunks(interval),
+        "range_p50_ms": round(statistics.median(range_ms), 3),
+        "range_p90_ms": round(_pct(range_ms, 0.9), 3),
+        "range_bars_per_sec": round(bars / (sum(range_ms) / 1000.0), 1),
+        "latest_p50_ms": round(statistics.median(latest_ms), 3),
+        "latest_p90_ms": round(_pct(latest_ms, 0.9), 3),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark reads per storage layout")
+    ap.add_argument("--pairs", required=True, help="Comma-separated SYMBOL/interval")
+    ap.add_argument("--dsn", default="", help="Override DSN; defaults to config.yaml")
+    ap.add_argument("--window", type=int, default=5000, help="Bars per read")
+    ap.add_argument("--reps", type=int, default=10, help="Reads per measurement")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--layouts", default="single,per_interval")
+    ap.add_argument("--json-out", default="", help="Optional JSON results path")
+    args = ap.parse_args()
+
+    from qryptify.data.timescale import TimescaleRepo
+
+    dsn = args.dsn or load_cfg_dsn()
+    pairs = [parse_pair(p) for p in args.pairs.split(",") if p.strip()]
+    results: List[Dict[str, object]] = []
+    for layout in [s.strip() for s in args.layouts.split(",") if s.strip()]:
+        with TimescaleRepo(dsn, layout=layout) as repo:
+            for symbol, interval in pairs:
+                res = bench_pair(repo, layout, symbol, interval, args.window, args.reps,
+                                 args.seed)
+                results.append(res)
+                print("  ".join(f"{k}={v}" for k, v in res.items()))
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"Saved benchmark results to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
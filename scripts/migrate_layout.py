@@ -0,0 +1,99 @@
+"""
+Migrate candles from the single `candlesticks` hypertable to per-interval
+hypertables with chunk sizes tuned per interval (online, resumable).
+
+Usage:
+  python scripts/migrate_layout.py                      # all intervals
+  python scripts/migrate_layout.py --intervals 1h,4h --batch-days 30
+  python scripts/migrate_layout.py --rebuild-rollups    # rollup mode: re-point
+                                                         # aggregates at candlesticks_1m
+
+Procedure:
+  1. Run the migration while the ingestor keeps writing to `candlesticks`.
+  2. Set `db.layout: per_interval` in qryptify_ingestor/config.yaml and restart
+     the ingestor.
+  3. Run the migration again; it resumes from the last committed batch
+     (watermark in `layout_migration`) and copies the rows written in
+     between. The source table is left untouched.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import timedelta
+
+from qryptify.shared.config import load_cfg_dsn
+from qryptify.shared.intervals import SUPPORTED_INTERVALS
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Copy candles into per-interval hypertables (db.layout=per_interval)")
+    ap.add_argument("--dsn", default="", help="Override DSN; defaults to config.yaml")
+    ap.add_argument("--intervals",
+                    default=",".join(SUPPORTED_INTERVALS),
+                    help="Comma-separated intervals to migrate")
+    ap.add_argument("--batch-days",
+                    type=float,
+                    default=7.0,
+                    help="Time span copied per transaction")
+    ap.add_argument("--full",
+                    action="store_true",
+                    help="Rescan the whole source instead of resuming")
+    ap.add_argument(
+        "--rebuild-rollups",
+        action="store_true",
+        help="Recreate the 1m rollups (sql/003_rollups.sql) on candlesticks_1m",
+    )
+    args = ap.parse_args()
+
+    import psycopg
+    from psycopg.rows import dict_row
+
+    from qryptify.data.layout import migrate_to_per_interval
+    from qryptify.data.rollups import ROLLUP_INTERVALS
+    from qryptify.data.rollups import rollup_ddl
+    from qryptify.data.rollups import rollup_view
+
+    intervals = [s.strip() for s in args.intervals.split(",") if s.strip()]
+    for itv in intervals:
+        if itv not in SUPPORTED_INTERVALS:
+            raise SystemExit(f"Unsupported interval: {itv}")
+
+    def _progress(stats, upper) -> None:
+        print(f"  {stats.interval}: copied={stats.rows} through {upper.isoformat()} "
+              f"({stats.rows_per_sec:,.0f} rows/s)")
+
+    dsn = args.dsn or load_cfg_dsn()
+    with psycopg.connect(dsn, autocommit=False, row_factory=dict_row) as conn:
+        conn.execute("SET TIME ZONE 'UTC'")
+        conn.commit()
+        results = migrate_to_per_interval(
+            conn,
+            intervals,
+            batch=timedelta(days=args.batch_days),
+            full=args.full,
+            progress=_progress,
+        )
+        print("\nMigration summary")
+        for st in results:
+            print(f"  {st.interval:>4}: rows={st.rows} batches={st.batches} "
+                  f"secs={st.seconds:.1f} rate={st.rows_per_sec:,.0f} rows/s")
+
+        if args.rebuild_rollups:
+            conn.autocommit = True
+            for itv in ROLLUP_INTERVALS:
+                conn.execute(f"DROP MATERIALIZED VIEW IF EXISTS {rollup_view(itv)}")
+            for stmt in rollup_ddl(source="candlesticks_1m"):
+                conn.execute(stmt)
+            for itv in ROLLUP_INTERVALS:
+                conn.execute(
+                    "CALL refresh_continuous_aggregate(%s::regclass, NULL, NULL)",
+                    (rollup_view(itv), ))
+            print("Rebuilt rollups on candlesticks_1m")
+
+    print("\nNext: set db.layout: per_interval, restart the ingestor, and re-run "
+          "this command to copy rows written in between.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,132 @@
 """
-Seed minimal OHLCV data into the TimescaleDB used by this repo.
+Seed synthetic OHLCV data into the TimescaleDB used by this repo (or to files).
 
 Usage:
   python scripts/seed_ohlcv.py --pair BTCUSDT/1h --rows 500
+  python scripts/seed_ohlcv.py --pair BTCUSDT/1m --rows 5000000 --derive 5m,1h,4h
+  python scripts/seed_ohlcv.py --pair BTCUSDT/1m --rows 10000000 --no-db \
+    --out-dir data/synthetic
 
 Notes:
-  - DSN is read from qryptify_ingestor/config.yaml unless --dsn is provided.
-  - Generates a simple price series with slight trend and noise.
-  - Idempotent via repo.upsert_klines(); safe to run multiple times.
+  - DSN and storage layout (db.layout) are read from qryptify_ingestor/config.yaml;
+    --dsn overrides the DSN only.
+  - Prices come from qryptify.data.synthetic: seeded GBM with regime switches,
+    volatility clustering and outage gaps. The same --seed gives the same data.
+  - --derive rolls the base series up into higher intervals, so every interval
+    is consistent with the base (same semantics as the continuous aggregates).
+  - Writes go through COPY in batches of --batch-rows (--method upsert uses the
+    row-wise path instead). Both are idempotent; safe to run multiple times.
+  - --out-dir writes one columnar directory per interval
+    (<out-dir>/<SYMBOL>_<interval>/), readable via synthetic.read_columnar().
 """
 from __future__ import annotations
 
 import argparse
-from datetime import datetime
-from datetime import timezone
-import math
-import random
-from typing import List
+from itertools import islice
+from pathlib import Path
+import time
 
 import yaml
 
-from qryptify.data.timescale import TimescaleRepo
+from qryptify.data.synthetic import generate_ohlcv
+from qryptify.data.synthetic import iter_rows
+from qryptify.data.synthetic import rollup
+from qryptify.data.synthetic import SyntheticSpec
+from qryptify.data.synthetic import write_columnar
 from qryptify.shared.intervals import step_of
 from qryptify.shared.pairs import parse_pair
 
 
-def _default_dsn() -> str:
+def _load_cfg() -> dict:
     with open("qryptify_ingestor/config.yaml", "r") as f:
-        cfg = yaml.safe_load(f) or {}
-    return cfg["db"]["dsn"]
-
-
-def _gen_rows(symbol: str, interval: str, rows: int) -> List[dict]:
-    now = datetime.now(timezone.utc)
-    # Choose step by interval string
-    try:
-        step = step_of(interval)
-    except Exception as e:
-        raise SystemExit(f"Unsupported interval for seed: {interval}") from e
-
-    # Start some time ago so bars are in the past
-    start = now - step * (rows + 5)
-    base = 100.0
-    trend = 0.01  # small upward trend per bar
-    out = []
-    last_close = base
-    for i in range(rows):
-        ts = start + step * i
-        # Sine + noise around last close with light trend
-        noise = random.uniform(-0.05, 0.05)
-        delta = math.sin(i / 25.0) * 0.1 + trend + noise
-        open_p = last_close
-        close_p = max(open_p + delta, 0.01)
-        high_p = max(open_p, close_p) + random.uniform(0.02, 0.12)
-        low_p = min(open_p, close_p) - random.uniform(0.02, 0.12)
-        vol = 1.0 + random.uniform(0, 0.5)
-        row = {
-            "ts": ts,
-            "symbol": symbol,
-            "interval": interval,
-            "open": float(open_p),
-            "high": float(high_p),
-            "low": float(low_p),
-            "close": float(close_p),
-            "volume": float(vol),
-            "close_time": ts + step,
-            "quote_asset_volume": float(vol * (open_p + close_p) / 2.0),
-            "number_of_trades": int(10 + i % 5),
-            "taker_buy_base": float(vol * 0.4),
-            "taker_buy_quote": float(vol * 0.4 * (open_p + close_p) / 2.0),
-        }
-        out.append(row)
-        last_close = close_p
-    return out
+        return yaml.safe_load(f) or {}
+
+
+def _write_db(repo, cols, symbol: str, interval: str, method: str, batch_rows: int) -> int:
+    rows_it = iter_rows(cols, symbol, interval)
+    total = 0
+    last = None
+    t0 = time.perf_counter()
+    while True:
+        batch = list(islice(rows_it, batch_rows))
+        if not batch:
+            break
+        if method == "copy":
+            total += repo.copy_klines(batch)
+        else:
+            total += repo.upsert_klines(batch)
+        last = batch[-1]["close_time"]
+    if last is not None:
+        # Update resume pointer to last close
+        repo.set_last_closed_ts(symbol, interval, last)
+    dt = time.perf_counter() - t0
+    rate = len(cols) / dt if dt > 0 else 0.0
+    print(f"Seeded {total} rows for {symbol}/{interval} "
+          f"up to {last.isoformat() if last else '-'} ({rate:,.0f} rows/s)")
+    return total
 
 
 def main() -> None:
-    ap = argparse.ArgumentParser(description="Seed minimal OHLCV into TimescaleDB")
+    ap = argparse.ArgumentParser(description="Seed synthetic OHLCV into TimescaleDB")
     ap.add_argument("--pair", required=True, help="SYMBOL/interval (e.g., BTCUSDT/1h)")
-    ap.add_argument("--rows", type=int, default=500, help="How many bars to insert")
+    ap.add_argument("--rows", type=int, default=500, help="How many base bars to generate")
     ap.add_argument("--dsn", default="", help="Override DSN; defaults to config.yaml")
+    ap.add_argument("--seed", type=int, default=42, help="RNG seed")
+    ap.add_argument("--start-price", type=float, default=100.0)
+    ap.add_argument("--derive",
+                    default="",
+                    help="Comma-separated higher intervals rolled up from the base")
+    ap.add_argument("--method", choices=("copy", "upsert"), default="copy")
+    ap.add_argument("--batch-rows", type=int, default=100_000, help="Rows per DB write")
+    ap.add_argument("--out-dir", default="", help="Also write columnar files here")
+    ap.add_argument("--no-db", action="store_true", help="Skip the database")
     args = ap.parse_args()
 
     symbol, interval = parse_pair(args.pair)
-    dsn = args.dsn or _default_dsn()
-
-    repo = TimescaleRepo(dsn)
+    try:
+        step = step_of(interval)
+        derived = {
+            itv: step_of(itv)
+            for itv in (s.strip() for s in args.derive.split(",")) if itv
+        }
+    except Exception as e:
+        raise SystemExit(f"Unsupported interval for seed: {e}") from e
+
+    t0 = time.perf_counter()
+    base = generate_ohlcv(
+        SyntheticSpec(bars=max(10, args.rows),
+                      step=step,
+                      seed=args.seed,
+                      start_price=args.start_price))
+    series = {interval: base}
+    for itv, st in derived.items():
+        series[itv] = rollup(base, st)
+    print(f"Generated {len(base)} {interval} bars "
+          f"({', '.join(f'{k}={len(v)}' for k, v in series.items())}) "
+          f"in {time.perf_counter() - t0:.1f}s")
+
+    if args.out_dir:
+        for itv, cols in series.items():
+            d = write_columnar(cols,
+                               Path(args.out_dir) / f"{symbol}_{itv}",
+                               symbol=symbol,
+                               interval=itv,
+                               seed=args.seed)
+            print(f"Wrote {len(cols)} rows to {d}")
+
+    if args.no_db:
+        return
+
+    from qryptify.data.timescale import TimescaleRepo
+
+    cfg = _load_cfg()
+    if args.dsn:
+        cfg.setdefault("db", {})["dsn"] = args.dsn
+    repo = TimescaleRepo.from_cfg(cfg)
     repo.connect()
     try:
-        rows = _gen_rows(symbol, interval, max(10, args.rows))
-        inserted = repo.upsert_klines(rows)
-        # Update resume pointer to last close
-        last_close = rows[-1]["close_time"]
-        repo.set_last_closed_ts(symbol, interval, last_close)
-        print(
-            f"Seeded {inserted} rows for {symbol}/{interval} up to {last_close.isoformat()}"
-        )
+        for itv, cols in series.items():
+            _write_db(repo, cols, symbol, itv, args.method, args.batch_rows)
     finally:
         repo.close()
 
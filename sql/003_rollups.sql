@@ -0,0 +1,189 @@
+-- Continuous-aggregate rollups (used when ingest.mode = rollup)
+-- Notes:
+-- - Only 1m candles are ingested; 3m..4h are derived from them per symbol
+-- - time_bucket aligns to UTC like Binance klines, so rollups match native bars
+-- - materialized_only = false: buckets newer than the last refresh are aggregated
+--   on read (real-time aggregation)
+-- - Generated from qryptify/data/rollups.py (rollup_ddl); keep in sync
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS candlesticks_rollup_3m
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '3 minutes', ts) AS ts,
+       symbol,
+       first(open, ts) AS open,
+       max(high) AS high,
+       min(low) AS low,
+       last(close, ts) AS close,
+       sum(volume) AS volume,
+       max(close_time) AS close_time,
+       sum(quote_asset_volume) AS quote_asset_volume,
+       sum(number_of_trades) AS number_of_trades,
+       sum(taker_buy_base) AS taker_buy_base,
+       sum(taker_buy_quote) AS taker_buy_quote,
+       count(*) AS bars
+FROM candlesticks
+WHERE interval = '1m'
+GROUP BY time_bucket(INTERVAL '3 minutes', ts), symbol
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('candlesticks_rollup_3m',
+  start_offset => INTERVAL '1 day',
+  end_offset => INTERVAL '3 minutes',
+  schedule_interval => INTERVAL '1 minute',
+  if_not_exists => TRUE);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS candlesticks_rollup_5m
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '5 minutes', ts) AS ts,
+       symbol,
+       first(open, ts) AS open,
+       max(high) AS high,
+       min(low) AS low,
+       last(close, ts) AS close,
+       sum(volume) AS volume,
+       max(close_time) AS close_time,
+       sum(quote_asset_volume) AS quote_asset_volume,
+       sum(number_of_trades) AS number_of_trades,
+       sum(taker_buy_base) AS taker_buy_base,
+       sum(taker_buy_quote) AS taker_buy_quote,
+       count(*) AS bars
+FROM candlesticks
+WHERE interval = '1m'
+GROUP BY time_bucket(INTERVAL '5 minutes', ts), symbol
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('candlesticks_rollup_5m',
+  start_offset => INTERVAL '1 day',
+  end_offset => INTERVAL '5 minutes',
+  schedule_interval => INTERVAL '1 minute',
+  if_not_exists => TRUE);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS candlesticks_rollup_15m
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '15 minutes', ts) AS ts,
+       symbol,
+       first(open, ts) AS open,
+       max(high) AS high,
+       min(low) AS low,
+       last(close, ts) AS close,
+       sum(volume) AS volume,
+       max(close_time) AS close_time,
+       sum(quote_asset_volume) AS quote_asset_volume,
+       sum(number_of_trades) AS number_of_trades,
+       sum(taker_buy_base) AS taker_buy_base,
+       sum(taker_buy_quote) AS taker_buy_quote,
+       count(*) AS bars
+FROM candlesticks
+WHERE interval = '1m'
+GROUP BY time_bucket(INTERVAL '15 minutes', ts), symbol
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('candlesticks_rollup_15m',
+  start_offset => INTERVAL '1 day',
+  end_offset => INTERVAL '15 minutes',
+  schedule_interval => INTERVAL '5 minutes',
+  if_not_exists => TRUE);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS candlesticks_rollup_30m
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '30 minutes', ts) AS ts,
+       symbol,
+       first(open, ts) AS open,
+       max(high) AS high,
+       min(low) AS low,
+       last(close, ts) AS close,
+       sum(volume) AS volume,
+       max(close_time) AS close_time,
+       sum(quote_asset_volume) AS quote_asset_volume,
+       sum(number_of_trades) AS number_of_trades,
+       sum(taker_buy_base) AS taker_buy_base,
+       sum(taker_buy_quote) AS taker_buy_quote,
+       count(*) AS bars
+FROM candlesticks
+WHERE interval = '1m'
+GROUP BY time_bucket(INTERVAL '30 minutes', ts), symbol
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('candlesticks_rollup_30m',
+  start_offset => INTERVAL '1 day',
+  end_offset => INTERVAL '30 minutes',
+  schedule_interval => INTERVAL '5 minutes',
+  if_not_exists => TRUE);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS candlesticks_rollup_1h
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '1 hours', ts) AS ts,
+       symbol,
+       first(open, ts) AS open,
+       max(high) AS high,
+       min(low) AS low,
+       last(close, ts) AS close,
+       sum(volume) AS volume,
+       max(close_time) AS close_time,
+       sum(quote_asset_volume) AS quote_asset_volume,
+       sum(number_of_trades) AS number_of_trades,
+       sum(taker_buy_base) AS taker_buy_base,
+       sum(taker_buy_quote) AS taker_buy_quote,
+       count(*) AS bars
+FROM candlesticks
+WHERE interval = '1m'
+GROUP BY time_bucket(INTERVAL '1 hours', ts), symbol
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('candlesticks_rollup_1h',
+  start_offset => INTERVAL '1 day',
+  end_offset => INTERVAL '1 hour',
+  schedule_interval => INTERVAL '15 minutes',
+  if_not_exists => TRUE);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS candlesticks_rollup_2h
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '2 hours', ts) AS ts,
+       symbol,
+       first(open, ts) AS open,
+       max(high) AS high,
+       min(low) AS low,
+       last(close, ts) AS close,
+       sum(volume) AS volume,
+       max(close_time) AS close_time,
+       sum(quote_asset_volume) AS quote_asset_volume,
+       sum(number_of_trades) AS number_of_trades,
+       sum(taker_buy_base) AS taker_buy_base,
+       sum(taker_buy_quote) AS taker_buy_quote,
+       count(*) AS bars
+FROM candlesticks
+WHERE interval = '1m'
+GROUP BY time_bucket(INTERVAL '2 hours', ts), symbol
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('candlesticks_rollup_2h',
+  start_offset => INTERVAL '2 days',
+  end_offset => INTERVAL '2 hours',
+  schedule_interval => INTERVAL '15 minutes',
+  if_not_exists => TRUE);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS candlesticks_rollup_4h
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '4 hours', ts) AS ts,
+       symbol,
+       first(open, ts) AS open,
+       max(high) AS high,
+       min(low) AS low,
+       last(close, ts) AS close,
+       sum(volume) AS volume,
+       max(close_time) AS close_time,
+       sum(quote_asset_volume) AS quote_asset_volume,
+       sum(number_of_trades) AS number_of_trades,
+       sum(taker_buy_base) AS taker_buy_base,
+       sum(taker_buy_quote) AS taker_buy_quote,
+       count(*) AS bars
+FROM candlesticks
+WHERE interval = '1m'
+GROUP BY time_bucket(INTERVAL '4 hours', ts), symbol
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('candlesticks_rollup_4h',
+  start_offset => INTERVAL '2 days',
+  end_offset => INTERVAL '4 hours',
+  schedule_interval => INTERVAL '30 minutes',
+  if_not_exists => TRUE);
@@ -0,0 +1,44 @@
+-- Distributed optimizer job queue (qryptify-optimize --coordinator / --worker)
+-- Notes:
+-- - One row per grid cell; workers claim batches with FOR UPDATE SKIP LOCKED
+-- - A claim is a lease (lease_until); expired cells are reclaimed by other
+--   workers until `attempts` reaches the limit, then marked failed
+-- - Also created on demand by qryptify_strategy/jobqueue.py (SCHEMA); keep in sync
+
+CREATE TABLE IF NOT EXISTS optimizer_runs (
+  run_id TEXT PRIMARY KEY,
+  created TIMESTAMPTZ NOT NULL DEFAULT now(),
+  meta JSONB NOT NULL DEFAULT '{}'
+);
+
+CREATE TABLE IF NOT EXISTS optimizer_pairs (
+  run_id TEXT NOT NULL REFERENCES optimizer_runs(run_id) ON DELETE CASCADE,
+  pair TEXT NOT NULL,
+  symbol TEXT NOT NULL,
+  interval TEXT NOT NULL,
+  first_ts TIMESTAMPTZ NOT NULL,
+  last_ts TIMESTAMPTZ NOT NULL,
+  n_bars INTEGER NOT NULL,
+  bars_fp TEXT NOT NULL,
+  fee_bps DOUBLE PRECISION NOT NULL,
+  PRIMARY KEY (run_id, pair)
+);
+
+CREATE TABLE IF NOT EXISTS optimizer_jobs (
+  id BIGSERIAL PRIMARY KEY,
+  run_id TEXT NOT NULL,
+  pair TEXT NOT NULL,
+  cand JSONB NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending'
+    CHECK (status IN ('pending','running','done','failed')),
+  worker TEXT,
+  lease_until TIMESTAMPTZ,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  result JSONB,
+  error TEXT,
+  updated TIMESTAMPTZ NOT NULL DEFAULT now(),
+  FOREIGN KEY (run_id, pair) REFERENCES optimizer_pairs(run_id, pair) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_optimizer_jobs_status ON optimizer_jobs(status, id);
+CREATE INDEX IF NOT EXISTS idx_optimizer_jobs_run_pair ON optimizer_jobs(run_id, pair, id);
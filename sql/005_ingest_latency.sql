@@ -0,0 +1,23 @@
+-- Live ingest latency per (symbol, interval) and stage, one row per reporting window
+-- Notes:
+-- - stage: exchange (close -> WS receipt), parse, enqueue, commit, total (close -> commit)
+-- - Quantiles come from log-bucketed histograms (within 10%); see qryptify/shared/latency.py
+-- - Also created on demand by qryptify/data/timescale.py (LATENCY_SCHEMA); keep in sync
+
+CREATE TABLE IF NOT EXISTS ingest_latency (
+  ts TIMESTAMPTZ NOT NULL,
+  symbol TEXT NOT NULL,
+  interval TEXT NOT NULL,
+  stage TEXT NOT NULL,
+  n INTEGER NOT NULL,
+  mean_ms DOUBLE PRECISION NOT NULL,
+  p50_ms DOUBLE PRECISION NOT NULL,
+  p99_ms DOUBLE PRECISION NOT NULL,
+  max_ms DOUBLE PRECISION NOT NULL,
+  PRIMARY KEY (symbol, interval, stage, ts)
+);
+
+SELECT create_hypertable('ingest_latency', 'ts', if_not_exists => TRUE,
+  chunk_time_interval => INTERVAL '7 days');
+
+SELECT add_retention_policy('ingest_latency', INTERVAL '90 days', if_not_exists => TRUE);
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from qryptify.shared.time import to_dt
+from qryptify.shared.time import to_ms
+
+pytest.importorskip("loguru")
+
+from qryptify_ingestor.backfill_runner import run_backfill  # noqa: E402
+
+T0 = to_ms(datetime(2022, 1, 1, tzinfo=timezone.utc))
+MIN = 60_000
+
+
+class Client:
+
+    def __init__(self, n):
+        self.calls = []
+        self.opens = [T0 + i * MIN for i in range(n)]
+
+    async def klines(self, symbol, interval, start_ms=None, end_ms=None, limit=1500):
+        self.calls.append((start_ms, end_ms))
+        opens = [t for t in self.opens if t >= start_ms and (end_ms is None or t <= end_ms)]
+        return [[t, "1", "1", "1", "1", "1", t + MIN - 1, "0", 1, "0", "0", "0"]
+                for t in opens[:limit]]
+
+
+class Repo:
+
+    def __init__(self, last):
+        self.last = last
+        self.rows = []
+        self.pointer = []
+
+    def get_last_closed_ts(self, symbol, interval):
+        return self.last
+
+    def set_last_closed_ts(self, symbol, interval, ts):
+        self.pointer.append(ts)
+
+    def upsert_klines(self, rows):
+        self.rows.extend(rows)
+        return len(rows)
+
+
+def test_reload_ignores_and_keeps_the_resume_pointer():
+    cfg = {"pairs": ["BTCUSDT/1m"], "rest": {"klines_limit": 4},
+           "backfill": {"start_date": "2022-01-01T00:00:00Z",
+                        "reload": {"start": "2022-01-01T00:02:00Z",
+                                   "end": "2022-01-01T00:07:00Z"}}}
+    # The resume pass starts one step after the pointer: bars 20..29
+    client, repo = Client(30), Repo(to_dt(T0 + 19 * MIN))
+    asyncio.run(run_backfill(cfg, repo, client))
+    opens = [to_ms(r["ts"]) for r in repo.rows]
+    assert opens == [T0 + i * MIN for i in (*range(2, 7), *range(20, 30))]
+    assert client.calls[:3] == [(T0 + 2 * MIN, T0 + 7 * MIN - 1),
+                                (T0 + 6 * MIN, T0 + 7 * MIN - 1), (T0 + 20 * MIN, None)]
+    # Only the resume pass moves the pointer
+    assert repo.pointer and min(repo.pointer) > to_dt(T0 + 20 * MIN)
@@ -4,12 +4,22 @@ from dataclasses import dataclass
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
+import json
 from typing import Optional
 
+import pytest
+
+from qryptify.data.synthetic import synthetic_bars
 from qryptify_strategy.backtester import backtest
+from qryptify_strategy.backtester import backtest_resumable
+from qryptify_strategy.backtester import snapshot_from_json
+from qryptify_strategy.backtester import snapshot_to_json
 from qryptify_strategy.models import Bar
 from qryptify_strategy.models import RiskParams
 from qryptify_strategy.models import Signal
+from qryptify_strategy.strategies.bollinger import BollingerBandStrategy
+from qryptify_strategy.strategies.ema_crossover import EMACrossStrategy
+from qryptify_strategy.strategies.rsi_scalp import RSIScalpStrategy
 from qryptify_strategy.strategy_base import Strategy
 
 
@@ -79,3 +89,104 @@ def test_backtest_entry_exit_and_pnl():
     # PnL = (exit - entry) * qty = (101.0 - 100.0) * expected_qty
     expected_pnl = (bars[4].open - bars[1].open) * expected_qty
     assert abs(t.pnl - expected_pnl) < 1e-6
+
+
+def _trend_bars(n: int, step: float):
+    base = datetime(2020, 1, 1, 0, 0, tzinfo=timezone.utc)
+    bars = []
+    px = 100.0
+    for i in range(n):
+        nxt = px + step
+        bars.append(
+            Bar(ts=base + timedelta(minutes=i),
+                open=px,
+                high=max(px, nxt) + 0.1,
+                low=min(px, nxt) - 0.1,
+                close=nxt,
+                volume=0.0))
+        px = nxt
+    return bars
+
+
+@dataclass
+class AlwaysLong(Strategy):
+    __test__ = False
+
+    def on_bar(self, i: int, bar: Bar) -> Optional[Signal]:
+        return Signal(target=+1, reason="long")
+
+
+def test_abort_rules_prune_early_and_keep_full_runs_identical():
+    from qryptify_strategy.models import AbortRules
+
+    # Steady decline: a long with a wide stop bleeds equity every bar
+    bars = _trend_bars(200, -0.05)
+    risk = RiskParams(start_equity=10_000.0,
+                      risk_per_trade=0.05,
+                      atr_period=1,
+                      atr_mult_stop=100.0,
+                      fee_bps=0.0,
+                      slippage_bps=0.0)
+    full, _ = backtest("TEST", "1m", bars, AlwaysLong(), risk)
+    assert not full.pruned and full.bars == 200
+    # Rules that never fire leave the report unchanged
+    same, _ = backtest("TEST", "1m", bars, AlwaysLong(), risk,
+                       AbortRules(max_drawdown=full.max_drawdown + 1.0))
+    assert same == full
+
+    cap = full.max_drawdown / 4
+    rpt, trades = backtest("TEST", "1m", bars, AlwaysLong(), risk,
+                           AbortRules(max_drawdown=cap))
+    assert rpt.pruned and rpt.pruned_reason == "max_drawdown"
+    assert rpt.bars < 100 and rpt.max_drawdown > cap
+    assert trades[-1].reason == "pruned"
+    assert trades[-1].exit_ts == bars[rpt.bars].ts  # flattened at the next open
+
+    floor, _ = backtest("TEST", "1m", bars, AlwaysLong(), risk,
+                        AbortRules(equity_floor=full.equity_end + 1.0))
+    assert floor.pruned and floor.pruned_reason == "equity_floor"
+
+
+def test_abort_min_trades_by_bar():
+    from qryptify_strategy.models import AbortRules
+
+    bars = _trend_bars(50, 0.05)
+    risk = RiskParams(atr_period=1, fee_bps=0.0, slippage_bps=0.0)
+    # Strategy stays long without closing: zero trades by bar 10
+    rpt, _ = backtest("TEST", "1m", bars, AlwaysLong(), risk,
+                      AbortRules(min_trades=1, min_trades_by_bar=10))
+    assert rpt.pruned and rpt.pruned_reason == "min_trades" and rpt.bars == 11
+
+
+def test_resume_from_snapshot_matches_full_run():
+    bars = synthetic_bars(3000)
+    risk = RiskParams(atr_mult_trail=1.5, atr_trail_trigger_mult=1.0)
+    for make in (lambda: EMACrossStrategy(10, 40), lambda: BollingerBandStrategy(20, 2.0),
+                 lambda: RSIScalpStrategy(14, 30.0, 55.0, 50)):
+        ref, ref_trades = backtest("X", "1m", bars, make(), risk)
+        for cuts in ((1000, ), (17, 1500, 2999)):
+            snap = None
+            trades = []
+            for a, b in zip((0, ) + cuts, cuts + (len(bars), )):
+                rpt, new, out = backtest_resumable("X", "1m", bars[a:b], make(), risk,
+                                                   resume=snap)
+                assert out is not None
+                # Positions still open at a cut are closed only in the report of that call
+                trades += [t for t in new if t.reason != "final_close" or b == len(bars)]
+                snap = snapshot_from_json(json.loads(json.dumps(snapshot_to_json(out))))
+            assert rpt == ref and trades == ref_trades
+
+
+def test_resume_rejects_other_config_and_old_bars():
+    bars = synthetic_bars(500)
+    _, _, snap = backtest_resumable("X", "1m", bars[:300], EMACrossStrategy(10, 40),
+                                    RiskParams())
+    with pytest.raises(ValueError):
+        backtest_resumable("X", "1m", bars[300:], EMACrossStrategy(10, 50), RiskParams(),
+                           resume=snap)
+    with pytest.raises(ValueError):
+        backtest_resumable("X", "1m", bars[300:], EMACrossStrategy(10, 40),
+                           RiskParams(fee_bps=2.0), resume=snap)
+    with pytest.raises(ValueError):
+        backtest_resumable("X", "1m", bars[299:], EMACrossStrategy(10, 40), RiskParams(),
+                           resume=snap)
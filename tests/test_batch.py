@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+
+import pytest
+
+from qryptify.data.synthetic import synthetic_bars
+from qryptify.data.synthetic import synthetic_symbols
+from qryptify_strategy.backtester import backtest
+from qryptify_strategy.batch import align_bars
+from qryptify_strategy.batch import atr_series
+from qryptify_strategy.batch import batch_backtest
+from qryptify_strategy.candidates import candidate_risk
+from qryptify_strategy.candidates import iter_candidates
+from qryptify_strategy.candidates import make_strategy
+from qryptify_strategy.models import AbortRules
+from qryptify_strategy.models import RiskParams
+from qryptify_strategy.models import Signal
+from qryptify_strategy.strategies.ema_crossover import EMACrossStrategy
+
+
+def test_align_bars_fills_gaps_with_nan():
+    syms = synthetic_symbols(500)
+    panel = align_bars(syms)
+    assert panel.ts == [b.ts for b in syms["AUSDT"]]
+    col = panel.close[panel.column("BUSDT")]
+    assert all(math.isnan(c) for c in col[:400]) and col[400] == syms["BUSDT"][0].close
+    assert sum(c == c for c in panel.close[2]) == len(syms["CUSDT"])
+    with pytest.raises(ValueError):
+        align_bars({"X": syms["AUSDT"][::-1]})
+
+
+def test_atr_series_matches_engine_atr():
+    bars = synthetic_bars(300)
+    atr = atr_series(bars, 14)
+    assert atr[12] is None and atr[13] is not None
+    sigs = [Signal(+1) if i == 50 else None for i in range(len(bars))]
+    ref = backtest("B", "1m", bars, EMACrossStrategy(), RiskParams(), signals=sigs)
+    assert backtest("B", "1m", bars, EMACrossStrategy(), RiskParams(), signals=sigs,
+                    atr_series=atr) == ref
+
+
+def test_batch_matches_individual_runs():
+    syms = synthetic_symbols(3000)
+    abort = AbortRules(max_drawdown=500.0)
+    cands = iter_candidates(["ema", "bollinger", "rsi"], [10, 20], [50, 100], [0.01], [2.0])
+    warm = {"AUSDT": 0, "BUSDT": 120, "CUSDT": 300}
+    for cand in cands:
+        risks = {s: candidate_risk(cand, fee) for s, fee in zip(syms, (4.0, 5.0, 2.5))}
+        out = batch_backtest("1m", syms, make_strategy(cand), risks, abort, warm)
+        assert list(out) == list(syms)
+        for symbol, bars in syms.items():
+            assert out[symbol] == backtest(symbol, "1m", bars, make_strategy(cand),
+                                           risks[symbol], abort, warm[symbol]), (cand, symbol)
+
+
+@dataclass
+class EveryTenth(EMACrossStrategy):
+    """No batch kernel: runs through on_bar on a copy per symbol."""
+
+    def on_bar(self, i, bar):
+        return Signal(+1 if i % 20 == 0 else -1) if i % 10 == 0 else None
+
+
+def test_strategies_without_kernel_fall_back_to_on_bar():
+    syms = synthetic_symbols(800)
+    out = batch_backtest("1m", dict(syms, EMPTY=[]), EveryTenth(), RiskParams())
+    assert "EMPTY" not in out
+    for symbol, bars in syms.items():
+        assert out[symbol] == backtest(symbol, "1m", bars, EveryTenth(), RiskParams())
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from benchmarks.cases import BenchContext
+from benchmarks.cases import CASES_BY_NAME
+from benchmarks.run import compare
+from benchmarks.run import run_case
+from benchmarks.run import select_cases
+
+
+def test_compare_flags_regressions():
+    base = [
+        {"case": "a", "size": 100, "median_s": 1.0},
+        {"case": "b", "size": 100, "median_s": 1.0},
+        {"case": "c", "size": 100, "median_s": 1.0},
+    ]
+    cur = [
+        {"case": "a", "size": 100, "median_s": 1.3},
+        {"case": "b", "size": 100, "median_s": 1.05},
+        {"case": "c", "size": 100, "median_s": 0.5},
+        {"case": "d", "size": 100, "median_s": 0.1},
+    ]
+    status = {r["case"]: r["status"] for r in compare(cur, base, 0.15)}
+    assert status == {"a": "regression", "b": "ok", "c": "faster", "d": "new"}
+
+
+def test_cases_run_on_small_inputs():
+    assert all(not c.needs_db for c in select_cases([], with_db=False))
+    ctx = BenchContext()
+    for name in ("indicators.wilder_rsi", "backtest.ema_trailing", "loader.build_bars"):
+        res = run_case(CASES_BY_NAME[name], 500, ctx, repeat=1)
+        assert res["units"] == 500 and res["median_s"] >= 0
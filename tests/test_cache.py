@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from qryptify.data.synthetic import synthetic_bars
+from qryptify_strategy import cache as cache_mod
+from qryptify_strategy.cache import bars_fingerprint
+from qryptify_strategy.cache import ResultCache
+from qryptify_strategy.candidates import eval_grid
+from qryptify_strategy.models import AbortRules
+from qryptify_strategy.search import successive_halving
+from qryptify_strategy.space import legacy_space
+from qryptify_strategy.space import sample
+
+GRID = dict(strategies=["ema", "bollinger"],
+            fast_opts=[10, 20],
+            slow_opts=[50],
+            risk_opts=[0.005],
+            atr_opts=[2.0, 3.0])
+
+
+def test_rerun_hits_cache_with_identical_results(tmp_path):
+    bars = synthetic_bars(3000)
+    path = str(tmp_path / "c.sqlite")
+    with ResultCache(path) as c:
+        first = eval_grid("BENCHUSDT", "1m", bars, fee_bps_val=4.0, cache=c, **GRID)
+        assert (c.stats.hits, c.stats.misses) == (0, len(first))
+    with ResultCache(path) as c:
+        again = eval_grid("BENCHUSDT", "1m", bars, fee_bps_val=4.0, cache=c, **GRID)
+        assert (c.stats.hits, c.stats.misses) == (len(first), 0)
+        # Different fee, abort rules or bars are different cells
+        eval_grid("BENCHUSDT", "1m", bars, fee_bps_val=5.0, cache=c, **GRID)
+        eval_grid("BENCHUSDT", "1m", bars, fee_bps_val=4.0, cache=c,
+                  abort=AbortRules(max_drawdown=100.0), **GRID)
+        eval_grid("BENCHUSDT", "1m", bars[1:], fee_bps_val=4.0, cache=c, **GRID)
+        assert c.stats.hits == len(first)
+    assert again == first
+
+
+def test_fingerprint_sensitive_to_any_field():
+    bars = synthetic_bars(100)
+    changed = list(bars)
+    changed[50] = replace(bars[50], volume=bars[50].volume + 1e-9)
+    assert bars_fingerprint(bars) != bars_fingerprint(changed)
+    assert bars_fingerprint(bars) == bars_fingerprint(list(bars))
+
+
+def test_halving_reuses_cells(tmp_path):
+    bars = synthetic_bars(3000)
+    space = legacy_space(**GRID)
+    with ResultCache(str(tmp_path / "c.sqlite")) as c:
+        a, _ = successive_halving("BENCHUSDT", "1m", bars, sample(space), 4.0, lam=0.5,
+                                  min_window=300, cache=c)
+        misses = c.stats.misses
+        b, _ = successive_halving("BENCHUSDT", "1m", bars, sample(space), 4.0, lam=0.5,
+                                  min_window=300, cache=c)
+        assert c.stats.misses == misses and c.stats.hits == misses
+    assert a == b
+
+
+def test_eviction_and_invalidation(tmp_path, monkeypatch):
+    bars = synthetic_bars(1000)
+    path = str(tmp_path / "c.sqlite")
+    with ResultCache(path, max_entries=3) as c:
+        eval_grid("BENCHUSDT", "1m", bars, fee_bps_val=4.0, cache=c, **GRID)
+    with ResultCache(path, max_entries=0) as c:
+        assert c.summary()["entries"] == 3
+        eval_grid("ETHUSDT", "1m", bars[:500], fee_bps_val=4.0, cache=c, **GRID)
+        assert c.invalidate(symbol="ETHUSDT") == 16
+        n_ema = c.summary()["by_strategy"].get("ema", 0)
+        assert c.invalidate(strategy="ema") == n_ema
+        assert "ema" not in c.summary()["by_strategy"]
+
+    # An engine change orphans old rows; --stale-engine removes them
+    monkeypatch.setattr(cache_mod.backtester, "ENGINE_VERSION", 999)
+    cache_mod.engine_version.cache_clear()
+    try:
+        with ResultCache(path, max_entries=0) as c:
+            left = c.summary()["entries"]
+            assert c.invalidate(stale_engine=True) == left
+    finally:
+        cache_mod.engine_version.cache_clear()
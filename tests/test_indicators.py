@@ -3,6 +3,7 @@ from __future__ import annotations
 from math import isclose
 
 from qryptify_strategy.indicators import ema
+from qryptify_strategy.indicators import ema_warmup
 from qryptify_strategy.indicators import RollingMeanStd
 from qryptify_strategy.indicators import true_range
 from qryptify_strategy.indicators import WilderATR
@@ -63,3 +64,12 @@ def test_rolling_mean_std():
     mean, std = rms.update(3.0)
     assert isclose(mean, 2.0)
     assert isclose(std, ((2 / 3)**0.5), rel_tol=1e-6)
+
+
+def test_declared_warmups_match_first_values():
+    for ind in (WilderRSI(14), WilderATR(14), RollingMeanStd(20)):
+        outs = [ind.update(100.0 + (i % 7)) for i in range(ind.warmup + 5)]
+        assert outs[ind.warmup - 2] is None and outs[ind.warmup - 1] is not None
+    # EMA seed weight after ema_warmup(n) updates is below 0.3%
+    n = 200
+    assert (1 - 2 / (n + 1))**ema_warmup(n) < 0.003
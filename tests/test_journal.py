@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from qryptify.data.synthetic import synthetic_bars
+from qryptify_strategy import candidates as cand_mod
+from qryptify_strategy.candidates import eval_candidates
+from qryptify_strategy.candidates import iter_candidates
+from qryptify_strategy.journal import RunJournal
+from qryptify_strategy.search import successive_halving
+
+GRID = (["ema", "bollinger"], [10, 20], [50], [0.005], [2.0, 3.0])
+PAIR = "BENCHUSDT/1m"
+
+
+def test_replay_resumes_cells_and_finished_pairs(tmp_path, monkeypatch):
+    bars = synthetic_bars(2000)
+    runs = str(tmp_path)
+    cands = list(iter_candidates(*GRID))
+    with RunJournal.create(runs, "r1", {"args": {"lam": 0.5}}) as j:
+        j.start_pair(PAIR, {"fee_bps": 4.0})
+        first = eval_candidates("BENCHUSDT", "1m", bars, cands[:5], 4.0, log=j.log(PAIR))
+        j.start_pair("OTHER/1m", {"fee_bps": 4.0})
+        eval_candidates("OTHER", "1m", bars[:500], cands, 4.0, log=j.log("OTHER/1m"))
+        j.finish_pair("OTHER/1m", 500)
+
+    j = RunJournal.open(runs, "r1")
+    assert j.meta["args"] == {"lam": 0.5}
+    assert j.state(PAIR).info == {"fee_bps": 4.0} and not j.state(PAIR).done
+    assert list(j.state(PAIR).cells[2000]) == cands[:5]
+    assert j.state("OTHER/1m").done and len(j.state("OTHER/1m").final_results()) == len(cands)
+
+    calls = []
+    orig = cand_mod.run_candidate
+
+    def counting(*a, **k):
+        calls.append(a[3])
+        return orig(*a, **k)
+
+    monkeypatch.setattr(cand_mod, "run_candidate", counting)
+    res = eval_candidates("BENCHUSDT", "1m", bars, cands, 4.0, log=j.log(PAIR))
+    monkeypatch.undo()
+    j.close()
+    assert calls == cands[5:]
+    assert res[:5] == first
+    assert res == eval_candidates("BENCHUSDT", "1m", bars, cands, 4.0)
+
+
+def test_torn_tail_dropped_and_restart_discards_cells(tmp_path):
+    bars = synthetic_bars(1000)
+    cands = list(iter_candidates(*GRID))
+    with RunJournal.create(str(tmp_path), "r", {}) as j:
+        j.start_pair(PAIR, {"bars_fp": "a"})
+        eval_candidates("BENCHUSDT", "1m", bars, cands[:3], 4.0, log=j.log(PAIR))
+    path = tmp_path / "r" / "cells.jsonl"
+    with open(path, "a") as f:
+        f.write('{"t": "cell", "pair": "BENCH')  # crash mid-write
+
+    j = RunJournal.open(str(tmp_path), "r")
+    assert len(j.state(PAIR).cells[1000]) == 3
+    assert path.read_text().endswith("\n")
+    j.start_pair(PAIR, {"bars_fp": "b"})  # inputs changed: start over
+    j.close()
+    j = RunJournal.open(str(tmp_path), "r")
+    assert j.state(PAIR).info == {"bars_fp": "b"} and not j.state(PAIR).cells
+    j.close()
+
+
+def test_halving_resumes_per_rung(tmp_path):
+    bars = synthetic_bars(3000)
+    cands = list(iter_candidates(*GRID))
+    with RunJournal.create(str(tmp_path), "h", {}) as j:
+        full, _ = successive_halving("BENCHUSDT", "1m", bars, cands, 4.0, lam=0.5,
+                                     min_window=300, log=j.log(PAIR))
+    j = RunJournal.open(str(tmp_path), "h")
+    assert sorted(j.state(PAIR).cells) == [333, 1000, 3000]
+    again, _ = successive_halving("BENCHUSDT", "1m", bars, cands, 4.0, lam=0.5,
+                                  min_window=300, log=j.log(PAIR))
+    j.close()
+    assert again == full
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import random
+
+import pytest
+
+from qryptify.shared.latency import format_rows
+from qryptify.shared.latency import LatencyHistogram
+from qryptify.shared.latency import LatencyTracker
+
+
+def test_histogram_quantiles_within_a_bucket():
+    rnd = random.Random(3)
+    samples = [rnd.lognormvariate(3.0, 1.5) for _ in range(20000)]
+    h = LatencyHistogram()
+    for ms in samples:
+        h.record(ms)
+    samples.sort()
+    for q in (0.5, 0.9, 0.99):
+        exact = samples[int(q * len(samples)) - 1]
+        assert exact <= h.quantile(q) <= exact * 1.1 + 1e-9
+    assert h.quantile(1.0) == h.max == samples[-1]
+    assert h.mean == pytest.approx(sum(samples) / len(samples))
+    other = LatencyHistogram()
+    other.record(1e9)  # beyond the last bucket: still counted, max exact
+    other.record(-5.0)  # clock skew lands in the first bucket
+    h.merge(other)
+    assert h.n == 20002 and h.max == 1e9 and LatencyHistogram().quantile(0.5) == 0.0
+
+
+def test_tracker_windows_and_totals():
+    tr = LatencyTracker()
+    for i in range(10):
+        tr.record("BTCUSDT", "1m", (100.0, 100.25, 100.2501, 100.2501, 100.26 + i / 1000))
+    tr.record("ETHUSDT", "1m", (100.0, 100.5, 100.5, 100.5, 100.6))
+    rows = tr.drain()
+    assert [(r.symbol, r.stage) for r in rows[:5]] == [("BTCUSDT", s) for s in (
+        "exchange", "parse", "enqueue", "commit", "total")]
+    total = {(r.symbol, r.stage): r for r in rows}
+    assert total[("BTCUSDT", "total")].n == 10
+    assert total[("BTCUSDT", "exchange")].p99_ms == pytest.approx(250.0, rel=0.1)
+    assert total[("BTCUSDT", "total")].max_ms == pytest.approx(269.0)
+    assert tr.drain() == []
+    tr.record("ETHUSDT", "1m", (0.0, 0.1, 0.1, 0.1, 0.2))
+    eth = [r for r in tr.summary() if r.symbol == "ETHUSDT" and r.stage == "total"]
+    assert eth[0].n == 2
+    lines = format_rows(rows)
+    assert len(lines) == 2 and lines[0].startswith("BTCUSDT/1m n=10 total")
+
+
+class Repo:
+
+    def __init__(self):
+        self.batches = []
+        self.latency = []
+
+    async def publish_klines_async(self, rows):
+        self.batches.append(len(rows))
+
+    async def record_latency_async(self, ts, rows):
+        self.latency.append(rows)
+
+
+class Client:
+
+    async def ws_kline_stream_pairs(self, pairs):
+        for t in range(6):
+            for sym, itv in pairs:
+                close = 1_700_000_000_000 + t * 60_000
+                yield {"symbol": sym, "recv": close / 1000 + 0.3,
+                       "k": {"t": close - 60_000, "T": close - 1, "i": itv, "x": True, "o": 1,
+                             "h": 1, "l": 1, "c": 1, "v": 1, "q": 0, "n": 1, "V": 0, "Q": 0}}
+            await asyncio.sleep(0)
+
+
+def test_live_runner_traces_every_bar():
+    pytest.importorskip("loguru")
+    from qryptify_ingestor.live_runner import run_live
+
+    cfg = {"pairs": ["BTCUSDT/1m", "ETHUSDT/1m"], "live": {"buffer_max": 4}}
+    tracker, repo = LatencyTracker(), Repo()
+    asyncio.run(run_live(cfg, repo, Client(), tracker))
+    assert repo.batches == [4, 4, 4]
+    # Nothing is due within 60s: the window is stored once at shutdown
+    assert len(repo.latency) == 1
+    rows = {(r.symbol, r.stage): r for r in repo.latency[0]}
+    assert rows[("BTCUSDT", "total")].n == 6 and rows[("ETHUSDT", "total")].n == 6
+    assert rows[("BTCUSDT", "exchange")].p50_ms == pytest.approx(300.0, rel=0.1)
+    assert tracker.summary() == repo.latency[0]
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from qryptify.data.layout import migrate_to_per_interval
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeDB:
+    """Just enough of a psycopg connection for migrate_to_per_interval."""
+
+    def __init__(self, source):
+        self.source = source  # candlesticks ts values (1h)
+        self.target = set()
+        self.watermark = {}
+        self.copies = []
+        self._row = None
+        self.rowcount = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=()):
+        if sql.startswith("SELECT copied_until"):
+            wm = self.watermark.get(params[0])
+            self._row = {"copied_until": wm} if wm else None
+        elif sql.startswith("SELECT min(ts)"):
+            self._row = {"lo": min(self.source), "hi": max(self.source)}
+        elif sql.startswith("INSERT INTO candlesticks_1h"):
+            _, lo, hi = params
+            rows = {t for t in self.source if lo <= t < hi} - self.target
+            self.target |= rows
+            self.rowcount = len(rows)
+            self.copies.append((lo, hi))
+        elif sql.startswith("INSERT INTO layout_migration"):
+            self.watermark[params[0]] = params[1]
+
+    def fetchone(self):
+        return self._row
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def test_rerun_resumes_from_watermark_not_target_max():
+    hours = [T0 + timedelta(hours=h) for h in range(24 * 20)]
+    db = FakeDB(hours[:24 * 10])
+    migrate_to_per_interval(db, ["1h"], batch=timedelta(days=3))
+    assert db.target == set(hours[:24 * 10])
+    # Ingestor switched layouts: new bars land in the target directly, while
+    # the source kept receiving bars until the restart
+    db.target |= set(hours[24 * 18:])
+    db.source = hours[:24 * 15]
+    db.copies.clear()
+    (stats, ) = migrate_to_per_interval(db, ["1h"], batch=timedelta(days=3))
+    assert db.target >= set(hours[:24 * 15])
+    assert stats.rows == 24 * 5
+    assert db.copies[0][0] == hours[24 * 10 - 1]  # the newest row the first run saw
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import os
+
+import pytest
+
+from qryptify.data.notify import BarEvent
+from qryptify.data.notify import BarSubscriber
+from qryptify.data.notify import decode_events
+from qryptify.data.notify import encode_events
+from qryptify.data.notify import latest_closes
+from qryptify.data.notify import PAYLOAD_MAX
+from qryptify.data.synthetic import synthetic_bars
+
+DSN = os.environ.get("QRYPTIFY_TEST_DSN", "")
+BARS = synthetic_bars(10)
+
+
+def _rows(symbol, interval, bars):
+    return [dict(vars(b), symbol=symbol, interval=interval,
+                 close_time=b.ts + timedelta(seconds=59.999)) for b in bars]
+
+
+def test_payload_round_trip_and_split():
+    rows = _rows("BTCUSDT", "1m", BARS) + _rows("ETHUSDT", "1m", BARS[:4])
+    closes = latest_closes(rows)
+    assert closes == {("BTCUSDT", "1m"): rows[9]["close_time"],
+                      ("ETHUSDT", "1m"): rows[13]["close_time"]}
+    payloads = encode_events(closes)
+    assert len(payloads) == 1
+    assert [(e.symbol, e.interval, e.close_time) for e in decode_events(payloads[0])] == \
+        [(s, i, t) for (s, i), t in closes.items()]
+
+    many = {(f"S{k:04d}USDT", "15m"): rows[0]["close_time"] for k in range(1000)}
+    payloads = encode_events(many)
+    assert len(payloads) > 1 and all(len(p) < PAYLOAD_MAX for p in payloads)
+    assert [(e.symbol, e.interval) for p in payloads for e in decode_events(p)] == list(many)
+    with pytest.raises(ValueError):
+        decode_events("BTCUSDT@123")
+
+
+def test_subscriber_yields_only_forward_events():
+    t0 = BARS[0].ts
+    sub = BarSubscriber("", pairs=[("BTCUSDT", "1m"), ("ETHUSDT", "1m")],
+                        last={("ETHUSDT", "1m"): t0 + timedelta(minutes=5)})
+    events = [
+        BarEvent("BTCUSDT", "1m", t0),
+        BarEvent("BTCUSDT", "1m", t0),  # duplicate (notification and catch-up)
+        BarEvent("ETHUSDT", "1m", t0 + timedelta(minutes=3)),  # behind the seeded mark
+        BarEvent("SOLUSDT", "1m", t0),  # not subscribed
+        BarEvent("BTCUSDT", "1m", t0 + timedelta(minutes=1)),
+        BarEvent("ETHUSDT", "1m", t0 + timedelta(minutes=6)),
+    ]
+    assert sub.advance(events) == [events[0], events[4], events[5]]
+    assert sub.last == {("BTCUSDT", "1m"): t0 + timedelta(minutes=1),
+                        ("ETHUSDT", "1m"): t0 + timedelta(minutes=6)}
+    pytest.importorskip("loguru")  # a malformed payload is logged
+    assert sub._decode("garbage") == [] and sub.notified == 0
+
+
+@pytest.mark.skipif(not DSN, reason="QRYPTIFY_TEST_DSN not set")
+def test_published_batch_wakes_subscriber():
+    from qryptify.data.timescale import TimescaleRepo
+
+    symbol = "NOTIFYTESTUSDT"
+    rows = _rows(symbol, "1m", BARS)
+
+    async def _run():
+        sub = BarSubscriber(DSN, pairs=[(symbol, "1m")], catch_up_s=None)
+        it = sub.events()
+        repo = TimescaleRepo(DSN)
+        repo.connect()
+        try:
+            await asyncio.to_thread(repo.publish_klines, rows[:5])
+            first = await asyncio.wait_for(it.__anext__(), 10)  # catch-up on connect
+            await asyncio.to_thread(repo.publish_klines, rows[5:])
+            second = await asyncio.wait_for(it.__anext__(), 10)  # notification
+        finally:
+            await it.aclose()
+            conn = repo._require_conn()
+            conn.execute("DELETE FROM candlesticks WHERE symbol = %s", (symbol, ))
+            conn.execute("DELETE FROM sync_state WHERE symbol = %s", (symbol, ))
+            conn.commit()
+            repo.close()
+        return sub, first, second
+
+    sub, first, second = asyncio.run(_run())
+    assert first.close_time == rows[4]["close_time"] and sub.caught_up == 1
+    assert second.close_time == rows[-1]["close_time"] and sub.notified == 1
@@ -2,7 +2,13 @@ from __future__ import annotations
 
 import pytest
 
+from qryptify.data.layout import table_for
+from qryptify.data.rollups import rollup_relation
+from qryptify.shared.config_model import backfill_mode
+from qryptify.shared.config_model import backfill_reload
+from qryptify.shared.config_model import storage_layout
 from qryptify.shared.config_model import validate_cfg_dict
+from qryptify.shared.pairs import ingest_pairs_from_cfg
 from qryptify.shared.pairs import parse_pair
 from qryptify.shared.pairs import symbol_interval_pairs_from_cfg
 
@@ -70,3 +76,57 @@ def test_validate_cfg_dict_invalid_interval():
     }
     with pytest.raises(ValueError):
         validate_cfg_dict(cfg)
+
+
+def test_ingest_pairs_rollup_mode_collapses_to_1m():
+    cfg = {
+        "pairs": ["BTCUSDT/1h", "BTCUSDT/4h", "ETHUSDT/15m"],
+        "ingest": {
+            "mode": "rollup"
+        },
+    }
+    assert ingest_pairs_from_cfg(cfg) == [("BTCUSDT", "1m"), ("ETHUSDT", "1m")]
+    cfg["ingest"]["mode"] = "native"
+    assert ingest_pairs_from_cfg(cfg) == symbol_interval_pairs_from_cfg(cfg)
+    cfg["ingest"]["mode"] = "bogus"
+    with pytest.raises(ValueError):
+        ingest_pairs_from_cfg(cfg)
+
+
+def test_rollup_relation_only_serves_closed_buckets():
+    rel = rollup_relation("4h")
+    assert "candlesticks_rollup_4h" in rel
+    assert "'4h'::text AS interval" in rel
+    assert "INTERVAL '4 hours' - INTERVAL '1 millisecond'" in rel
+    assert "AND bars = 240" in rel and "AND bars = 3)" in rollup_relation("3m")
+    with pytest.raises(ValueError):
+        rollup_relation("1m")
+
+
+def test_storage_layout_routes_intervals_to_tables():
+    assert storage_layout({"db": {"dsn": "x"}}) == "single"
+    assert storage_layout({"db": {"dsn": "x", "layout": "per_interval"}}) == "per_interval"
+    with pytest.raises(ValueError):
+        storage_layout({"db": {"dsn": "x", "layout": "sharded"}})
+    assert table_for("4h") == "candlesticks"
+    assert table_for("4h", "per_interval") == "candlesticks_4h"
+    with pytest.raises(ValueError):
+        table_for("7m", "per_interval")
+
+
+def test_backfill_mode_defaults_and_validation():
+    assert backfill_mode({"backfill": {"start_date": "2022-01-01"}}) == "rows"
+    assert backfill_mode({"backfill": {"mode": "BULK"}}) == "bulk"
+    with pytest.raises(ValueError):
+        backfill_mode({"backfill": {"mode": "fast"}})
+
+
+def test_backfill_reload_range():
+    assert backfill_reload({"backfill": {"start_date": "2022-01-01"}}) is None
+    start, end = backfill_reload({"backfill": {"reload": {
+        "start": "2022-01-01T00:00:00Z", "end": "2022-02-01T00:00:00Z"}}})
+    assert (end - start).days == 31 and start.utcoffset().total_seconds() == 0
+    for reload in ({"start": "2022-02-01T00:00:00Z", "end": "2022-01-01T00:00:00Z"},
+                   {"start": "2022-01-01T00:00:00"}, "2022-01-01"):
+        with pytest.raises(ValueError):
+            backfill_reload({"backfill": {"reload": reload}})
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import itertools
+import os
+
+import pytest
+
+from qryptify.data.notify import BarEvent
+from qryptify.data.synthetic import synthetic_bars
+from qryptify_strategy.backtester import backtest
+from qryptify_strategy.backtester import snapshot_from_json
+from qryptify_strategy.backtester import snapshot_to_json
+from qryptify_strategy.models import RiskParams
+from qryptify_strategy.paper import _db_bars
+from qryptify_strategy.paper import CANCELLED
+from qryptify_strategy.paper import NEW
+from qryptify_strategy.paper import PAPER_FILLED
+from qryptify_strategy.paper import PaperBatch
+from qryptify_strategy.paper import PaperEngine
+from qryptify_strategy.paper import PaperInstance
+from qryptify_strategy.paper import PaperOrderWriter
+from qryptify_strategy.paper import PaperStats
+from qryptify_strategy.paper import REJECTED
+from qryptify_strategy.paper import run_paper
+from qryptify_strategy.strategies.bollinger import BollingerBandStrategy
+from qryptify_strategy.strategies.ema_crossover import EMACrossStrategy
+from qryptify_strategy.strategies.rsi_scalp import RSIScalpStrategy
+
+DSN = os.environ.get("QRYPTIFY_TEST_DSN", "")
+BARS = synthetic_bars(3000)
+
+
+class MemoryWriter:
+
+    def __init__(self) -> None:
+        self._ids = itertools.count(1)
+        self.orders = {}
+        self.fills = []
+        self.writes = 0
+
+    def next_id(self):
+        return next(self._ids)
+
+    def write(self, batch):
+        self.writes += 1
+        for o in batch.orders:
+            assert o.id not in self.orders
+            self.orders[o.id] = o
+        for u in batch.updates:
+            assert self.orders[u.id].status == NEW
+            self.orders[u.id] = self.orders[u.id].__class__(
+                **{**vars(self.orders[u.id]), "status": u.status, "qty": u.qty,
+                   "price": u.price})
+        self.fills.extend(batch.fills)
+
+
+def _round_trips(fills):
+    """Pair entry and exit fills back into (entry_ts, exit_ts, entry, exit, qty, pnl)."""
+    out, entry = [], None
+    for f in fills:
+        if entry is None:
+            entry = f
+            continue
+        qty = entry.qty if entry.side == "BUY" else -entry.qty
+        out.append((entry.ts, f.ts, entry.price, f.price, qty, f.pnl, entry.fee + f.fee))
+        entry = None
+    return out
+
+
+@pytest.mark.parametrize("make,trail", [
+    (lambda: EMACrossStrategy(10, 40), 0.0),
+    (lambda: EMACrossStrategy(10, 40), 1.5),
+    (lambda: BollingerBandStrategy(20, 2.0), 0.0),
+    (lambda: RSIScalpStrategy(14, 30.0, 55.0, 0), 1.0),
+])
+def test_paper_trades_match_backtest(make, trail):
+    risk = RiskParams(atr_mult_trail=trail, atr_trail_trigger_mult=1.0, min_notional=5.0)
+    ref, ref_trades = backtest("AUSDT", "1m", BARS, make(), risk, warmup=100)
+    ref_trades = [t for t in ref_trades if t.reason != "final_close"]
+
+    inst = PaperInstance("s1", "AUSDT", "1m", make(), risk)
+    w = MemoryWriter()
+    for b in BARS[:100]:
+        inst.warm(b)
+    for b in BARS[100:]:
+        out = PaperBatch()
+        assert inst.step(b, out, w.next_id)
+        w.write(out)
+    assert not inst.step(BARS[-1], PaperBatch(), w.next_id)  # already seen
+
+    got = _round_trips(w.fills)
+    assert got == [(t.entry_ts, t.exit_ts, t.entry_price, t.exit_price, t.qty, t.pnl,
+                    pytest.approx(t.fees)) for t in ref_trades]
+    assert inst.totals.trades == len(ref_trades)
+    # Every NEW order was resolved except the pending signal's
+    statuses = [o.status for o in w.orders.values()]
+    assert statuses.count(NEW) == len(inst.pending_orders)
+    filled = {o.id for o in w.orders.values() if o.status == PAPER_FILLED}
+    assert {f.order_id for f in w.fills} == filled
+    assert all(o.qty > 0 and o.price > 0 for o in w.orders.values())
+
+
+def _until_entry_recorded(inst, w, bars):
+    """Step until a bar records a NEW entry; returns that batch and the bars left."""
+    for k, b in enumerate(bars):
+        out = PaperBatch()
+        inst.step(b, out, w.next_id)
+        w.write(out)
+        if any(o.status == NEW and o.note != "signal_exit" for o in out.orders):
+            return out, bars[k + 1:]
+    raise AssertionError("no entry signal")
+
+
+def test_entries_that_no_longer_size_are_rejected():
+    inst = PaperInstance("s1", "AUSDT", "1m", EMACrossStrategy(10, 40), RiskParams())
+    w = MemoryWriter()
+    recorded, rest = _until_entry_recorded(inst, w, BARS)
+    entry = [o for o in recorded.orders if o.note != "signal_exit"][0]
+    inst.risk = RiskParams(min_notional=1e12)
+    out = PaperBatch()
+    inst.step(rest[0], out, w.next_id)
+    w.write(out)
+    assert w.orders[entry.id].status == REJECTED and inst.state.position_qty == 0
+
+
+def test_restored_instance_continues_identically():
+    risk = RiskParams(atr_mult_trail=1.5, atr_trail_trigger_mult=1.0)
+    ref = PaperInstance("s1", "AUSDT", "1m", RSIScalpStrategy(14, 30.0, 55.0, 200), risk)
+    live = PaperInstance("s1", "AUSDT", "1m", RSIScalpStrategy(14, 30.0, 55.0, 200), risk)
+    w_ref, w_live = MemoryWriter(), MemoryWriter()
+    for b in BARS[:1700]:
+        ref.step(b, PaperBatch(), w_ref.next_id)
+        live.step(b, PaperBatch(), w_live.next_id)
+    snap = snapshot_from_json(snapshot_to_json(live.snapshot()))
+    warm = PaperInstance("s1", "AUSDT", "1m", RSIScalpStrategy(14, 30.0, 55.0, 200), risk)
+    warm.restore(snap)
+    a, b_ = PaperBatch(), PaperBatch()
+    for b in BARS[1700:]:
+        ref.step(b, a, w_ref.next_id)
+        warm.step(b, b_, w_live.next_id)
+    assert [(f.ts, f.price, f.qty, f.pnl) for f in a.fills] == \
+        [(f.ts, f.price, f.qty, f.pnl) for f in b_.fills]
+    assert warm.state == ref.state and warm.totals == ref.totals
+    with pytest.raises(ValueError):
+        PaperInstance("s1", "AUSDT", "1m", RSIScalpStrategy(14, 30.0, 55.0, 100),
+                      risk).restore(snap)
+
+
+async def _stream(events):
+    for e in events:
+        yield e
+        await asyncio.sleep(0)
+
+
+def test_run_paper_batches_writes_and_cancels_pending():
+    risk = RiskParams()
+    syms = ("AUSDT", "BUSDT")
+    instances = [
+        PaperInstance(f"{name}:{s}/1m", s, "1m", make(), risk) for s in syms
+        for name, make in (("ema", lambda: EMACrossStrategy(10, 40)),
+                           ("bb", lambda: BollingerBandStrategy(20, 2.0)))
+    ]
+    w = MemoryWriter()
+    engine = PaperEngine(instances, w.next_id)
+    assert engine.pairs() == [("AUSDT", "1m"), ("BUSDT", "1m")]
+    events = [(s, "1m", b, 0.0) for b in BARS[:2000] for s in syms]
+    events.append(("AUSDT", "1m", BARS[1000], 0.0))  # replayed bar: ignored
+    events.append(("CUSDT", "1m", BARS[0], 0.0))  # no instance
+    stats = asyncio.run(run_paper(engine, _stream(events), w, stats_every=0))
+    assert stats.bars == len(events) and stats.steps == 2 * 2000 * 2
+    assert stats.writes == w.writes and 0 < w.writes <= 2 * 2000
+    assert stats.orders == len(w.orders) and stats.fills == len(w.fills)
+    assert stats.unwritten == 0
+    assert NEW not in {o.status for o in w.orders.values()}
+    assert all(not i.pending_orders for i in instances)
+    # Stopping with a signal pending cancels its NEW orders
+    recorded, rest = _until_entry_recorded(
+        PaperInstance("s", "AUSDT", "1m", EMACrossStrategy(10, 40), risk), MemoryWriter(), BARS)
+    inst = PaperInstance("s", "AUSDT", "1m", EMACrossStrategy(10, 40), risk)
+    w = MemoryWriter()
+    events = [("AUSDT", "1m", b, 0.0) for b in BARS[:len(BARS) - len(rest)]]
+    asyncio.run(run_paper(PaperEngine([inst], w.next_id), _stream(events), w, stats_every=0))
+    assert w.orders[recorded.orders[-1].id].status == CANCELLED
+    assert inst.pending is not None and not inst.pending_orders
+    with pytest.raises(ValueError):
+        PaperEngine(instances + instances[:1], w.next_id)
+
+
+def test_writer_failure_stops_the_service():
+
+    class Broken(MemoryWriter):
+
+        def write(self, batch):
+            raise RuntimeError("db down")
+
+    w = Broken()
+    engine = PaperEngine([PaperInstance("s", "AUSDT", "1m", EMACrossStrategy(10, 40),
+                                        RiskParams())], w.next_id)
+    stats = PaperStats()
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_paper(engine, _stream([("AUSDT", "1m", b, 0.0) for b in BARS]), w,
+                              stats_every=0, stats=stats))
+    assert stats.unwritten > 0  # states are ahead of the DB: _serve must not save them
+
+
+class BarRepo:
+
+    def __init__(self, bars):
+        self.bars = bars
+
+    def fetch_latest_n(self, symbol, interval, n):
+        return [vars(b) for b in self.bars[-n:]]
+
+    def fetch_ohlcv(self, symbol, interval, start=None, end=None, limit=None):
+        return [vars(b) for b in self.bars if start <= b.ts <= end]
+
+
+def test_db_source_reads_bars_since_the_last_one():
+    repo = BarRepo(BARS[:50])
+    close = lambda k: BARS[k].ts + timedelta(seconds=59.999)  # noqa: E731
+    events = [
+        BarEvent("AUSDT", "1m", close(20)),  # first event: head only
+        BarEvent("AUSDT", "1m", close(21)),
+        BarEvent("BUSDT", "1m", close(21)),  # not traded
+        BarEvent("AUSDT", "1m", close(25)),  # missed notifications: 22..25
+        BarEvent("AUSDT", "1m", close(25)),
+    ]
+    last = {}
+
+    async def _collect():
+        return [b async for _, _, b, _ in _db_bars(_stream(events), repo, [("AUSDT", "1m")],
+                                                   last)]
+
+    repo.bars = BARS[:21]
+    got = asyncio.run(_collect())
+    assert got == [BARS[20]]
+    repo.bars = BARS[:50]
+    got = asyncio.run(_collect())
+    assert got == BARS[21:26] and last == {("AUSDT", "1m"): BARS[25].ts}
+
+
+@pytest.mark.skipif(not DSN, reason="QRYPTIFY_TEST_DSN not set")
+def test_writer_round_trip():
+    risk = RiskParams()
+    with PaperOrderWriter.connect(DSN, id_block=8) as w:
+        inst = PaperInstance("test-paper:AUSDT/1m", "AUSDT", "1m", EMACrossStrategy(10, 40),
+                             risk)
+        fills = 0
+        for b in BARS[:1500]:
+            out = PaperBatch()
+            inst.step(b, out, w.next_id)
+            w.write(out)
+            fills += len(out.fills)
+        conn = w._conn
+        n, = conn.execute("SELECT count(*) FROM trades t JOIN orders o ON o.id = t.order_id "
+                          "WHERE o.strategy_id = %s", (inst.strategy_id, )).fetchone()
+        assert n == fills
+        conn.execute("DELETE FROM orders WHERE strategy_id = %s", (inst.strategy_id, ))
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import math
+import random
+
+import pytest
+
+from qryptify_strategy.candidates import Result
+from qryptify_strategy.pareto import MINIMIZE
+from qryptify_strategy.pareto import parse_objectives
+from qryptify_strategy.pareto import skyline
+from qryptify_strategy.pareto import SkylineFrontier
+from qryptify_strategy.sink import PairSink
+from qryptify_strategy.sink import pareto_frontier
+
+
+def _naive(cols):
+    rows = list(zip(*cols))
+    keep = []
+    for i, p in enumerate(rows):
+        dominated = any(
+            all(a <= b for a, b in zip(q, p)) and (q != p or j < i)
+            for j, q in enumerate(rows) if j != i)
+        if not dominated:
+            keep.append(i)
+    return keep
+
+
+def test_skyline_matches_all_pairs_check():
+    rng = random.Random(7)
+    for k in (1, 2, 3, 4, 6):
+        for _ in range(20):
+            n = rng.randint(0, 120)
+            # Few distinct values so ties and duplicates are common
+            cols = [[float(rng.randint(0, 6)) for _ in range(n)] for _ in range(k)]
+            for c in cols:
+                if n:
+                    c[rng.randrange(n)] = math.inf
+            assert skyline(cols) == _naive(cols)
+
+
+def _results(n: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        Result(strategy="ema",
+               params=f"i={i}",
+               risk=0.01,
+               atr_mult=2.0,
+               pnl=float(rng.randint(-20, 20) * 50),
+               dd=float(rng.randint(0, 20) * 100),
+               trades=rng.randint(0, 50),
+               cagr=rng.choice([None, 0.1, 0.2, 0.3]),
+               equity_end=10_000.0,
+               win_rate=rng.randint(0, 10) / 10,
+               fees=float(rng.randint(0, 5) * 10)) for i in range(n)
+    ]
+
+
+def test_streaming_frontier_is_chunk_independent():
+    objectives = parse_objectives("pnl,dd,win_rate,fee_drag,cagr")
+    results = _results(500, 3)
+    cols = [[o.cost(r) for r in results] for o in objectives]
+    expected = {id(results[i]) for i in skyline(cols)}
+    for chunk in (1, 7, 64, 10_000):
+        fr = SkylineFrontier(objectives, chunk=chunk)
+        for r in results:
+            fr.add(r)
+        pts = fr.points()
+        assert {id(r) for r in pts} == expected
+        # Best pnl first
+        assert pts[0].pnl == max(r.pnl for r in results)
+
+
+def test_two_objective_skyline_agrees_with_pareto_frontier():
+    results = _results(400, 5)
+    sink = PairSink(0.5, None, 5, objectives=parse_objectives("dd,pnl"))
+    for r in results:
+        sink.add(r)
+    assert isinstance(sink.frontier, SkylineFrontier)
+    assert sink.frontier.points() == pareto_frontier(results)
+
+
+def test_parse_objectives():
+    obj = parse_objectives(" pnl, -trades ")
+    assert [o.name for o in obj] == ["pnl", "trades"] and obj[1].sense == MINIMIZE
+    for bad in ("pnl,sharpe", "pnl,pnl", ""):
+        with pytest.raises(ValueError):
+            parse_objectives(bad)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+
+from qryptify.data.synthetic import synthetic_bars
+from qryptify.data.synthetic import synthetic_symbols
+from qryptify_strategy.backtester import backtest
+from qryptify_strategy.loader import iter_bars
+from qryptify_strategy.models import RiskParams
+from qryptify_strategy.portfolio import PortfolioLimits
+from qryptify_strategy.portfolio import run_portfolio
+from qryptify_strategy.strategies.ema_crossover import EMACrossStrategy
+
+
+def _symbols(n: int = 3000):
+    base = synthetic_bars(n)
+    return {**synthetic_symbols(n, seed=11, late=300), "DUSDT": base[:2000], "EUSDT": base[100:]}
+
+
+def _risk(**kw) -> RiskParams:
+    return RiskParams(risk_per_trade=0.01, fee_bps=4.0, slippage_bps=1.0, **kw)
+
+
+def _strategy(symbol):
+    return EMACrossStrategy(fast=10, slow=40)
+
+
+@pytest.mark.parametrize("trail", [0.0, 1.5])
+def test_single_symbol_matches_backtest(trail):
+    bars = synthetic_bars(3000)
+    risk = _risk(atr_mult_trail=trail, atr_trail_trigger_mult=1.0)
+    ref, ref_trades = backtest("AUSDT", "1m", bars, _strategy("AUSDT"), risk)
+    report, trades = run_portfolio({"AUSDT": iter(bars)}, _strategy, risk)
+    assert [t for _, t in trades] == ref_trades
+    assert report.equity_end == ref.equity_end
+    assert report.trades == ref.trades and report.bars == len(bars)
+    assert report.max_drawdown == pytest.approx(ref.max_drawdown)
+    assert report.equity_curve[-1] == (bars[-1].ts, ref.equity_end)
+
+
+def test_max_positions_caps_concurrent_positions():
+    syms = _symbols()
+    free, _ = run_portfolio({s: iter(b) for s, b in syms.items()}, _strategy, _risk())
+    assert free.max_open > 2
+    report, trades = run_portfolio({s: iter(b) for s, b in syms.items()}, _strategy, _risk(),
+                                   PortfolioLimits(max_positions=2))
+    assert report.max_open == 2
+    assert sum(st.rejected for st in report.symbols.values()) > 0
+    events = sorted([(t.entry_ts, 1) for _, t in trades] + [(t.exit_ts, -1) for _, t in trades])
+    open_now = 0
+    for _, d in events:  # exits sort before entries at the same timestamp
+        open_now += d
+        assert open_now <= 2
+    assert report.timestamps == len({b.ts for bars in syms.values() for b in bars})
+    assert report.bars == sum(len(b) for b in syms.values())
+    assert report.equity_end == pytest.approx(report.start_equity + report.total_pnl)
+
+
+def test_gross_exposure_shrinks_entries_to_equity():
+    bars = synthetic_bars(3000)
+    report, trades = run_portfolio({"AUSDT": bars}, _strategy, _risk(),
+                                   PortfolioLimits(max_gross_exposure=1.0))
+    assert report.symbols["AUSDT"].capped > 0
+    cash = report.start_equity
+    for _, t in trades:
+        assert abs(t.qty) * t.entry_price <= cash * (1 + 1e-9)
+        cash += t.pnl
+
+
+def test_equity_curve_is_sampled_and_streams_must_increase():
+    bars = synthetic_bars(3000)
+    report, _ = run_portfolio({"AUSDT": bars}, _strategy, _risk(),
+                              curve_every=timedelta(hours=6))
+    gaps = [b[0] - a[0] for a, b in zip(report.equity_curve, report.equity_curve[1:-1])]
+    assert gaps and all(g >= timedelta(hours=6) for g in gaps)
+    with pytest.raises(ValueError):
+        run_portfolio({"AUSDT": bars[::-1]}, _strategy, _risk())
+
+
+class PagedRepo:
+
+    def __init__(self, bars):
+        self.rows = [vars(b) for b in bars]
+        self.calls = 0
+
+    def fetch_ohlcv(self, symbol, interval, start=None, end=None, limit=None):
+        self.calls += 1
+        rows = [r for r in self.rows
+                if (start is None or r["ts"] >= start) and (end is None or r["ts"] <= end)]
+        return rows[:limit]
+
+
+def test_iter_bars_pages_by_timestamp():
+    bars = synthetic_bars(250)
+    repo = PagedRepo(bars)
+    assert list(iter_bars(repo, "AUSDT", "1m", page=100)) == bars
+    assert repo.calls == 3
+    got = list(iter_bars(repo, "AUSDT", "1m", start=bars[50].ts, end=bars[149].ts, page=50))
+    assert got == bars[50:150]
+    with pytest.raises(ValueError):
+        next(iter_bars(repo, "AUSDT", "45m"))
+
+
+def test_bars_before_start_only_warm_up():
+    bars = synthetic_bars(3000)
+    risk = _risk()
+    ref, ref_trades = backtest("AUSDT", "1m", bars, _strategy("AUSDT"), risk, warmup=500)
+    report, trades = run_portfolio({"AUSDT": bars}, _strategy, risk, start=bars[500].ts)
+    assert [t for _, t in trades] == ref_trades
+    assert report.equity_end == ref.equity_end and report.bars == ref.bars
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from qryptify_strategy.prefetch import prefetch
+from qryptify_strategy.prefetch import RepoPool
+
+
+class FakeRepo:
+    opened = 0
+
+    def __init__(self) -> None:
+        self.connected = False
+
+    def connect(self) -> None:
+        FakeRepo.opened += 1
+        self.connected = True
+
+    def close(self) -> None:
+        self.connected = False
+
+
+def test_prefetch_keeps_order_and_bounds_loads_ahead():
+    lock = threading.Lock()
+    started = []
+    consumed = []
+    ahead = []
+
+    def load(i):
+        with lock:
+            started.append(i)
+            # Loads started but not yet handed to the consumer, besides the current one
+            ahead.append(len(started) - len(consumed))
+        time.sleep(0.01 * (i % 3))
+        return i * 10
+
+    out = []
+    for i, fut in prefetch(range(8), load, depth=2):
+        with lock:
+            consumed.append(i)
+        out.append((i, fut.result()))
+        time.sleep(0.02)
+    assert out == [(i, i * 10) for i in range(8)]
+    assert max(ahead) <= 3
+
+
+def test_failed_load_raises_for_its_item_only():
+
+    def load(i):
+        if i == 1:
+            raise ValueError("no bars")
+        return i
+
+    got = []
+    for depth in (0, 2):
+        for i, fut in prefetch(range(3), load, depth=depth):
+            if i == 1:
+                with pytest.raises(ValueError):
+                    fut.result()
+            else:
+                got.append(fut.result())
+    assert got == [0, 2, 0, 2]
+
+
+def test_closing_early_cancels_pending_loads():
+    calls = []
+    gen = prefetch(range(100), lambda i: calls.append(i), depth=2)
+    next(gen)
+    gen.close()
+    assert len(calls) <= 3
+
+
+def test_pool_reuses_and_caps_connections():
+    FakeRepo.opened = 0
+    pool = RepoPool(FakeRepo, size=2)
+    barrier = threading.Barrier(2)
+    seen = set()
+
+    def work():
+        with pool.acquire() as repo:
+            seen.add(id(repo))
+            barrier.wait(timeout=5)
+
+    threads = [threading.Thread(target=work) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for _ in range(5):
+        with pool.acquire() as repo:
+            assert id(repo) in seen
+    assert FakeRepo.opened == 2 and pool.connections == 2
+
+    # A repo that raised is closed instead of handed out again
+    with pytest.raises(RuntimeError):
+        with pool.acquire() as bad:
+            raise RuntimeError("connection lost")
+    assert not bad.connected and pool.connections == 1
+    pool.close()
+    assert pool.connections == 0
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from qryptify.shared import profiling
+
+
+def test_null_profiler_is_inert():
+    prof = profiling.current()
+    assert not prof.enabled
+
+    def fn():
+        return 1
+
+    assert prof.wrap(fn, "x") is fn
+    with prof.phase("anything"):
+        prof.count("bars", 10)
+
+
+def test_phases_counters_and_json_dump(tmp_path):
+    out = tmp_path / "profile.json"
+    reports = []
+    with profiling.profiled(True, str(out), report=reports.append) as prof:
+        assert profiling.current() is prof
+        with prof.phase("backtest"):
+            step = prof.wrap(lambda x: x + 1, "on_bar")
+            for i in range(100):
+                step(i)
+        prof.count("bars", 100)
+    assert profiling.current() is not prof
+
+    assert prof.phases["backtest"].calls == 1
+    assert prof.phases["backtest/on_bar"].calls == 100
+    assert list(prof.phases) == ["backtest", "backtest/on_bar"]
+    assert "bars/sec" in prof.rates()
+    assert "on_bar" in reports[0] and "peak RSS" in reports[0]
+    doc = json.loads(out.read_text())
+    assert doc["counters"] == {"bars": 100}
+    assert doc["phases"]["backtest/on_bar"]["calls"] == 100
+
+
+def test_phases_nest_per_thread():
+
+    def fetch():
+        with prof.phase("db_fetch"):
+            prof.count("rows", 5)
+
+    with profiling.profiled(True, report=lambda s: None) as prof:
+        with prof.phase("backtest"):
+            # A background phase is top-level even while the main thread is inside one
+            t = threading.Thread(target=fetch)
+            t.start()
+            t.join()
+            with prof.phase("on_bar"):
+                pass
+    assert list(prof.phases) == ["backtest", "db_fetch", "backtest/on_bar"]
+    assert prof.counters["rows"] == 5
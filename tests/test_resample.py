@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+
+from qryptify.shared.intervals import parse_interval
+from qryptify_strategy.loader import load_bars
+from qryptify_strategy.loader import load_window
+from qryptify_strategy.models import Bar
+from qryptify_strategy.resample import base_interval_for
+from qryptify_strategy.resample import resample_bars
+
+
+def _minute_bars(start: datetime, n: int):
+    bars = []
+    for i in range(n):
+        px = 100.0 + i
+        bars.append(
+            Bar(ts=start + timedelta(minutes=i),
+                open=px,
+                high=px + 0.5,
+                low=px - 0.5,
+                close=px + 0.25,
+                volume=1.0))
+    return bars
+
+
+def test_parse_interval_and_base_selection():
+    assert parse_interval("45m") == timedelta(minutes=45)
+    assert parse_interval("6h") == timedelta(hours=6)
+    assert parse_interval("1d") == timedelta(days=1)
+    with pytest.raises(ValueError):
+        parse_interval("7x")
+    assert base_interval_for("6h") == "2h"
+    assert base_interval_for("45m") == "15m"
+    assert base_interval_for("1d") == "4h"
+    assert base_interval_for("7m") == "1m"
+
+
+def test_resample_ohlcv_aggregation_and_alignment():
+    start = datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc)
+    bars = _minute_bars(start, 10)
+    out = resample_bars(bars, timedelta(minutes=5))
+    assert [b.ts for b in out] == [start, start + timedelta(minutes=5)]
+    first = out[0]
+    assert first.open == 100.0
+    assert first.high == 104.5
+    assert first.low == 99.5
+    assert first.close == 104.25
+    assert first.volume == 5.0
+
+
+def test_resample_partial_bucket_policies():
+    # Starts mid-bucket (00:02) and ends mid-bucket (00:12)
+    start = datetime(2024, 1, 1, 0, 2, tzinfo=timezone.utc)
+    bars = _minute_bars(start, 11)
+    # Interior gap: remove 00:06
+    bars = [b for b in bars if b.ts.minute != 6]
+    step = timedelta(minutes=5)
+    drop = resample_bars(bars, step, base_step=timedelta(minutes=1))
+    assert [b.ts.minute for b in drop] == [5]
+    keep = resample_bars(bars, step, base_step=timedelta(minutes=1), partial="keep")
+    assert [b.ts.minute for b in keep] == [0, 5, 10]
+    strict = resample_bars(bars, step, base_step=timedelta(minutes=1), partial="strict")
+    assert strict == []
+    with pytest.raises(ValueError):
+        resample_bars(bars, timedelta(minutes=7), base_step=timedelta(minutes=5))
+
+
+class _FakeRepo:
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def fetch_latest_n(self, symbol, interval, n):
+        self.calls.append((interval, n))
+        return self.rows[-n:]
+
+    def fetch_ohlcv(self, symbol, interval, start=None, end=None, limit=None):
+        self.calls.append((interval, start, end))
+        return [r for r in self.rows
+                if (start is None or r["ts"] >= start) and (end is None or r["ts"] <= end)]
+
+
+def test_load_bars_derives_unstored_interval_from_base():
+    start = datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc)
+    rows = [{
+        "ts": b.ts,
+        "open": b.open,
+        "high": b.high,
+        "low": b.low,
+        "close": b.close,
+        "volume": b.volume,
+    } for b in _minute_bars(start, 3 * 45 + 7)]
+    repo = _FakeRepo(rows)
+    bars = load_bars(repo, "BTCUSDT", "45m", lookback=2, base_interval="1m")
+    assert repo.calls == [("1m", 3 * 45)]
+    assert len(bars) == 2
+    assert bars[-1].ts == start + timedelta(minutes=90)
+
+
+def test_load_window_fetches_warmup_ahead_of_the_window():
+    start = datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc)
+    bars = _minute_bars(start, 100)
+    repo = _FakeRepo([vars(b) for b in bars])
+    got, n_warm = load_window(repo, "BTCUSDT", "1m", 30, lookback=50)
+    assert repo.calls == [("1m", 80)] and n_warm == 30 and got == bars[20:]
+    got, n_warm = load_window(repo, "BTCUSDT", "1m", 30, start=bars[40].ts, end=bars[59].ts)
+    assert n_warm == 30 and got == bars[10:60]
+    # Short history shrinks the warm-up, never the window
+    got, n_warm = load_window(repo, "BTCUSDT", "1m", 30, lookback=90)
+    assert n_warm == 10 and len(got) == 100
+    got, n_warm = load_window(repo, "BTCUSDT", "1m", 30, end=bars[9].ts)
+    assert n_warm == 9 and len(got) == 10
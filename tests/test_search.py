@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from qryptify.data.synthetic import synthetic_bars
+from qryptify_strategy.candidates import eval_grid
+from qryptify_strategy.candidates import iter_candidates
+from qryptify_strategy.search import rung_windows
+from qryptify_strategy.search import score
+from qryptify_strategy.search import successive_halving
+
+GRID = dict(strategies=["ema", "bollinger"],
+            fast_opts=[10, 20, 30],
+            slow_opts=[50, 100],
+            risk_opts=[0.005],
+            atr_opts=[2.0, 3.0])
+
+
+def test_rung_windows_grow_by_eta_and_end_on_full_series():
+    assert rung_windows(20_000, 297, 3, 1000) == [2222, 6666, 20_000]
+    # Too few candidates to halve more than once
+    assert rung_windows(20_000, 3, 3, 100) == [6666, 20_000]
+    assert rung_windows(500, 100, 3, 1000) == [500]
+
+
+def test_candidates_match_grid_order():
+    cands = list(iter_candidates(**GRID))
+    assert len(cands) == 2 * (6 + 6)
+    assert cands[0].strategy == "ema" and cands[0].kwargs() == {"fast": 10, "slow": 50}
+    assert cands[6].strategy == "bollinger"
+
+
+def test_halving_keeps_top_fraction_and_finishes_on_full_window():
+    bars = synthetic_bars(6000)
+    seen = []
+    final, rungs = successive_halving("BENCHUSDT",
+                                      "1m",
+                                      bars,
+                                      iter_candidates(**GRID),
+                                      4.0,
+                                      lam=0.5,
+                                      eta=3,
+                                      min_window=500,
+                                      on_rung=seen.append)
+    assert seen == rungs
+    assert [r.window for r in rungs] == [666, 2000, 6000]
+    assert [r.evaluated for r in rungs] == [24, 8, 3]
+    assert all(r.bars == len(bars) for r in final)
+
+    # Finalists score exactly as in the exhaustive grid on the same bars
+    grid = {(r.strategy, r.params, r.risk, r.atr_mult): r
+            for r in eval_grid("BENCHUSDT", "1m", bars, fee_bps_val=4.0, **GRID)}
+    for r in final:
+        g = grid[(r.strategy, r.params, r.risk, r.atr_mult)]
+        assert score(r, 0.5) == score(g, 0.5)
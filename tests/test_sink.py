@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import random
+
+from dataclasses import replace
+
+from qryptify_strategy.candidates import Result
+from qryptify_strategy.models import AbortRules
+from qryptify_strategy.sink import choose_best
+from qryptify_strategy.sink import FullGridWriter
+from qryptify_strategy.sink import PairSink
+from qryptify_strategy.sink import pareto_frontier
+from qryptify_strategy.sink import sweep_unpruned
+
+
+def _results(n: int, seed: int):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        # Coarse values so ties in score, pnl and dd are common
+        out.append(
+            Result(strategy="ema",
+                   params=f"i={i}",
+                   risk=0.01,
+                   atr_mult=2.0,
+                   pnl=float(rng.randint(-20, 20) * 50),
+                   dd=float(rng.randint(0, 20) * 100),
+                   trades=rng.randint(0, 50),
+                   cagr=None,
+                   equity_end=10_000.0,
+                   pruned=rng.random() < 0.3,
+                   bars=100))
+    return out
+
+
+def test_sink_matches_batch_ranking_and_frontier():
+    for seed in range(20):
+        results = _results(300, seed)
+        for dd_cap in (None, 500.0, 0.0):
+            sink = PairSink(lam=0.5, dd_cap=dd_cap, top_k=10)
+            for r in results:
+                sink.add(r)
+            best, ranked = choose_best(results, dd_cap, 0.5)
+            assert sink.ranked() == ranked[:10]
+            assert sink.best() is best
+            # Pruned runs only cover a prefix: they never reach the frontier
+            assert sink.frontier.points() == pareto_frontier([r for r in results
+                                                              if not r.pruned])
+            assert sink.count == 300
+            assert sink.pruned == sum(r.pruned for r in results)
+
+
+def test_all_pruned_falls_back_to_any():
+    results = [r for r in _results(100, 1) if r.pruned]
+    sink = PairSink(lam=0.5, dd_cap=None, top_k=3)
+    for r in results:
+        sink.add(r)
+    assert sink.ranked() == choose_best(results, None, 0.5)[1][:3]
+    assert sink.all_pruned and len(sink.frontier) == 0
+
+
+def test_full_grid_writer_streams_rows(tmp_path):
+    path = str(tmp_path / "grid.csv.gz")
+    with FullGridWriter(path) as w:
+        sink = PairSink(lam=0.5, dd_cap=None, top_k=1,
+                        on_result=w.writer_for("BTCUSDT", "1h"))
+        for r in _results(25, 3):
+            sink.add(r)
+    with gzip.open(path, "rt", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 25 and rows[0]["symbol"] == "BTCUSDT"
+    assert rows[3]["params"] == "i=3"
+
+
+def test_all_pruned_pass_is_discarded_from_grid_and_counts(tmp_path):
+    path = str(tmp_path / "grid.csv")
+    results = _results(40, 5)
+    abort = AbortRules(max_drawdown=1.0)
+
+    def sweep(sink, abort_, prune_all=True):
+        # Pruned under abort (all of them, or the random 30%), full runs without
+        for r in results:
+            sink.add(replace(r, pruned=abort_ is not None and (prune_all or r.pruned),
+                             bars=10 if abort_ is not None else 100))
+        return sink.count
+
+    for prune_all, rows_expected, pruned_expected in ((True, 40, 0),
+                                                       (False, 40, sum(r.pruned
+                                                                       for r in results))):
+        with FullGridWriter(path) as w:
+            sink, n, fell_back = sweep_unpruned(
+                lambda hold: PairSink(0.5, None, 3, w.writer_for("BTCUSDT", "1h"),
+                                      hold_pruned=hold),
+                lambda s, a: sweep(s, a, prune_all), abort)
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert fell_back is prune_all
+        assert len(rows) == rows_expected and w.rows == rows_expected
+        assert sum(int(r["pruned"]) for r in rows) == pruned_expected
+        assert n == sink.count == 40 and sink.pruned == pruned_expected
+        assert sink.bars == (4000 if prune_all else 400)
+        assert not sink.best().pruned
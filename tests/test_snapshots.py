@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+
+from qryptify.data.synthetic import synthetic_bars
+from qryptify_strategy.indicators import RollingMeanStd
+from qryptify_strategy.indicators import true_range
+from qryptify_strategy.indicators import WilderATR
+from qryptify_strategy.indicators import WilderRSI
+from qryptify_strategy.snapshots import dumps
+from qryptify_strategy.snapshots import loads
+from qryptify_strategy.snapshots import SnapshotError
+from qryptify_strategy.snapshots import SnapshotStore
+from qryptify_strategy.strategies.bollinger import BollingerBandStrategy
+from qryptify_strategy.strategies.ema_crossover import EMACrossStrategy
+from qryptify_strategy.strategies.rsi_scalp import RSIScalpStrategy
+from qryptify_strategy.strategy_utils import BollingerCore
+from qryptify_strategy.strategy_utils import EMACrossCore
+from qryptify_strategy.strategy_utils import RSICore
+
+BARS = synthetic_bars(600)
+
+
+def _feed(obj, bars):
+    """One update per bar through each kind's own entry point."""
+    out = []
+    for k, b in enumerate(bars):
+        if isinstance(obj, WilderATR):
+            out.append(obj.update(true_range(b.high, b.low, bars[k - 1].close if k else None)))
+        elif isinstance(obj, (WilderRSI, RollingMeanStd, RSICore)):
+            out.append(obj.update(b.close))
+        elif isinstance(obj, EMACrossCore):
+            out.append(obj.update_and_cross(b.close))
+        elif isinstance(obj, BollingerCore):
+            out.append(obj.update_and_events(b.close))
+        else:
+            out.append(obj.on_bar(k, b))
+    return out
+
+
+@pytest.mark.parametrize("make", [
+    lambda: WilderRSI(14),
+    lambda: WilderATR(14),
+    lambda: RollingMeanStd(20),
+    lambda: EMACrossCore(20, 200),
+    lambda: BollingerCore(20, 2.0),
+    lambda: RSICore(14, 200),
+    lambda: EMACrossStrategy(20, 200),
+    lambda: BollingerBandStrategy(20, 2.0),
+    lambda: RSIScalpStrategy(14, 30.0, 55.0, 200),
+])
+@pytest.mark.parametrize("cut", [0, 5, 300])
+def test_restored_state_continues_identically(make, cut):
+    ref, live = make(), make()
+    _feed(ref, BARS[:cut])
+    _feed(live, BARS[:cut])
+    blob = dumps(live)
+    warm = make()
+    loads(blob, warm)
+    assert _feed(warm, BARS[cut:]) == _feed(ref, BARS[cut:])
+
+
+def test_blobs_are_compact_and_checked():
+    core = EMACrossCore(20, 200)
+    _feed(core, BARS[:50])
+    blob = dumps(core)
+    assert len(blob) < 64
+    with pytest.raises(SnapshotError):
+        loads(blob, EMACrossCore(20, 100))  # other parameters
+    with pytest.raises(SnapshotError):
+        loads(blob, WilderRSI(14))  # other kind
+    with pytest.raises(SnapshotError):
+        loads(blob[:4] + bytes([99]) + blob[5:], EMACrossCore(20, 200))  # other format
+    with pytest.raises(SnapshotError):
+        loads(blob[:-3], EMACrossCore(20, 200))
+
+
+def test_store_keeps_latest_per_pair_and_config(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snap.sqlite"), keep=2)
+    strat = EMACrossStrategy(10, 40)
+    strat.on_start()
+    for k, b in enumerate(BARS[:300]):
+        strat.on_bar(k, b)
+        if k in (99, 199, 299):
+            store.save("BTCUSDT/1m", strat, b.ts)
+
+    other = EMACrossStrategy(10, 50)
+    assert store.restore_latest("BTCUSDT/1m", other) is None
+    assert store.restore_latest("ETHUSDT/1m", EMACrossStrategy(10, 40)) is None
+
+    warm = EMACrossStrategy(10, 40)
+    assert store.restore_latest("BTCUSDT/1m", warm) == BARS[299].ts
+    assert warm.snapshot() == strat.snapshot()
+    # keep=2 dropped the oldest
+    old = EMACrossStrategy(10, 40)
+    assert store.restore_latest("BTCUSDT/1m", old,
+                                before=BARS[299].ts - timedelta(seconds=1)) == BARS[199].ts
+    assert store.restore_latest("BTCUSDT/1m", old, before=BARS[150].ts) is None
+    store.close()
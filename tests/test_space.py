@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import itertools
+
+import pytest
+
+from qryptify_strategy.candidates import iter_candidates
+from qryptify_strategy.candidates import make_strategy
+from qryptify_strategy.space import compile_constraint
+from qryptify_strategy.space import Dim
+from qryptify_strategy.space import legacy_space
+from qryptify_strategy.space import parse_space
+from qryptify_strategy.space import sample
+
+SPACE = {
+    "common": {
+        "risk": [0.005, 0.01],
+        "atr_mult": {"min": 2.0, "max": 3.0, "step": 0.5},
+        "atr_trail": [0.0, 2.0],
+    },
+    "strategies": {
+        "ema": {
+            "fast": {"min": 5, "max": 100, "step": 5},
+            "slow": {"min": 20, "max": 400, "step": 20},
+            "constraints": ["fast * 2 <= slow"],
+        },
+        "rsi": {
+            "entry": {"min": 20, "max": 40},
+            "exit": {"min": 40.0, "max": 70.0},
+            "constraints": ["exit >= entry + 10"],
+        },
+    },
+}
+
+
+def test_dim_parsing():
+    assert Dim.parse("fast", {"min": 5, "max": 20, "step": 5}).values == [5, 10, 15, 20]
+    assert Dim.parse("mult", {"min": 2.0, "max": 3.0, "step": 0.5}).values == [2.0, 2.5, 3.0]
+    assert Dim.parse("period", {"min": 8, "max": 10}).values == [8, 9, 10]
+    cont = Dim.parse("exit", {"min": 40.0, "max": 70.0})
+    assert cont.size is None and cont.at(0.5) == 55.0
+    assert Dim.parse("ema_filter", 200).values == [200]
+
+
+def test_constraints():
+    check = compile_constraint("fast * 2 <= slow - 10", ["fast", "slow"])
+    assert check({"fast": 10, "slow": 30})
+    assert not check({"fast": 10, "slow": 29})
+    assert compile_constraint("10 < a < b", ["a", "b"])({"a": 11, "b": 12})
+    with pytest.raises(ValueError):
+        compile_constraint("fast < nope", ["fast"])
+    with pytest.raises(ValueError):
+        compile_constraint("fast", ["fast"])
+
+
+def test_unknown_strategy_param_rejected():
+    with pytest.raises(ValueError, match="unknown parameter"):
+        parse_space({"strategies": {"ema": {"fastest": [1]}}})
+
+
+def test_grid_matches_cli_grid():
+    args = (["ema", "bollinger", "rsi"], [10, 20, 50], [50, 200], [0.005], [2.0, 3.0])
+    legacy = set(iter_candidates(*args))
+    assert set(sample(legacy_space(*args))) == legacy
+
+
+def test_grid_is_lazy_and_respects_constraints():
+    space = parse_space(SPACE)
+    head = list(itertools.islice(sample(space, "grid"), 50))
+    assert len(head) == 50
+    assert all(dict(c.params)["fast"] * 2 <= dict(c.params)["slow"] for c in head)
+    with pytest.raises(ValueError, match="grid sampling needs a step"):
+        list(sample(parse_space({"strategies": {"rsi": SPACE["strategies"]["rsi"]}})))
+
+
+@pytest.mark.parametrize("sampler", ["random", "lhs"])
+def test_random_and_lhs_fill_budget_with_feasible_distinct_points(sampler):
+    space = parse_space(SPACE)
+    got = list(sample(space, sampler, budget=200, seed=3))
+    assert len(got) == 200 and len(set(got)) == 200
+    assert sum(c.strategy == "ema" for c in got) == 100
+    for c in got:
+        kw = c.kwargs()
+        if c.strategy == "rsi":
+            assert kw["exit"] >= kw["entry"] + 10
+            assert kw["rsi_period"] == 14  # constructor default
+        make_strategy(c)
+    assert {c.trail for c in got} == {0.0, 2.0}
+    # Same seed, same draw
+    assert got == list(sample(space, sampler, budget=200, seed=3))
+
+
+def test_lhs_covers_each_stratum():
+    space = parse_space({"strategies": {"ema": {"fast": {"min": 1, "max": 10},
+                                                "slow": [500]}}})
+    got = list(sample(space, "lhs", budget=10, seed=1))
+    # Space of 10 fits the budget: enumerated exactly once
+    assert sorted(dict(c.params)["fast"] for c in got) == list(range(1, 11))
+    big = parse_space({"strategies": {"ema": {"fast": {"min": 1, "max": 1000},
+                                              "slow": [5000]}}})
+    fast = sorted(dict(c.params)["fast"] for c in sample(big, "lhs", budget=10, seed=1))
+    assert [(f - 1) // 100 for f in fast] == list(range(10))
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import json
+import math
+
+import pytest
+
 from qryptify_strategy.strategy_utils import BollingerCore
 from qryptify_strategy.strategy_utils import EMACrossCore
 from qryptify_strategy.strategy_utils import RSICore
@@ -44,3 +49,28 @@ def test_rsi_core_basic_and_ema_filter():
     prev_rsi, rsi, ema_ok_long, ema_ok_short, ema_cross_down, ema_cross_up = last
     assert rsi is not None
     assert isinstance(ema_ok_long, bool) and isinstance(ema_ok_short, bool)
+
+
+def test_cores_restore_from_json_snapshot():
+    closes = [100 + 5 * math.sin(i / 7) + (i % 5) for i in range(300)]
+    for make, step in ((lambda: EMACrossCore(5, 20), "update_and_cross"),
+                       (lambda: BollingerCore(20, 2.0), "update_and_events"),
+                       (lambda: RSICore(14, 30), "update")):
+        ref, core = make(), make()
+        for c in closes[:150]:
+            getattr(ref, step)(c)
+            getattr(core, step)(c)
+        restored = make()
+        restored.restore(json.loads(json.dumps(core.snapshot())))
+        for c in closes[150:]:
+            assert getattr(restored, step)(c) == getattr(ref, step)(c)
+
+    with pytest.raises(ValueError):
+        EMACrossCore(5, 30).restore(EMACrossCore(5, 20).snapshot())
+
+
+def test_core_warmups():
+    assert EMACrossCore(50, 200).warmup == 600
+    assert BollingerCore(20, 2.0).warmup == 21
+    assert RSICore(14, 0).warmup == 16
+    assert RSICore(14, 200).warmup == 600
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from qryptify.data.synthetic import synthetic_bars
+from qryptify_strategy.backtester import backtest
+from qryptify_strategy.backtester import required_warmup
+from qryptify_strategy.candidates import candidate_risk
+from qryptify_strategy.candidates import eval_candidates
+from qryptify_strategy.candidates import iter_candidates
+from qryptify_strategy.candidates import make_strategy
+from qryptify_strategy.models import AbortRules
+from qryptify_strategy.sink import choose_best
+from qryptify_strategy.walkforward import walk_forward
+from qryptify_strategy.walkforward import wf_windows
+from qryptify_strategy.walkforward import WFSettings
+
+GRID = (["ema", "bollinger"], [10, 20], [50, 100], [0.005], [2.0, 3.0])
+
+
+def test_windows_roll_or_anchor():
+    rolling = wf_windows(1000, 400, 250)
+    assert [(w.is_start, w.is_end, w.oos_end) for w in rolling] == [(0, 400, 650),
+                                                                    (250, 650, 900),
+                                                                    (500, 900, 1000)]
+    anchored = wf_windows(1000, 400, 250, anchored=True)
+    assert [w.is_start for w in anchored] == [0, 0, 0]
+    assert wf_windows(400, 400, 100) == []
+
+
+def test_warmup_bars_feed_indicators_but_do_not_trade():
+    bars = synthetic_bars(3000)
+    cand = list(iter_candidates(*GRID))[0]
+    risk = candidate_risk(cand, 4.0)
+    full, _ = backtest("B", "1m", bars, make_strategy(cand), risk)
+    assert backtest("B", "1m", bars, make_strategy(cand), risk, warmup=0)[0] == full
+    rpt, trades = backtest("B", "1m", bars, make_strategy(cand), risk, warmup=2000)
+    assert rpt.bars == 1000
+    assert trades and all(t.entry_ts >= bars[2000].ts for t in trades)
+
+
+def test_walk_forward_picks_and_stitches():
+    bars = synthetic_bars(4000)
+    cands = list(iter_candidates(*GRID))
+    st = WFSettings(lam=0.5)
+    rep = walk_forward("B", "1m", bars, cands, 4.0, st, window=1500, step=1000)
+    assert len(rep.windows) == 3
+    for w in rep.windows:
+        sl = bars[w.window.is_start:w.window.is_end]
+        best, _ = choose_best(eval_candidates("B", "1m", sl, cands, 4.0), None, 0.5)
+        assert w.is_result == best and w.pick is not None
+    for prev, nxt in zip(rep.windows, rep.windows[1:]):
+        assert nxt.equity_start == prev.equity_end
+    assert rep.end_equity == rep.windows[-1].equity_end
+    assert rep.equity[0] == (bars[1500].ts, 10_000.0)
+
+    # OOS runs warm up on the declared warm-up only, not the whole IS slice
+    w = rep.windows[1]
+    strat = make_strategy(w.pick)
+    warm = required_warmup(strat, 14)
+    assert warm < 1500
+    oos, _ = backtest("B", "1m", bars[w.window.oos_start - warm:w.window.oos_end], strat,
+                      replace(candidate_risk(w.pick, 4.0), start_equity=w.equity_start),
+                      warmup=warm)
+    assert w.oos == oos
+
+    par = walk_forward("B", "1m", bars, cands, 4.0, st, window=1500, step=1000, workers=2)
+    assert par.equity == rep.equity
+    assert [w.pick for w in par.windows] == [w.pick for w in rep.windows]
+
+
+def test_all_pruned_window_reruns_without_abort():
+    bars = synthetic_bars(2500)
+    cands = list(iter_candidates(*GRID))
+    # Every candidate is pruned at bar 100; picking from those prefixes is noise
+    abort = AbortRules(min_trades=10**6, min_trades_by_bar=100)
+    assert all(r.pruned for r in eval_candidates("B", "1m", bars[:1500], cands, 4.0, abort))
+    rep = walk_forward("B", "1m", bars, cands, 4.0, WFSettings(lam=0.5, abort=abort),
+                       window=1500, step=1000)
+    plain = walk_forward("B", "1m", bars, cands, 4.0, WFSettings(lam=0.5), window=1500,
+                         step=1000)
+    assert [w.pick for w in rep.windows] == [w.pick for w in plain.windows]
+    assert not rep.windows[0].is_result.pruned
@@ -8,6 +8,7 @@ set -euo pipefail
 #   FILTER_SYMBOL  - limit to a specific symbol (e.g., BTCUSDT)
 #   FILTER_INTERVAL - limit to a specific interval (e.g., 1h)
 #   SHOW_SAMPLE=1  - also show last 3 bars per (symbol, interval)
+#   CHECK_ROLLUPS=1 - compare 1m rollups with native bars where both exist
 
 # --- Config (override via env) ---
 PGHOST="${PGHOST:-localhost}"
@@ -21,6 +22,7 @@ PSQL="psql -h $PGHOST -p $PGPORT -U $PGUSER -d $PGDATABASE -v ON_ERROR_STOP=1 -X
 FILTER_SYMBOL="${FILTER_SYMBOL:-}"
 FILTER_INTERVAL="${FILTER_INTERVAL:-}"
 SHOW_SAMPLE="${SHOW_SAMPLE:-0}"
+CHECK_ROLLUPS="${CHECK_ROLLUPS:-0}"
 
 # --- Display helpers ---
 bold()   { tput bold 2>/dev/null || true; }
@@ -147,4 +149,36 @@ if [[ "${SHOW_SAMPLE}" == "1" ]]; then
   ORDER BY symbol, interval, ts DESC;" | pretty
 fi
 
+if [[ "${CHECK_ROLLUPS}" == "1" ]]; then
+  bar "10) Rollup Parity (continuous aggregates vs native bars)"
+  for IVL in 3m 5m 15m 30m 1h 2h 4h; do
+    [[ -n "$IVL_F" && "$IVL_F" != "$IVL" ]] && continue
+    $PSQL -c "
+    SELECT '${IVL}' AS interval, n.symbol, COUNT(*) AS compared,
+           SUM(CASE WHEN r.open = n.open AND r.high = n.high AND r.low = n.low
+                     AND r.close = n.close AND r.close_time = n.close_time
+                     AND r.number_of_trades = n.number_of_trades
+                     AND abs(r.volume - n.volume) <= 1e-9 * greatest(abs(n.volume), 1)
+                    THEN 0 ELSE 1 END) AS mismatched
+    FROM candlesticks n
+    JOIN candlesticks_rollup_${IVL} r ON r.symbol = n.symbol AND r.ts = n.ts
+    WHERE n.interval = '${IVL}' AND $WHERE_SYM
+    GROUP BY n.symbol
+    ORDER BY 2;" | pretty || true
+  done
+fi
+
+if [[ "$($PSQL -t -c "SELECT to_regclass('ingest_latency') IS NOT NULL")" == "t" ]]; then
+  bar "11) Live Bar Latency (last hour, close -> commit)"
+  $PSQL -c "
+  SELECT symbol, interval, SUM(n) AS bars,
+         round(percentile_cont(0.5) WITHIN GROUP (ORDER BY p50_ms)::numeric, 1) AS median_p50_ms,
+         round(MAX(p99_ms)::numeric, 1) AS worst_p99_ms,
+         round(MAX(max_ms)::numeric, 1) AS max_ms
+  FROM ingest_latency
+  WHERE stage = 'total' AND ts > now() - INTERVAL '1 hour' AND $WHERE_SYM AND $WHERE_IVL
+  GROUP BY symbol, interval
+  ORDER BY 1,2;" | pretty
+fi
+
 bar "Done"